@@ -1,4 +1,4 @@
-import asyncio, random, string, threading
+import asyncio, os, random, string, threading
 import nest_asyncio
 
 nest_asyncio.apply()
@@ -11,6 +11,7 @@ from enum import Enum
 import models
 
 from python.helpers import (
+    dotenv,
     extract_tools,
     files,
     errors,
@@ -22,14 +23,10 @@ from python.helpers import (
 )
 from python.helpers.print_style import PrintStyle
 
-from langchain_core.prompts import (
-    ChatPromptTemplate,
-)
-from langchain_core.messages import SystemMessage, BaseMessage
+from langchain_core.messages import SystemMessage, BaseMessage, get_buffer_string
 
 import python.helpers.log as Log
-from python.helpers.dirty_json import DirtyJson
-from python.helpers.defer import DeferredTask
+from python.helpers.defer import DeferredTask, EventLoopLanes
 from typing import Callable
 from python.helpers.localization import Localization
 from python.helpers.extension import call_extensions
@@ -48,6 +45,8 @@ class AgentContext:
     _contexts_lock = threading.RLock()
     _counter: int = 0
     _notification_manager = None
+    _lanes: EventLoopLanes | None = None
+    _lanes_lock = threading.Lock()
 
     def __init__(
         self,
@@ -153,12 +152,25 @@ class AgentContext:
             cls._notification_manager = NotificationManager()
         return cls._notification_manager
 
+    @classmethod
+    def get_lanes(cls) -> EventLoopLanes:
+        # contexts run on a bounded pool of event loop threads, sticky per context
+        if cls._lanes is None:
+            with cls._lanes_lock:
+                if cls._lanes is None:
+                    size = int(dotenv.get_dotenv_value("A0_AGENT_LANES", 0) or 0)
+                    cls._lanes = EventLoopLanes(
+                        cls.__name__, size or min(32, (os.cpu_count() or 1) * 2)
+                    )
+        return cls._lanes
+
     @staticmethod
     def remove(id: str):
         with AgentContext._contexts_lock:
             context = AgentContext._contexts.pop(id, None)
         if context and context.task:
             context.task.kill()
+        AgentContext.get_lanes().release(id)
         return context
 
     def get_data(self, key: str, recursive: bool = True):
@@ -267,7 +279,7 @@ class AgentContext:
     ):
         if not self.task:
             self.task = DeferredTask(
-                thread_name=self.__class__.__name__,
+                thread_name=AgentContext.get_lanes().get_thread_name(self.id),
             )
         self.task.start_task(func, *args, **kwargs)
         return self.task
@@ -570,14 +582,16 @@ class Agent:
             SystemMessage(content=system_text),
             *history_langchain,
         ]
-        full_text = ChatPromptTemplate.from_messages(full_prompt).format()
+        # format messages one by one, unchanged messages reuse their memoized token counts
+        message_texts = [get_buffer_string([message]) for message in full_prompt]
+        full_text = "\n".join(message_texts)
 
         # store as last context window content
         self.set_data(
             Agent.DATA_NAME_CTX_WINDOW,
             {
                 "text": full_text,
-                "tokens": tokens.approximate_tokens(full_text),
+                "tokens": tokens.approximate_tokens_sum(message_texts),
             },
         )
 
@@ -959,13 +973,18 @@ class Agent:
         try:
             if len(stream) < 25:
                 return  # no reason to try
-            response = DirtyJson.parse_string(stream)
+            # keep one incremental parser per LLM response, only new text is parsed
+            parser = self.loop_data.params_temporary.get("response_parser")
+            if not parser:
+                parser = dirty_json.DirtyJsonStream()
+                self.loop_data.params_temporary["response_parser"] = parser
+            response = parser.feed_text(stream)
             if isinstance(response, dict):
                 await self.call_extensions(
                     "response_stream",
                     loop_data=self.loop_data,
                     text=stream,
-                    parsed=response,
+                    parsed=parser.snapshot(),  # extensions may modify the parsed object
                 )
 
         except Exception as e:
@@ -981,20 +1000,10 @@ class Agent:
         **kwargs,
     ):
         from python.tools.unknown import Unknown
-        from python.helpers.tool import Tool
-
-        classes = []
-
-        # search for tools in agent's folder hierarchy
-        paths = subagents.get_paths(self, "tools", name + ".py", default_root="python")
-        for path in paths:
-            try:
-                classes = extract_tools.load_classes_from_file(path, Tool)  # type: ignore[arg-type]
-                break
-            except Exception:
-                continue
+        from python.helpers import tool_registry
 
-        tool_class = classes[0] if classes else Unknown
+        # search for tools in agent's folder hierarchy, classes are cached until the file changes
+        tool_class = tool_registry.get_tool_class(self, name) or Unknown
         return tool_class(
             agent=self,
             name=name,
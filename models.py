@@ -2,6 +2,7 @@ from dataclasses import dataclass, field
 from enum import Enum
 import logging
 import os
+import threading
 from typing import (
     Any,
     Awaitable,
@@ -22,6 +23,7 @@ from litellm.types.utils import ModelResponse
 from python.helpers import dotenv
 from python.helpers import settings, dirty_json
 from python.helpers.dotenv import load_dotenv
+from python.helpers.embedding_service import EmbeddingService
 from python.helpers.providers import ModelType as ProviderModelType, get_provider_config
 from python.helpers.rate_limiter import RateLimiter
 from python.helpers.tokens import approximate_tokens
@@ -196,6 +198,8 @@ class ChatGenerationResult:
 
 rate_limiters: dict[str, RateLimiter] = {}
 api_keys_round_robin: dict[str, int] = {}
+# model calls of different event loop lanes share the limiters and key rotation
+_shared_state_lock = threading.Lock()
 
 
 def get_api_key(service: str) -> str:
@@ -209,8 +213,9 @@ def get_api_key(service: str) -> str:
     # if the key contains a comma, use round-robin
     if "," in key:
         api_keys = [k.strip() for k in key.split(",") if k.strip()]
-        api_keys_round_robin[service] = api_keys_round_robin.get(service, -1) + 1
-        key = api_keys[api_keys_round_robin[service] % len(api_keys)]
+        with _shared_state_lock:
+            api_keys_round_robin[service] = index = api_keys_round_robin.get(service, -1) + 1
+        key = api_keys[index % len(api_keys)]
     return key
 
 
@@ -218,7 +223,8 @@ def get_rate_limiter(
     provider: str, name: str, requests: int, input: int, output: int
 ) -> RateLimiter:
     key = f"{provider}\\{name}"
-    rate_limiters[key] = limiter = rate_limiters.get(key, RateLimiter(seconds=60))
+    with _shared_state_lock:
+        limiter = rate_limiters.setdefault(key, RateLimiter(seconds=60))
     limiter.limits["requests"] = requests or 0
     limiter.limits["input"] = input or 0
     limiter.limits["output"] = output or 0
@@ -266,7 +272,9 @@ async def apply_rate_limiter(
         model_config.limit_input,
         model_config.limit_output,
     )
-    limiter.add(input=approximate_tokens(input_text))
+    # counting input tokens is only needed when they are limited
+    if limiter.is_limited("input"):
+        limiter.add(input=approximate_tokens(input_text))
     limiter.add(requests=1)
     await limiter.wait(rate_limiter_callback)
     return limiter
@@ -534,7 +542,7 @@ class LiteLLMChatWrapper(SimpleChatModel):
                                     approximate_tokens(output["reasoning_delta"]),
                                 )
                             # Add output tokens to rate limiter if configured
-                            if limiter:
+                            if limiter and limiter.is_limited("output"):
                                 limiter.add(output=approximate_tokens(output["reasoning_delta"]))
                         # collect response delta and call callbacks
                         if output["response_delta"]:
@@ -546,14 +554,14 @@ class LiteLLMChatWrapper(SimpleChatModel):
                                     approximate_tokens(output["response_delta"]),
                                 )
                             # Add output tokens to rate limiter if configured
-                            if limiter:
+                            if limiter and limiter.is_limited("output"):
                                 limiter.add(output=approximate_tokens(output["response_delta"]))
 
                 # non-stream response
                 else:
                     parsed = _parse_chunk(_completion)
                     output = result.add_chunk(parsed)
-                    if limiter:
+                    if limiter and limiter.is_limited("output"):
                         if output["response_delta"]:
                             limiter.add(output=approximate_tokens(output["response_delta"]))
                         if output["reasoning_delta"]:
@@ -703,7 +711,9 @@ class LiteLLMEmbeddingWrapper(Embeddings):
 
 
 class LocalSentenceTransformerWrapper(Embeddings):
-    """Local wrapper for sentence-transformers models to avoid HuggingFace API calls"""
+    """Local wrapper for sentence-transformers models to avoid HuggingFace API calls.
+    Models are loaded once per configuration and shared through the embedding service,
+    which batches concurrent requests."""
 
     def __init__(
         self,
@@ -730,7 +740,12 @@ class LocalSentenceTransformerWrapper(Embeddings):
         }
         st_kwargs = {k: v for k, v in (kwargs or {}).items() if k in st_allowed_keys}
 
-        self.model = SentenceTransformer(model, **st_kwargs)
+        self.service = EmbeddingService.get(
+            ("sentence-transformers", model, repr(sorted(st_kwargs.items()))),
+            load=lambda: SentenceTransformer(model, **st_kwargs),
+            encode=_encode_sentence_transformer,
+        )
+        self.model = self.service.model
         self.model_name = model
         self.a0_model_conf = model_config
 
@@ -738,18 +753,30 @@ class LocalSentenceTransformerWrapper(Embeddings):
         # Apply rate limiting if configured
         apply_rate_limiter_sync(self.a0_model_conf, " ".join(texts))
 
-        embeddings = self.model.encode(texts, convert_to_tensor=False)  # type: ignore
-        return embeddings.tolist() if hasattr(embeddings, "tolist") else embeddings  # type: ignore
+        return self.service.embed(texts)
 
     def embed_query(self, text: str) -> List[float]:
         # Apply rate limiting if configured
         apply_rate_limiter_sync(self.a0_model_conf, text)
 
-        embedding = self.model.encode([text], convert_to_tensor=False)  # type: ignore
-        result = (
-            embedding[0].tolist() if hasattr(embedding[0], "tolist") else embedding[0]
-        )
-        return result  # type: ignore
+        return self.service.embed([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        # Apply rate limiting if configured
+        await apply_rate_limiter(self.a0_model_conf, " ".join(texts))
+
+        return await self.service.aembed(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        # Apply rate limiting if configured
+        await apply_rate_limiter(self.a0_model_conf, text)
+
+        return (await self.service.aembed([text]))[0]
+
+
+def _encode_sentence_transformer(model: SentenceTransformer, texts: List[str]) -> List[List[float]]:
+    embeddings = model.encode(texts, convert_to_tensor=False)  # type: ignore
+    return embeddings.tolist() if hasattr(embeddings, "tolist") else embeddings  # type: ignore
 
 
 def _get_litellm_chat(
@@ -891,6 +918,7 @@ def _merge_provider_defaults(
 
     # Merge LiteLLM global kwargs (timeouts, stream_timeout, etc.)
     try:
+        # a copy, litellm updates nested values like extra_headers in place
         global_kwargs = settings.get_settings().get("litellm_global_kwargs", {})  # type: ignore[union-attr]
     except Exception:
         global_kwargs = {}
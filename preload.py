@@ -1,7 +1,7 @@
 import asyncio
 from python.helpers import runtime, whisper, settings
 from python.helpers.print_style import PrintStyle
-from python.helpers import kokoro_tts
+from python.helpers import kokoro_tts, tool_registry
 import models
 
 
@@ -37,8 +37,16 @@ async def preload():
                 except Exception as e:
                     PrintStyle().error(f"Error in preload_kokoro: {e}")
 
+        # preload tool classes of all profiles
+        async def preload_tools():
+            try:
+                return tool_registry.preload()
+            except Exception as e:
+                PrintStyle().error(f"Error in preload_tools: {e}")
+
         # async tasks to preload
         tasks = [
+            preload_tools(),
             preload_embedding(),
             # preload_whisper(),
             # preload_kokoro()
@@ -1,5 +1,6 @@
 from python.helpers.api import ApiHandler, Request, Response, send_file
 from python.helpers.backup import BackupService
+from python.helpers.backup_store import start_progress
 from python.helpers.persist_chat import save_tmp_chats
 
 
@@ -19,6 +20,7 @@ class BackupCreate(ApiHandler):
             exclude_patterns = input.get("exclude_patterns", [])
             include_hidden = input.get("include_hidden", True)
             backup_name = input.get("backup_name", "agent-zero-backup")
+            incremental = input.get("incremental", False)
 
             # Support legacy string patterns format for backward compatibility
             patterns_string = input.get("patterns", "")
@@ -34,14 +36,37 @@ class BackupCreate(ApiHandler):
             # Save all chats to the chats folder
             save_tmp_chats()
 
-            # Create backup service and generate backup
-            backup_service = BackupService()
-            zip_path = await backup_service.create_backup(
-                include_patterns=include_patterns,
-                exclude_patterns=exclude_patterns,
-                include_hidden=include_hidden,
-                backup_name=backup_name
-            )
+            # Progress can be polled with backup_progress using the same job_id
+            progress = start_progress("snapshot" if incremental else "backup", input.get("job_id", ""))
+
+            try:
+                backup_service = BackupService()
+                if incremental:
+                    # Store an incremental snapshot in the local backup store
+                    result = await backup_service.create_snapshot(
+                        include_patterns=include_patterns,
+                        exclude_patterns=exclude_patterns,
+                        include_hidden=include_hidden,
+                        backup_name=backup_name,
+                        parent_id=input.get("parent_id"),
+                        progress=progress
+                    )
+                    progress.result = result
+                    return {"success": True, "job_id": progress.id, **result}
+
+                # Create backup service and generate backup
+                zip_path = await backup_service.create_backup(
+                    include_patterns=include_patterns,
+                    exclude_patterns=exclude_patterns,
+                    include_hidden=include_hidden,
+                    backup_name=backup_name,
+                    progress=progress
+                )
+            except Exception as e:
+                progress.error = str(e)
+                raise
+            finally:
+                progress.done = True
 
             # Return file for download
             return send_file(
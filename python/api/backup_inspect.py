@@ -13,17 +13,21 @@ class BackupInspect(ApiHandler):
         return False
 
     async def process(self, input: dict, request: Request) -> dict | Response:
-        # Handle file upload
-        if 'backup_file' not in request.files:
-            return {"success": False, "error": "No backup file provided"}
-
-        backup_file: FileStorage = request.files['backup_file']
-        if backup_file.filename == '':
-            return {"success": False, "error": "No file selected"}
+        # Snapshots of the local backup store are restored by id, archives are uploaded
+        snapshot_id = request.form.get('snapshot_id') or input.get("snapshot_id")
+        backup_file: FileStorage | None = None
+        if not snapshot_id:
+            # Handle file upload
+            if 'backup_file' not in request.files:
+                return {"success": False, "error": "No backup file provided"}
+
+            backup_file = request.files['backup_file']
+            if backup_file.filename == '':
+                return {"success": False, "error": "No file selected"}
 
         try:
             backup_service = BackupService()
-            metadata = await backup_service.inspect_backup(backup_file)
+            metadata = await backup_service.inspect_backup(backup_file, snapshot_id=snapshot_id)
 
             return {
                 "success": True,
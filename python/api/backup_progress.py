@@ -0,0 +1,24 @@
+from python.helpers.api import ApiHandler, Request, Response
+from python.helpers.backup_store import get_progress
+
+
+class BackupProgress(ApiHandler):
+    @classmethod
+    def runs_on_event_loop(cls) -> bool:
+        return True
+
+    @classmethod
+    def requires_auth(cls) -> bool:
+        return True
+
+    @classmethod
+    def requires_loopback(cls) -> bool:
+        return False
+
+    async def process(self, input: dict, request: Request) -> dict | Response:
+        job_id = input.get("job_id", "")
+        progress = get_progress(job_id)
+        if not progress:
+            return {"success": False, "error": f"No backup job '{job_id}'"}
+
+        return {"success": True, "progress": progress.to_dict()}
@@ -1,6 +1,7 @@
 from python.helpers.api import ApiHandler, Request, Response
 from werkzeug.datastructures import FileStorage
 from python.helpers.backup import BackupService
+from python.helpers.backup_store import start_progress
 from python.helpers.persist_chat import load_tmp_chats
 import json
 
@@ -15,13 +16,17 @@ class BackupRestore(ApiHandler):
         return False
 
     async def process(self, input: dict, request: Request) -> dict | Response:
-        # Handle file upload
-        if 'backup_file' not in request.files:
-            return {"success": False, "error": "No backup file provided"}
+        # Snapshots of the local backup store are restored by id, archives are uploaded
+        snapshot_id = request.form.get('snapshot_id') or input.get("snapshot_id")
+        backup_file: FileStorage | None = None
+        if not snapshot_id:
+            # Handle file upload
+            if 'backup_file' not in request.files:
+                return {"success": False, "error": "No backup file provided"}
 
-        backup_file: FileStorage = request.files['backup_file']
-        if backup_file.filename == '':
-            return {"success": False, "error": "No file selected"}
+            backup_file = request.files['backup_file']
+            if backup_file.filename == '':
+                return {"success": False, "error": "No file selected"}
 
         # Get restore configuration from form data
         metadata_json = request.form.get('metadata', '{}')
@@ -35,6 +40,9 @@ class BackupRestore(ApiHandler):
         except json.JSONDecodeError:
             return {"success": False, "error": "Invalid metadata JSON"}
 
+        # Progress can be polled with backup_progress using the same job_id
+        progress = start_progress("restore", request.form.get('job_id', ''))
+
         try:
             backup_service = BackupService()
             result = await backup_service.restore_backup(
@@ -43,8 +51,11 @@ class BackupRestore(ApiHandler):
                 restore_exclude_patterns=restore_exclude_patterns,
                 overwrite_policy=overwrite_policy,
                 clean_before_restore=clean_before_restore,
-                user_edited_metadata=metadata
+                user_edited_metadata=metadata,
+                snapshot_id=snapshot_id,
+                progress=progress
             )
+            progress.done = True
 
             # Load all chats from the chats folder
             load_tmp_chats()
@@ -60,6 +71,8 @@ class BackupRestore(ApiHandler):
             }
 
         except Exception as e:
+            progress.error = str(e)
+            progress.done = True
             return {
                 "success": False,
                 "error": str(e)
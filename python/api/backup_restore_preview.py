@@ -14,13 +14,17 @@ class BackupRestorePreview(ApiHandler):
         return False
 
     async def process(self, input: dict, request: Request) -> dict | Response:
-        # Handle file upload
-        if 'backup_file' not in request.files:
-            return {"success": False, "error": "No backup file provided"}
+        # Snapshots of the local backup store are restored by id, archives are uploaded
+        snapshot_id = request.form.get('snapshot_id') or input.get("snapshot_id")
+        backup_file: FileStorage | None = None
+        if not snapshot_id:
+            # Handle file upload
+            if 'backup_file' not in request.files:
+                return {"success": False, "error": "No backup file provided"}
 
-        backup_file: FileStorage = request.files['backup_file']
-        if backup_file.filename == '':
-            return {"success": False, "error": "No file selected"}
+            backup_file = request.files['backup_file']
+            if backup_file.filename == '':
+                return {"success": False, "error": "No file selected"}
 
         # Get restore patterns and options from form data
         metadata_json = request.form.get('metadata', '{}')
@@ -42,7 +46,8 @@ class BackupRestorePreview(ApiHandler):
                 restore_exclude_patterns=restore_exclude_patterns,
                 overwrite_policy=overwrite_policy,
                 clean_before_restore=clean_before_restore,
-                user_edited_metadata=metadata
+                user_edited_metadata=metadata,
+                snapshot_id=snapshot_id
             )
 
             return {
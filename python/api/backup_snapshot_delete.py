@@ -0,0 +1,37 @@
+from python.helpers.api import ApiHandler, Request, Response
+from python.helpers.backup import BackupService
+
+
+class BackupSnapshotDelete(ApiHandler):
+    @classmethod
+    def requires_auth(cls) -> bool:
+        return True
+
+    @classmethod
+    def requires_loopback(cls) -> bool:
+        return False
+
+    async def process(self, input: dict, request: Request) -> dict | Response:
+        try:
+            backup_service = BackupService()
+            snapshot_ids = input.get("snapshot_ids", [])
+            keep_last = input.get("keep_last")
+
+            if keep_last is not None:
+                # Retention: keep the newest snapshots, delete older ones
+                result = await backup_service.prune_snapshots(int(keep_last))
+            elif snapshot_ids:
+                result = await backup_service.delete_snapshots(snapshot_ids)
+            else:
+                return {
+                    "success": False,
+                    "error": "snapshot_ids or keep_last is required"
+                }
+
+            return {"success": True, **result}
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
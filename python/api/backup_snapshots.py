@@ -0,0 +1,29 @@
+from python.helpers.api import ApiHandler, Request, Response
+from python.helpers.backup import BackupService
+
+
+class BackupSnapshots(ApiHandler):
+    @classmethod
+    def requires_auth(cls) -> bool:
+        return True
+
+    @classmethod
+    def requires_loopback(cls) -> bool:
+        return False
+
+    async def process(self, input: dict, request: Request) -> dict | Response:
+        try:
+            backup_service = BackupService()
+            snapshots = backup_service.list_snapshots()
+
+            return {
+                "success": True,
+                "snapshots": snapshots,
+                "total_count": len(snapshots)
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
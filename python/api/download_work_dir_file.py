@@ -86,7 +86,6 @@ def make_disposition(download_name: str) -> str:
 
 
 class DownloadFile(ApiHandler):
-
     @classmethod
     def get_methods(cls):
         return ["GET"]
@@ -1,5 +1,6 @@
 from python.helpers.api import ApiHandler, Request, Response
 from python.helpers import errors, git
+from agent import AgentContext
 
 class HealthCheck(ApiHandler):
 
@@ -23,4 +24,7 @@ class HealthCheck(ApiHandler):
         except Exception as e:
             error = errors.error_text(e)
 
-        return {"gitinfo": gitinfo, "error": error}
+        # per-lane load of chat execution threads (keys, active tasks, wait and lag)
+        lanes = AgentContext.get_lanes().get_metrics()
+
+        return {"gitinfo": gitinfo, "error": error, "lanes": lanes}
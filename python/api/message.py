@@ -1,3 +1,4 @@
+import asyncio
 from agent import AgentContext, UserMessage
 from python.helpers.api import ApiHandler, Request, Response
 
@@ -8,6 +9,11 @@ from python.helpers.defer import DeferredTask
 
 
 class Message(ApiHandler):
+    @classmethod
+    def runs_on_event_loop(cls) -> bool:
+        # body parsing, attachment saves and context creation run in worker threads
+        return True
+
     async def process(self, input: dict, request: Request) -> dict | Response:
         task, context = await self.communicate(input=input, request=request)
         return await self.respond(task, context)
@@ -20,6 +26,32 @@ class Message(ApiHandler):
         }
 
     async def communicate(self, input: dict, request: Request):
+        text, ctxid, message_id, attachment_paths = await asyncio.to_thread(
+            self.read_message, request
+        )
+
+        # Now process the message
+        message = text
+
+        # Obtain agent context
+        context = await asyncio.to_thread(self.use_context, ctxid)
+
+        # call extension point, alow it to modify data
+        data = { "message": message, "attachment_paths": attachment_paths }
+        await extension.call_extensions("user_message_ui", agent=context.get_agent(), data=data)
+        message = data.get("message", "")
+        attachment_paths = data.get("attachment_paths", [])
+
+        # Store attachments in agent data
+        # context.agent0.set_data("attachments", attachment_paths)
+
+        # Log to console and UI using helper function
+        mq.log_user_message(context, message, attachment_paths, message_id)
+
+        return context.communicate(UserMessage(message, attachment_paths)), context
+
+    def read_message(self, request: Request):
+        """Text, context id, message id and saved attachment paths of the request."""
         # Handle both JSON and multipart/form-data
         if request.content_type.startswith("multipart/form-data"):
             text = request.form.get("text", "")
@@ -50,22 +82,4 @@ class Message(ApiHandler):
             message_id = input_data.get("message_id", None)
             attachment_paths = []
 
-        # Now process the message
-        message = text
-
-        # Obtain agent context
-        context = self.use_context(ctxid)
-
-        # call extension point, alow it to modify data
-        data = { "message": message, "attachment_paths": attachment_paths }
-        await extension.call_extensions("user_message_ui", agent=context.get_agent(), data=data)
-        message = data.get("message", "")
-        attachment_paths = data.get("attachment_paths", [])
-
-        # Store attachments in agent data
-        # context.agent0.set_data("attachments", attachment_paths)
-
-        # Log to console and UI using helper function
-        mq.log_user_message(context, message, attachment_paths, message_id)
-
-        return context.communicate(UserMessage(message, attachment_paths)), context
+        return text, ctxid, message_id, attachment_paths
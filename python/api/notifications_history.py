@@ -4,6 +4,10 @@ from agent import AgentContext
 
 
 class NotificationsHistory(ApiHandler):
+    @classmethod
+    def runs_on_event_loop(cls) -> bool:
+        return True
+
     @classmethod
     def requires_auth(cls) -> bool:
         return True
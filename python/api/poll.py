@@ -4,6 +4,10 @@ from python.helpers.state_snapshot import build_snapshot
 
 
 class Poll(ApiHandler):
+    @classmethod
+    def runs_on_event_loop(cls) -> bool:
+        # in-memory snapshot, polled by every open tab
+        return True
 
     async def process(self, input: dict, request: Request) -> dict | Response:
         return await build_snapshot(
@@ -3,16 +3,24 @@ from python.helpers.api import ApiHandler, Request, Response
 from python.helpers import runtime, settings, whisper
 
 class Transcribe(ApiHandler):
+    @classmethod
+    def runs_on_event_loop(cls) -> bool:
+        # decoding and transcription are awaited off the loop
+        return True
+
     async def process(self, input: dict, request: Request) -> dict | Response:
         audio = input.get("audio")
-        ctxid = input.get("ctxid", "")
-
-        if ctxid:
-            context = self.use_context(ctxid)
 
         # if not await whisper.is_downloaded():
         #     context.log.log(type="info", content="Whisper STT model is currently being initialized, please wait...")
 
         set = settings.get_settings()
-        result = await whisper.transcribe(set["stt_model_size"], audio) # type: ignore
+        # with a session id, each new piece of the recording returns the text of finished chunks
+        result = await whisper.transcribe(
+            set["stt_model_size"],
+            audio,  # type: ignore
+            session=input.get("session", ""),
+            final=input.get("final", True),
+            offset=int(input.get("offset", 0)),
+        )
         return result
@@ -0,0 +1,18 @@
+import asyncio
+
+from python.helpers.extension import Extension
+from agent import Agent, LoopData
+from python.tools.call_subordinate import DATA_NAME_BUDGET, SubordinateBudget
+
+
+class SubordinateBudgetCheck(Extension):
+
+    async def execute(self, loop_data: LoopData = LoopData(), **kwargs):
+        # only fan-out subordinates carry a budget
+        budget: SubordinateBudget | None = self.agent.get_data(DATA_NAME_BUDGET)
+        if not budget:
+            return
+
+        window = self.agent.get_data(Agent.DATA_NAME_CTX_WINDOW) or {}
+        if budget.spend(window.get("tokens", 0)):
+            await asyncio.sleep(0)  # deliver the cancellation before the model is called
@@ -36,7 +36,7 @@ class IncludeWorkdirExtras(Extension):
 
             file_structure = projects.get_file_structure(project_name)
         else:
-            set = settings.get_settings()
+            set = settings.get_settings_snapshot()
             enabled = bool(set["workdir_show"])
 
             if not enabled:
@@ -54,7 +54,7 @@ class IncludeWorkdirExtras(Extension):
             files.create_dir(scan_path)
 
             file_structure = str(
-                file_tree.file_tree(
+                file_tree.cached_file_tree(
                     scan_path,
                     max_depth=max_depth,
                     max_files=max_files,
@@ -7,7 +7,7 @@ from python.helpers import settings
 class RecallWait(Extension):
     async def execute(self, loop_data: LoopData = LoopData(), **kwargs):
 
-        set = settings.get_settings()
+        set = settings.get_settings_snapshot()
 
         task = self.agent.get_data(DATA_NAME_TASK_MEMORIES)
         iter = self.agent.get_data(DATA_NAME_ITER_MEMORIES) or 0
@@ -14,7 +14,7 @@ class MemorizeMemories(Extension):
     async def execute(self, loop_data: LoopData = LoopData(), **kwargs):
         # try:
 
-        set = settings.get_settings()
+        set = settings.get_settings_snapshot()
 
         if not set["memory_memorize_enabled"]:
             return
@@ -34,7 +34,7 @@ class MemorizeMemories(Extension):
     async def memorize(self, loop_data: LoopData, log_item: LogItem, **kwargs):
 
         try:
-            set = settings.get_settings()
+            set = settings.get_settings_snapshot()
 
             db = await Memory.get(self.agent)
 
@@ -95,77 +95,49 @@ class MemorizeMemories(Extension):
                 memories_txt = "\n\n".join([str(memory) for memory in memories]).strip()
                 log_item.update(heading=f"{len(memories)} entries to memorize.", memories=memories_txt)
 
-            # Process memories with intelligent consolidation
-            total_processed = 0
-            total_consolidated = 0
-            rem = []
-
-            for memory in memories:
-                # Convert memory to plain text
-                txt = f"{memory}"
-
-                if set["memory_memorize_consolidation"]:
-                    
-                    try:
-                        # Use intelligent consolidation system
-                        from python.helpers.memory_consolidation import create_memory_consolidator
-                        consolidator = create_memory_consolidator(
-                            self.agent,
-                            similarity_threshold=DEFAULT_MEMORY_THRESHOLD,  # More permissive for discovery
-                            max_similar_memories=8,
-                            max_llm_context_memories=4
-                        )
-
-                        # Create memory item-specific log for detailed tracking
-                        memory_log = None # too many utility messages, skip log for now
-                        # memory_log = self.agent.context.log.log(
-                        #     type="util",
-                        #     heading=f"Processing memory fragment: {txt[:50]}...",
-                        #     update_progress="none"  # Don't affect status bar
-                        # )
-
-                        # Process with intelligent consolidation
-                        result_obj = await consolidator.process_new_memory(
-                            new_memory=txt,
-                            area=Memory.Area.FRAGMENTS.value,
-                            metadata={"area": Memory.Area.FRAGMENTS.value},
-                            log_item=memory_log
-                        )
+            # Convert memories to plain text
+            texts = [f"{memory}" for memory in memories]
+
+            if set["memory_memorize_consolidation"]:
+
+                # Process memories with intelligent consolidation, as one batch
+                total_processed = len(texts)
+                total_consolidated = 0
+                try:
+                    from python.helpers.memory_consolidation import create_memory_consolidator
+                    consolidator = create_memory_consolidator(
+                        self.agent,
+                        similarity_threshold=DEFAULT_MEMORY_THRESHOLD,  # More permissive for discovery
+                        max_similar_memories=8,
+                        max_llm_context_memories=4
+                    )
 
-                        # Update the individual log item with completion status but keep it temporary
-                        if result_obj.get("success"):
-                            total_consolidated += 1
-                            if memory_log:
-                                memory_log.update(
-                                    result="Fragment processed successfully",
-                                    heading=f"Memory fragment completed: {txt[:50]}...",
-                                    update_progress="none"  # Show briefly then disappear
-                                )
-                        else:
-                            if memory_log:
-                                memory_log.update(
-                                    result="Fragment processing failed",
-                                    heading=f"Memory fragment failed: {txt[:50]}...",
-                                    update_progress="none"  # Show briefly then disappear
-                                )
-                        total_processed += 1
-
-                    except Exception as e:
-                        # Log error but continue processing
-                        log_item.update(consolidation_error=str(e))
-                        total_processed += 1
-
-                    # Update final results with structured logging
-                    log_item.update(
-                        heading=f"Memorization completed: {total_processed} memories processed, {total_consolidated} intelligently consolidated",
-                        memories=memories_txt,
-                        result=f"{total_processed} memories processed, {total_consolidated} intelligently consolidated",
-                        memories_processed=total_processed,
-                        memories_consolidated=total_consolidated,
-                        update_progress="none"
+                    # too many utility messages, skip per memory logs
+                    results = await consolidator.process_new_memories(
+                        new_memories=texts,
+                        area=Memory.Area.FRAGMENTS.value,
+                        metadata={"area": Memory.Area.FRAGMENTS.value},
                     )
+                    total_consolidated = sum(1 for result in results if result.get("success"))
+
+                except Exception as e:
+                    # Log error, memories count as processed
+                    log_item.update(consolidation_error=str(e))
+
+                # Update final results with structured logging
+                log_item.update(
+                    heading=f"Memorization completed: {total_processed} memories processed, {total_consolidated} intelligently consolidated",
+                    memories=memories_txt,
+                    result=f"{total_processed} memories processed, {total_consolidated} intelligently consolidated",
+                    memories_processed=total_processed,
+                    memories_consolidated=total_consolidated,
+                    update_progress="none"
+                )
 
-                else:
+            else:
+                rem = []
+
+                for txt in texts:
 
                     # remove previous fragments too similiar to this one
                     if set["memory_memorize_replace_threshold"] > 0:
@@ -187,9 +159,6 @@ class MemorizeMemories(Extension):
                     )
                     if rem:
                         log_item.stream(result=f"\nReplaced {len(rem)} previous memories.")
-                
-
-
 
         except Exception as e:
             err = errors.format_error(e)
@@ -13,7 +13,7 @@ class MemorizeSolutions(Extension):
     async def execute(self, loop_data: LoopData = LoopData(), **kwargs):
         # try:
 
-        set = settings.get_settings()
+        set = settings.get_settings_snapshot()
 
         if not set["memory_memorize_enabled"]:
             return
@@ -32,7 +32,7 @@ class MemorizeSolutions(Extension):
 
     async def memorize(self, loop_data: LoopData, log_item: LogItem, **kwargs):
         try:
-            set = settings.get_settings()
+            set = settings.get_settings_snapshot()
 
             db = await Memory.get(self.agent)
 
@@ -97,81 +97,58 @@ class MemorizeSolutions(Extension):
                     heading=f"{len(solutions)} successful solutions to memorize.", solutions=solutions_txt
                 )
 
-            # Process solutions with intelligent consolidation
-            total_processed = 0
-            total_consolidated = 0
-            rem = []
-
+            # Convert solutions to structured text
+            texts = []
             for solution in solutions:
-                # Convert solution to structured text
                 if isinstance(solution, dict):
                     problem = solution.get('problem', 'Unknown problem')
                     solution_text = solution.get('solution', 'Unknown solution')
-                    txt = f"# Problem\n {problem}\n# Solution\n {solution_text}"
+                    texts.append(f"# Problem\n {problem}\n# Solution\n {solution_text}")
                 else:
                     # If solution is not a dict, convert it to string
-                    txt = f"# Solution\n {str(solution)}"
-
-                if set["memory_memorize_consolidation"]:
-                    try:
-                        # Use intelligent consolidation system
-                        from python.helpers.memory_consolidation import create_memory_consolidator
-                        consolidator = create_memory_consolidator(
-                            self.agent,
-                            similarity_threshold=DEFAULT_MEMORY_THRESHOLD,  # More permissive for discovery
-                            max_similar_memories=6,    # Fewer for solutions (more complex)
-                            max_llm_context_memories=3
-                        )
-
-                        # Create solution-specific log for detailed tracking
-                        solution_log = None # too many utility messages, skip log for now
-                        # solution_log = self.agent.context.log.log(
-                        #     type="util",
-                        #     heading=f"Processing solution: {txt[:50]}...",
-                        #     update_progress="none"  # Don't affect status bar
-                        # )
-
-                        # Process with intelligent consolidation
-                        result_obj = await consolidator.process_new_memory(
-                            new_memory=txt,
-                            area=Memory.Area.SOLUTIONS.value,
-                            metadata={"area": Memory.Area.SOLUTIONS.value},
-                            log_item=solution_log
-                        )
+                    texts.append(f"# Solution\n {str(solution)}")
+
+            if set["memory_memorize_consolidation"]:
+
+                # Process solutions with intelligent consolidation, as one batch
+                total_processed = len(texts)
+                total_consolidated = 0
+                try:
+                    from python.helpers.memory_consolidation import create_memory_consolidator
+                    consolidator = create_memory_consolidator(
+                        self.agent,
+                        similarity_threshold=DEFAULT_MEMORY_THRESHOLD,  # More permissive for discovery
+                        max_similar_memories=6,    # Fewer for solutions (more complex)
+                        max_llm_context_memories=3
+                    )
 
-                        # Update the individual log item with completion status but keep it temporary
-                        if result_obj.get("success"):
-                            total_consolidated += 1
-                            if solution_log:
-                                solution_log.update(
-                                    result="Solution processed successfully",
-                                    heading=f"Solution completed: {txt[:50]}...",
-                                    update_progress="none"  # Show briefly then disappear
-                                )
-                        else:
-                            if solution_log:
-                                solution_log.update(
-                                    result="Solution processing failed",
-                                    heading=f"Solution failed: {txt[:50]}...",
-                                    update_progress="none"  # Show briefly then disappear
-                                )
-                        total_processed += 1
-
-                    except Exception as e:
-                        # Log error but continue processing
-                        log_item.update(consolidation_error=str(e))
-                        total_processed += 1
-
-                    # Update final results with structured logging
-                    log_item.update(
-                        heading=f"Solution memorization completed: {total_processed} solutions processed, {total_consolidated} intelligently consolidated",
-                        solutions=solutions_txt,
-                        result=f"{total_processed} solutions processed, {total_consolidated} intelligently consolidated",
-                        solutions_processed=total_processed,
-                        solutions_consolidated=total_consolidated,
-                        update_progress="none"
+                    # too many utility messages, skip per solution logs
+                    results = await consolidator.process_new_memories(
+                        new_memories=texts,
+                        area=Memory.Area.SOLUTIONS.value,
+                        metadata={"area": Memory.Area.SOLUTIONS.value},
                     )
-                else:
+                    total_consolidated = sum(1 for result in results if result.get("success"))
+
+                except Exception as e:
+                    # Log error, solutions count as processed
+                    log_item.update(consolidation_error=str(e))
+
+                # Update final results with structured logging
+                log_item.update(
+                    heading=f"Solution memorization completed: {total_processed} solutions processed, {total_consolidated} intelligently consolidated",
+                    solutions=solutions_txt,
+                    result=f"{total_processed} solutions processed, {total_consolidated} intelligently consolidated",
+                    solutions_processed=total_processed,
+                    solutions_consolidated=total_consolidated,
+                    update_progress="none"
+                )
+
+            else:
+                rem = []
+
+                for txt in texts:
+
                     # remove previous solutions too similiar to this one
                     if set["memory_memorize_replace_threshold"] > 0:
                         rem += await db.delete_documents_by_query(
@@ -193,7 +170,6 @@ class MemorizeSolutions(Extension):
                     if rem:
                         log_item.stream(result=f"\nReplaced {len(rem)} previous solutions.")
 
-
         except Exception as e:
             err = errors.format_error(e)
             self.agent.context.log.log(
@@ -2,7 +2,7 @@ from typing import Any
 from python.helpers.extension import Extension
 from python.helpers.mcp_handler import MCPConfig
 from agent import Agent, LoopData
-from python.helpers.settings import get_settings
+from python.helpers.settings import get_settings_snapshot
 from python.helpers import projects, skills
 
 
@@ -65,7 +65,7 @@ def get_secrets_prompt(agent: Agent):
 
         secrets_manager = get_secrets_manager(agent.context)
         secrets = secrets_manager.get_secrets_for_prompt()
-        vars = get_settings()["variables"]
+        vars = get_settings_snapshot()["variables"]
         return agent.read_prompt("agent.system.secrets.md", secrets=secrets, vars=vars)
     except Exception as e:
         # If secrets module is not available or has issues, return empty string
@@ -1,7 +1,7 @@
 from abc import abstractmethod
 import json
 import threading
-from typing import Union, TypedDict, Dict, Any
+from typing import AsyncIterable, Union, TypedDict, Dict, Any
 from attr import dataclass
 from flask import Request, Response, jsonify, Flask, session, request, send_file
 from agent import AgentContext
@@ -10,10 +10,54 @@ from python.helpers.print_style import PrintStyle
 from python.helpers.errors import format_error
 from werkzeug.serving import make_server
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
 ThreadLockType = Union[threading.Lock, threading.RLock]
 
+
+class ApiStream:
+    """
+    Handler output streamed to the client while it is produced.
+    Dicts and lists are sent as newline-delimited JSON, str and bytes as they are.
+    """
+
+    def __init__(self, chunks: AsyncIterable[Any], mimetype: str = "application/x-ndjson"):
+        self.chunks = chunks
+        self.mimetype = mimetype
+
+    async def encode(self):
+        async for chunk in self.chunks:
+            if isinstance(chunk, bytes):
+                yield chunk
+            elif isinstance(chunk, str):
+                yield chunk.encode("utf-8")
+            else:
+                yield dumps_json(chunk) + b"\n"
+
+
+class StreamedResponse(Response):
+    """Response with an async body, sent chunk by chunk by the ASGI api router."""
+
+    def __init__(self, stream: ApiStream, status: int = 200):
+        super().__init__(status=status, mimetype=stream.mimetype)
+        self.async_body = stream.encode()
+
+
 Input = dict
-Output = Union[Dict[str, Any], Response, TypedDict]  # type: ignore
+Output = Union[Dict[str, Any], Response, ApiStream, TypedDict]  # type: ignore
+
+
+def dumps_json(data: Any) -> bytes:
+    """Serialize handler output, with orjson when it is available."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass  # values orjson rejects (e.g. big ints), json.dumps decides
+    return json.dumps(data).encode("utf-8")
 
 
 class ApiHandler:
@@ -41,6 +85,15 @@ class ApiHandler:
     def requires_csrf(cls) -> bool:
         return cls.requires_auth()
 
+    @classmethod
+    def runs_on_event_loop(cls) -> bool:
+        """
+        Run directly on the server event loop instead of a worker thread. Only for
+        audited handlers that never block: no file or network IO outside awaits,
+        no thread locks and no context creation.
+        """
+        return False
+
     @abstractmethod
     async def process(self, input: Input, request: Request) -> Output:
         pass
@@ -69,8 +122,10 @@ class ApiHandler:
             # return output based on type
             if isinstance(output, Response):
                 return output
+            elif isinstance(output, ApiStream):
+                return StreamedResponse(output)
             else:
-                response_json = json.dumps(output)
+                response_json = dumps_json(output)
                 return Response(
                     response=response_json, status=200, mimetype="application/json"
                 )
@@ -0,0 +1,147 @@
+import asyncio
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, IO, Iterator
+
+from flask import Flask
+from uvicorn.middleware.wsgi import build_environ
+from werkzeug.exceptions import HTTPException
+from werkzeug.wrappers.response import Response as BaseResponse
+
+from python.helpers.api import StreamedResponse
+
+# request bodies larger than this are spooled to a temporary file
+BODY_SPOOL_SIZE = 1024 * 1024
+# sync response bodies (files) are read in a worker thread in blocks of this size
+RESPONSE_BLOCK_SIZE = 256 * 1024
+
+View = Callable[[], Awaitable[Any]]
+
+
+@dataclass
+class ApiRoute:
+    view: View
+    methods: frozenset[str]
+    in_thread: bool = True
+
+
+class ApiRouter:
+    """
+    ASGI app serving ApiHandler endpoints without the WSGI bridge. Each request
+    runs inside a Flask request context, so handlers and the auth decorators keep
+    using flask.request, session and Flask responses. Routes run in a worker thread
+    with its own event loop unless added with in_thread=False, which runs them
+    directly on the server event loop. Streamed outputs (ApiStream) need the event
+    loop route, a threaded route returning one raises. Other paths are passed to
+    the fallback app.
+    """
+
+    def __init__(self, app: Flask, fallback: Callable):
+        self.app = app
+        self.fallback = fallback
+        self.routes: dict[str, ApiRoute] = {}
+
+    def add_route(self, path: str, view: View, methods: list[str], in_thread: bool = True):
+        allowed = {m.upper() for m in methods}
+        if "GET" in allowed:
+            allowed.add("HEAD")
+        self.routes[path] = ApiRoute(view, frozenset(allowed), in_thread)
+
+    async def __call__(self, scope, receive, send):
+        route = self.routes.get(scope["path"]) if scope["type"] == "http" else None
+        if route is None:
+            await self.fallback(scope, receive, send)
+            return
+
+        if scope["method"] not in route.methods:
+            await self._send_response(
+                BaseResponse("Method Not Allowed", 405, {"Allow": ", ".join(sorted(route.methods))}),
+                send,
+                scope,
+            )
+            return
+
+        body = await _read_body(receive)
+        if body is None:
+            return  # client disconnected
+        try:
+            environ = build_environ(scope, {}, body)  # type: ignore[arg-type]
+            if route.in_thread:
+                response = await asyncio.to_thread(self._dispatch_in_thread, route, environ)
+            else:
+                response = await self._dispatch(route, environ)
+            await self._send_response(response, send, scope)
+        finally:
+            body.close()
+
+    async def _dispatch(self, route: ApiRoute, environ: dict) -> BaseResponse:
+        with self.app.request_context(environ):
+            try:
+                rv = await route.view()
+            except HTTPException as e:
+                rv = e.get_response(environ)
+            response = self.app.make_response(rv)
+            # stores the session cookie like Flask does after a view
+            return self.app.process_response(response)
+
+    def _dispatch_in_thread(self, route: ApiRoute, environ: dict) -> BaseResponse:
+        # own event loop like Flask async views, it is closed before the body is sent
+        response = asyncio.run(self._dispatch(route, environ))
+        if isinstance(response, StreamedResponse):
+            response.close()
+            raise RuntimeError(
+                f"{environ.get('PATH_INFO')} returned a streamed response from a worker thread, "
+                "add streaming routes with in_thread=False"
+            )
+        return response
+
+    async def _send_response(self, response: BaseResponse, send, scope):
+        headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1"))
+            for name, value in response.headers.to_wsgi_list()
+        ]
+        await send({"type": "http.response.start", "status": response.status_code, "headers": headers})
+        head = scope["method"] == "HEAD"
+
+        try:
+            if isinstance(response, StreamedResponse):
+                if not head:
+                    async for chunk in response.async_body:
+                        if chunk:
+                            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            elif response.is_sequence:
+                if not head:
+                    await send({"type": "http.response.body", "body": response.get_data(), "more_body": True})
+            elif not head:
+                # streamed sync bodies (send_file) are read off the event loop
+                iterator = iter(response.iter_encoded())
+                while block := await asyncio.to_thread(_read_block, iterator):
+                    await send({"type": "http.response.body", "body": block, "more_body": True})
+        finally:
+            response.close()
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+async def _read_body(receive) -> IO[bytes] | None:
+    body = tempfile.SpooledTemporaryFile(max_size=BODY_SPOOL_SIZE)
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            body.close()
+            return None
+        body.write(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    body.seek(0)
+    return body  # type: ignore[return-value]
+
+
+def _read_block(iterator: Iterator[bytes]) -> bytes:
+    parts = []
+    size = 0
+    for chunk in iterator:
+        parts.append(chunk)
+        size += len(chunk)
+        if size >= RESPONSE_BLOCK_SIZE:
+            break
+    return b"".join(parts)
@@ -1,17 +1,23 @@
+import asyncio
 import zipfile
 import json
 import os
+import shutil
 import tempfile
 import datetime
 import platform
-from typing import List, Dict, Any, Optional
+from contextlib import contextmanager
+from typing import List, Dict, Any, Iterator, Optional
 
 from pathspec import PathSpec
 from pathspec.patterns.gitwildmatch import GitWildMatchPattern
 
 from python.helpers import files, runtime, git
+from python.helpers.backup_store import BACKUP_STORE_FOLDER, BackupProgress, BackupStore
 from python.helpers.print_style import PrintStyle
 
+MAX_BACKUP_FILES = 50000
+
 
 class BackupService:
     """
@@ -242,6 +248,10 @@ class BackupService:
 
     async def test_patterns(self, metadata: Dict[str, Any], max_files: int = 1000) -> List[Dict[str, Any]]:
         """Test backup patterns and return list of matched files"""
+        return await asyncio.to_thread(self._match_files, metadata, max_files)
+
+    def _match_files(self, metadata: Dict[str, Any], max_files: int) -> List[Dict[str, Any]]:
+        """Walk base directories and match files against backup patterns (blocking)"""
         include_patterns = metadata.get("include_patterns", [])
         exclude_patterns = metadata.get("exclude_patterns", [])
         include_hidden = metadata.get("include_hidden", True)
@@ -260,6 +270,8 @@ class BackupService:
 
         matched_files = []
         processed_count = 0
+        # snapshots of the backup store are never backed up themselves
+        store_path = files.get_abs_path(BACKUP_STORE_FOLDER)
 
         try:
             spec = PathSpec.from_lines(GitWildMatchPattern, pattern_lines)
@@ -270,6 +282,8 @@ class BackupService:
                     continue
 
                 for root, dirs, files_list in os.walk(base_real_path):
+                    dirs[:] = [d for d in dirs if os.path.join(root, d) != store_path]
+
                     # Filter hidden directories if not included, BUT allow explicit ones
                     if not include_hidden:
                         dirs_to_keep = []
@@ -330,7 +344,8 @@ class BackupService:
         include_patterns: List[str],
         exclude_patterns: List[str],
         include_hidden: bool = True,
-        backup_name: str = "agent-zero-backup"
+        backup_name: str = "agent-zero-backup",
+        progress: Optional[BackupProgress] = None
     ) -> str:
         """Create backup archive and return path to created file"""
 
@@ -342,75 +357,22 @@ class BackupService:
         }
 
         # Get matched files
-        matched_files = await self.test_patterns(metadata, max_files=50000)
+        matched_files = await self.test_patterns(metadata, max_files=MAX_BACKUP_FILES)
 
         if not matched_files:
             raise Exception("No files matched the backup patterns")
 
+        metadata = await self._get_backup_metadata(
+            include_patterns, exclude_patterns, include_hidden, backup_name, matched_files
+        )
+
         # Create temporary zip file
         temp_dir = tempfile.mkdtemp()
         zip_path = os.path.join(temp_dir, f"{backup_name}.zip")
 
         try:
-            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # Add comprehensive metadata
-                metadata = {
-                    # Basic backup information
-                    "agent_zero_version": self.agent_zero_version,
-                    "timestamp": datetime.datetime.now().isoformat(),
-                    "backup_name": backup_name,
-                    "include_hidden": include_hidden,
-
-                    # Pattern arrays for granular control during restore
-                    "include_patterns": include_patterns,
-                    "exclude_patterns": exclude_patterns,
-
-                    # System and environment information
-                    "system_info": await self._get_system_info(),
-                    "environment_info": await self._get_environment_info(),
-                    "backup_author": await self._get_backup_author(),
-
-                    # Backup configuration
-                    "backup_config": {
-                        "include_patterns": include_patterns,
-                        "exclude_patterns": exclude_patterns,
-                        "include_hidden": include_hidden,
-                        "compression_level": 6,
-                        "integrity_check": True
-                    },
-
-                    # File information
-                    "files": [
-                        {
-                            "path": f["path"],
-                            "size": f["size"],
-                            "modified": f["modified"],
-                            "type": "file"
-                        }
-                        for f in matched_files
-                    ],
-
-                    # Statistics
-                    "total_files": len(matched_files),
-                    "backup_size": sum(f["size"] for f in matched_files),
-                    "directory_count": self._count_directories(matched_files),
-                }
-
-                zipf.writestr("metadata.json", json.dumps(metadata, indent=2))
-
-                # Add files
-                for file_info in matched_files:
-                    real_path = file_info["real_path"]
-                    archive_path = file_info["path"].lstrip('/')
-
-                    try:
-                        if os.path.exists(real_path) and os.path.isfile(real_path):
-                            zipf.write(real_path, archive_path)
-                    except (OSError, IOError) as e:
-                        # Log error but continue with other files
-                        PrintStyle().warning(f"Warning: Could not backup file {real_path}: {e}")
-                        continue
-
+            # Compress in a worker thread so the server keeps responding
+            await asyncio.to_thread(self._write_zip, zip_path, metadata, matched_files, progress)
             return zip_path
 
         except Exception as e:
@@ -419,27 +381,183 @@ class BackupService:
                 os.remove(zip_path)
             raise Exception(f"Error creating backup: {str(e)}")
 
-    async def inspect_backup(self, backup_file) -> Dict[str, Any]:
-        """Inspect backup archive and return metadata"""
+    async def create_snapshot(
+        self,
+        include_patterns: List[str],
+        exclude_patterns: List[str],
+        include_hidden: bool = True,
+        backup_name: str = "agent-zero-backup",
+        parent_id: Optional[str] = None,
+        progress: Optional[BackupProgress] = None
+    ) -> Dict[str, Any]:
+        """Create an incremental snapshot in the local backup store and return its summary.
 
-        # Save uploaded file temporarily
-        temp_dir = tempfile.mkdtemp()
-        temp_file = os.path.join(temp_dir, "backup.zip")
+        The snapshot builds on `parent_id` (the latest snapshot by default), only files
+        changed since then are read and only chunks not yet stored are written.
+        """
+        metadata = {
+            "include_patterns": include_patterns,
+            "exclude_patterns": exclude_patterns,
+            "include_hidden": include_hidden
+        }
+        matched_files = await self.test_patterns(metadata, max_files=MAX_BACKUP_FILES)
 
+        if not matched_files:
+            raise Exception("No files matched the backup patterns")
+
+        metadata = await self._get_backup_metadata(
+            include_patterns, exclude_patterns, include_hidden, backup_name, matched_files
+        )
+
+        store = BackupStore()
         try:
-            backup_file.save(temp_file)
+            if parent_id is None:
+                parent_id = await asyncio.to_thread(store.latest_snapshot_id)
+            manifest = await asyncio.to_thread(
+                store.create_snapshot,
+                matched_files,
+                metadata,
+                parent_id,
+                metadata["backup_config"]["compression_level"],
+                progress,
+            )
+        except Exception as e:
+            raise Exception(f"Error creating backup snapshot: {str(e)}")
 
-            with zipfile.ZipFile(temp_file, 'r') as zipf:
-                # Read metadata
-                if "metadata.json" not in zipf.namelist():
+        return {
+            "snapshot_id": manifest["id"],
+            "parent": manifest["parent"],
+            "full": manifest["full"],
+            "backup_name": backup_name,
+            "total_files": manifest["metadata"]["total_files"],
+            "backup_size": manifest["metadata"]["backup_size"],
+            "changed_files": len(manifest["files"]),
+            "removed_files": len(manifest["removed"]),
+            "stored_bytes": manifest["stored_bytes"],
+        }
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        """List snapshots of the local backup store, oldest first"""
+        return BackupStore().list_snapshots()
+
+    async def delete_snapshots(self, snapshot_ids: List[str]) -> Dict[str, Any]:
+        """Delete snapshots from the local backup store and free chunks no other snapshot uses"""
+        store = BackupStore()
+
+        def delete():
+            for snapshot_id in snapshot_ids:
+                store.delete_snapshot(snapshot_id)
+            return store.collect_garbage()
+
+        try:
+            garbage = await asyncio.to_thread(delete)
+        except Exception as e:
+            raise Exception(f"Error deleting backup snapshots: {str(e)}")
+        return {"deleted": list(snapshot_ids), **garbage}
+
+    async def prune_snapshots(self, keep_last: int) -> Dict[str, Any]:
+        """Keep the newest `keep_last` snapshots of the local backup store and delete the rest"""
+        try:
+            deleted = await asyncio.to_thread(BackupStore().prune, keep_last)
+        except Exception as e:
+            raise Exception(f"Error pruning backup snapshots: {str(e)}")
+        return {"deleted": deleted, "kept": keep_last}
+
+    async def _get_backup_metadata(
+        self,
+        include_patterns: List[str],
+        exclude_patterns: List[str],
+        include_hidden: bool,
+        backup_name: str,
+        matched_files: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Build comprehensive backup metadata stored with zip archives and snapshots"""
+        return {
+            # Basic backup information
+            "agent_zero_version": self.agent_zero_version,
+            "timestamp": datetime.datetime.now().isoformat(),
+            "backup_name": backup_name,
+            "include_hidden": include_hidden,
+
+            # Pattern arrays for granular control during restore
+            "include_patterns": include_patterns,
+            "exclude_patterns": exclude_patterns,
+
+            # System and environment information
+            "system_info": await self._get_system_info(),
+            "environment_info": await self._get_environment_info(),
+            "backup_author": await self._get_backup_author(),
+
+            # Backup configuration
+            "backup_config": {
+                "include_patterns": include_patterns,
+                "exclude_patterns": exclude_patterns,
+                "include_hidden": include_hidden,
+                "compression_level": 6,
+                "integrity_check": True
+            },
+
+            # File information
+            "files": [
+                {
+                    "path": f["path"],
+                    "size": f["size"],
+                    "modified": f["modified"],
+                    "type": "file"
+                }
+                for f in matched_files
+            ],
+
+            # Statistics
+            "total_files": len(matched_files),
+            "backup_size": sum(f["size"] for f in matched_files),
+            "directory_count": self._count_directories(matched_files),
+        }
+
+    def _write_zip(
+        self,
+        zip_path: str,
+        metadata: Dict[str, Any],
+        matched_files: List[Dict[str, Any]],
+        progress: Optional[BackupProgress]
+    ):
+        """Write metadata and matched files into a zip archive (blocking)"""
+        if progress:
+            progress.phase = "compressing"
+            progress.total_files = len(matched_files)
+            progress.total_bytes = metadata["backup_size"]
+
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=metadata["backup_config"]["compression_level"]) as zipf:
+            zipf.writestr("metadata.json", json.dumps(metadata, indent=2))
+
+            # Add files
+            for file_info in matched_files:
+                real_path = file_info["real_path"]
+                archive_path = file_info["path"].lstrip('/')
+
+                try:
+                    if os.path.exists(real_path) and os.path.isfile(real_path):
+                        zipf.write(real_path, archive_path)
+                except (OSError, IOError) as e:
+                    # Log error but continue with other files
+                    PrintStyle().warning(f"Warning: Could not backup file {real_path}: {e}")
+
+                if progress:
+                    progress.processed_files += 1
+                    progress.processed_bytes += file_info["size"]
+
+    async def inspect_backup(self, backup_file=None, snapshot_id: Optional[str] = None) -> Dict[str, Any]:
+        """Inspect backup archive or snapshot and return metadata"""
+
+        try:
+            with self._open_backup(backup_file, snapshot_id) as source:
+                if not source.metadata:
                     raise Exception("Invalid backup file: missing metadata.json")
 
-                metadata_content = zipf.read("metadata.json").decode('utf-8')
-                metadata = json.loads(metadata_content)
+                metadata = dict(source.metadata)
 
                 # Add file list from archive
-                files_in_archive = [name for name in zipf.namelist() if name != "metadata.json"]
-                metadata["files_in_archive"] = files_in_archive
+                metadata["files_in_archive"] = source.names()
 
                 return metadata
 
@@ -447,72 +565,34 @@ class BackupService:
             raise Exception("Invalid backup file: not a valid zip archive")
         except json.JSONDecodeError:
             raise Exception("Invalid backup file: corrupted metadata")
-        finally:
-            # Cleanup
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-            if os.path.exists(temp_dir):
-                os.rmdir(temp_dir)
 
     async def preview_restore(
         self,
-        backup_file,
+        backup_file=None,
         restore_include_patterns: Optional[List[str]] = None,
         restore_exclude_patterns: Optional[List[str]] = None,
         overwrite_policy: str = "overwrite",
         clean_before_restore: bool = False,
-        user_edited_metadata: Optional[Dict[str, Any]] = None
+        user_edited_metadata: Optional[Dict[str, Any]] = None,
+        snapshot_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Preview which files would be restored based on patterns"""
 
-        # Save uploaded file temporarily
-        temp_dir = tempfile.mkdtemp()
-        temp_file = os.path.join(temp_dir, "backup.zip")
-
         files_to_restore = []
         skipped_files = []
 
         try:
-            backup_file.save(temp_file)
-
-            with zipfile.ZipFile(temp_file, 'r') as zipf:
+            with self._open_backup(backup_file, snapshot_id) as source:
                 # Read backup metadata from archive
-                original_backup_metadata = {}
-                if "metadata.json" in zipf.namelist():
-                    metadata_content = zipf.read("metadata.json").decode('utf-8')
-                    original_backup_metadata = json.loads(metadata_content)
+                original_backup_metadata = source.metadata
 
                 # Use user-edited metadata if provided, otherwise fall back to original
                 backup_metadata = user_edited_metadata if user_edited_metadata else original_backup_metadata
 
-                # Get files from archive (excluding metadata files)
-                archive_files = [name for name in zipf.namelist()
-                                 if name not in ["metadata.json", "checksums.json"]]
-
-                # Create pathspec for restore patterns if provided
-                restore_spec = None
-                if restore_include_patterns or restore_exclude_patterns:
-                    pattern_lines = []
-                    if restore_include_patterns:
-                        # Translate patterns from backed up system to current system
-                        translated_include_patterns = self._translate_patterns(restore_include_patterns, original_backup_metadata)
-                        for pattern in translated_include_patterns:
-                            # Remove leading slash for pathspec matching
-                            pattern_lines.append(pattern.lstrip('/'))
-                    if restore_exclude_patterns:
-                        # Translate patterns from backed up system to current system
-                        translated_exclude_patterns = self._translate_patterns(restore_exclude_patterns, original_backup_metadata)
-                        for pattern in translated_exclude_patterns:
-                            # Remove leading slash for pathspec matching
-                            pattern_lines.append(f"!{pattern.lstrip('/')}")
-
-                    if pattern_lines:
-                        from pathspec import PathSpec
-                        from pathspec.patterns.gitwildmatch import GitWildMatchPattern
-                        restore_spec = PathSpec.from_lines(GitWildMatchPattern, pattern_lines)
+                restore_spec = self._get_restore_spec(restore_include_patterns, restore_exclude_patterns, original_backup_metadata)
 
                 # Process each file in archive
-                for archive_path in archive_files:
+                for archive_path in source.names():
                     # Archive path is already the correct relative path (e.g., "a0/tmp/settings.json")
                     original_path = archive_path
 
@@ -580,42 +660,27 @@ class BackupService:
             raise Exception("Invalid backup file: corrupted metadata")
         except Exception as e:
             raise Exception(f"Error previewing restore: {str(e)}")
-        finally:
-            # Cleanup
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-            if os.path.exists(temp_dir):
-                os.rmdir(temp_dir)
 
     async def restore_backup(
         self,
-        backup_file,
+        backup_file=None,
         restore_include_patterns: Optional[List[str]] = None,
         restore_exclude_patterns: Optional[List[str]] = None,
         overwrite_policy: str = "overwrite",
         clean_before_restore: bool = False,
-        user_edited_metadata: Optional[Dict[str, Any]] = None
+        user_edited_metadata: Optional[Dict[str, Any]] = None,
+        snapshot_id: Optional[str] = None,
+        progress: Optional[BackupProgress] = None
     ) -> Dict[str, Any]:
-        """Restore files from backup archive"""
+        """Restore files from backup archive or snapshot"""
 
-        # Save uploaded file temporarily
-        temp_dir = tempfile.mkdtemp()
-        temp_file = os.path.join(temp_dir, "backup.zip")
-
-        restored_files = []
-        skipped_files = []
-        errors = []
         deleted_files = []
+        errors = []
 
         try:
-            backup_file.save(temp_file)
-
-            with zipfile.ZipFile(temp_file, 'r') as zipf:
+            with self._open_backup(backup_file, snapshot_id) as source:
                 # Read backup metadata from archive
-                original_backup_metadata = {}
-                if "metadata.json" in zipf.namelist():
-                    metadata_content = zipf.read("metadata.json").decode('utf-8')
-                    original_backup_metadata = json.loads(metadata_content)
+                original_backup_metadata = source.metadata
 
                 # Use user-edited metadata if provided, otherwise fall back to original
                 backup_metadata = user_edited_metadata if user_edited_metadata else original_backup_metadata
@@ -642,93 +707,13 @@ class BackupService:
                                 "error": f"Failed to delete: {str(e)}"
                             })
 
-                # Get files from archive (excluding metadata files)
-                archive_files = [name for name in zipf.namelist()
-                                 if name not in ["metadata.json", "checksums.json"]]
-
-                # Create pathspec for restore patterns if provided
-                restore_spec = None
-                if restore_include_patterns or restore_exclude_patterns:
-                    pattern_lines = []
-                    if restore_include_patterns:
-                        # Translate patterns from backed up system to current system
-                        translated_include_patterns = self._translate_patterns(restore_include_patterns, original_backup_metadata)
-                        for pattern in translated_include_patterns:
-                            # Remove leading slash for pathspec matching
-                            pattern_lines.append(pattern.lstrip('/'))
-                    if restore_exclude_patterns:
-                        # Translate patterns from backed up system to current system
-                        translated_exclude_patterns = self._translate_patterns(restore_exclude_patterns, original_backup_metadata)
-                        for pattern in translated_exclude_patterns:
-                            # Remove leading slash for pathspec matching
-                            pattern_lines.append(f"!{pattern.lstrip('/')}")
-
-                    if pattern_lines:
-                        from pathspec import PathSpec
-                        from pathspec.patterns.gitwildmatch import GitWildMatchPattern
-                        restore_spec = PathSpec.from_lines(GitWildMatchPattern, pattern_lines)
-
-                # Process each file in archive
-                for archive_path in archive_files:
-                    # Archive path is already the correct relative path (e.g., "a0/tmp/settings.json")
-                    original_path = archive_path
-
-                    # Translate path from backed up system to current system
-                    # Use original metadata for path translation (environment_info needed for this)
-                    target_path = self._translate_restore_path(archive_path, original_backup_metadata)
-
-                    # For pattern matching, we need to use the translated path (current system)
-                    # so that patterns like "/home/rafael/a0/data/**" can match files correctly
-                    translated_path_for_matching = target_path.lstrip('/')
-
-                    # Check if file matches restore patterns
-                    if restore_spec and not restore_spec.match_file(translated_path_for_matching):
-                        skipped_files.append({
-                            "archive_path": archive_path,
-                            "original_path": original_path,
-                            "reason": "not_matched_by_pattern"
-                        })
-                        continue
-
-                    try:
-                        # Handle overwrite policy
-                        if os.path.exists(target_path):
-                            if overwrite_policy == "skip":
-                                skipped_files.append({
-                                    "archive_path": archive_path,
-                                    "original_path": original_path,
-                                    "reason": "file_exists_skip_policy"
-                                })
-                                continue
-                            elif overwrite_policy == "backup":
-                                timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-                                backup_path = f"{target_path}.backup.{timestamp}"
-                                import shutil
-                                shutil.move(target_path, backup_path)
-
-                        # Create target directory if needed
-                        target_dir = os.path.dirname(target_path)
-                        if target_dir:
-                            os.makedirs(target_dir, exist_ok=True)
-
-                        # Extract file
-                        import shutil
-                        with zipf.open(archive_path) as source, open(target_path, 'wb') as target:
-                            shutil.copyfileobj(source, target)
-
-                        restored_files.append({
-                            "archive_path": archive_path,
-                            "original_path": original_path,
-                            "target_path": target_path,
-                            "status": "restored"
-                        })
+                restore_spec = self._get_restore_spec(restore_include_patterns, restore_exclude_patterns, original_backup_metadata)
 
-                    except Exception as e:
-                        errors.append({
-                            "path": archive_path,
-                            "original_path": original_path,
-                            "error": str(e)
-                        })
+                # Extract in a worker thread so the server keeps responding
+                restored_files, skipped_files, extract_errors = await asyncio.to_thread(
+                    self._extract_files, source, restore_spec, overwrite_policy, progress
+                )
+                errors.extend(extract_errors)
 
                 return {
                     "restored_files": restored_files,
@@ -745,6 +730,141 @@ class BackupService:
             raise Exception("Invalid backup file: corrupted metadata")
         except Exception as e:
             raise Exception(f"Error restoring backup: {str(e)}")
+
+    def _extract_files(
+        self,
+        source: "_ZipBackupSource | _SnapshotBackupSource",
+        restore_spec: Optional[PathSpec],
+        overwrite_policy: str,
+        progress: Optional[BackupProgress]
+    ) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Write backup files to their translated target paths (blocking)"""
+        restored_files = []
+        skipped_files = []
+        errors = []
+
+        archive_files = source.names()
+        if progress:
+            progress.phase = "restoring"
+            progress.total_files = len(archive_files)
+
+        # Process each file in archive
+        for archive_path in archive_files:
+            if progress:
+                progress.processed_files += 1
+
+            # Archive path is already the correct relative path (e.g., "a0/tmp/settings.json")
+            original_path = archive_path
+
+            # Translate path from backed up system to current system
+            # Use original metadata for path translation (environment_info needed for this)
+            target_path = self._translate_restore_path(archive_path, source.metadata)
+
+            # For pattern matching, we need to use the translated path (current system)
+            # so that patterns like "/home/rafael/a0/data/**" can match files correctly
+            translated_path_for_matching = target_path.lstrip('/')
+
+            # Check if file matches restore patterns
+            if restore_spec and not restore_spec.match_file(translated_path_for_matching):
+                skipped_files.append({
+                    "archive_path": archive_path,
+                    "original_path": original_path,
+                    "reason": "not_matched_by_pattern"
+                })
+                continue
+
+            try:
+                # Handle overwrite policy
+                if os.path.exists(target_path):
+                    if overwrite_policy == "skip":
+                        skipped_files.append({
+                            "archive_path": archive_path,
+                            "original_path": original_path,
+                            "reason": "file_exists_skip_policy"
+                        })
+                        continue
+                    elif overwrite_policy == "backup":
+                        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+                        backup_path = f"{target_path}.backup.{timestamp}"
+                        shutil.move(target_path, backup_path)
+
+                # Create target directory if needed
+                target_dir = os.path.dirname(target_path)
+                if target_dir:
+                    os.makedirs(target_dir, exist_ok=True)
+
+                # Extract file, a failed extraction leaves the existing file untouched
+                temp_path = f"{target_path}.restore.tmp"
+                try:
+                    with open(temp_path, 'wb') as target:
+                        source.copy_to(archive_path, target)
+                    os.replace(temp_path, target_path)
+                finally:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+
+                restored_files.append({
+                    "archive_path": archive_path,
+                    "original_path": original_path,
+                    "target_path": target_path,
+                    "status": "restored"
+                })
+
+            except Exception as e:
+                errors.append({
+                    "path": archive_path,
+                    "original_path": original_path,
+                    "error": str(e)
+                })
+
+        return restored_files, skipped_files, errors
+
+    def _get_restore_spec(
+        self,
+        restore_include_patterns: Optional[List[str]],
+        restore_exclude_patterns: Optional[List[str]],
+        original_backup_metadata: Dict[str, Any]
+    ) -> Optional[PathSpec]:
+        """Create pathspec for restore patterns if provided"""
+        if not restore_include_patterns and not restore_exclude_patterns:
+            return None
+
+        pattern_lines = []
+        if restore_include_patterns:
+            # Translate patterns from backed up system to current system
+            translated_include_patterns = self._translate_patterns(restore_include_patterns, original_backup_metadata)
+            for pattern in translated_include_patterns:
+                # Remove leading slash for pathspec matching
+                pattern_lines.append(pattern.lstrip('/'))
+        if restore_exclude_patterns:
+            # Translate patterns from backed up system to current system
+            translated_exclude_patterns = self._translate_patterns(restore_exclude_patterns, original_backup_metadata)
+            for pattern in translated_exclude_patterns:
+                # Remove leading slash for pathspec matching
+                pattern_lines.append(f"!{pattern.lstrip('/')}")
+
+        if not pattern_lines:
+            return None
+        return PathSpec.from_lines(GitWildMatchPattern, pattern_lines)
+
+    @contextmanager
+    def _open_backup(self, backup_file, snapshot_id: Optional[str]) -> Iterator["_ZipBackupSource | _SnapshotBackupSource"]:
+        """Open an uploaded zip archive or a snapshot of the local backup store"""
+        if snapshot_id:
+            yield _SnapshotBackupSource(BackupStore(), snapshot_id)
+            return
+        if backup_file is None:
+            raise Exception("No backup file or snapshot provided")
+
+        # Save uploaded file temporarily
+        temp_dir = tempfile.mkdtemp()
+        temp_file = os.path.join(temp_dir, "backup.zip")
+
+        try:
+            backup_file.save(temp_file)
+
+            with zipfile.ZipFile(temp_file, 'r') as zipf:
+                yield _ZipBackupSource(zipf)
         finally:
             # Cleanup
             if os.path.exists(temp_file):
@@ -840,3 +960,47 @@ class BackupService:
         except Exception:
             # If pattern testing fails, return empty list to avoid breaking restore
             return []
+
+
+class _ZipBackupSource:
+    """Files and metadata of a zip backup archive"""
+
+    def __init__(self, zipf: zipfile.ZipFile):
+        self.zipf = zipf
+        self.metadata: Dict[str, Any] = {}
+        if "metadata.json" in zipf.namelist():
+            self.metadata = json.loads(zipf.read("metadata.json").decode('utf-8'))
+
+    def names(self) -> List[str]:
+        # Get files from archive (excluding metadata files)
+        return [name for name in self.zipf.namelist()
+                if name not in ["metadata.json", "checksums.json"]]
+
+    def copy_to(self, name: str, target):
+        with self.zipf.open(name) as source:
+            shutil.copyfileobj(source, target)
+
+
+class _SnapshotBackupSource:
+    """Files and metadata of a snapshot, resolved through its chain of parent snapshots"""
+
+    def __init__(self, store: BackupStore, snapshot_id: str):
+        self.store = store
+        manifest = store.read_manifest(snapshot_id)
+        resolved = store.resolve(snapshot_id)
+        self.metadata: Dict[str, Any] = dict(
+            manifest["metadata"],
+            snapshot_id=snapshot_id,
+            files=[
+                {"path": path, "size": entry["size"], "modified": entry["modified"], "type": "file"}
+                for path, entry in resolved.items()
+            ],
+        )
+        # archive paths are relative like in zip archives
+        self._files = {path.lstrip('/'): entry for path, entry in resolved.items()}
+
+    def names(self) -> List[str]:
+        return list(self._files)
+
+    def copy_to(self, name: str, target):
+        self.store.copy_file(self._files[name], target)
@@ -0,0 +1,356 @@
+import datetime
+import hashlib
+import json
+import os
+import threading
+import uuid
+import zlib
+from dataclasses import asdict, dataclass, field
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional
+
+from python.helpers import files
+
+BACKUP_STORE_FOLDER = "usr/backups"
+MANIFEST_FORMAT = 1
+# files are split into chunks of this size, unchanged chunks are stored once
+CHUNK_SIZE = 1024 * 1024
+# every n-th snapshot stores the full file list so chains stay short
+FULL_MANIFEST_INTERVAL = 16
+PROGRESS_HISTORY = 16
+
+
+@dataclass
+class BackupProgress:
+    """Progress of a running backup, polled by the UI while the worker thread runs."""
+
+    id: str
+    operation: str
+    phase: str = "scanning"
+    total_files: int = 0
+    processed_files: int = 0
+    total_bytes: int = 0
+    processed_bytes: int = 0
+    stored_bytes: int = 0
+    done: bool = False
+    error: str = ""
+    result: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+_progress: Dict[str, BackupProgress] = {}
+_progress_lock = threading.Lock()
+
+# snapshots are created, deleted and garbage collected one at a time, a sweep must
+# not see chunks of a snapshot whose manifest is not written yet
+_store_lock = threading.RLock()
+
+
+def start_progress(operation: str, job_id: str = "") -> BackupProgress:
+    progress = BackupProgress(id=job_id or str(uuid.uuid4()), operation=operation)
+    with _progress_lock:
+        _progress.pop(progress.id, None)
+        _progress[progress.id] = progress
+        while len(_progress) > PROGRESS_HISTORY:
+            del _progress[next(iter(_progress))]
+    return progress
+
+
+def get_progress(job_id: str) -> Optional[BackupProgress]:
+    with _progress_lock:
+        return _progress.get(job_id)
+
+
+class BackupStore:
+    """
+    Content-addressed snapshot store.
+    Files are split into fixed-size chunks stored once under blobs/ by their sha256,
+    each snapshot manifest lists the chunks of files that changed since its parent
+    snapshot and the files that were removed. Resolving a snapshot walks the chain
+    back to the last full manifest. Deleting a snapshot rewrites the snapshots built
+    on it as full manifests, chunks no manifest lists are swept by collect_garbage.
+    """
+
+    def __init__(self, root: str = ""):
+        self.root = root or files.get_abs_path(BACKUP_STORE_FOLDER)
+        self.blobs_dir = os.path.join(self.root, "blobs")
+        self.snapshots_dir = os.path.join(self.root, "snapshots")
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        """Snapshot summaries, oldest first."""
+        snapshots = []
+        for manifest in self._manifests():
+            snapshots.append(
+                {
+                    "id": manifest["id"],
+                    "parent": manifest.get("parent"),
+                    "full": manifest.get("full", False),
+                    "backup_name": manifest["metadata"].get("backup_name", ""),
+                    "timestamp": manifest["metadata"].get("timestamp", ""),
+                    "total_files": manifest["metadata"].get("total_files", 0),
+                    "backup_size": manifest["metadata"].get("backup_size", 0),
+                    "stored_bytes": manifest.get("stored_bytes", 0),
+                }
+            )
+        return snapshots
+
+    def latest_snapshot_id(self) -> Optional[str]:
+        snapshots = self.list_snapshots()
+        return snapshots[-1]["id"] if snapshots else None
+
+    def read_manifest(self, snapshot_id: str) -> Dict[str, Any]:
+        path = self._manifest_path(snapshot_id)
+        if not os.path.isfile(path):
+            raise Exception(f"Backup snapshot '{snapshot_id}' not found")
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format") != MANIFEST_FORMAT:
+            raise Exception(f"Unsupported backup snapshot format in '{snapshot_id}'")
+        return manifest
+
+    def resolve(self, snapshot_id: str) -> Dict[str, Dict[str, Any]]:
+        """Full file map of a snapshot: path -> entry with size, mtime and chunks."""
+        chain = []
+        current: Optional[str] = snapshot_id
+        while current:
+            manifest = self.read_manifest(current)
+            chain.append(manifest)
+            if manifest.get("full"):
+                break
+            current = manifest.get("parent")
+            if current and len(chain) > FULL_MANIFEST_INTERVAL * 4:
+                raise Exception(f"Backup snapshot chain of '{snapshot_id}' is too long")
+        resolved: Dict[str, Dict[str, Any]] = {}
+        for manifest in reversed(chain):
+            for path in manifest.get("removed", []):
+                resolved.pop(path, None)
+            resolved.update(manifest["files"])
+        return resolved
+
+    def create_snapshot(
+        self,
+        matched_files: List[Dict[str, Any]],
+        metadata: Dict[str, Any],
+        parent_id: Optional[str] = None,
+        compression_level: int = 6,
+        progress: Optional[BackupProgress] = None,
+    ) -> Dict[str, Any]:
+        """
+        Store matched files as a new snapshot on top of `parent_id`.
+        Files whose size and mtime match the parent are not read again,
+        changed files only write chunks not yet in the store.
+        """
+        with _store_lock:
+            return self._create_snapshot(
+                matched_files, metadata, parent_id, compression_level, progress
+            )
+
+    def delete_snapshot(self, snapshot_id: str) -> List[str]:
+        """
+        Delete a snapshot. Snapshots built on it are rewritten as full manifests
+        first so they stay resolvable, returns their ids. Chunks are not freed
+        until collect_garbage.
+        """
+        with _store_lock:
+            return self._delete_snapshot(snapshot_id)
+
+    def prune(self, keep_last: int) -> List[str]:
+        """Delete all but the newest `keep_last` snapshots and sweep their chunks, returns deleted ids."""
+        with _store_lock:
+            ids = [manifest["id"] for manifest in self._manifests()]
+            deleted = ids[: max(len(ids) - max(keep_last, 0), 0)]
+            # newest first, so only the oldest kept snapshot is rewritten as full
+            for snapshot_id in reversed(deleted):
+                self._delete_snapshot(snapshot_id)
+            self._collect_garbage()
+            return deleted
+
+    def collect_garbage(self) -> Dict[str, int]:
+        """Mark the chunks listed by any manifest and remove all other blobs."""
+        with _store_lock:
+            return self._collect_garbage()
+
+    def _delete_snapshot(self, snapshot_id: str) -> List[str]:
+        path = self._manifest_path(snapshot_id)
+        self.read_manifest(snapshot_id)
+        rewritten = []
+        for child in self._manifests():
+            if child.get("parent") != snapshot_id:
+                continue
+            if not child.get("full"):
+                child["files"] = self.resolve(child["id"])
+                child["removed"] = []
+                child["full"] = True
+                child["depth"] = 0
+                rewritten.append(child["id"])
+            child["parent"] = None
+            _write_atomic(self._manifest_path(child["id"]), json.dumps(child).encode("utf-8"))
+        os.remove(path)
+        return rewritten
+
+    def _collect_garbage(self) -> Dict[str, int]:
+        # every chunk of a resolved snapshot is listed by a manifest of its chain
+        referenced = set()
+        for manifest in self._manifests():
+            for entry in manifest["files"].values():
+                referenced.update(entry["chunks"])
+
+        removed_blobs = 0
+        freed_bytes = 0
+        for dirpath, _dirnames, names in os.walk(self.blobs_dir):
+            for name in names:
+                if name in referenced:
+                    continue
+                # unreferenced chunks and temp files of interrupted writes
+                blob_path = os.path.join(dirpath, name)
+                freed_bytes += os.path.getsize(blob_path)
+                os.remove(blob_path)
+                removed_blobs += 1
+        return {"removed_blobs": removed_blobs, "freed_bytes": freed_bytes}
+
+    def _create_snapshot(
+        self,
+        matched_files: List[Dict[str, Any]],
+        metadata: Dict[str, Any],
+        parent_id: Optional[str],
+        compression_level: int,
+        progress: Optional[BackupProgress],
+    ) -> Dict[str, Any]:
+        parent_manifest = self.read_manifest(parent_id) if parent_id else None
+        previous = self.resolve(parent_id) if parent_id else {}
+        depth = 0 if not parent_manifest else parent_manifest.get("depth", 0) + 1
+        full = parent_manifest is None or depth >= FULL_MANIFEST_INTERVAL
+        if full:
+            depth = 0
+
+        if progress:
+            progress.phase = "storing"
+            progress.total_files = len(matched_files)
+            progress.total_bytes = sum(f["size"] for f in matched_files)
+
+        current: Dict[str, Dict[str, Any]] = {}
+        stored_bytes = 0
+        for file_info in matched_files:
+            path = file_info["path"]
+            real_path = file_info["real_path"]
+            try:
+                stat = os.stat(real_path)
+                old = previous.get(path)
+                if old and old["size"] == stat.st_size and old["mtime_ns"] == stat.st_mtime_ns:
+                    entry = old
+                else:
+                    chunks, size, written = self._store_file(real_path, compression_level)
+                    stored_bytes += written
+                    entry = {
+                        "size": size,
+                        "modified": datetime.datetime.fromtimestamp(stat.st_mtime).isoformat(),
+                        "mtime_ns": stat.st_mtime_ns,
+                        "chunks": chunks,
+                    }
+                current[path] = entry
+            except (OSError, IOError):
+                # file vanished or is unreadable, it is left out like in zip backups
+                pass
+            if progress:
+                progress.processed_files += 1
+                progress.processed_bytes += file_info["size"]
+                progress.stored_bytes = stored_bytes
+
+        if full:
+            changed = current
+            removed: List[str] = []
+        else:
+            changed = {p: e for p, e in current.items() if previous.get(p) != e}
+            removed = sorted(p for p in previous if p not in current)
+
+        # the file list is resolved from the manifest chain when inspecting, only counts are kept
+        metadata = {key: value for key, value in metadata.items() if key != "files"}
+        metadata["total_files"] = len(current)
+        metadata["backup_size"] = sum(e["size"] for e in current.values())
+
+        snapshot_id = _new_snapshot_id()
+        manifest = {
+            "format": MANIFEST_FORMAT,
+            "id": snapshot_id,
+            "parent": parent_id,
+            "full": full,
+            "depth": depth,
+            "stored_bytes": stored_bytes,
+            "metadata": metadata,
+            "files": changed,
+            "removed": removed,
+        }
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        _write_atomic(self._manifest_path(snapshot_id), json.dumps(manifest).encode("utf-8"))
+        return manifest
+
+    def copy_file(self, entry: Dict[str, Any], target: BinaryIO, verify: bool = True):
+        """Write the content of a resolved file entry to `target`."""
+        for digest in entry["chunks"]:
+            target.write(self.read_chunk(digest, verify))
+
+    def read_chunk(self, digest: str, verify: bool = True) -> bytes:
+        try:
+            with open(self._blob_path(digest), "rb") as f:
+                data = zlib.decompress(f.read())
+        except FileNotFoundError:
+            raise Exception(f"Backup store is missing chunk {digest}")
+        if verify and hashlib.sha256(data).hexdigest() != digest:
+            raise Exception(f"Backup store chunk {digest} is corrupted")
+        return data
+
+    def _store_file(self, real_path: str, compression_level: int) -> tuple[List[str], int, int]:
+        """Store new chunks of a file, returns chunk digests, bytes read and bytes written."""
+        chunks: List[str] = []
+        size = 0
+        written = 0
+        with open(real_path, "rb") as f:
+            for data in _read_chunks(f):
+                size += len(data)
+                digest = hashlib.sha256(data).hexdigest()
+                path = self._blob_path(digest)
+                if not os.path.exists(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    compressed = zlib.compress(data, compression_level)
+                    _write_atomic(path, compressed)
+                    written += len(compressed)
+                chunks.append(digest)
+        return chunks, size, written
+
+    def _manifests(self) -> Iterable[Dict[str, Any]]:
+        """All snapshot manifests, oldest first."""
+        if not os.path.isdir(self.snapshots_dir):
+            return
+        for name in sorted(os.listdir(self.snapshots_dir)):
+            if name.endswith(".json"):
+                yield self.read_manifest(name[: -len(".json")])
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blobs_dir, digest[:2], digest)
+
+    def _manifest_path(self, snapshot_id: str) -> str:
+        if not snapshot_id or os.sep in snapshot_id or snapshot_id.startswith("."):
+            raise Exception(f"Invalid backup snapshot id '{snapshot_id}'")
+        return os.path.join(self.snapshots_dir, snapshot_id + ".json")
+
+
+def _read_chunks(f: BinaryIO) -> Iterable[bytes]:
+    while True:
+        data = f.read(CHUNK_SIZE)
+        if not data:
+            break
+        yield data
+
+
+def _new_snapshot_id() -> str:
+    # sortable by creation time
+    timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return f"{timestamp}-{uuid.uuid4().hex[:6]}"
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
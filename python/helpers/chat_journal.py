@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+import time
+from typing import Any
+
+JOURNAL_FILE_NAME = "chat.journal"
+# compact the journal into chat.json when it grows over this size...
+JOURNAL_MAX_BYTES = 4 * 1024 * 1024
+# ...or when its oldest entry is older than this many seconds
+JOURNAL_MAX_AGE = 300
+
+
+class ChatJournal:
+    """
+    Append-only journal of chat mutations stored next to chat.json.
+    Each save appends one JSON line with a list of operations, a torn line at the
+    end of the file (crash during write) is ignored on replay.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._size = os.path.getsize(path) if os.path.exists(path) else 0
+        self._started_at = time.time() if self._size else 0.0
+        self.compacting = False
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def append(self, line: str):
+        """Write one batch of operations serialized as a single JSON line."""
+        record = (line + "\n").encode("utf-8", "replace")
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(record)
+                f.flush()
+            if not self._size:
+                self._started_at = time.time()
+            self._size += len(record)
+
+    def read(self) -> tuple[list[dict], int]:
+        """Return operations of all intact lines and the byte length they occupy."""
+        operations: list[dict] = []
+        with self._lock:
+            if not os.path.exists(self.path):
+                return operations, 0
+            with open(self.path, "rb") as f:
+                data = f.read()
+        offset = 0
+        while offset < len(data):
+            end = data.find(b"\n", offset)
+            if end < 0:
+                break  # torn write at the end of the journal
+            try:
+                operations.extend(json.loads(data[offset:end]))
+            except ValueError:
+                break
+            offset = end + 1
+        return operations, offset
+
+    def needs_compaction(self) -> bool:
+        if not self._size or self.compacting:
+            return False
+        return (
+            self._size >= JOURNAL_MAX_BYTES
+            or time.time() - self._started_at >= JOURNAL_MAX_AGE
+        )
+
+    def discard(self, upto: int | None = None):
+        """Drop lines already contained in chat.json, keep anything appended after `upto`."""
+        with self._lock:
+            if upto is None or upto >= self._size:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                self._size = 0
+                self._started_at = 0.0
+                return
+            with open(self.path, "rb") as f:
+                f.seek(upto)
+                rest = f.read()
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(rest)
+            os.replace(tmp_path, self.path)
+            self._size = len(rest)
+            self._started_at = time.time()
+
+
+def apply_operations(data: dict[str, Any], operations: list[dict], log_size: int):
+    """Replay journal operations onto serialized chat data (the chat.json format)."""
+    histories: dict[int, dict] = {}
+    logs: dict[int, dict] | None = None
+
+    for op in operations:
+        kind = op.get("op")
+        if kind == "context":
+            data.update(op["fields"])
+        elif kind == "agents":
+            data["agents"] = op["agents"]
+            histories.clear()
+        elif kind == "agent":
+            data["agents"][op["agent"]]["data"] = op["data"]
+        elif kind == "history":
+            index = op["agent"]
+            if "history" in op:
+                data["agents"][index]["history"] = op["history"]
+                histories.pop(index, None)
+                continue
+            if index not in histories:
+                histories[index] = _load_history(data["agents"][index].get("history", ""))
+            history = histories[index]
+            history["counter"] = op["counter"]
+            for part, mode, value in op["changes"]:
+                if part == "current":
+                    if mode == "append":
+                        history["current"].setdefault("messages", []).extend(value)
+                    else:
+                        history["current"] = value
+                elif mode == "append":
+                    history.setdefault(part, []).extend(value)
+                else:
+                    history[part] = value
+        elif kind == "log":
+            log = data.setdefault("log", {})
+            if op.get("reset") or logs is None:
+                source = [] if op.get("reset") else log.get("logs", [])
+                logs = {item.get("no", i): item for i, item in enumerate(source)}
+            for item in op["items"]:
+                logs[item["no"]] = item
+            for key in ("guid", "progress", "progress_no"):
+                if key in op:
+                    log[key] = op[key]
+
+    for index, history in histories.items():
+        data["agents"][index]["history"] = json.dumps(history, ensure_ascii=False)
+    if logs is not None:
+        data["log"]["logs"] = [logs[no] for no in sorted(logs)][-log_size:]
+    return data
+
+
+def _load_history(serialized: str) -> dict:
+    if serialized:
+        return json.loads(serialized)
+    return {
+        "_cls": "History",
+        "counter": 0,
+        "bulks": [],
+        "topics": [],
+        "current": {"_cls": "Topic", "summary": "", "messages": []},
+    }
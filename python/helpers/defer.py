@@ -1,12 +1,14 @@
 import asyncio
 from dataclasses import dataclass
 import threading
+import time
 from concurrent.futures import Future
 from typing import Any, Callable, Optional, Coroutine, TypeVar, Awaitable
 
 T = TypeVar("T")
 
 THREAD_BACKGROUND = "Background"
+HEARTBEAT_INTERVAL = 1.0  # seconds between loop lag probes
 
 
 class EventLoopThread:
@@ -26,6 +28,8 @@ class EventLoopThread:
             return cls._instances[thread_name]
 
     def _start(self):
+        if not hasattr(self, "stats"):
+            self._reset_stats()
         if not hasattr(self, "loop") or not self.loop:
             self.loop = asyncio.new_event_loop()
         if not hasattr(self, "thread") or not self.thread:
@@ -38,8 +42,53 @@ class EventLoopThread:
         if not self.loop:
             raise RuntimeError("Event loop is not initialized")
         asyncio.set_event_loop(self.loop)
+        self._next_beat = time.monotonic()
+        self.loop.call_soon(self._heartbeat)
         self.loop.run_forever()
 
+    def _reset_stats(self):
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "active": 0,
+            "wait_total": 0.0,
+            "wait_max": 0.0,
+            "lag": 0.0,
+            "lag_max": 0.0,
+        }
+        self._next_beat = time.monotonic()
+
+    def _heartbeat(self):
+        # how late the loop got to this callback, blocked loops show up as lag
+        now = time.monotonic()
+        lag = max(0.0, now - self._next_beat)
+        self.stats["lag"] = lag
+        self.stats["lag_max"] = max(self.stats["lag_max"], lag)
+        self._next_beat = now + HEARTBEAT_INTERVAL
+        if self.loop:
+            self.loop.call_later(HEARTBEAT_INTERVAL, self._heartbeat)
+
+    async def _measure(self, coro, submitted: float):
+        # time between submission and first run is the back-pressure of this loop
+        wait = time.monotonic() - submitted
+        self.stats["wait_total"] += wait
+        self.stats["wait_max"] = max(self.stats["wait_max"], wait)
+        self.stats["active"] += 1
+        try:
+            return await coro
+        finally:
+            self.stats["active"] -= 1
+            self.stats["completed"] += 1
+
+    def get_metrics(self) -> dict[str, Any]:
+        stats = dict(self.stats)
+        # a loop stuck in synchronous work never runs the heartbeat
+        stats["lag"] = max(stats["lag"], time.monotonic() - self._next_beat)
+        stats["wait_avg"] = (
+            stats["wait_total"] / stats["completed"] if stats["completed"] else 0.0
+        )
+        return {"thread_name": self.thread_name, **stats}
+
     def terminate(self):
         loop = getattr(self, "loop", None)
         thread = getattr(self, "thread", None)
@@ -71,7 +120,60 @@ class EventLoopThread:
         self._start()
         if not self.loop:
             raise RuntimeError("Event loop is not initialized")
-        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+        self.stats["submitted"] += 1
+        return asyncio.run_coroutine_threadsafe(
+            self._measure(coro, time.monotonic()), self.loop
+        )
+
+
+class EventLoopLanes:
+    """Bounded set of named EventLoopThreads shared by many keys.
+
+    Each key (e.g. a chat context id) is assigned to the least loaded lane the
+    first time it asks and sticks to it until released, so synchronous work in
+    one key only blocks the keys sharing its lane.
+    """
+
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = max(1, size)
+        self._assigned: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get_thread_name(self, key: str) -> str:
+        with self._lock:
+            if key not in self._assigned:
+                self._assigned[key] = min(range(self.size), key=self._lane_load)
+            return self._lane_name(self._assigned[key])
+
+    def release(self, key: str):
+        with self._lock:
+            self._assigned.pop(key, None)
+
+    def get_metrics(self) -> list[dict[str, Any]]:
+        with self._lock:
+            keys = [self._lane_keys(lane) for lane in range(self.size)]
+        metrics = []
+        for lane in range(self.size):
+            thread = EventLoopThread._instances.get(self._lane_name(lane))
+            metrics.append(
+                {
+                    **(thread.get_metrics() if thread else {"thread_name": self._lane_name(lane)}),
+                    "keys": keys[lane],
+                }
+            )
+        return metrics
+
+    def _lane_name(self, lane: int) -> str:
+        return f"{self.name}-{lane}"
+
+    def _lane_keys(self, lane: int) -> int:
+        return sum(1 for assigned in self._assigned.values() if assigned == lane)
+
+    def _lane_load(self, lane: int) -> tuple[int, int]:
+        thread = EventLoopThread._instances.get(self._lane_name(lane))
+        active = thread.stats["active"] if thread else 0
+        return (self._lane_keys(lane), active)
 
 
 @dataclass
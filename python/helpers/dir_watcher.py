@@ -0,0 +1,152 @@
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+
+# inotify event flags (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+
+_EVENT = struct.Struct("iIII")
+
+_libc = None
+
+
+def _get_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+    return _libc
+
+
+class DirWatcher:
+    """
+    Non-recursive inotify watches on a set of directories, polled without blocking.
+    Use `DirWatcher.create()`, it returns None where inotify is not available so
+    callers can fall back to polling the directories themselves.
+    """
+
+    @staticmethod
+    def create() -> "DirWatcher | None":
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            fd = _get_libc().inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        return DirWatcher(fd)
+
+    def __init__(self, fd: int):
+        self._fd = fd
+        self._paths: dict[int, str] = {}
+        self._watches: dict[str, int] = {}
+
+    def watch(self, path: str) -> bool:
+        """Watch a directory for changes of its entries, False when the watch limit is reached."""
+        if path in self._watches:
+            return True
+        wd = _get_libc().inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            return False
+        self._paths[wd] = path
+        self._watches[path] = wd
+        return True
+
+    def read_changes(self) -> tuple[set[str], set[str], bool]:
+        """
+        Drain pending events.
+        Returns directories whose entries changed, directories that were removed or
+        replaced (their subtree is stale) and whether events were lost (everything is stale).
+        """
+        changed: set[str] = set()
+        removed: set[str] = set()
+        overflow = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            except OSError:
+                overflow = True
+                break
+            if not data:
+                break
+            offset = 0
+            while offset + _EVENT.size <= len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size : offset + _EVENT.size + length]
+                offset += _EVENT.size + length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                path = self._paths.get(wd)
+                if path is None:
+                    continue
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                    removed.add(path)
+                    if mask & IN_IGNORED:
+                        self._forget(wd)
+                    continue
+                changed.add(path)
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO):
+                    child = name.rstrip(b"\0")
+                    removed.add(os.path.join(path, os.fsdecode(child)))
+        return changed, removed, overflow
+
+    def unwatch(self, path: str):
+        wd = self._watches.get(path)
+        if wd is not None:
+            _get_libc().inotify_rm_watch(self._fd, wd)
+            self._forget(wd)
+
+    def unwatch_tree(self, path: str):
+        prefix = path.rstrip(os.sep) + os.sep
+        for watched in [p for p in self._watches if p == path or p.startswith(prefix)]:
+            self.unwatch(watched)
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._paths.clear()
+        self._watches.clear()
+
+    def _forget(self, wd: int):
+        path = self._paths.pop(wd, None)
+        if path is not None and self._watches.get(path) == wd:
+            del self._watches[path]
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
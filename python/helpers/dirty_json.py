@@ -1,4 +1,6 @@
 import json
+import re
+from typing import Any
 
 def try_parse(json_string: str):
     try:
@@ -16,15 +18,19 @@ def stringify(obj, **kwargs):
 
 
 class DirtyJson:
+    """Lenient JSON parser, whole text at once or fed chunk by chunk.
+
+    Both run on the DirtyJsonStream parsing core: parse() feeds the complete
+    text and finishes, feed() continues the stream with each chunk.
+    """
+
     def __init__(self):
         self._reset()
 
     def _reset(self):
         self.json_string = ""
-        self.index = 0
-        self.current_char = None
         self.result = None
-        self.stack = []
+        self.stream = DirtyJsonStream()
 
     @staticmethod
     def parse_string(json_string):
@@ -34,302 +40,422 @@ class DirtyJson:
     def parse(self, json_string):
         self._reset()
         self.json_string = json_string
+        self.stream.feed(json_string)
+        self.result = self.stream.finish()
+        return self.result
+
+    def feed(self, chunk):
+        self.json_string += chunk
+        self.result = self.stream.feed(chunk)
+        return self.result
+
 
-        # Add bounds checking to prevent IndexError
-        if not json_string:
-            # Return None for empty strings
-            return None
+_ESCAPES = {"b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+_SIMPLE_ESCAPES = ['"', "'", "\\", "/", "b", "f", "n", "r", "t"]
+_UNQUOTED_KEY_RUN = re.compile(r"[^\s:,}\]]*")
+_UNQUOTED_STRING_RUN = re.compile(r"[^:,}\]]*")
 
-        self.index = self.get_start_pos(self.json_string)
 
-        # Ensure index is within bounds
-        if self.index >= len(self.json_string):
-            # If start position is beyond string length, return None
-            return None
+class DirtyJsonStream:
+    """Incremental DirtyJson parser, the parsing core of DirtyJson.
 
-        self.current_char = self.json_string[self.index]
-        self._parse()
+    Parser state is kept in a suspended generator between chunks, so every
+    character is processed only once. The result is built in place and can be
+    read at any time as a partial object (strings grow as they stream in,
+    numbers and literals appear once complete). After finish() the result is
+    the same as parsing the whole text at once.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self.text = ""
+        self.result = None
+        self.done = False
+        self._buf = ""
+        self._pos = 0
+        self._closed = False
+        self._error: Exception | None = None
+        self._open_string: tuple[Any, list[str], bool] | None = None
+        self._parser = self._parse_document()
+
+    def feed(self, chunk: str):
+        """Parse the next chunk of text and return the (partial) result."""
+        self.text += chunk
+        return self._feed(chunk)
+
+    def feed_text(self, text: str):
+        """Parse accumulated text, processing only the part not seen yet.
+        Starts over when the text does not continue the previously fed one."""
+        if not text.startswith(self.text):
+            self._reset()
+        chunk = text[len(self.text) :]
+        self.text = text
+        return self._feed(chunk)
+
+    def finish(self):
+        """Mark the end of input so pending values are completed."""
+        if not self._closed:
+            self._closed = True
+            self._resume()
         return self.result
 
-    def feed(self, chunk):
-        self.json_string += chunk
-        if not self.current_char and self.json_string:
-            self.current_char = self.json_string[0]
-        self._parse()
+    def snapshot(self):
+        """Copy of the current result that callers are free to modify."""
+        return _copy_containers(self.result)
+
+    def _feed(self, chunk: str):
+        if chunk and not self._closed:
+            self._buf = self._buf[self._pos :] + chunk
+            self._pos = 0
+            self._resume()
         return self.result
 
+    def _resume(self):
+        if self._error:
+            raise self._error
+        if self.done:
+            return
+        try:
+            next(self._parser)
+        except StopIteration:
+            self.done = True
+        except Exception as e:
+            self._error = e
+            self.done = True
+            raise
+        finally:
+            # expose the string being streamed right now
+            if self._open_string:
+                setter, parts, strip = self._open_string
+                value = "".join(parts)
+                parts[:] = [value]
+                setter(value.strip() if strip else value)
+
+    def _wait(self, count=1):
+        while len(self._buf) - self._pos < count and not self._closed:
+            yield
+
+    def _char(self, offset=0):
+        index = self._pos + offset
+        return self._buf[index] if index < len(self._buf) else None
+
     def _advance(self, count=1):
-        self.index += count
-        if self.index < len(self.json_string):
-            self.current_char = self.json_string[self.index]
-        else:
-            self.current_char = None
+        self._pos = min(self._pos + count, len(self._buf))
 
-    def _skip_whitespace(self):
-        while self.current_char is not None:
-            if self.current_char.isspace():
-                self._advance()
-            elif (
-                self.current_char == "/" and self._peek(1) == "/"
-            ):  # Single-line comment
-                self._skip_single_line_comment()
-            elif (
-                self.current_char == "/" and self._peek(1) == "*"
-            ):  # Multi-line comment
-                self._skip_multi_line_comment()
+    def _set_result(self, value):
+        self.result = value
+
+    @staticmethod
+    def _dict_setter(obj: dict, key):
+        def setter(value):
+            obj[key] = value
+
+        return setter
+
+    @staticmethod
+    def _list_setter(arr: list):
+        index = len(arr)
+
+        def setter(value):
+            if index < len(arr):
+                arr[index] = value
             else:
+                arr.append(value)
+
+        return setter
+
+    def _parse_document(self):
+        # parsing starts at the first '{', '[' or '"', found as the text arrives
+        scanned = 0
+        while True:
+            found = [
+                i for i in (self._buf.find(c, scanned) for c in '{["') if i != -1
+            ]
+            if found:
+                self._pos = min(found)
                 break
-
-    def _skip_single_line_comment(self):
-        while self.current_char is not None and self.current_char != "\n":
-            self._advance()
-        if self.current_char == "\n":
-            self._advance()
-
-    def _skip_multi_line_comment(self):
-        self._advance(2)  # Skip /*
-        while self.current_char is not None:
-            if self.current_char == "*" and self._peek(1) == "/":
-                self._advance(2)  # Skip */
+            if self._closed:
                 break
-            self._advance()
+            scanned = len(self._buf)
+            yield
+        yield from self._wait()
+        if self._char() is not None:
+            yield from self._parse_value(self._set_result)
+
+    def _skip_whitespace(self):
+        while True:
+            yield from self._wait()
+            char = self._char()
+            if char is None:
+                return
+            if char.isspace():
+                self._pos += 1
+                continue
+            if char != "/":
+                return
+            yield from self._wait(2)
+            following = self._char(1)
+            if following == "/":  # Single-line comment
+                while True:
+                    end = self._buf.find("\n", self._pos)
+                    if end != -1:
+                        self._pos = end + 1
+                        break
+                    self._pos = len(self._buf)
+                    if self._closed:
+                        return
+                    yield
+            elif following == "*":  # Multi-line comment
+                self._pos += 2
+                while True:
+                    end = self._buf.find("*/", self._pos)
+                    if end != -1:
+                        self._pos = end + 2
+                        break
+                    if self._closed:
+                        self._pos = len(self._buf)
+                        return
+                    self._pos = max(self._pos, len(self._buf) - 1)  # keep a trailing '*'
+                    yield
+            else:
+                return
 
-    def _parse(self):
-        if self.result is None:
-            self.result = self._parse_value()
+    def _parse_value(self, setter):
+        yield from self._skip_whitespace()
+        char = self._char()
+        if char == "{":
+            yield from self._wait(2)
+            if self._char(1) == "{":  # Handle {{
+                self._pos += 2
+            yield from self._parse_object(setter)
+        elif char == "[":
+            yield from self._parse_array(setter)
+        elif char in ['"', "'", "`"]:
+            yield from self._wait(3)
+            if self._buf[self._pos + 1 : self._pos + 3] == char * 2:  # type: ignore
+                yield from self._parse_multiline_string(setter)
+            else:
+                yield from self._parse_string(setter)
+        elif char and (char.isdigit() or char in ["-", "+"]):
+            yield from self._parse_number(setter)
         else:
-            self._continue_parsing()
-
-    def _continue_parsing(self):
-        while self.current_char is not None:
-            if isinstance(self.result, dict):
-                self._parse_object_content()
-            elif isinstance(self.result, list):
-                self._parse_array_content()
-            elif isinstance(self.result, str):
-                self.result = self._parse_string()
+            for text, value in (
+                ("true", True),
+                ("false", False),
+                ("null", None),
+                ("undefined", None),
+            ):
+                if (yield from self._match(text)):
+                    setter(value)
+                    return
+            if char:
+                yield from self._parse_unquoted_string(setter)
             else:
-                break
+                setter(None)
 
-    def _parse_value(self):
-        self._skip_whitespace()
-        if self.current_char == "{":
-            if self._peek(1) == "{":  # Handle {{
-                self._advance(2)
-            return self._parse_object()
-        elif self.current_char == "[":
-            return self._parse_array()
-        elif self.current_char in ['"', "'", "`"]:
-            if self._peek(2) == self.current_char * 2:  # type: ignore
-                return self._parse_multiline_string()
-            return self._parse_string()
-        elif self.current_char and (
-            self.current_char.isdigit() or self.current_char in ["-", "+"]
-        ):
-            return self._parse_number()
-        elif self._match("true"):
-            return True
-        elif self._match("false"):
+    def _match(self, text: str):
+        char = self._char()
+        if not char or char.lower() != text[0].lower():
             return False
-        elif self._match("null") or self._match("undefined"):
-            return None
-        elif self.current_char:
-            return self._parse_unquoted_string()
-        return None
-
-    def _match(self, text: str) -> bool:
-        # first char should match current char
-        if not self.current_char or self.current_char.lower() != text[0].lower():
-            return False
-
-        # peek remaining chars
-        remaining = len(text) - 1
-        if self._peek(remaining).lower() == text[1:].lower():
-            self._advance(len(text))
+        yield from self._wait(len(text))
+        if self._buf[self._pos + 1 : self._pos + len(text)].lower() == text[1:].lower():
+            self._pos += len(text)
             return True
         return False
 
-    def _parse_object(self):
+    def _parse_object(self, setter):
         obj = {}
+        yield from self._wait()
         self._advance()  # Skip opening brace
-        self.stack.append(obj)
-        self._parse_object_content()
-        return obj
-
-    def _parse_object_content(self):
-        while self.current_char is not None:
-            self._skip_whitespace()
-            if self.current_char == "}":
-                if self._peek(1) == "}":  # Handle }}
-                    self._advance(2)
-                else:
-                    self._advance()
-                self.stack.pop()
+        setter(obj)
+        while True:
+            yield from self._wait()
+            if self._char() is None:
+                return
+            yield from self._skip_whitespace()
+            char = self._char()
+            if char == "}":
+                yield from self._wait(2)
+                self._advance(2 if self._char(1) == "}" else 1)  # Handle }}
                 return
-            if self.current_char is None:
-                self.stack.pop()
+            if char is None:
                 return  # End of input reached while parsing object
 
-            key = self._parse_key()
-            value = None
-            self._skip_whitespace()
+            key = yield from self._parse_key()
+            yield from self._skip_whitespace()
+            value_setter = self._dict_setter(obj, key)
 
-            if self.current_char == ":":
-                self._advance()
-                value = self._parse_value()
-            elif self.current_char is None:
-                value = None  # End of input reached after key
+            if self._char() == ":":
+                self._pos += 1
+                yield from self._parse_value(value_setter)
+            elif self._char() is None:
+                value_setter(None)  # End of input reached after key
             else:
-                value = self._parse_value()
+                yield from self._parse_value(value_setter)
 
-            self.stack[-1][key] = value
-
-            self._skip_whitespace()
-            if self.current_char == ",":
-                self._advance()
-                continue
-            elif self.current_char != "}":
-                if self.current_char is None:
-                    self.stack.pop()
-                    return  # End of input reached after value
-                continue
+            yield from self._skip_whitespace()
+            char = self._char()
+            if char == ",":
+                self._pos += 1
+            elif char is None:
+                return  # End of input reached after value
 
     def _parse_key(self):
-        self._skip_whitespace()
-        if self.current_char in ['"', "'"]:
-            return self._parse_string()
-        else:
-            return self._parse_unquoted_key()
-
-    def _parse_unquoted_key(self):
-        result = ""
-        while (
-            self.current_char is not None
-            and not self.current_char.isspace()
-            and self.current_char not in [":", ",", "}", "]"]
-        ):
-            result += self.current_char
-            self._advance()
-        return result
-
-    def _parse_array(self):
+        yield from self._skip_whitespace()
+        if self._char() in ['"', "'"]:
+            return (yield from self._parse_string())
+        parts = []
+        while True:
+            match = _UNQUOTED_KEY_RUN.match(self._buf, self._pos)
+            parts.append(match.group())  # type: ignore
+            self._pos = match.end()  # type: ignore
+            if self._pos < len(self._buf) or self._closed:
+                return "".join(parts)
+            yield
+
+    def _parse_array(self, setter):
         arr = []
-        self._advance()  # Skip opening bracket
-        self.stack.append(arr)
-        self._parse_array_content()
-        return arr
-
-    def _parse_array_content(self):
-        while self.current_char is not None:
-            self._skip_whitespace()
-            if self.current_char == "]":
-                self._advance()
-                self.stack.pop()
+        self._pos += 1  # Skip opening bracket
+        setter(arr)
+        while True:
+            yield from self._wait()
+            if self._char() is None:
                 return
-            value = self._parse_value()
-            self.stack[-1].append(value)
-            self._skip_whitespace()
-            if self.current_char == ",":
-                self._advance()
+            yield from self._skip_whitespace()
+            if self._char() == "]":
+                self._pos += 1
+                return
+            yield from self._parse_value(self._list_setter(arr))
+            yield from self._skip_whitespace()
+            char = self._char()
+            if char == ",":
+                self._pos += 1
                 # handle trailing commas, end of array
-                self._skip_whitespace()
-                if self.current_char is None or self.current_char == "]":
-                    if self.current_char == "]":
-                        self._advance()
-                    self.stack.pop()
+                yield from self._skip_whitespace()
+                if self._char() is None or self._char() == "]":
+                    self._advance()
                     return
-            elif self.current_char != "]":
-                self.stack.pop()
+            elif char != "]":
                 return
 
-    def _parse_string(self):
-        result = ""
-        quote_char = self.current_char
-        self._advance()  # Skip opening quote
-        while self.current_char is not None and self.current_char != quote_char:
-            if self.current_char == "\\":
-                self._advance()
-                if self.current_char in ['"', "'", "\\", "/", "b", "f", "n", "r", "t"]:
-                    result += {
-                        "b": "\b",
-                        "f": "\f",
-                        "n": "\n",
-                        "r": "\r",
-                        "t": "\t",
-                    }.get(self.current_char, self.current_char)
-                elif self.current_char == "u":
-                    self._advance()  # Skip 'u'
-                    unicode_char = ""
-                    # Try to collect exactly 4 hex digits
-                    for _ in range(4):
-                        if self.current_char is None or not self.current_char.isalnum():
-                            # If we can't get 4 hex digits, treat it as a literal '\u' followed by whatever we got
-                            return result + "\\u" + unicode_char
-                        unicode_char += self.current_char
-                        self._advance()
+    def _parse_string(self, setter=None):
+        quote = self._char()
+        self._pos += 1  # Skip opening quote
+        parts: list[str] = []
+        if setter:
+            self._open_string = (setter, parts, False)
+        while True:
+            yield from self._wait()
+            buf = self._buf
+            stops = [i for i in (buf.find(quote, self._pos), buf.find("\\", self._pos)) if i != -1]  # type: ignore
+            if not stops:
+                parts.append(buf[self._pos :])
+                self._pos = len(buf)
+                if self._closed:
+                    break
+                yield
+                continue
+            stop = min(stops)
+            parts.append(buf[self._pos : stop])
+            self._pos = stop
+            if buf[stop] == quote:
+                self._pos += 1  # Skip closing quote
+                break
+            yield from self._wait(2)
+            escaped = self._char(1)
+            if escaped in _SIMPLE_ESCAPES:
+                parts.append(_ESCAPES.get(escaped, escaped))  # type: ignore
+                self._pos += 2
+            elif escaped == "u":
+                yield from self._wait(6)
+                self._pos += 2  # Skip '\u'
+                unicode_char = ""
+                for _ in range(4):
+                    char = self._char()
+                    if char is None or not char.isalnum():
+                        break
+                    unicode_char += char
+                    self._pos += 1
+                else:
                     try:
-                        result += chr(int(unicode_char, 16))
+                        parts.append(chr(int(unicode_char, 16)))
                     except ValueError:
-                        # If invalid hex value, treat as literal
-                        result += "\\u" + unicode_char
+                        parts.append("\\u" + unicode_char)
                     continue
+                # incomplete escape is kept literally and ends the string
+                parts.append("\\u" + unicode_char)
+                break
             else:
-                result += self.current_char
-            self._advance()
-        if self.current_char == quote_char:
-            self._advance()  # Skip closing quote
-        return result
-
-    def _parse_multiline_string(self):
-        result = ""
-        quote_char = self.current_char
-        self._advance(3)  # Skip first quote
-        while self.current_char is not None:
-            if self.current_char == quote_char and self._peek(2) == quote_char * 2:  # type: ignore
-                self._advance(3)  # Skip first quote
+                self._advance(2)  # unknown escapes are dropped
+        value = "".join(parts)
+        if setter:
+            self._open_string = None
+            setter(value)
+        return value
+
+    def _parse_multiline_string(self, setter):
+        quote = self._char()
+        self._pos += 3  # Skip opening quotes
+        parts: list[str] = []
+        self._open_string = (setter, parts, True)
+        while True:
+            yield from self._wait()
+            end = self._buf.find(quote, self._pos)  # type: ignore
+            if end == -1:
+                parts.append(self._buf[self._pos :])
+                self._pos = len(self._buf)
+                if self._closed:
+                    break
+                yield
+                continue
+            parts.append(self._buf[self._pos : end])
+            self._pos = end
+            yield from self._wait(3)
+            if self._buf[self._pos + 1 : self._pos + 3] == quote * 2:  # type: ignore
+                self._pos += 3  # Skip closing quotes
                 break
-            result += self.current_char
-            self._advance()
-        return result.strip()
+            parts.append(quote)  # type: ignore
+            self._pos += 1
+        self._open_string = None
+        setter("".join(parts).strip())
 
-    def _parse_number(self):
+    def _parse_number(self, setter):
         number_str = ""
-        while self.current_char is not None and (
-            self.current_char.isdigit()
-            or self.current_char in ["-", "+", ".", "e", "E"]
-        ):
-            number_str += self.current_char
-            self._advance()
+        while True:
+            buf = self._buf
+            while self._pos < len(buf) and (
+                buf[self._pos].isdigit() or buf[self._pos] in ["-", "+", ".", "e", "E"]
+            ):
+                number_str += buf[self._pos]
+                self._pos += 1
+            if self._pos < len(buf) or self._closed:
+                break
+            yield
         try:
-            return int(number_str)
+            setter(int(number_str))
         except ValueError:
-            return float(number_str)
-
-    def _parse_unquoted_string(self):
-        result = ""
-        while self.current_char is not None and self.current_char not in [
-            ":",
-            ",",
-            "}",
-            "]",
-        ]:
-            result += self.current_char
-            self._advance()
-        self._advance()
-        return result.strip()
-
-    def _peek(self, n):
-        peek_index = self.index + 1
-        result = ""
-        for _ in range(n):
-            if peek_index < len(self.json_string):
-                result += self.json_string[peek_index]
-                peek_index += 1
-            else:
+            setter(float(number_str))
+
+    def _parse_unquoted_string(self, setter):
+        parts: list[str] = []
+        self._open_string = (setter, parts, True)
+        while True:
+            match = _UNQUOTED_STRING_RUN.match(self._buf, self._pos)
+            parts.append(match.group())  # type: ignore
+            self._pos = match.end()  # type: ignore
+            if self._pos < len(self._buf) or self._closed:
                 break
-        return result
-
-    def get_start_pos(self, input_str: str) -> int:
-        chars = ["{", "[", '"']
-        indices = [input_str.find(char) for char in chars if input_str.find(char) != -1]
-        return min(indices) if indices else 0
+            yield
+        self._advance()  # Skip the terminator
+        self._open_string = None
+        setter("".join(parts).strip())
+
+
+def _copy_containers(value):
+    if isinstance(value, dict):
+        return {k: _copy_containers(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_containers(v) for v in value]
+    return value
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+
+from python.helpers import files
+from python.helpers.print_style import PrintStyle
+
+DOCUMENT_CACHE_DIR = "tmp/document_cache"
+DOCUMENT_CACHE_MAX_BYTES = 1024 * 1024 * 1024  # least recently used entries are evicted above this
+# cache hits update usage in memory, the index is saved with the next write or after this many seconds
+DOCUMENT_CACHE_INDEX_SAVE_INTERVAL = 60.0
+
+_INDEX_FILE = "index.json"
+
+
+class DocumentCache:
+    """
+    Persistent cache of processed documents keyed by content hash.
+    Each entry stores the parsed text, its chunks (per chunking parameters) and chunk
+    embeddings (per embedding model), so repeated queries skip fetching, parsing,
+    splitting and embedding. Total size is bounded with LRU eviction.
+    """
+
+    _instances: dict[str, "DocumentCache"] = {}
+    _instances_lock = threading.Lock()
+
+    @staticmethod
+    def get(folder: str = DOCUMENT_CACHE_DIR) -> "DocumentCache":
+        path = files.get_abs_path(folder)
+        with DocumentCache._instances_lock:
+            if path not in DocumentCache._instances:
+                DocumentCache._instances[path] = DocumentCache(path)
+            return DocumentCache._instances[path]
+
+    @staticmethod
+    def flush_all():
+        """Save pending usage times of all open caches, called on shutdown."""
+        with DocumentCache._instances_lock:
+            caches = list(DocumentCache._instances.values())
+        for cache in caches:
+            cache.flush()
+
+    def __init__(self, path: str, max_bytes: int = DOCUMENT_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._index: dict[str, dict] = self._read_index()
+        self._index_dirty = False
+        self._index_saved = time.monotonic()
+
+    @staticmethod
+    def content_key(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    # text
+
+    def get_text(self, key: str) -> str | None:
+        return self._read(key, "text.txt", lambda path: files.read_file(path))
+
+    def put_text(self, key: str, uri: str, text: str):
+        with self._lock:
+            self._write(key, "text.txt", lambda path: _write_text(path, text))
+            self._index[key]["uri"] = uri
+            self._save_index()
+
+    # chunks
+
+    def get_chunks(self, key: str, chunk_size: int, chunk_overlap: int) -> list[str] | None:
+        name = f"chunks-{chunk_size}-{chunk_overlap}.json"
+        return self._read(key, name, lambda path: json.loads(files.read_file(path)))
+
+    def put_chunks(self, key: str, chunk_size: int, chunk_overlap: int, chunks: list[str]):
+        name = f"chunks-{chunk_size}-{chunk_overlap}.json"
+        with self._lock:
+            self._write(key, name, lambda path: _write_text(path, json.dumps(chunks)))
+            self._save_index()
+
+    # embeddings
+
+    def get_embeddings(
+        self, key: str, namespace: str, chunk_size: int, chunk_overlap: int
+    ) -> np.ndarray | None:
+        name = _embeddings_file(namespace, chunk_size, chunk_overlap)
+        return self._read(key, name, lambda path: np.load(path, allow_pickle=False))
+
+    def put_embeddings(
+        self,
+        key: str,
+        namespace: str,
+        chunk_size: int,
+        chunk_overlap: int,
+        embeddings: np.ndarray,
+    ):
+        name = _embeddings_file(namespace, chunk_size, chunk_overlap)
+        with self._lock:
+            self._write(
+                key, name, lambda path: _save_array(path, np.asarray(embeddings, np.float32))
+            )
+            self._save_index()
+
+    def find_previous_key(self, uri: str, exclude: str) -> str | None:
+        """Most recently used other entry of the same document URI (previous version)."""
+        with self._lock:
+            candidates = [
+                (entry.get("used", 0), key)
+                for key, entry in self._index.items()
+                if key != exclude and entry.get("uri") == uri
+            ]
+        return max(candidates)[1] if candidates else None
+
+    def total_size(self) -> int:
+        with self._lock:
+            return sum(entry.get("size", 0) for entry in self._index.values())
+
+    # internals
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.path, key)
+
+    def _read(self, key: str, name: str, reader):
+        path = os.path.join(self._entry_dir(key), name)
+        with self._lock:
+            if key not in self._index or not os.path.exists(path):
+                return None
+            try:
+                value = reader(path)
+            except Exception as e:
+                PrintStyle.error(f"Document cache entry '{key}' is unreadable: {e}")
+                self._remove(key)
+                self._save_index()
+                return None
+            self._index[key]["used"] = time.time()
+            self._index_dirty = True
+            if time.monotonic() - self._index_saved >= DOCUMENT_CACHE_INDEX_SAVE_INTERVAL:
+                self._save_index()
+            return value
+
+    def flush(self):
+        """Save usage times of cache hits not yet written to the index."""
+        with self._lock:
+            if self._index_dirty:
+                self._save_index()
+
+    def _write(self, key: str, name: str, writer):
+        entry_dir = self._entry_dir(key)
+        os.makedirs(entry_dir, exist_ok=True)
+        path = os.path.join(entry_dir, name)
+        tmp_path = path + ".tmp"
+        writer(tmp_path)
+        os.replace(tmp_path, path)
+        entry = self._index.setdefault(key, {})
+        entry["used"] = time.time()
+        entry["size"] = _dir_size(entry_dir)
+        self._evict(keep=key)
+
+    def _evict(self, keep: str):
+        total = sum(entry.get("size", 0) for entry in self._index.values())
+        if total <= self.max_bytes:
+            return
+        for key in sorted(self._index, key=lambda k: self._index[k].get("used", 0)):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= self._index[key].get("size", 0)
+            self._remove(key)
+
+    def _remove(self, key: str):
+        self._index.pop(key, None)
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def _read_index(self) -> dict[str, dict]:
+        path = os.path.join(self.path, _INDEX_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # drop entries whose folder is gone
+        return {
+            key: entry
+            for key, entry in index.items()
+            if os.path.isdir(self._entry_dir(key))
+        }
+
+    def _save_index(self):
+        os.makedirs(self.path, exist_ok=True)
+        path = os.path.join(self.path, _INDEX_FILE)
+        _write_text(path + ".tmp", json.dumps(self._index))
+        os.replace(path + ".tmp", path)
+        self._index_dirty = False
+        self._index_saved = time.monotonic()
+
+
+def _embeddings_file(namespace: str, chunk_size: int, chunk_overlap: int) -> str:
+    return f"embeddings-{files.safe_file_name(namespace)}-{chunk_size}-{chunk_overlap}.npy"
+
+
+def _write_text(path: str, text: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _save_array(path: str, array: np.ndarray):
+    with open(path, "wb") as f:
+        np.save(f, array, allow_pickle=False)
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for entry in os.scandir(path):
+        if entry.is_file():
+            total += entry.stat().st_size
+    return total
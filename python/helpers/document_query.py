@@ -4,6 +4,9 @@ import asyncio
 import aiohttp
 import json
 
+import numpy as np
+
+from python.helpers.document_cache import DocumentCache
 from python.helpers.vector_db import VectorDB
 
 os.environ["USER_AGENT"] = "@mixedbread-ai/unstructured"  # noqa E402
@@ -13,7 +16,7 @@ from urllib.parse import urlparse
 from typing import Callable, Sequence, List, Optional, Tuple
 from datetime import datetime
 
-from langchain_community.document_loaders import AsyncHtmlLoader
+from langchain_community.document_loaders.async_html import default_header_template
 from langchain_community.document_loaders.text import TextLoader
 from langchain_community.document_loaders.pdf import PyMuPDFLoader
 from langchain_community.document_transformers import MarkdownifyTransformer
@@ -23,13 +26,16 @@ from langchain_core.documents import Document
 from langchain.schema import SystemMessage, HumanMessage
 
 from python.helpers.print_style import PrintStyle
-from python.helpers import files, errors
+from python.helpers import files, errors, http_session
 from agent import Agent
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
 
 DEFAULT_SEARCH_THRESHOLD = 0.5
+WEB_DOCUMENT_TIMEOUT = 60.0
+# browser-like headers AsyncHtmlLoader sent, some sites refuse requests without them
+WEB_DOCUMENT_HEADERS = dict(default_header_template)
 
 
 class DocumentQueryStore:
@@ -42,17 +48,26 @@ class DocumentQueryStore:
     DEFAULT_CHUNK_SIZE = 1000
     DEFAULT_CHUNK_OVERLAP = 100
 
-    # Cache for initialized stores
+    # Cache for initialized stores, per context and embedding model, least recently used first
     _stores: dict[str, "DocumentQueryStore"] = {}
+    MAX_STORES = 16
 
     @staticmethod
     def get(agent: Agent):
-        """Create a DocumentQueryStore instance for the specified agent."""
+        """Get the DocumentQueryStore instance for the specified agent's context."""
         if not agent or not agent.config:
             raise ValueError("Agent and agent config must be provided")
 
-        # Initialize store
-        store = DocumentQueryStore(agent)
+        model_config = agent.config.embeddings_model
+        key = f"{agent.context.id}:{model_config.provider}:{model_config.name}"
+        store = DocumentQueryStore._stores.pop(key, None)
+        if store is None:
+            store = DocumentQueryStore(agent)
+        else:
+            store.agent = agent
+        DocumentQueryStore._stores[key] = store
+        while len(DocumentQueryStore._stores) > DocumentQueryStore.MAX_STORES:
+            del DocumentQueryStore._stores[next(iter(DocumentQueryStore._stores))]
         return store
 
     def __init__(
@@ -62,6 +77,9 @@ class DocumentQueryStore:
         """Initialize a DocumentQueryStore instance."""
         self.agent = agent
         self.vector_db: VectorDB | None = None
+        self.cache = DocumentCache.get()
+        # document cache key of each indexed document, to detect changed content
+        self.document_keys: dict[str, str] = {}
 
     @staticmethod
     def normalize_uri(uri: str) -> str:
@@ -98,7 +116,11 @@ class DocumentQueryStore:
         return VectorDB(self.agent, cache=True)
 
     async def add_document(
-        self, text: str, document_uri: str, metadata: dict | None = None
+        self,
+        text: str,
+        document_uri: str,
+        metadata: dict | None = None,
+        cache_key: str | None = None,
     ) -> tuple[bool, list[str]]:
         """
         Add a document to the store with the given URI.
@@ -107,6 +129,7 @@ class DocumentQueryStore:
             text: The document text content
             document_uri: The URI that uniquely identifies this document
             metadata: Optional metadata for the document
+            cache_key: Document cache key, chunks and embeddings are reused from the cache
 
         Returns:
             True if successful, False otherwise
@@ -123,10 +146,26 @@ class DocumentQueryStore:
         doc_metadata["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         # Split text into chunks
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.DEFAULT_CHUNK_SIZE, chunk_overlap=self.DEFAULT_CHUNK_OVERLAP
+        chunks = (
+            self.cache.get_chunks(
+                cache_key, self.DEFAULT_CHUNK_SIZE, self.DEFAULT_CHUNK_OVERLAP
+            )
+            if cache_key
+            else None
         )
-        chunks = text_splitter.split_text(text)
+        if chunks is None:
+            text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=self.DEFAULT_CHUNK_SIZE,
+                chunk_overlap=self.DEFAULT_CHUNK_OVERLAP,
+            )
+            chunks = text_splitter.split_text(text)
+            if cache_key and chunks:
+                self.cache.put_chunks(
+                    cache_key,
+                    self.DEFAULT_CHUNK_SIZE,
+                    self.DEFAULT_CHUNK_OVERLAP,
+                    chunks,
+                )
 
         # Create documents
         docs = []
@@ -145,7 +184,14 @@ class DocumentQueryStore:
             if not self.vector_db:
                 self.vector_db = self.init_vector_db()
 
-            ids = await self.vector_db.insert_documents(docs)
+            embeddings = (
+                await self._get_chunk_embeddings(cache_key, document_uri, chunks)
+                if cache_key
+                else None
+            )
+            ids = await self.vector_db.insert_documents(docs, embeddings)
+            if cache_key:
+                self.document_keys[document_uri] = cache_key
             PrintStyle.standard(
                 f"Added document '{document_uri}' with {len(docs)} chunks"
             )
@@ -155,6 +201,46 @@ class DocumentQueryStore:
             PrintStyle.error(f"Error adding document '{document_uri}': {err_text}")
             return False, []
 
+    async def _get_chunk_embeddings(
+        self, cache_key: str, document_uri: str, chunks: list[str]
+    ) -> np.ndarray:
+        """
+        Get chunk embeddings from the document cache, embedding only chunks not cached
+        for this document or its previous version.
+        """
+        assert self.vector_db
+        namespace = self.vector_db.embeddings_namespace
+        size, overlap = self.DEFAULT_CHUNK_SIZE, self.DEFAULT_CHUNK_OVERLAP
+
+        vectors = self.cache.get_embeddings(cache_key, namespace, size, overlap)
+        if vectors is not None and len(vectors) == len(chunks):
+            return vectors
+
+        # reuse embeddings of unchanged chunks from the previous version of the document
+        known: dict[str, np.ndarray] = {}
+        previous = self.cache.find_previous_key(document_uri, exclude=cache_key)
+        if previous:
+            previous_chunks = self.cache.get_chunks(previous, size, overlap)
+            previous_vectors = self.cache.get_embeddings(previous, namespace, size, overlap)
+            if (
+                previous_chunks is not None
+                and previous_vectors is not None
+                and len(previous_chunks) == len(previous_vectors)
+            ):
+                known = dict(zip(previous_chunks, previous_vectors))
+
+        missing = [chunk for chunk in dict.fromkeys(chunks) if chunk not in known]
+        if missing:
+            embedded = await self.vector_db.embeddings.aembed_documents(missing)
+            known.update(zip(missing, np.asarray(embedded, dtype=np.float32)))
+        PrintStyle.standard(
+            f"Embedded {len(missing)} of {len(chunks)} chunks for document: {document_uri}"
+        )
+
+        vectors = np.stack([known[chunk] for chunk in chunks])
+        self.cache.put_embeddings(cache_key, namespace, size, overlap, vectors)
+        return vectors
+
     async def get_document(self, document_uri: str) -> Optional[Document]:
         """
         Retrieve a document by its URI.
@@ -217,12 +303,15 @@ class DocumentQueryStore:
         PrintStyle.standard(f"Found {len(chunks)} chunks for document: {document_uri}")
         return chunks
 
-    async def document_exists(self, document_uri: str) -> bool:
+    async def document_exists(
+        self, document_uri: str, cache_key: str | None = None
+    ) -> bool:
         """
         Check if a document exists in the store.
 
         Args:
             document_uri: The URI of the document to check
+            cache_key: When given, the stored document must have this content key
 
         Returns:
             True if the document exists, False otherwise
@@ -235,6 +324,10 @@ class DocumentQueryStore:
         # Normalize the URI
         document_uri = self.normalize_uri(document_uri)
 
+        # Stored document has different content
+        if cache_key and self.document_keys.get(document_uri) != cache_key:
+            return False
+
         chunks = await self._get_document_chunks(document_uri)
         return len(chunks) > 0
 
@@ -262,6 +355,8 @@ class DocumentQueryStore:
         if not chunks:
             return False
 
+        self.document_keys.pop(document_uri, None)
+
         # Collect IDs to delete
         ids_to_delete = [chunk.metadata["id"] for chunk in chunks]
 
@@ -458,12 +553,11 @@ class DocumentQueryHelper:
                 last_error = ""
                 while not response and retries < 3:
                     try:
-                        async with aiohttp.ClientSession() as session:
-                            response = await session.head(
-                                document_uri,
-                                timeout=aiohttp.ClientTimeout(total=2.0),
-                                allow_redirects=True,
-                            )
+                        async with http_session.get_session().head(
+                            document_uri,
+                            timeout=aiohttp.ClientTimeout(total=2.0),
+                            allow_redirects=True,
+                        ) as response:
                             if response.status > 399:
                                 raise Exception(response.status)
                             break
@@ -510,28 +604,41 @@ class DocumentQueryHelper:
         document_uri_norm = self.store.normalize_uri(document_uri)
 
         await self.agent.handle_intervention()
-        exists = await self.store.document_exists(document_uri_norm)
+        # remote documents are fetched on every query and keyed by their content,
+        # so a changed page is parsed and indexed again
+        web_document = await self.fetch_web_document(document_uri, scheme)
+        web_content = web_document[0] if web_document else None
+        cache_key = self.get_cache_key(document_uri, scheme, web_content)
+        exists = await self.store.document_exists(document_uri_norm, cache_key)
         document_content = ""
         if not exists:
             await self.agent.handle_intervention()
-            if mimetype.startswith("image/"):
-                document_content = self.handle_image_document(document_uri, scheme)
-            elif mimetype == "text/html":
-                document_content = self.handle_html_document(document_uri, scheme)
-            elif mimetype.startswith("text/") or mimetype == "application/json":
-                document_content = self.handle_text_document(document_uri, scheme)
-            elif mimetype == "application/pdf":
-                document_content = self.handle_pdf_document(document_uri, scheme)
+            cached_content = self.store.cache.get_text(cache_key) if cache_key else None
+            if cached_content is not None:
+                self.progress_callback(f"Using cached document content")
+                document_content = cached_content
             else:
-                document_content = self.handle_unstructured_document(
-                    document_uri, scheme
-                )
+                web_text = web_content.decode(web_document[1], errors="replace") if web_document else None
+                if mimetype.startswith("image/"):
+                    document_content = self.handle_image_document(document_uri, scheme, web_content)
+                elif mimetype == "text/html":
+                    document_content = self.handle_html_document(document_uri, scheme, web_text)
+                elif mimetype.startswith("text/") or mimetype == "application/json":
+                    document_content = self.handle_text_document(document_uri, scheme, web_text)
+                elif mimetype == "application/pdf":
+                    document_content = self.handle_pdf_document(document_uri, scheme, web_content)
+                else:
+                    document_content = self.handle_unstructured_document(
+                        document_uri, scheme, web_content
+                    )
+                if cache_key and document_content:
+                    self.store.cache.put_text(cache_key, document_uri_norm, document_content)
             if add_to_db:
                 self.progress_callback(f"Indexing document")
                 await self.agent.handle_intervention()
                 async with self.store_lock:
                     success, ids = await self.store.add_document(
-                        document_content, document_uri_norm
+                        document_content, document_uri_norm, cache_key=cache_key
                     )
                 if not success:
                     self.progress_callback(f"Failed to index document")
@@ -550,13 +657,41 @@ class DocumentQueryHelper:
                 )
         return document_content
 
-    def handle_image_document(self, document: str, scheme: str) -> str:
-        return self.handle_unstructured_document(document, scheme)
+    def get_cache_key(
+        self, document: str, scheme: str, content: bytes | None = None
+    ) -> str | None:
+        """Document cache key: hash of the local file or of the fetched remote content."""
+        try:
+            if scheme == "file":
+                content = files.read_file_bin(document)
+            if content is not None:
+                return DocumentCache.content_key(content)
+        except Exception as e:
+            PrintStyle.error(f"Document cache key error for '{document}': {e}")
+        return None
+
+    def handle_image_document(self, document: str, scheme: str, content: bytes | None = None) -> str:
+        return self.handle_unstructured_document(document, scheme, content)
+
+    async def fetch_web_document(self, document: str, scheme: str) -> tuple[bytes, str] | None:
+        """Download http(s) documents over the shared HTTP session as body and charset, None for other schemes."""
+        if scheme not in ["http", "https"]:
+            return None
+        async with http_session.get_session().get(
+            document,
+            headers=WEB_DOCUMENT_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=WEB_DOCUMENT_TIMEOUT),
+        ) as response:
+            if response.status != 200:
+                raise ValueError(
+                    f"DocumentQueryHelper::fetch_web_document: Failed to download {document}: {response.status}"
+                )
+            body = await response.read()
+            return body, response.get_encoding()
 
-    def handle_html_document(self, document: str, scheme: str) -> str:
+    def handle_html_document(self, document: str, scheme: str, content: str | None = None) -> str:
         if scheme in ["http", "https"]:
-            loader = AsyncHtmlLoader(web_path=document)
-            parts: list[Document] = loader.load()
+            parts = [Document(page_content=str(content or ""), metadata={"source": document})]
         elif scheme == "file":
             # Use RFC file operations instead of TextLoader
             file_content_bytes = files.read_file_bin(document)
@@ -573,10 +708,9 @@ class DocumentQueryHelper:
             ]
         )
 
-    def handle_text_document(self, document: str, scheme: str) -> str:
+    def handle_text_document(self, document: str, scheme: str, content: str | None = None) -> str:
         if scheme in ["http", "https"]:
-            loader = AsyncHtmlLoader(web_path=document)
-            elements: list[Document] = loader.load()
+            elements = [Document(page_content=str(content or ""), metadata={"source": document})]
         elif scheme == "file":
             # Use RFC file operations instead of TextLoader
             file_content_bytes = files.read_file_bin(document)
@@ -590,7 +724,7 @@ class DocumentQueryHelper:
 
         return "\n".join([element.page_content for element in elements])
 
-    def handle_pdf_document(self, document: str, scheme: str) -> str:
+    def handle_pdf_document(self, document: str, scheme: str, content: bytes | None = None) -> str:
         temp_file_path = ""
         if scheme == "file":
             # Use RFC file operations to read the PDF file as binary
@@ -602,17 +736,11 @@ class DocumentQueryHelper:
                 temp_file.write(file_content_bytes)
                 temp_file_path = temp_file.name
         elif scheme in ["http", "https"]:
-            # download the file from the web url to a temporary file using python libraries for downloading
-            import requests
+            # the file was downloaded by fetch_web_document, PyMuPDFLoader needs a file path
             import tempfile
 
             with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-                response = requests.get(document, timeout=10.0)
-                if response.status_code != 200:
-                    raise ValueError(
-                        f"DocumentQueryHelper::handle_pdf_document: Failed to download PDF from {document}: {response.status_code}"
-                    )
-                temp_file.write(response.content)
+                temp_file.write(content or b"")
                 temp_file_path = temp_file.name
         else:
             raise ValueError(f"Unsupported scheme: {scheme}")
@@ -658,44 +786,40 @@ class DocumentQueryHelper:
         finally:
             os.unlink(temp_file_path)
 
-    def handle_unstructured_document(self, document: str, scheme: str) -> str:
+    def handle_unstructured_document(self, document: str, scheme: str, content: bytes | None = None) -> str:
         elements: list[Document] = []
         if scheme in ["http", "https"]:
-            # loader = UnstructuredURLLoader(urls=[document], mode="single")
+            # the file was downloaded by fetch_web_document
+            file_content_bytes = content or b""
+            path = urlparse(document).path
+        elif scheme == "file":
+            # Use RFC file operations to read the file as binary
+            file_content_bytes = files.read_file_bin(document)
+            path = document
+        else:
+            raise ValueError(f"Unsupported scheme: {scheme}")
+
+        # Create a temporary file for UnstructuredLoader since it needs a file path
+        import tempfile
+        import os
+
+        # Get file extension to preserve it for proper processing
+        _, ext = os.path.splitext(path)
+        with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as temp_file:
+            temp_file.write(file_content_bytes)
+            temp_file_path = temp_file.name
+
+        try:
             loader = UnstructuredLoader(
-                web_url=document,
+                file_path=temp_file_path,
                 mode="single",
                 partition_via_api=False,
                 # chunking_strategy="by_page",
                 strategy="hi_res",
             )
             elements = loader.load()
-        elif scheme == "file":
-            # Use RFC file operations to read the file as binary
-            file_content_bytes = files.read_file_bin(document)
-            # Create a temporary file for UnstructuredLoader since it needs a file path
-            import tempfile
-            import os
-
-            # Get file extension to preserve it for proper processing
-            _, ext = os.path.splitext(document)
-            with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as temp_file:
-                temp_file.write(file_content_bytes)
-                temp_file_path = temp_file.name
-
-            try:
-                loader = UnstructuredLoader(
-                    file_path=temp_file_path,
-                    mode="single",
-                    partition_via_api=False,
-                    # chunking_strategy="by_page",
-                    strategy="hi_res",
-                )
-                elements = loader.load()
-            finally:
-                # Clean up temporary file
-                os.unlink(temp_file_path)
-        else:
-            raise ValueError(f"Unsupported scheme: {scheme}")
+        finally:
+            # Clean up temporary file
+            os.unlink(temp_file_path)
 
         return "\n".join([element.page_content for element in elements])
@@ -0,0 +1,117 @@
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+from python.helpers.print_style import PrintStyle
+
+MAX_BATCH_SIZE = 64  # texts encoded in one model call
+MAX_BATCH_LATENCY = 0.005  # seconds the first request waits for others to join its batch
+
+Encoder = Callable[[list[str]], list[list[float]]]
+
+
+class EmbeddingService:
+    """
+    Process-wide embedding model shared by all callers with the same configuration.
+    The model is loaded once, concurrent requests (from threads or event loops) are
+    coalesced into micro-batches and encoded on one worker thread.
+    """
+
+    _services: dict[Hashable, "EmbeddingService"] = {}
+    _services_lock = threading.Lock()
+
+    @staticmethod
+    def get(
+        key: Hashable,
+        load: Callable[[], Any],
+        encode: Callable[[Any, list[str]], list[list[float]]],
+    ) -> "EmbeddingService":
+        """Get the service for the given configuration key, loading the model on first use."""
+        with EmbeddingService._services_lock:
+            service = EmbeddingService._services.get(key)
+            if service is None:
+                model = load()
+                service = EmbeddingService(
+                    lambda texts: encode(model, texts), name=str(key), model=model
+                )
+                EmbeddingService._services[key] = service
+            return service
+
+    def __init__(
+        self,
+        encode: Encoder,
+        name: str = "",
+        model: Any = None,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_latency: float = MAX_BATCH_LATENCY,
+    ):
+        self.model = model
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self._encode = encode
+        self._queue: queue.SimpleQueue[tuple[list[str], Future]] = queue.SimpleQueue()
+        self._worker: threading.Thread | None = None
+        self._worker_lock = threading.Lock()
+
+    def submit(self, texts: list[str]) -> Future:
+        future: Future = Future()
+        if not texts:
+            future.set_result([])
+            return future
+        self._ensure_worker()
+        self._queue.put((list(texts), future))
+        return future
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        return self.submit(texts).result()
+
+    async def aembed(self, texts: list[str]) -> list[list[float]]:
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def _ensure_worker(self):
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name=f"EmbeddingService-{self.name}", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0][0])
+            deadline = time.monotonic() + self.max_latency
+            while size < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    request = (
+                        self._queue.get(timeout=timeout)
+                        if timeout > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request[0])
+            self._process(batch)
+
+    def _process(self, batch: list[tuple[list[str], Future]]):
+        # requests cancelled while waiting are dropped
+        batch = [(texts, future) for texts, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            vectors = self._encode([text for texts, _ in batch for text in texts])
+        except Exception as e:
+            PrintStyle.error(f"Embedding batch failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        offset = 0
+        for texts, future in batch:
+            future.set_result(vectors[offset : offset + len(texts)])
+            offset += len(texts)
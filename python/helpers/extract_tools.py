@@ -118,3 +118,20 @@ def load_classes_from_file(file: str, base_class: type[T], one_per_file: bool =
                 break
                 
     return classes
+
+
+# classes loaded by load_classes_from_file_cached, keyed by path and filter, validated by mtime and size
+_classes_cache: dict[tuple[str, type, bool], tuple[tuple[int, int], list[type]]] = {}
+
+def load_classes_from_file_cached(file: str, base_class: type[T], one_per_file: bool = True) -> list[type[T]]:
+    """Same as load_classes_from_file, but the module is only executed again when the file changes."""
+    abs_path = get_abs_path(file)
+    stat = os.stat(abs_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    key = (abs_path, base_class, one_per_file)
+    cached = _classes_cache.get(key)
+    if cached and cached[0] == signature:
+        return list(cached[1])  # type: ignore
+    classes = load_classes_from_file(abs_path, base_class, one_per_file)
+    _classes_cache[key] = (signature, classes)
+    return list(classes)
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
-from collections import deque
+from collections import OrderedDict, deque
 from dataclasses import dataclass
 from datetime import datetime, timezone
 import os
+import threading
+import time
 from typing import Any, Callable, Iterable, Literal, Optional, Sequence
 
 from pathspec import PathSpec
 
 from python.helpers import files as files_helper
+from python.helpers.dir_watcher import DirWatcher
 
 SORT_BY_NAME = "name"
 SORT_BY_CREATED = "created"
@@ -21,6 +24,11 @@ OUTPUT_MODE_STRING = "string"
 OUTPUT_MODE_FLAT = "flat"
 OUTPUT_MODE_NESTED = "nested"
 
+# cached trees kept for this many root and ignore spec combinations
+TREE_CACHE_SIZE = 16
+# without inotify, cached listings of unchanged directories are still re-read after this many seconds
+POLL_REFRESH_INTERVAL = 10.0
+
 
 def file_tree(
     relative_path: str,
@@ -83,6 +91,80 @@ def file_tree(
                 epoch = item[\"created\"].timestamp()
 
     """
+    abs_root, output_root = _validate_arguments(
+        relative_path, max_depth=max_depth, max_lines=max_lines, sort=sort, output_mode=output_mode
+    )
+    scanner = _DirectoryScanner(abs_root, _resolve_ignore_patterns(ignore, abs_root))
+    return _build_tree(
+        abs_root,
+        output_root,
+        scanner,
+        max_depth=max_depth,
+        max_lines=max_lines,
+        folders_first=folders_first,
+        max_folders=max_folders,
+        max_files=max_files,
+        sort=sort,
+        output_mode=output_mode,
+    )
+
+
+def cached_file_tree(
+    relative_path: str,
+    *,
+    max_depth: int = 0,
+    max_lines: int = 0,
+    folders_first: bool = True,
+    max_folders: int = 0,
+    max_files: int = 0,
+    sort: tuple[Literal["name", "created", "modified"], Literal["asc", "desc"]] = ("modified", "desc"),
+    ignore: str | None = None,
+    output_mode: Literal["string", "flat", "nested"] = OUTPUT_MODE_STRING,
+) -> str | list[dict]:
+    """Same as :func:`file_tree`, for trees rendered repeatedly (prompts on every loop turn).
+
+    Directory listings and ignore matches are kept per root and ignore spec and only re-read for
+    directories that changed, as reported by inotify or, where it is not available, by polling
+    directory modification times. String output is memoized per rendering options until
+    something in the tree changes.
+    """
+    abs_root, output_root = _validate_arguments(
+        relative_path, max_depth=max_depth, max_lines=max_lines, sort=sort, output_mode=output_mode
+    )
+    cache = _get_tree_cache(abs_root, _read_ignore_content(ignore, abs_root))
+    key = (output_root, max_depth, max_lines, folders_first, max_folders, max_files, tuple(sort))
+
+    with cache.lock:
+        cache.refresh()
+        if output_mode == OUTPUT_MODE_STRING:
+            rendered = cache.rendered.get(key)
+            if rendered is not None:
+                return rendered
+        result = _build_tree(
+            abs_root,
+            output_root,
+            cache,
+            max_depth=max_depth,
+            max_lines=max_lines,
+            folders_first=folders_first,
+            max_folders=max_folders,
+            max_files=max_files,
+            sort=sort,
+            output_mode=output_mode,
+        )
+        if output_mode == OUTPUT_MODE_STRING:
+            cache.rendered[key] = result  # type: ignore[assignment]
+        return result
+
+
+def _validate_arguments(
+    relative_path: str,
+    *,
+    max_depth: int,
+    max_lines: int,
+    sort: tuple[str, str],
+    output_mode: str,
+) -> tuple[str, str]:
     abs_root = files_helper.get_abs_path(relative_path)
     output_root = files_helper.get_abs_path_dockerized(relative_path)
 
@@ -102,9 +184,22 @@ def file_tree(
         raise ValueError("max_depth must be >= 0")
     if max_lines < 0:
         raise ValueError("max_lines must be >= 0")
+    return abs_root, output_root
 
-    ignore_spec = _resolve_ignore_patterns(ignore, abs_root)
 
+def _build_tree(
+    abs_root: str,
+    output_root: str,
+    scanner: "_DirectoryScanner",
+    *,
+    max_depth: int,
+    max_lines: int,
+    folders_first: bool,
+    max_folders: int,
+    max_files: int,
+    sort: tuple[str, str],
+    output_mode: str,
+) -> str | list[dict]:
     root_stat = os.stat(abs_root, follow_symlinks=False)
     root_name = os.path.basename(os.path.normpath(abs_root)) or os.path.basename(abs_root)
     root_node = _TreeEntry(
@@ -122,12 +217,10 @@ def file_tree(
     nodes_in_order: list[_TreeEntry] = []
     rendered_count = 0
     limit_reached = False
-    visibility_cache: dict[str, bool] = {}
 
     def make_entry(entry: os.DirEntry, parent: _TreeEntry, level: int, item_type: Literal["file", "folder"]) -> _TreeEntry:
         stat = entry.stat(follow_symlinks=False)
-        rel_path = os.path.relpath(entry.path, abs_root)
-        rel_posix = _normalize_relative_path(rel_path)
+        rel_posix = scanner.relative_path(entry.path)
         return _TreeEntry(
             name=entry.name,
             level=level,
@@ -148,10 +241,8 @@ def file_tree(
         remaining_depth = max_depth - level if max_depth else -1
         folders, files = _list_directory_children(
             current_dir,
-            abs_root,
-            ignore_spec,
+            scanner,
             max_depth_remaining=remaining_depth,
-            cache=visibility_cache,
         )
 
         folder_entries = [make_entry(folder, parent_node, level, "folder") for folder in folders]
@@ -215,8 +306,7 @@ def file_tree(
             summary = _create_folder_unprocessed_comment(
                 folder_node,
                 folder_path,
-                abs_root,
-                ignore_spec,
+                scanner,
             )
             if summary is None:
                 continue
@@ -292,54 +382,172 @@ def _normalize_relative_path(path: str) -> str:
     return normalized
 
 
+class _DirectoryScanner:
+    """Directory listings and ignore matches of a single tree walk."""
+
+    def __init__(self, root_abs_path: str, ignore_spec: Optional[PathSpec]):
+        self.root_abs_path = root_abs_path
+        self.ignore_spec = ignore_spec
+        # (directory, remaining depth) -> whether it has entries that are not ignored
+        self.visibility: dict[tuple[str, int], bool] = {}
+
+    def scan(self, directory: str) -> list[os.DirEntry]:
+        with os.scandir(directory) as iterator:
+            return list(iterator)
+
+    def relative_path(self, path: str) -> str:
+        return _normalize_relative_path(os.path.relpath(path, self.root_abs_path))
+
+    def is_ignored(self, rel_posix: str, is_directory: bool) -> bool:
+        ignore_spec = self.ignore_spec
+        if ignore_spec is None:
+            return False
+        if is_directory:
+            return bool(ignore_spec.match_file(rel_posix) or ignore_spec.match_file(f"{rel_posix}/"))
+        return bool(ignore_spec.match_file(rel_posix))
+
+
+class _TreeCache(_DirectoryScanner):
+    """Directory listings and ignore matches of one root and ignore spec, kept between walks."""
+
+    def __init__(self, root_abs_path: str, ignore_spec: Optional[PathSpec]):
+        super().__init__(root_abs_path, ignore_spec)
+        self.lock = threading.RLock()
+        # directory -> (entries, directory mtime, monotonic time of the scan)
+        self.listings: dict[str, tuple[list[os.DirEntry], int, float]] = {}
+        self.ignored: dict[tuple[str, bool], bool] = {}
+        self.rendered: dict[tuple, str] = {}
+        self.watcher = DirWatcher.create()
+
+    def scan(self, directory: str) -> list[os.DirEntry]:
+        listing = self.listings.get(directory)
+        if listing is not None:
+            return listing[0]
+        if self.watcher is not None and not self.watcher.watch(directory) and os.path.isdir(directory):
+            self._stop_watching()  # out of inotify watches
+        mtime = os.stat(directory).st_mtime_ns
+        entries = super().scan(directory)
+        for entry in entries:
+            # subfolder mtimes are part of this listing, changes inside them invalidate it
+            if self.watcher is not None and entry.is_dir(follow_symlinks=False):
+                if not self.watcher.watch(entry.path):
+                    self._stop_watching()
+        self.listings[directory] = (entries, mtime, time.monotonic())
+        return entries
+
+    def is_ignored(self, rel_posix: str, is_directory: bool) -> bool:
+        key = (rel_posix, is_directory)
+        ignored = self.ignored.get(key)
+        if ignored is None:
+            ignored = self.ignored[key] = super().is_ignored(rel_posix, is_directory)
+        return ignored
+
+    def refresh(self):
+        """Drop listings of directories changed since they were read."""
+        stale: set[str] = set()
+        if self.watcher is not None:
+            changed, removed, overflow = self.watcher.read_changes()
+            if overflow:
+                stale.update(self.listings)
+            for path in removed:
+                self.watcher.unwatch_tree(path)
+                prefix = path + os.sep
+                stale.update(d for d in self.listings if d == path or d.startswith(prefix))
+            for path in changed:
+                stale.add(path)
+                stale.add(os.path.dirname(path))
+        else:
+            now = time.monotonic()
+            for directory, (_, mtime, scanned_at) in self.listings.items():
+                try:
+                    current = os.stat(directory).st_mtime_ns
+                except OSError:
+                    current = None
+                if current != mtime or now - scanned_at >= POLL_REFRESH_INTERVAL:
+                    stale.add(directory)
+                    stale.add(os.path.dirname(directory))
+
+        stale &= self.listings.keys()
+        if not stale:
+            return
+        for directory in stale:
+            del self.listings[directory]
+        self.visibility.clear()
+        self.rendered.clear()
+
+    def close(self):
+        if self.watcher is not None:
+            self.watcher.close()
+
+    def _stop_watching(self):
+        # fall back to polling, listings read so far are checked by mtime from now on
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher = None
+
+
+_tree_caches: OrderedDict[tuple[str, str | None], _TreeCache] = OrderedDict()
+_tree_caches_lock = threading.Lock()
+
+
+def _get_tree_cache(abs_root: str, ignore_content: str | None) -> _TreeCache:
+    key = (abs_root, ignore_content)
+    with _tree_caches_lock:
+        cache = _tree_caches.get(key)
+        if cache is not None:
+            _tree_caches.move_to_end(key)
+            return cache
+        cache = _tree_caches[key] = _TreeCache(abs_root, _parse_ignore_patterns(ignore_content))
+        while len(_tree_caches) > TREE_CACHE_SIZE:
+            _, evicted = _tree_caches.popitem(last=False)
+            evicted.close()
+        return cache
+
+
 def _directory_has_visible_entries(
     directory: str,
-    root_abs_path: str,
-    ignore_spec: PathSpec,
-    cache: dict[str, bool],
+    scanner: _DirectoryScanner,
     max_depth_remaining: int,
 ) -> bool:
     if max_depth_remaining == 0:
         return False
 
-    cached = cache.get(directory)
+    key = (directory, max(max_depth_remaining, -1))
+    cached = scanner.visibility.get(key)
     if cached is not None:
         return cached
 
     try:
-        with os.scandir(directory) as iterator:
-            for entry in iterator:
-                rel_path = os.path.relpath(entry.path, root_abs_path)
-                rel_posix = _normalize_relative_path(rel_path)
-                is_dir = entry.is_dir(follow_symlinks=False)
-
-                if is_dir:
-                    ignored = ignore_spec.match_file(rel_posix) or ignore_spec.match_file(f"{rel_posix}/")
-                    if ignored:
-                        next_depth = max_depth_remaining - 1 if max_depth_remaining > 0 else -1
-                        if next_depth == 0:
-                            continue
-                        if _directory_has_visible_entries(
-                            entry.path,
-                            root_abs_path,
-                            ignore_spec,
-                            cache,
-                            next_depth,
-                        ):
-                            cache[directory] = True
-                            return True
-                        continue
-                else:
-                    if ignore_spec.match_file(rel_posix):
-                        continue
-
-                cache[directory] = True
-                return True
+        entries = scanner.scan(directory)
     except FileNotFoundError:
-        cache[directory] = False
+        scanner.visibility[key] = False
         return False
 
-    cache[directory] = False
+    for entry in entries:
+        rel_posix = scanner.relative_path(entry.path)
+        is_dir = entry.is_dir(follow_symlinks=False)
+
+        if is_dir:
+            if scanner.is_ignored(rel_posix, True):
+                next_depth = max_depth_remaining - 1 if max_depth_remaining > 0 else -1
+                if next_depth == 0:
+                    continue
+                if _directory_has_visible_entries(
+                    entry.path,
+                    scanner,
+                    next_depth,
+                ):
+                    scanner.visibility[key] = True
+                    return True
+                continue
+        else:
+            if scanner.is_ignored(rel_posix, False):
+                continue
+
+        scanner.visibility[key] = True
+        return True
+
+    scanner.visibility[key] = False
     return False
 
 
@@ -391,16 +599,13 @@ def _create_global_limit_comment(parent: _TreeEntry, hidden_children: Sequence[_
 def _create_folder_unprocessed_comment(
     folder_node: _TreeEntry,
     folder_path: str,
-    abs_root: str,
-    ignore_spec: Optional[PathSpec],
+    scanner: _DirectoryScanner,
 ) -> Optional[_TreeEntry]:
     try:
         folders, files = _list_directory_children(
             folder_path,
-            abs_root,
-            ignore_spec,
+            scanner,
             max_depth_remaining=-1,
-            cache={},
         )
     except FileNotFoundError:
         return None
@@ -470,6 +675,10 @@ def _refresh_render_metadata(node: _TreeEntry) -> None:
 
 
 def _resolve_ignore_patterns(ignore: str | None, root_abs_path: str) -> Optional[PathSpec]:
+    return _parse_ignore_patterns(_read_ignore_content(ignore, root_abs_path))
+
+
+def _read_ignore_content(ignore: str | None, root_abs_path: str) -> str | None:
     if ignore is None:
         return None
 
@@ -492,6 +701,12 @@ def _resolve_ignore_patterns(ignore: str | None, root_abs_path: str) -> Optional
             raise FileNotFoundError(f"Ignore file not found: {reference_path}") from exc
     else:
         content = ignore
+    return content
+
+
+def _parse_ignore_patterns(content: str | None) -> Optional[PathSpec]:
+    if content is None:
+        return None
 
     lines = [
         line.strip()
@@ -507,48 +722,43 @@ def _resolve_ignore_patterns(ignore: str | None, root_abs_path: str) -> Optional
 
 def _list_directory_children(
     directory: str,
-    root_abs_path: str,
-    ignore_spec: Optional[PathSpec],
+    scanner: _DirectoryScanner,
     *,
     max_depth_remaining: int,
-    cache: dict[str, bool],
 ) -> tuple[list[os.DirEntry], list[os.DirEntry]]:
     folders: list[os.DirEntry] = []
     files: list[os.DirEntry] = []
 
     try:
-        with os.scandir(directory) as iterator:
-            for entry in iterator:
-                if entry.name in (".", ".."):
-                    continue
-                rel_path = os.path.relpath(entry.path, root_abs_path)
-                rel_posix = _normalize_relative_path(rel_path)
-                is_directory = entry.is_dir(follow_symlinks=False)
-
-                if ignore_spec:
-                    if is_directory:
-                        ignored = ignore_spec.match_file(rel_posix) or ignore_spec.match_file(f"{rel_posix}/")
-                        if ignored:
-                            if _directory_has_visible_entries(
-                                entry.path,
-                                root_abs_path,
-                                ignore_spec,
-                                cache,
-                                max_depth_remaining - 1,
-                            ):
-                                folders.append(entry)
-                            continue
-                    else:
-                        if ignore_spec.match_file(rel_posix):
-                            continue
-
-                if is_directory:
-                    folders.append(entry)
-                else:
-                    files.append(entry)
+        entries = scanner.scan(directory)
     except FileNotFoundError:
         return ([], [])
 
+    for entry in entries:
+        if entry.name in (".", ".."):
+            continue
+        is_directory = entry.is_dir(follow_symlinks=False)
+
+        if scanner.ignore_spec:
+            rel_posix = scanner.relative_path(entry.path)
+            if is_directory:
+                if scanner.is_ignored(rel_posix, True):
+                    if _directory_has_visible_entries(
+                        entry.path,
+                        scanner,
+                        max_depth_remaining - 1,
+                    ):
+                        folders.append(entry)
+                    continue
+            else:
+                if scanner.is_ignored(rel_posix, False):
+                    continue
+
+        if is_directory:
+            folders.append(entry)
+        else:
+            files.append(entry)
+
     return (folders, files)
 
 
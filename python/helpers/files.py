@@ -45,7 +45,8 @@ def load_plugin_variables(
 
         from python.helpers import extract_tools
 
-        classes = extract_tools.load_classes_from_file(
+        # plugin module is executed once and again only after it changes
+        classes = extract_tools.load_classes_from_file_cached(
             plugin_file, VariablesPlugin, one_per_file=False
         )
         for cls in classes:
@@ -90,30 +91,19 @@ def parse_file(
     # Find the file in the directories
     absolute_path = find_file_in_dirs(_filename, _directories)
 
-    # Read the file content
-    with open(absolute_path, "r", encoding=_encoding) as f:
-        # content = remove_code_fences(f.read())
-        content = f.read()
+    # Read and compile the file content (cached until the file changes)
+    template = get_prompt_template(absolute_path, _encoding, conditions=False)
 
-    is_json = is_full_json_template(content)
-    content = remove_code_fences(content)
     variables = load_plugin_variables(absolute_path, _directories, **kwargs) or {}  # type: ignore
     variables.update(kwargs)
-    if is_json:
-        content = replace_placeholders_json(content, **variables)
+    if template.is_json:
+        content = replace_placeholders_json(template.content, **variables)
         obj = json.loads(content)
         # obj = replace_placeholders_dict(obj, **variables)
         return obj
     else:
-        content = replace_placeholders_text(content, **variables)
-        # Process include statements
-        content = process_includes(
-            # here we use kwargs, the plugin variables are not inherited
-            content,
-            _directories,
-            **kwargs,
-        )
-        return content
+        # here we use kwargs for includes, the plugin variables are not inherited
+        return template.render(variables, _directories, kwargs)
 
 
 def read_prompt_file(
@@ -131,35 +121,187 @@ def read_prompt_file(
     # Find the file in the directories
     absolute_path = find_file_in_dirs(_file, _directories)
 
-    # Read the file content
-    with open(absolute_path, "r", encoding=_encoding) as f:
-        # content = remove_code_fences(f.read())
-        content = f.read()
+    # Read and compile the file content (cached until the file changes)
+    template = get_prompt_template(absolute_path, _encoding)
 
     variables = load_plugin_variables(_file, _directories, **kwargs) or {}  # type: ignore
     variables.update(kwargs)
 
-    # evaluate conditions
-    content = evaluate_text_conditions(content, **variables)
+    # evaluate conditions, replace placeholders and process includes,
+    # here we use kwargs for includes, the plugin variables are not inherited
+    return template.render(variables, _directories, kwargs)
 
-    # Replace placeholders with values from kwargs
-    content = replace_placeholders_text(content, **variables)
-
-    # Process include statements
-    content = process_includes(
-        # here we use kwargs, the plugin variables are not inherited
-        content,
-        _directories,
-        **kwargs,
-    )
 
-    return content
+_IF_PATTERN = re.compile(r"{{\s*if\s+(.*?)}}", flags=re.DOTALL)
+_CONDITION_TOKEN_PATTERN = re.compile(r"{{\s*(if\b.*?|endif)\s*}}", flags=re.DOTALL)
+_PLACEHOLDER_PATTERN = re.compile(r"{{(\w+)}}")
+# Regex to find {{ include 'path' }} or {{include'path'}}
+_INCLUDE_PATTERN = re.compile(r"{{\s*include\s*['\"](.*?)['\"]\s*}}")
+
+
+class _Placeholder(str):
+    """Placeholder name in compiled template segments"""
+
+
+class _Include(tuple):
+    """Include statement in compiled template segments, its path may contain placeholders"""
+
+
+class _ConditionBlock:
+    # Mirrors the recursion of evaluate_text_conditions: text is split at its first
+    # complete {{if}} block into before, inner and after. A block without condition
+    # (or one whose condition fails to evaluate) renders its whole text unchanged.
+    def __init__(self, text: str, conditions: bool):
+        self.segments = _compile_segments(text)
+        self.condition: str | None = None
+        if not conditions:
+            return
+        m_if = _IF_PATTERN.search(text)
+        if not m_if:
+            return
+
+        depth = 1
+        pos = m_if.end()
+        while True:
+            m = _CONDITION_TOKEN_PATTERN.search(text, pos)
+            if not m:
+                return  # Unterminated if-block, do not modify text
+            token = m.group(1)
+            depth += 1 if token.startswith("if ") else -1
+            if depth == 0:
+                break
+            pos = m.end()
+
+        self.condition = m_if.group(1).strip()
+        self.before = _compile_segments(text[: m_if.start()])
+        self.inner = _ConditionBlock(text[m_if.end() : m.start()], conditions)
+        self.after = _ConditionBlock(text[m.end() :], conditions)
+
+    def collect(self, variables: dict[str, Any], out: list):
+        if self.condition is None:
+            out.extend(self.segments)
+            return
+        try:
+            result = simple_eval(self.condition, names=variables)
+        except Exception:
+            # On evaluation error, do not modify this block
+            out.extend(self.segments)
+            return
+        out.extend(self.before)
+        if result:
+            self.inner.collect(variables, out)
+        self.after.collect(variables, out)
+
+
+def _compile_segments(text: str) -> list:
+    segments: list = []
+
+    def add_placeholders(part: str, target: list):
+        pos = 0
+        for m in _PLACEHOLDER_PATTERN.finditer(part):
+            if m.start() > pos:
+                target.append(part[pos : m.start()])
+            target.append(_Placeholder(m.group(1)))
+            pos = m.end()
+        if pos < len(part):
+            target.append(part[pos:])
+
+    pos = 0
+    for m in _INCLUDE_PATTERN.finditer(text):
+        add_placeholders(text[pos : m.start()], segments)
+        statement: list = []
+        add_placeholders(m.group(0), statement)
+        segments.append(_Include(statement))
+        pos = m.end()
+    add_placeholders(text[pos:], segments)
+    return segments
+
+
+class PromptTemplate:
+    """Prompt file compiled once into conditions, placeholders and includes,
+    rendering only evaluates conditions and substitutes variables."""
+
+    def __init__(self, content: str, conditions: bool = True):
+        self.content = content
+        self.conditions = conditions
+        self.is_json = False
+        if not conditions:
+            # parse_file mode, json templates are substituted as json
+            self.is_json = is_full_json_template(content)
+            self.content = content = remove_code_fences(content)
+        self.root = _ConditionBlock(content, conditions)
+        self.placeholders = set(_PLACEHOLDER_PATTERN.findall(content))
+
+    def render(
+        self,
+        variables: dict[str, Any],
+        directories: list[str],
+        include_kwargs: dict[str, Any],
+    ) -> str:
+        values = {
+            key: str(variables[key]) for key in self.placeholders if key in variables
+        }
+        if any("{{" in value for value in values.values()):
+            # values containing placeholders or includes need the sequential text pipeline
+            return self._render_text(variables, directories, include_kwargs)
+
+        segments: list = []
+        if self.conditions:
+            self.root.collect(variables, segments)
+        else:
+            segments = self.root.segments
+
+        def substitute(segment):
+            if type(segment) is _Placeholder:
+                return values.get(segment, "{{" + segment + "}}")
+            return segment
+
+        parts = []
+        for segment in segments:
+            if type(segment) is _Include:
+                statement = "".join(substitute(s) for s in segment)
+                parts.append(process_includes(statement, directories, **include_kwargs))
+            else:
+                parts.append(substitute(segment))
+        return "".join(parts)
+
+    def _render_text(
+        self,
+        variables: dict[str, Any],
+        directories: list[str],
+        include_kwargs: dict[str, Any],
+    ) -> str:
+        content = self.content
+        if self.conditions:
+            content = evaluate_text_conditions(content, **variables)
+        content = replace_placeholders_text(content, **variables)
+        return process_includes(content, directories, **include_kwargs)
+
+
+# compiled templates by absolute path and encoding, validated by mtime and size
+_prompt_templates: dict[tuple[str, str, bool], tuple[tuple[int, int], PromptTemplate]] = {}
+
+
+def get_prompt_template(
+    absolute_path: str, encoding: str = "utf-8", conditions: bool = True
+) -> PromptTemplate:
+    stat = os.stat(absolute_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    key = (absolute_path, encoding, conditions)
+    cached = _prompt_templates.get(key)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    with open(absolute_path, "r", encoding=encoding) as f:
+        template = PromptTemplate(f.read(), conditions)
+    _prompt_templates[key] = (signature, template)
+    return template
 
 
 def evaluate_text_conditions(_content: str, **kwargs):
     # search for {{if ...}} ... {{endif}} blocks and evaluate conditions with nesting support
-    if_pattern = re.compile(r"{{\s*if\s+(.*?)}}", flags=re.DOTALL)
-    token_pattern = re.compile(r"{{\s*(if\b.*?|endif)\s*}}", flags=re.DOTALL)
+    if_pattern = _IF_PATTERN
+    token_pattern = _CONDITION_TOKEN_PATTERN
 
     def _process(text: str) -> str:
         m_if = if_pattern.search(text)
@@ -315,8 +457,7 @@ def replace_placeholders_dict(_content: dict, **kwargs):
 
 
 def process_includes(_content: str, _directories: list[str], **kwargs):
-    # Regex to find {{ include 'path' }} or {{include'path'}}
-    include_pattern = re.compile(r"{{\s*include\s*['\"](.*?)['\"]\s*}}")
+    include_pattern = _INCLUDE_PATTERN
 
     def replace_include(match):
         include_path = match.group(1)
@@ -43,6 +43,9 @@ class OutputMessage(TypedDict):
 
 
 class Record:
+    # container notified when the token count of this record changes
+    parent: "Record | RecordList | None" = None
+
     def __init__(self):
         pass
 
@@ -50,6 +53,10 @@ class Record:
     def get_tokens(self) -> int:
         pass
 
+    def invalidate_tokens(self):
+        if self.parent is not None:
+            self.parent.invalidate_tokens()
+
     @abstractmethod
     async def compress(self) -> bool:
         pass
@@ -78,13 +85,115 @@ class Record:
         return output_text(self.output(), ai_label, human_label)
 
 
+class RecordList(list):
+    """
+    Records of a topic, bulk or history with their total token count cached.
+    The total is updated on append and recalculated from the cached counts of
+    the records when the list is modified otherwise or a record changes.
+    `version` counts those other changes, so appends can be told apart from edits.
+    """
+
+    def __init__(self, owner: Record | None, records=()):
+        super().__init__(records)
+        self.owner = owner
+        self.version = 0
+        self._tokens: int | None = None
+        for record in self:
+            record.parent = self
+
+    def get_tokens(self) -> int:
+        if self._tokens is None:
+            self._tokens = sum(record.get_tokens() for record in self)
+        return self._tokens
+
+    def invalidate_tokens(self):
+        self._tokens = None
+        self.version += 1
+        if self.owner is not None:
+            self.owner.invalidate_tokens()
+
+    def _adopt(self, records):
+        records = list(records)
+        for record in records:
+            record.parent = self
+        return records
+
+    def append(self, record):
+        record.parent = self
+        super().append(record)
+        if self._tokens is not None:
+            self._tokens += record.get_tokens()
+        if self.owner is not None:
+            self.owner.invalidate_tokens()
+
+    def extend(self, records):
+        super().extend(self._adopt(records))
+        self.invalidate_tokens()
+
+    def __iadd__(self, records):
+        self.extend(records)
+        return self
+
+    def insert(self, index, record):
+        record.parent = self
+        super().insert(index, record)
+        self.invalidate_tokens()
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = self._adopt(value)
+        else:
+            value.parent = self
+        super().__setitem__(index, value)
+        self.invalidate_tokens()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self.invalidate_tokens()
+
+    def pop(self, index=-1):
+        record = super().pop(index)
+        self.invalidate_tokens()
+        return record
+
+    def remove(self, record):
+        super().remove(record)
+        self.invalidate_tokens()
+
+    def clear(self):
+        super().clear()
+        self.invalidate_tokens()
+
+
 class Message(Record):
     def __init__(self, ai: bool, content: MessageContent, tokens: int = 0):
         self.ai = ai
-        self.content = content
-        self.summary: str = ""
+        self._content = content
+        self._summary: str = ""
         self.tokens: int = tokens or self.calculate_tokens()
 
+    @property
+    def content(self) -> MessageContent:
+        return self._content
+
+    @content.setter
+    def content(self, content: MessageContent):
+        self._content = content
+        self._changed()
+
+    @property
+    def summary(self) -> str:
+        return self._summary
+
+    @summary.setter
+    def summary(self, summary: str):
+        self._summary = summary
+        self._changed()
+
+    def _changed(self):
+        self.tokens = 0  # recalculated on next get_tokens
+        self.invalidate_tokens()
+
     def get_tokens(self) -> int:
         if not self.tokens:
             self.tokens = self.calculate_tokens()
@@ -131,14 +240,36 @@ class Message(Record):
 class Topic(Record):
     def __init__(self, history: "History"):
         self.history = history
-        self.summary: str = ""
-        self.messages: list[Message] = []
+        self._summary: str = ""
+        self._summary_tokens: int | None = None
+        self._messages: RecordList = RecordList(self)
+
+    @property
+    def summary(self) -> str:
+        return self._summary
+
+    @summary.setter
+    def summary(self, summary: str):
+        self._summary = summary
+        self._summary_tokens = None
+        self.invalidate_tokens()
+
+    @property
+    def messages(self) -> list[Message]:
+        return self._messages
+
+    @messages.setter
+    def messages(self, messages: list[Message]):
+        self._messages = RecordList(self, messages)
+        self.invalidate_tokens()
 
     def get_tokens(self):
         if self.summary:
-            return tokens.approximate_tokens(self.summary)
+            if self._summary_tokens is None:
+                self._summary_tokens = tokens.approximate_tokens(self.summary)
+            return self._summary_tokens
         else:
-            return sum(msg.get_tokens() for msg in self.messages)
+            return self._messages.get_tokens()
 
     def add_message(
         self, ai: bool, content: MessageContent, tokens: int = 0
@@ -159,7 +290,7 @@ class Topic(Record):
         return self.summary
 
     def compress_large_messages(self, message_ratio: float = CURRENT_TOPIC_RATIO * LARGE_MESSAGE_TO_CURRENT_TOPIC_RATIO) -> bool:
-        set = settings.get_settings()
+        set = settings.get_settings_snapshot()
         msg_max_size = (
             set["chat_model_ctx_length"]
             * set["chat_model_ctx_history"]
@@ -249,14 +380,36 @@ class Topic(Record):
 class Bulk(Record):
     def __init__(self, history: "History"):
         self.history = history
-        self.summary: str = ""
-        self.records: list[Record] = []
+        self._summary: str = ""
+        self._summary_tokens: int | None = None
+        self._records: RecordList = RecordList(self)
+
+    @property
+    def summary(self) -> str:
+        return self._summary
+
+    @summary.setter
+    def summary(self, summary: str):
+        self._summary = summary
+        self._summary_tokens = None
+        self.invalidate_tokens()
+
+    @property
+    def records(self) -> list[Record]:
+        return self._records
+
+    @records.setter
+    def records(self, records: list[Record]):
+        self._records = RecordList(self, records)
+        self.invalidate_tokens()
 
     def get_tokens(self):
         if self.summary:
-            return tokens.approximate_tokens(self.summary)
+            if self._summary_tokens is None:
+                self._summary_tokens = tokens.approximate_tokens(self.summary)
+            return self._summary_tokens
         else:
-            return sum([r.get_tokens() for r in self.records])
+            return self._records.get_tokens()
 
     def output(
         self, human_label: str = "user", ai_label: str = "ai"
@@ -300,12 +453,38 @@ class History(Record):
         from agent import Agent
 
         self.counter = 0
-        self.bulks: list[Bulk] = []
-        self.topics: list[Topic] = []
+        self._bulks: RecordList = RecordList(self)
+        self._topics: RecordList = RecordList(self)
         self.current = Topic(history=self)
         self.agent: Agent = agent
 
+    @property
+    def bulks(self) -> list[Bulk]:
+        return self._bulks
+
+    @bulks.setter
+    def bulks(self, bulks: list[Bulk]):
+        self._bulks = RecordList(self, bulks)
+
+    @property
+    def topics(self) -> list[Topic]:
+        return self._topics
+
+    @topics.setter
+    def topics(self, topics: list[Topic]):
+        self._topics = RecordList(self, topics)
+
+    @property
+    def current(self) -> Topic:
+        return self._current
+
+    @current.setter
+    def current(self, topic: Topic):
+        topic.parent = self
+        self._current = topic
+
     def get_tokens(self) -> int:
+        # each part keeps its total up to date as records are added or changed
         return (
             self.get_bulks_tokens()
             + self.get_topics_tokens()
@@ -318,10 +497,10 @@ class History(Record):
         return total > limit
 
     def get_bulks_tokens(self) -> int:
-        return sum(record.get_tokens() for record in self.bulks)
+        return self._bulks.get_tokens()
 
     def get_topics_tokens(self) -> int:
-        return sum(record.get_tokens() for record in self.topics)
+        return self._topics.get_tokens()
 
     def get_current_topic_tokens(self) -> int:
         return self.current.get_tokens()
@@ -479,7 +658,7 @@ def deserialize_history(json_data: str, agent) -> History:
 
 
 def _get_ctx_size_for_history() -> int:
-    set = settings.get_settings()
+    set = settings.get_settings_snapshot()
     return int(set["chat_model_ctx_length"] * set["chat_model_ctx_history"])
 
 
@@ -0,0 +1,87 @@
+import asyncio
+import sys
+import threading
+
+import aiohttp
+
+# connections kept open in total and per host by each shared session
+CONNECTION_LIMIT = 100
+CONNECTION_LIMIT_PER_HOST = 8
+# seconds an idle connection stays open, below uvicorn's default of 5 s so a
+# connection is not reused just as the server closes it
+KEEPALIVE_TIMEOUT = 4
+DNS_CACHE_TTL = 300
+
+_sessions: dict[asyncio.AbstractEventLoop, tuple[aiohttp.ClientSession, object]] = {}
+_lock = threading.Lock()
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Shared aiohttp session of the running event loop, with keep-alive connections
+    and cached DNS lookups. Use it for requests only, never close it: it is closed
+    when its event loop shuts down or by close_sessions().
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        entry = _sessions.get(loop)
+        if entry and not entry[0].closed:
+            return entry[0]
+        for other in [l for l in _sessions if l.is_closed()]:
+            del _sessions[other]
+
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=CONNECTION_LIMIT,
+                limit_per_host=CONNECTION_LIMIT_PER_HOST,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=DNS_CACHE_TTL,
+            )
+        )
+        _sessions[loop] = (session, _close_with_loop(session))
+        return session
+
+
+async def close_session():
+    """Close the shared session of the running event loop."""
+    with _lock:
+        entry = _sessions.pop(asyncio.get_running_loop(), None)
+    if entry:
+        await entry[0].close()
+
+
+def close_sessions():
+    """Shutdown hook: close shared sessions of all event loops still running."""
+    with _lock:
+        entries = list(_sessions.items())
+        _sessions.clear()
+    for loop, (session, _guard) in entries:
+        if loop.is_closed() or session.closed:
+            continue
+        try:
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+        except RuntimeError:
+            pass  # loop closed meanwhile
+
+
+def _close_with_loop(session: aiohttp.ClientSession):
+    # a started async generator is finalized by loop.shutdown_asyncgens(),
+    # which asyncio.run() calls before closing the loop; loops that do not track
+    # async generators (run_until_complete patched by nest_asyncio) are never
+    # closed by it and keep their session until close_sessions()
+    if sys.get_asyncgen_hooks().firstiter is None:
+        return None
+
+    async def guard():
+        try:
+            yield
+        finally:
+            await session.close()
+
+    generator = guard()
+    step = generator.asend(None)
+    try:
+        step.send(None)
+    except StopIteration:
+        pass
+    return generator
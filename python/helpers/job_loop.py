@@ -8,6 +8,8 @@ from python.helpers import runtime
 
 
 SLEEP_TIME = 60
+# tasks.json is checked for changes by other processes at least this often
+FILE_WATCH_INTERVAL = 2.0
 
 keep_running = True
 pause_time = 0
@@ -16,8 +18,15 @@ pause_time = 0
 async def run_loop():
     global pause_time, keep_running
 
+    # changes made in this process wake the loop up right away
+    wakeup = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    TaskScheduler.get().on_schedule_change(lambda: loop.call_soon_threadsafe(wakeup.set))
+    last_pause_call = 0.0
+
     while True:
-        if runtime.is_development():
+        if runtime.is_development() and time.time() - last_pause_call >= SLEEP_TIME:
+            last_pause_call = time.time()
             # Signal to container that the job loop should be paused
             # if we are runing a development instance to avoid duble-running the jobs
             try:
@@ -31,7 +40,21 @@ async def run_loop():
                 await scheduler_tick()
             except Exception as e:
                 PrintStyle().error(errors.format_error(e))
-        await asyncio.sleep(SLEEP_TIME)  # TODO! - if we lower it under 1min, it can run a 5min job multiple times in it's target minute
+        wakeup.clear()
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout=get_sleep_time())
+        except asyncio.TimeoutError:
+            pass
+
+
+def get_sleep_time() -> float:
+    """Seconds until the next task is due, bounded by the tasks.json watch interval."""
+    if not keep_running:
+        return SLEEP_TIME
+    next_due = TaskScheduler.get().get_next_due_time()
+    if next_due is None:
+        return FILE_WATCH_INTERVAL
+    return min(max(next_due - time.time(), 0.0), FILE_WATCH_INTERVAL)
 
 
 async def scheduler_tick():
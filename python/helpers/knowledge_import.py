@@ -1,22 +1,28 @@
 import glob
 import os
 import hashlib
-from typing import Any, Dict, Literal, TypedDict
-from langchain_community.document_loaders import (
-    CSVLoader,
-    PyPDFLoader,
-    TextLoader,
-    UnstructuredHTMLLoader,
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Literal, NotRequired, TypedDict
+from python.helpers.knowledge_loader import (
+    file_types_loaders,
+    load_file,
+    get_mp_context,
+    as_worker_main,
 )
 from python.helpers.log import LogItem
 from python.helpers.print_style import PrintStyle
 
-text_loader_kwargs = {"autodetect_encoding": True}
+# changed files are parsed in a process pool when there are at least this many
+PARALLEL_MIN_FILES = 4
+LOADER_WORKERS = min(8, os.cpu_count() or 1)
 
 
 class KnowledgeImport(TypedDict):
     file: str
     checksum: str
+    size: NotRequired[int]
+    mtime: NotRequired[int]  # st_mtime_ns, unchanged size and mtime skip the checksum
     ids: list[str]
     state: Literal["changed", "original", "removed"]
     documents: list[Any]
@@ -30,6 +36,38 @@ def calculate_checksum(file_path: str) -> str:
     return hasher.hexdigest()
 
 
+def load_files(files: list[tuple[str, str]]) -> list[list[Any] | Exception]:
+    """Load (file_path, ext) pairs, in parallel worker processes when worthwhile."""
+    if len(files) >= PARALLEL_MIN_FILES and LOADER_WORKERS > 1:
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(LOADER_WORKERS, len(files)),
+                mp_context=get_mp_context(),
+            ) as pool:
+                # workers are started on submit
+                with as_worker_main():
+                    futures = [pool.submit(load_file, path, ext) for path, ext in files]
+                results: list[list[Any] | Exception] = []
+                for future in futures:
+                    try:
+                        results.append(future.result())
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        results.append(e)
+                return results
+        except (BrokenProcessPool, OSError) as e:
+            PrintStyle.warning(f"Parallel knowledge loading failed, loading sequentially: {e}")
+
+    results = []
+    for path, ext in files:
+        try:
+            results.append(load_file(path, ext))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
 def load_knowledge(
     log_item: LogItem | None,
     knowledge_dir: str,
@@ -45,17 +83,6 @@ def load_knowledge(
     intelligent memory consolidation system.
     """
 
-    # Mapping file extensions to corresponding loader classes
-    # Note: Using TextLoader for JSON and MD to avoid parsing issues with consolidation
-    file_types_loaders = {
-        "txt": TextLoader,
-        "pdf": PyPDFLoader,
-        "csv": CSVLoader,
-        "html": UnstructuredHTMLLoader,
-        "json": TextLoader,  # Use TextLoader for better consolidation compatibility
-        "md": TextLoader,    # Use TextLoader for better consolidation compatibility
-    }
-
     cnt_files = 0
     cnt_docs = 0
 
@@ -114,6 +141,7 @@ def load_knowledge(
                 progress=f"\nFound {len(kn_files)} knowledge files in {knowledge_dir}, processing...",
             )
 
+    to_load: list[tuple[str, str, KnowledgeImport]] = []
     for file_path in kn_files:
         try:
             # Get file extension safely
@@ -125,10 +153,7 @@ def load_knowledge(
             if ext not in file_types_loaders:
                 continue  # Skip unsupported file types
 
-            checksum = calculate_checksum(file_path)
-            if not checksum:
-                continue  # Skip files with checksum errors
-
+            stat = os.stat(file_path)
             file_key = file_path
 
             # Load existing data from the index or create a new entry
@@ -140,51 +165,27 @@ def load_knowledge(
                 "documents": []
             })
 
-            # Check if file has changed
-            if file_data.get("checksum") == checksum:
+            # Unchanged size and mtime means the file was not touched, skip reading it
+            if (
+                file_data.get("checksum")
+                and file_data.get("size") == stat.st_size
+                and file_data.get("mtime") == stat.st_mtime_ns
+            ):
                 file_data["state"] = "original"
             else:
-                file_data["state"] = "changed"
-
-            # Process changed files
-            if file_data["state"] == "changed":
+                checksum = calculate_checksum(file_path)
+                if not checksum:
+                    continue  # Skip files with checksum errors
+
+                # Check if file has changed
+                if file_data.get("checksum") == checksum:
+                    file_data["state"] = "original"
+                else:
+                    file_data["state"] = "changed"
+                    to_load.append((file_path, ext, file_data))
                 file_data["checksum"] = checksum
-                loader_cls = file_types_loaders[ext]
-
-                try:
-                    loader = loader_cls(
-                        file_path,
-                        **(
-                            text_loader_kwargs
-                            if ext in ["txt", "csv", "html", "md"]
-                            else {}
-                        ),
-                    )
-                    documents = loader.load_and_split()
-
-                    # Enhanced metadata for better consolidation compatibility
-                    enhanced_metadata = {
-                        **metadata,
-                        "source_file": os.path.basename(file_path),
-                        "source_path": file_path,
-                        "file_type": ext,
-                        "knowledge_source": True,  # Flag to distinguish from conversation memories
-                        "import_timestamp": None,  # Will be set when inserted into memory
-                    }
-
-                    # Apply metadata to all documents
-                    for doc in documents:
-                        doc.metadata = {**doc.metadata, **enhanced_metadata}
-
-                    file_data["documents"] = documents
-                    cnt_files += 1
-                    cnt_docs += len(documents)
-
-                except Exception as e:
-                    PrintStyle(font_color="red").print(f"Error loading {file_path}: {e}")
-                    if log_item:
-                        log_item.stream(progress=f"\nError loading {os.path.basename(file_path)}: {e}")
-                    continue
+                file_data["size"] = stat.st_size
+                file_data["mtime"] = stat.st_mtime_ns
 
             # Update the index
             index[file_key] = file_data
@@ -193,6 +194,41 @@ def load_knowledge(
             PrintStyle(font_color="red").print(f"Error processing {file_path}: {e}")
             continue
 
+    # Parse and split changed files
+    loaded = load_files([(file_path, ext) for file_path, ext, _ in to_load])
+    for (file_path, ext, file_data), documents in zip(to_load, loaded):
+        if isinstance(documents, Exception):
+            PrintStyle(font_color="red").print(f"Error loading {file_path}: {documents}")
+            if log_item:
+                log_item.stream(progress=f"\nError loading {os.path.basename(file_path)}: {documents}")
+            # keep the previous version if any, retry on next import
+            if file_data.get("ids"):
+                file_data["state"] = "original"
+                file_data["checksum"] = ""
+                file_data.pop("size", None)
+                file_data.pop("mtime", None)
+            else:
+                index.pop(file_path, None)
+            continue
+
+        # Enhanced metadata for better consolidation compatibility
+        enhanced_metadata = {
+            **metadata,
+            "source_file": os.path.basename(file_path),
+            "source_path": file_path,
+            "file_type": ext,
+            "knowledge_source": True,  # Flag to distinguish from conversation memories
+            "import_timestamp": None,  # Will be set when inserted into memory
+        }
+
+        # Apply metadata to all documents
+        for doc in documents:
+            doc.metadata = {**doc.metadata, **enhanced_metadata}
+
+        file_data["documents"] = documents
+        cnt_files += 1
+        cnt_docs += len(documents)
+
     # Mark removed files
     current_files = set(kn_files)
     for file_key, file_data in list(index.items()):
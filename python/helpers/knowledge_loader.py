@@ -0,0 +1,73 @@
+"""
+Knowledge file parsing for loader worker processes.
+
+Workers are started with forkserver or spawn and run this module as their main
+module, so they import only the document loaders and never the server (run_ui).
+Keep the imports here light.
+"""
+
+import multiprocessing
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any
+
+from langchain_community.document_loaders import (
+    CSVLoader,
+    PyPDFLoader,
+    TextLoader,
+    UnstructuredHTMLLoader,
+)
+
+text_loader_kwargs = {"autodetect_encoding": True}
+
+# Mapping file extensions to corresponding loader classes
+# Note: Using TextLoader for JSON and MD to avoid parsing issues with consolidation
+file_types_loaders = {
+    "txt": TextLoader,
+    "pdf": PyPDFLoader,
+    "csv": CSVLoader,
+    "html": UnstructuredHTMLLoader,
+    "json": TextLoader,  # Use TextLoader for better consolidation compatibility
+    "md": TextLoader,    # Use TextLoader for better consolidation compatibility
+}
+
+_main_lock = threading.Lock()
+
+
+def load_file(file_path: str, ext: str) -> list[Any]:
+    """Parse and split a single knowledge file (runs in loader worker processes)."""
+    loader_cls = file_types_loaders[ext]
+    loader = loader_cls(
+        file_path,
+        **(
+            text_loader_kwargs
+            if ext in ["txt", "csv", "html", "md"]
+            else {}
+        ),
+    )
+    return loader.load_and_split()
+
+
+def get_mp_context():
+    # fork from the threaded server can deadlock on locks held by other threads
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+@contextmanager
+def as_worker_main():
+    """
+    Start worker processes inside this block. multiprocessing re-imports the
+    parent's main module in every worker, this module stands in for it.
+    """
+    with _main_lock:
+        main = sys.modules["__main__"]
+        sys.modules["__main__"] = sys.modules[__name__]
+        try:
+            yield
+        finally:
+            sys.modules["__main__"] = main
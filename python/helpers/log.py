@@ -4,7 +4,7 @@ import threading
 import time
 import uuid
 from collections import OrderedDict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Literal, Optional, TYPE_CHECKING, TypeVar, cast
 
 from python.helpers.secrets import get_secrets_manager
@@ -143,6 +143,32 @@ def _truncate_content(text: str | None, type: Type) -> str:
     return truncated
 
 
+def _copy_containers(value: T) -> T:
+    # copy dicts and lists so truncation does not modify the caller's data, leaves are shared
+    if isinstance(value, dict):
+        return cast(T, {k: _copy_containers(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return cast(T, [_copy_containers(v) for v in value])
+    return value
+
+
+def _safe_mask_cut(text: str, secrets: list[str]) -> int:
+    # Position up to which text can be masked for good: no secret occurrence crosses it
+    # and the rest is shorter than the longest secret, so appended text may complete one.
+    if not secrets:
+        return len(text)
+    cut = max(0, len(text) - (max(len(s) for s in secrets) - 1))
+    moved = True
+    while moved and cut > 0:
+        moved = False
+        for secret in secrets:
+            pos = text.find(secret, max(0, cut - len(secret) + 1), cut + len(secret) - 1)
+            if pos != -1 and pos < cut:
+                cut = pos
+                moved = True
+    return cut
+
+
 @dataclass
 class LogItem:
     log: "Log"
@@ -156,6 +182,10 @@ class LogItem:
     guid: str = ""
     timestamp: float = 0.0
     agentno: int = 0
+    # content streaming state: last raw content, its masked stable prefix and raw tail
+    _raw_content: str = field(default="", init=False, repr=False)
+    _masked_content: str = field(default="", init=False, repr=False)
+    _pending_content: str = field(default="", init=False, repr=False)
 
     def __post_init__(self):
         self.guid = self.log.guid
@@ -190,13 +220,27 @@ class LogItem:
         if heading is not None:
             self.update(heading=self.heading + heading)
         if content is not None:
-            self.update(content=self.content + content)
+            # extend the raw content so masking continues incrementally
+            self.update(content=(self._raw_content or self.content) + content)
 
         for k, v in kwargs.items():
             prev = self.kvps.get(k, "") if self.kvps else ""
             self.update(**{k: prev + v})
 
-    def output(self):
+    def output(self, content_from: int | None = None):
+        # content_from: the client already has content[:content_from], send the rest only
+        if content_from:
+            return {
+                "no": self.no,
+                "id": self.id,
+                "type": self.type,
+                "heading": self.heading,
+                "content": self.content[content_from:],
+                "content_from": content_from,
+                "kvps": self.kvps,
+                "timestamp": self.timestamp,
+                "agentno": self.agentno,
+            }
         return {
             "no": self.no,
             "id": self.id,  # Include id in output
@@ -216,6 +260,8 @@ class Log:
         self.context: "AgentContext|None" = None  # set from outside
         self.guid: str = str(uuid.uuid4())
         self.updates: list[int] = []
+        # update index -> length of the item's stable content prefix before an append-only update
+        self.update_bases: dict[int, int] = {}
         self.logs: list[LogItem] = []
         self.progress: str = ""
         self.progress_no: int = 0
@@ -280,7 +326,13 @@ class Log:
         # Capture the effective type for truncation without holding the lock during
         # masking/truncation work.
         with self._lock:
-            current_type = self.logs[no].type
+            current_item = self.logs[no]
+            current_type = current_item.type
+            stream_state = (
+                current_item._raw_content,
+                current_item._masked_content,
+                current_item._pending_content,
+            )
         type_for_truncation = type if type is not None else current_type
 
         heading_out: str | None = None
@@ -288,12 +340,15 @@ class Log:
             heading_out = _truncate_heading(self._mask_recursive(heading))
 
         content_out: str | None = None
+        content_base: int | None = None
         if content is not None:
-            content_out = _truncate_content(self._mask_recursive(content), type_for_truncation)
+            content_out, content_base, stream_state = self._mask_content(
+                str(content), stream_state, type_for_truncation
+            )
 
         kvps_out: OrderedDict | None = None
         if kvps is not None:
-            kvps_out_tmp = OrderedDict(copy.deepcopy(kvps))
+            kvps_out_tmp = OrderedDict(_copy_containers(kvps))
             kvps_out_tmp = self._mask_recursive(kvps_out_tmp)
             kvps_out_tmp = _truncate_value(kvps_out_tmp)
             kvps_out = OrderedDict(kvps_out_tmp)
@@ -320,6 +375,11 @@ class Log:
 
             if content_out is not None:
                 item.content = content_out
+                (
+                    item._raw_content,
+                    item._masked_content,
+                    item._pending_content,
+                ) = stream_state
 
             if kvps_out is not None:
                 item.kvps = kvps_out
@@ -331,6 +391,13 @@ class Log:
                     item.kvps = OrderedDict()
                 item.kvps.update(kwargs_out)
 
+            # append-only content updates (or none) keep the client's content prefix
+            if content_base is not None:
+                self.update_bases[len(self.updates)] = content_base
+            elif content_out is None:
+                self.update_bases[len(self.updates)] = min(
+                    len(item._masked_content), len(item.content)
+                )
             self.updates.append(item.no)
 
             if item.heading and item.update_progress != "none":
@@ -343,6 +410,48 @@ class Log:
         if notify_state_monitor:
             self._notify_state_monitor_for_context_update()
 
+    def _mask_content(
+        self,
+        content: str,
+        stream_state: tuple[str, str, str],
+        type: Type,
+    ) -> tuple[str, int | None, tuple[str, str, str]]:
+        """Mask and truncate content. When content extends the previous raw content, only
+        the appended text and a tail shorter than the longest secret are masked again.
+        Returns the content, the length of its prefix unchanged since the previous content
+        (None if replaced) and the new streaming state."""
+        raw, masked, pending = stream_state
+        base: int | None = None
+        if raw and content.startswith(raw):
+            base = len(masked)
+            chunk = content[len(raw) :]
+        else:
+            masked, pending, chunk = "", "", content
+
+        text = pending + chunk
+        try:
+            from agent import AgentContext
+
+            secrets_mgr = get_secrets_manager(self.context or AgentContext.current())
+            secrets = [
+                value
+                for value in secrets_mgr.load_secrets().values()
+                if value and len(value.strip()) >= 4
+            ]
+            cut = _safe_mask_cut(text, secrets)
+            masked += secrets_mgr.mask_values(text[:cut])
+            pending = text[cut:]
+            content_out = masked + secrets_mgr.mask_values(pending)
+        except Exception:
+            # If masking fails, use original text
+            masked, pending = masked + text, ""
+            content_out = masked
+
+        truncated = _truncate_content(content_out, type)
+        if truncated is not content_out:
+            base = None
+        return truncated, base or None, (content, masked, pending)
+
     def _notify_state_monitor(self) -> None:
         ctx = self.context
         if not ctx:
@@ -385,7 +494,9 @@ class Log:
     def set_initial_progress(self):
         self.set_progress("Waiting for input", 0, False)
 
-    def output(self, start=None, end=None):
+    def output(self, start=None, end=None, deltas: bool = False):
+        # deltas: items only appended to since start are sent as content suffixes,
+        # for clients that keep the earlier content (the state snapshot)
         with self._lock:
             if start is None:
                 start = 0
@@ -393,12 +504,22 @@ class Log:
                 end = len(self.updates)
             updates = self.updates[start:end]
             logs = list(self.logs)
+            bases: dict[int, int | None] = {}
+            if start and deltas:
+                for index, no in enumerate(updates, start):
+                    base = self.update_bases.get(index)
+                    if no not in bases:
+                        bases[no] = base
+                    elif base is None or bases[no] is None:
+                        bases[no] = None
+                    else:
+                        bases[no] = min(bases[no], base)  # type: ignore[type-var]
 
         out = []
         seen = set()
         for update in updates:
             if update not in seen and update < len(logs):
-                out.append(logs[update].output())
+                out.append(logs[update].output(content_from=bases.get(update)))
                 seen.add(update)
         return out
 
@@ -406,6 +527,7 @@ class Log:
         with self._lock:
             self.guid = str(uuid.uuid4())
             self.updates = []
+            self.update_bases = {}
             self.logs = []
         self.set_initial_progress()
 
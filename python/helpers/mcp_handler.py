@@ -24,6 +24,7 @@ import json
 from python.helpers import errors
 from python.helpers import settings
 from python.helpers.log import LogItem
+from python.helpers.mcp_session_pool import MCPSessionPool, DEFAULT_MAX_SESSIONS
 
 import httpx
 
@@ -227,6 +228,7 @@ class MCPServerRemote(BaseModel):
     init_timeout: int = Field(default=0)
     tool_timeout: int = Field(default=0)
     verify: bool = Field(default=True, description="Verify SSL certificates")
+    max_sessions: int = Field(default=0, description="Concurrent pooled sessions, 0 for default")
     disabled: bool = Field(default=False)
 
     __lock: ClassVar[threading.Lock] = PrivateAttr(default=threading.Lock())
@@ -260,8 +262,9 @@ class MCPServerRemote(BaseModel):
     ) -> CallToolResult:
         """Call a tool with the given input data"""
         with self.__lock:
-            # We already run in an event loop, dont believe Pylance
-            return await self.__client.call_tool(tool_name, input_data)  # type: ignore
+            client = self.__client
+        # not awaited under the lock so calls can run concurrently on pooled sessions
+        return await client.call_tool(tool_name, input_data)  # type: ignore
 
     def update(self, config: dict[str, Any]) -> "MCPServerRemote":
         with self.__lock:
@@ -275,6 +278,7 @@ class MCPServerRemote(BaseModel):
                     "headers",
                     "init_timeout",
                     "tool_timeout",
+                    "max_sessions",
                     "disabled",
                     "verify",
                 ]:
@@ -290,6 +294,10 @@ class MCPServerRemote(BaseModel):
         await self.__client.update_tools()  # type: ignore
         return self
 
+    def close_sessions(self):
+        with self.__lock:
+            self.__client.close_sessions()  # type: ignore
+
 
 class MCPServerLocal(BaseModel):
     name: str = Field(default_factory=str)
@@ -305,6 +313,7 @@ class MCPServerLocal(BaseModel):
     init_timeout: int = Field(default=0)
     tool_timeout: int = Field(default=0)
     verify: bool = Field(default=True, description="Verify SSL certificates")
+    max_sessions: int = Field(default=0, description="Concurrent pooled sessions, 0 for default")
     disabled: bool = Field(default=False)
 
     __lock: ClassVar[threading.Lock] = PrivateAttr(default=threading.Lock())
@@ -338,8 +347,9 @@ class MCPServerLocal(BaseModel):
     ) -> CallToolResult:
         """Call a tool with the given input data"""
         with self.__lock:
-            # We already run in an event loop, dont believe Pylance
-            return await self.__client.call_tool(tool_name, input_data)  # type: ignore
+            client = self.__client
+        # not awaited under the lock so calls can run concurrently on pooled sessions
+        return await client.call_tool(tool_name, input_data)  # type: ignore
 
     def update(self, config: dict[str, Any]) -> "MCPServerLocal":
         with self.__lock:
@@ -355,6 +365,7 @@ class MCPServerLocal(BaseModel):
                     "encoding_error_handler",
                     "init_timeout",
                     "tool_timeout",
+                    "max_sessions",
                     "disabled",
                 ]:
                     if key == "name":
@@ -366,6 +377,10 @@ class MCPServerLocal(BaseModel):
         await self.__client.update_tools()  # type: ignore
         return self
 
+    def close_sessions(self):
+        with self.__lock:
+            self.__client.close_sessions()  # type: ignore
+
 
 MCPServer = Annotated[
     Union[
@@ -526,8 +541,19 @@ class MCPConfig(BaseModel):
         # If servers is a field like `servers: List[MCPServer] = Field(default_factory=list)`,
         # then super().__init__() might try to initialize it.
         # We are re-assigning self.servers later in this __init__.
+        try:
+            previous_servers = list(self.servers or [])
+        except Exception:  # first initialization, fields not set yet
+            previous_servers = []
         super().__init__()
 
+        # Servers are recreated below, release warm sessions of the previous ones
+        for previous_server in previous_servers:
+            try:
+                previous_server.close_sessions()
+            except Exception:
+                pass
+
         # Clear any servers potentially initialized by super().__init__() before we populate based on servers_list
         self.servers = []
         # initialize failed servers list
@@ -797,10 +823,17 @@ class MCPConfig(BaseModel):
             raise ValueError(f"Tool {tool_name} not found")
         server_name_part, tool_name_part = tool_name.split(".")
         with self.__lock:
-            for server in self.servers:
-                if server.name == server_name_part and server.has_tool(tool_name_part):
-                    return await server.call_tool(tool_name_part, input_data)
+            server = next(
+                (
+                    s
+                    for s in self.servers
+                    if s.name == server_name_part and s.has_tool(tool_name_part)
+                ),
+                None,
+            )
+        if not server:
             raise ValueError(f"Tool {tool_name} not found")
+        return await server.call_tool(tool_name_part, input_data)
 
 
 T = TypeVar("T")
@@ -809,7 +842,7 @@ T = TypeVar("T")
 class MCPClientBase(ABC):
     # server: Union[MCPServerLocal, MCPServerRemote] # Defined in __init__
     # tools: List[dict[str, Any]] # Defined in __init__
-    # No self.session, self.exit_stack, self.stdio, self.write as persistent instance fields
+    # Sessions are not instance fields, they live in MCPSessionPool keyed by _pool_key()
 
     __lock: ClassVar[threading.Lock] = threading.Lock()
 
@@ -831,68 +864,55 @@ class MCPClientBase(ABC):
         """Create stdio/write streams using the provided exit_stack."""
         ...
 
+    def _pool_key(self) -> str:
+        # each client owns its sessions, recreated servers never share them
+        return f"{self.server.name}:{id(self)}"
+
+    async def _open_session(
+        self, exit_stack: AsyncExitStack, read_timeout_seconds: int
+    ) -> ClientSession:
+        stdio, write = await self._create_stdio_transport(exit_stack)
+        session = await exit_stack.enter_async_context(
+            ClientSession(
+                stdio,  # type: ignore
+                write,  # type: ignore
+                read_timeout_seconds=timedelta(seconds=read_timeout_seconds),
+            )
+        )
+        await session.initialize()
+        return session
+
     async def _execute_with_session(
         self,
         coro_func: Callable[[ClientSession], Awaitable[T]],
         read_timeout_seconds=60,
     ) -> T:
         """
-        Manages the lifecycle of an MCP session for a single operation.
-        Creates a temporary session, executes coro_func with it, and ensures cleanup.
+        Executes coro_func with a warm session from the MCP session pool.
+        A new session (with read_timeout_seconds) is only opened when no idle one is available.
         """
         operation_name = coro_func.__name__  # For logging
-        # PrintStyle(font_color="cyan").print(f"MCPClientBase ({self.server.name}): Creating new session for operation '{operation_name}'...")
-        # Store the original exception outside the async block
-        original_exception = None
         try:
-            async with AsyncExitStack() as temp_stack:
-                try:
-
-                    stdio, write = await self._create_stdio_transport(temp_stack)
-                    # PrintStyle(font_color="cyan").print(f"MCPClientBase ({self.server.name} - {operation_name}): Transport created. Initializing session...")
-                    session = await temp_stack.enter_async_context(
-                        ClientSession(
-                            stdio,  # type: ignore
-                            write,  # type: ignore
-                            read_timeout_seconds=timedelta(
-                                seconds=read_timeout_seconds
-                            ),
-                        )
-                    )
-                    await session.initialize()
-
-                    result = await coro_func(session)
-
-                    return result
-                except Exception as e:
-                    # Store the original exception and raise a dummy exception
-                    excs = getattr(e, "exceptions", None)  # Python 3.11+ ExceptionGroup
-                    if excs:
-                        original_exception = excs[0]
-                    else:
-                        original_exception = e
-                    # Create a dummy exception to break out of the async block
-                    raise RuntimeError("Dummy exception to break out of async block")
+            return await MCPSessionPool.get_instance().run(
+                key=self._pool_key(),
+                opener=lambda stack: self._open_session(stack, read_timeout_seconds),
+                operation=coro_func,
+                max_sessions=self.server.max_sessions or DEFAULT_MAX_SESSIONS,
+                health_check=lambda session: session.send_ping(),
+            )
         except Exception as e:
-            # Check if this is our dummy exception
-            if original_exception is not None:
-                e = original_exception
-            # We have the original exception stored
+            excs = getattr(e, "exceptions", None)  # Python 3.11+ ExceptionGroup
+            if excs:
+                e = excs[0]
             PrintStyle(
                 background_color="#AA4455", font_color="white", padding=False
             ).print(
                 f"MCPClientBase ({self.server.name} - {operation_name}): Error during operation: {type(e).__name__}: {e}"
             )
             raise e  # Re-raise the original exception
-        # finally:
-        #     PrintStyle(font_color="cyan").print(
-        #         f"MCPClientBase ({self.server.name} - {operation_name}): Session and transport will be closed by AsyncExitStack."
-        #     )
-        # This line should ideally be unreachable if the try/except/finally logic within the 'async with' is exhaustive.
-        # Adding it to satisfy linters that might not fully trace the raise/return paths through async context managers.
-        raise RuntimeError(
-            f"MCPClientBase ({self.server.name} - {operation_name}): _execute_with_session exited 'async with' block unexpectedly."
-        )
+
+    def close_sessions(self):
+        MCPSessionPool.get_instance().close(self._pool_key())
 
     async def update_tools(self) -> "MCPClientBase":
         # PrintStyle(font_color="cyan").print(f"MCPClientBase ({self.server.name}): Starting 'update_tools' operation...")
@@ -913,7 +933,7 @@ class MCPClientBase(ABC):
             )
 
         try:
-            set = settings.get_settings()
+            set = settings.get_settings_snapshot()
             await self._execute_with_session(
                 list_tools_op,
                 read_timeout_seconds=self.server.init_timeout
@@ -967,7 +987,7 @@ class MCPClientBase(ABC):
             )
 
         async def call_tool_op(current_session: ClientSession):
-            set = settings.get_settings()
+            set = settings.get_settings_snapshot()
             # PrintStyle(font_color="cyan").print(f"MCPClientBase ({self.server.name}): Executing 'call_tool' for '{tool_name}' via MCP session...")
             response: CallToolResult = await current_session.call_tool(
                 tool_name,
@@ -1093,7 +1113,7 @@ class MCPClientRemote(MCPClientBase):
     ]:
         """Connect to an MCP server, init client and save stdio/write streams"""
         server: MCPServerRemote = cast(MCPServerRemote, self.server)
-        set = settings.get_settings()
+        set = settings.get_settings_snapshot()
 
         # Resolve timeout: check server config first, then settings, defaulting to 5s/10s
         init_timeout = server.init_timeout or set["mcp_client_init_timeout"] or 5
@@ -0,0 +1,273 @@
+import asyncio
+import threading
+import time
+from contextlib import AsyncExitStack
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from python.helpers.defer import EventLoopThread
+from python.helpers.print_style import PrintStyle
+
+T = TypeVar("T")
+
+POOL_THREAD_NAME = "MCPSessionPool"
+DEFAULT_MAX_SESSIONS = 4  # concurrent sessions (and calls) per server
+IDLE_TIMEOUT = 300  # seconds before an unused session is closed
+EVICTION_INTERVAL = 30  # seconds between idle eviction sweeps
+HEALTH_CHECK_AFTER = 30  # idle seconds after which a session is checked before reuse
+HEALTH_CHECK_TIMEOUT = 5
+CLOSE_TIMEOUT = 5
+CONNECT_ATTEMPTS = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30
+
+SessionOpener = Callable[[AsyncExitStack], Awaitable[Any]]
+HealthCheck = Callable[[Any], Awaitable[Any]]
+
+
+class PooledSession:
+    """One long-lived session owned by its own task on the pool loop.
+
+    Transports like stdio_client are anyio context managers that have to be
+    entered and exited by the same task, so the owner task opens the session,
+    parks until close() is called and then tears it down.
+    """
+
+    def __init__(self):
+        self.session: Any = None
+        self.last_used = time.monotonic()
+        self._stop = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._closed = False
+
+    async def open(self, opener: SessionOpener):
+        ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._own(opener, ready))
+        self.session = await ready
+        return self
+
+    async def _own(self, opener: SessionOpener, ready: asyncio.Future):
+        try:
+            async with AsyncExitStack() as stack:
+                session = await opener(stack)
+                ready.set_result(session)
+                await self._stop.wait()
+        except asyncio.CancelledError:
+            if not ready.done():
+                ready.cancel()
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e)
+        finally:
+            self._closed = True
+
+    @property
+    def alive(self) -> bool:
+        return not self._closed and self._task is not None and not self._task.done()
+
+    async def close(self):
+        self._closed = True
+        self._stop.set()
+        if not self._task or self._task.done():
+            return
+        done, _ = await asyncio.wait([self._task], timeout=CLOSE_TIMEOUT)
+        if not done:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+class ServerSessions:
+    """Sessions and statistics of a single configured server."""
+
+    def __init__(self, max_sessions: int):
+        self.max_sessions = max_sessions
+        self.slots = asyncio.Semaphore(max_sessions)
+        self.idle: list[PooledSession] = []
+        self.active: set[PooledSession] = set()
+        self.failures = 0
+        self.retry_at = 0.0
+        self.closed = False
+        self.stats = {"calls": 0, "opened": 0, "reused": 0, "evicted": 0, "failed": 0}
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            **self.stats,
+            "idle": len(self.idle),
+            "active": len(self.active),
+            "max_sessions": self.max_sessions,
+            "failures": self.failures,
+        }
+
+
+class MCPSessionPool:
+    """Warm MCP client sessions kept per server on a dedicated event loop.
+
+    Callers from any thread or event loop submit an operation, the pool runs it
+    on an idle session (or opens a new one, with backoff after failures) while
+    limiting the number of concurrent sessions per server. Idle sessions are
+    health-checked before reuse and evicted after IDLE_TIMEOUT.
+    """
+
+    _instance: "MCPSessionPool | None" = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> "MCPSessionPool":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self, thread_name: str = POOL_THREAD_NAME):
+        self.loop_thread = EventLoopThread(thread_name)
+        self._servers: dict[Hashable, ServerSessions] = {}
+        self._evictor: asyncio.Task | None = None
+
+    async def run(
+        self,
+        key: Hashable,
+        opener: SessionOpener,
+        operation: Callable[[Any], Awaitable[T]],
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        health_check: HealthCheck | None = None,
+    ) -> T:
+        """Run operation(session) on a pooled session of the server identified by key."""
+        future = self.loop_thread.run_coroutine(
+            self._run(key, opener, operation, max_sessions, health_check)
+        )
+        return await asyncio.wrap_future(future)
+
+    def close(self, key: Hashable):
+        """Close all sessions of a server, sessions in use are closed when released."""
+        self.loop_thread.run_coroutine(self._close(key))
+
+    def close_all(self):
+        for key in list(self._servers.keys()):
+            self.close(key)
+
+    def get_stats(self, key: Hashable) -> dict[str, Any] | None:
+        server = self._servers.get(key)
+        return server.get_stats() if server else None
+
+    async def _run(
+        self,
+        key: Hashable,
+        opener: SessionOpener,
+        operation: Callable[[Any], Awaitable[T]],
+        max_sessions: int,
+        health_check: HealthCheck | None,
+    ) -> T:
+        self._ensure_evictor()
+        server = self._servers.get(key)
+        if not server:
+            server = self._servers[key] = ServerSessions(max(1, max_sessions))
+
+        async with server.slots:
+            pooled = await self._checkout(server, opener, health_check)
+            server.stats["calls"] += 1
+            try:
+                result = await operation(pooled.session)
+            except (asyncio.CancelledError, asyncio.TimeoutError):
+                # the session may still deliver the abandoned response, do not reuse it
+                await self._discard(server, pooled)
+                raise
+            except Exception:
+                await self._release(server, pooled)
+                raise
+            await self._release(server, pooled)
+            return result
+
+    async def _checkout(
+        self,
+        server: ServerSessions,
+        opener: SessionOpener,
+        health_check: HealthCheck | None,
+    ) -> PooledSession:
+        while server.idle:
+            pooled = server.idle.pop()  # most recently used first
+            if not pooled.alive:
+                await pooled.close()
+                continue
+            if health_check and time.monotonic() - pooled.last_used > HEALTH_CHECK_AFTER:
+                try:
+                    await asyncio.wait_for(
+                        health_check(pooled.session), HEALTH_CHECK_TIMEOUT
+                    )
+                except Exception:
+                    await pooled.close()
+                    continue
+            server.active.add(pooled)
+            server.stats["reused"] += 1
+            return pooled
+        pooled = await self._connect(server, opener)
+        server.active.add(pooled)
+        return pooled
+
+    async def _connect(
+        self, server: ServerSessions, opener: SessionOpener
+    ) -> PooledSession:
+        last_error: BaseException | None = None
+        for _ in range(CONNECT_ATTEMPTS):
+            delay = server.retry_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            pooled = PooledSession()
+            try:
+                await pooled.open(opener)
+            except Exception as e:
+                last_error = e
+                await pooled.close()
+                server.failures += 1
+                server.stats["failed"] += 1
+                server.retry_at = time.monotonic() + min(
+                    BACKOFF_BASE * 2 ** (server.failures - 1), BACKOFF_MAX
+                )
+                continue
+            server.failures = 0
+            server.retry_at = 0.0
+            server.stats["opened"] += 1
+            return pooled
+        raise last_error  # type: ignore
+
+    async def _release(self, server: ServerSessions, pooled: PooledSession):
+        if not pooled.alive or server.closed:
+            await self._discard(server, pooled)
+            return
+        server.active.discard(pooled)
+        pooled.last_used = time.monotonic()
+        server.idle.append(pooled)
+
+    async def _discard(self, server: ServerSessions, pooled: PooledSession):
+        server.active.discard(pooled)
+        await pooled.close()
+
+    async def _close(self, key: Hashable):
+        server = self._servers.pop(key, None)
+        if not server:
+            return
+        server.closed = True
+        idle, server.idle = server.idle, []
+        await asyncio.gather(*[pooled.close() for pooled in idle])
+
+    def _ensure_evictor(self):
+        if not self._evictor or self._evictor.done():
+            self._evictor = asyncio.create_task(self._evict_idle())
+
+    async def _evict_idle(self):
+        while True:
+            await asyncio.sleep(EVICTION_INTERVAL)
+            now = time.monotonic()
+            for server in list(self._servers.values()):
+                stale = [
+                    pooled
+                    for pooled in server.idle
+                    if not pooled.alive or now - pooled.last_used >= IDLE_TIMEOUT
+                ]
+                if not stale:
+                    continue
+                server.idle = [pooled for pooled in server.idle if pooled not in stale]
+                server.stats["evicted"] += len(stale)
+                for pooled in stale:
+                    try:
+                        await pooled.close()
+                    except Exception as e:
+                        PrintStyle.error(f"MCPSessionPool: failed to close session: {e}")
@@ -1,5 +1,8 @@
+import asyncio
 from datetime import datetime
-from typing import Any, List, Sequence
+import operator
+import threading
+from typing import Any, Callable, List, Optional, Sequence, Tuple
 from langchain.storage import InMemoryByteStore, LocalFileStore
 from langchain.embeddings import CacheBackedEmbeddings
 from python.helpers import guids
@@ -25,7 +28,7 @@ import numpy as np
 from python.helpers.print_style import PrintStyle
 from . import files
 from langchain_core.documents import Document
-from python.helpers import knowledge_import
+from python.helpers import knowledge_import, memory_index, memory_journal, settings
 from python.helpers.log import Log, LogItem
 from enum import Enum
 from agent import Agent, AgentContext
@@ -37,8 +40,260 @@ from simpleeval import simple_eval
 # Raise the log level so WARNING messages aren't shown
 logging.getLogger("langchain_core.vectorstores.base").setLevel(logging.ERROR)
 
+# knowledge chunks embedded and inserted per call when preloading knowledge
+KNOWLEDGE_INSERT_BATCH = 256
+
 
 class MyFaiss(FAISS):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.index_type = "flat"
+        self._metadata_index: memory_index.MetadataIndex | None = None
+        self._ann_index: memory_index.AnnIndex | None = None
+        # mutations made while an ANN index is built in the background, None when idle
+        self._ann_pending: list[tuple] | None = None
+        self._ann_thread: threading.Thread | None = None
+        self._ann_generation = 0
+        self._positions: dict[str, int] | None = None
+        self._lock = threading.RLock()
+        # mutations not yet written to the journal, None when journaling is off
+        self.journal: memory_journal.MemoryJournal | None = None
+        self.journal_ops: list[tuple] | None = None
+
+    def set_index_type(self, index_type: str):
+        if index_type not in memory_index.INDEX_TYPES:
+            index_type = "flat"
+        with self._lock:
+            if index_type != self.index_type:
+                self.index_type = index_type
+                self._drop_ann_index()
+
+    def add_texts(self, texts, metadatas=None, ids=None, **kwargs) -> List[str]:
+        with self._lock:
+            ids = super().add_texts(texts, metadatas=metadatas, ids=ids, **kwargs)
+            self._on_added(ids)
+        return ids
+
+    async def aadd_texts(self, texts, metadatas=None, ids=None, **kwargs) -> List[str]:
+        texts = list(texts)
+        embeddings = await self._aembed_documents(texts)
+        return self.add_embeddings(zip(texts, embeddings), metadatas=metadatas, ids=ids)
+
+    def add_embeddings(self, text_embeddings, metadatas=None, ids=None, **kwargs) -> List[str]:
+        with self._lock:
+            ids = super().add_embeddings(text_embeddings, metadatas=metadatas, ids=ids, **kwargs)
+            self._on_added(ids)
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        with self._lock:
+            result = super().delete(ids, **kwargs)
+            self._positions = None
+            if self._metadata_index is not None:
+                for id in ids or []:
+                    self._metadata_index.remove(id)
+            if self._ann_index is not None:
+                self._ann_index.remove(ids or [])
+            if self._ann_pending is not None:
+                self._ann_pending.append(("delete", list(ids or [])))
+            if self.journal_ops is not None:
+                self.journal_ops.append(("delete", list(ids or [])))
+        return result
+
+    def _on_added(self, ids: List[str]):
+        self._positions = None
+        if self._metadata_index is not None:
+            for id in ids:
+                self._metadata_index.add(id, self.docstore._dict[id].metadata)  # type: ignore
+        if not ids or (
+            self._ann_index is None and self._ann_pending is None and self.journal_ops is None
+        ):
+            return
+        vectors = self.index.reconstruct_n(self.index.ntotal - len(ids), len(ids))
+        if self._ann_index is not None:
+            self._ann_index.add(vectors, ids)
+        if self._ann_pending is not None:
+            self._ann_pending.append(("add", vectors, list(ids)))
+        if self.journal_ops is not None:
+            docs = [self.docstore._dict[id] for id in ids]  # type: ignore
+            self.journal_ops.append(
+                (
+                    "add",
+                    list(ids),
+                    [doc.page_content for doc in docs],
+                    [doc.metadata for doc in docs],
+                    vectors,
+                )
+            )
+
+    def replay_journal(self, operations: list[tuple]) -> int:
+        """Re-apply journaled mutations, skipping those already in the snapshot."""
+        applied = 0
+        for operation in operations:
+            if operation[0] == "add":
+                _op, ids, texts, metadatas, vectors = operation
+                new = [i for i, id in enumerate(ids) if id not in self.docstore._dict]  # type: ignore
+                if new:
+                    self.add_embeddings(
+                        [(texts[i], vectors[i]) for i in new],
+                        metadatas=[metadatas[i] for i in new],
+                        ids=[ids[i] for i in new],
+                    )
+                    applied += len(new)
+            elif operation[0] == "delete":
+                existing = [id for id in operation[1] if id in self.docstore._dict]  # type: ignore
+                if existing:
+                    self.delete(existing)
+                    applied += len(existing)
+        return applied
+
+    def _get_metadata_index(self) -> memory_index.MetadataIndex:
+        if self._metadata_index is None:
+            index = memory_index.MetadataIndex()
+            for id, doc in self.get_all_docs().items():
+                index.add(id, doc.metadata)
+            self._metadata_index = index
+        return self._metadata_index
+
+    def _get_positions(self) -> dict[str, int]:
+        if self._positions is None:
+            self._positions = {id: pos for pos, id in self.index_to_docstore_id.items()}
+        return self._positions
+
+    def _get_ann_index(self) -> memory_index.AnnIndex | None:
+        """
+        The ANN index to search, or None for the exact flat search. Building and
+        retraining run in a background thread, searches stay flat until it is done.
+        """
+        size = self.index.ntotal
+        if self.index_type == "flat" or size < memory_index.ANN_MIN_VECTORS:
+            self._drop_ann_index()
+            return None
+        if self._ann_index is not None and not self._ann_index.needs_rebuild(size):
+            return self._ann_index
+        if self._ann_pending is None:
+            self._ann_index = None
+            self._ann_pending = []
+            ids = [self.index_to_docstore_id[pos] for pos in range(size)]
+            self._ann_thread = threading.Thread(
+                target=self._build_ann_index,
+                args=(self._ann_generation, self.index_type, self.index.reconstruct_n(0, size), ids),
+                name="MemoryAnnIndex",
+                daemon=True,
+            )
+            self._ann_thread.start()
+        return None
+
+    def _build_ann_index(self, generation: int, index_type: str, vectors, ids: list[str]):
+        try:
+            ann = memory_index.AnnIndex(index_type, self.index.d)
+            ann.build(vectors, ids)
+        except Exception as e:
+            ann = None
+            PrintStyle.error(f"Failed to build {index_type} memory index: {e}")
+        with self._lock:
+            if generation != self._ann_generation:
+                return  # dropped meanwhile
+            pending, self._ann_pending = self._ann_pending or [], None
+            if ann is None:
+                return
+            # mutations made during the build, in order
+            for operation in pending:
+                if operation[0] == "add":
+                    ann.add(operation[1], operation[2])
+                else:
+                    ann.remove(operation[1])
+            self._ann_index = ann
+
+    def _drop_ann_index(self):
+        self._ann_index = None
+        if self._ann_pending is not None:
+            self._ann_generation += 1  # the running build is discarded
+            self._ann_pending = None
+
+    def similarity_search_with_score_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[Callable | dict[str, Any]] = None,
+        fetch_k: int = 20,
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vectors(
+            [embedding], k=k, filter=filter, fetch_k=fetch_k, **kwargs
+        )[0]
+
+    def similarity_search_with_score_by_vectors(
+        self,
+        embeddings: Sequence[Sequence[float]],
+        k: int | Sequence[int] = 4,
+        filter: Optional[Callable | dict[str, Any]] = None,
+        fetch_k: int = 20,
+        **kwargs: Any,
+    ) -> List[List[Tuple[Document, float]]]:
+        """Search many query vectors in one index search, k can be given per query."""
+        limits = [k] * len(embeddings) if isinstance(k, int) else list(k)
+        # structured filters are resolved from the metadata index before scoring
+        condition = getattr(filter, "condition", None)
+        with self._lock:
+            ann = self._get_ann_index()
+            candidates, exact = (
+                self._get_metadata_index().select(condition) if condition else (None, False)
+            )
+            if ann is None and candidates is None:
+                return [
+                    super(MyFaiss, self).similarity_search_with_score_by_vector(
+                        list(embedding), k=limit, filter=filter, fetch_k=fetch_k, **kwargs
+                    )
+                    for embedding, limit in zip(embeddings, limits)
+                ]
+
+            vectors = np.array(embeddings, dtype=np.float32).reshape(len(limits), self.index.d)
+            if self._normalize_L2:
+                faiss.normalize_L2(vectors)
+            counts = [
+                limit if filter is None or exact else max(limit, fetch_k) for limit in limits
+            ]
+            count = max(counts, default=0)
+            if not count:
+                return [[] for _ in limits]
+            if ann is not None and (
+                candidates is None or len(candidates) >= memory_index.ANN_MIN_VECTORS
+            ):
+                found = ann.search_batch(vectors, count, candidates)
+            else:
+                positions = self._get_positions()
+                found = [
+                    [(self.index_to_docstore_id[pos], score) for pos, score in row]
+                    for row in memory_index.flat_search_batch(
+                        self.index,
+                        vectors,
+                        count,
+                        (positions[id] for id in candidates) if candidates is not None else None,
+                    )
+                ]
+            results = [
+                [(self.docstore._dict[id], score) for id, score in row[:row_count]]  # type: ignore
+                for row, row_count in zip(found, counts)
+            ]
+
+        filter_func = self._create_filter_func(filter) if filter is not None else None
+        score_threshold = kwargs.get("score_threshold")
+        cmp = (
+            operator.ge
+            if self.distance_strategy
+            in (DistanceStrategy.MAX_INNER_PRODUCT, DistanceStrategy.JACCARD)
+            else operator.le
+        )
+        for i, (docs, limit) in enumerate(zip(results, limits)):
+            if filter_func is not None:
+                docs = [(doc, score) for doc, score in docs if filter_func(doc.metadata)]
+            if score_threshold is not None:
+                docs = [(doc, score) for doc, score in docs if cmp(score, score_threshold)]
+            results[i] = docs[:limit]
+        return results
+
     # override aget_by_ids
     def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
         # return all self.docstore._dict[id] in ids
@@ -172,9 +427,9 @@ class Memory:
         created = False
 
         # if db folder exists and is not empty:
-        if os.path.exists(db_dir) and files.exists(db_dir, "index.faiss"):
+        if os.path.exists(db_dir) and memory_journal.has_snapshot(db_dir):
             db = MyFaiss.load_local(
-                folder_path=db_dir,
+                folder_path=memory_journal.snapshot_dir(db_dir),
                 embeddings=embedder,
                 allow_dangerous_deserialization=True,
                 distance_strategy=DistanceStrategy.COSINE,
@@ -182,6 +437,14 @@ class Memory:
                 relevance_score_fn=Memory._cosine_normalizer,
             )  # type: ignore
 
+            # re-apply mutations journaled since the last snapshot
+            journal = memory_journal.MemoryJournal(db_dir)
+            if journal.size:
+                replayed = db.replay_journal(journal.read())
+                if log_item and replayed:
+                    log_item.stream(progress=f"\nReplayed {replayed} journaled changes")
+            db.journal = journal
+
             # if there is a mismatch in embeddings used, re-index the whole DB
             emb_ok = False
             emb_set_file = files.get_abs_path(db_dir, "embedding.json")
@@ -220,6 +483,8 @@ class Memory:
                     log_item.stream(progress="\nIndexing memories")
                 db.add_documents(documents=list(docs.values()), ids=list(docs.keys()))
 
+            db.journal = memory_journal.MemoryJournal(db_dir)
+
             # save DB
             Memory._save_db_file(db, memory_subdir)
             # save meta file
@@ -236,6 +501,7 @@ class Memory:
 
             created = True
 
+        db.journal_ops = []
         return db, created
 
     def __init__(
@@ -245,6 +511,9 @@ class Memory:
     ):
         self.db = db
         self.memory_subdir = memory_subdir
+        self.db.set_index_type(
+            settings.get_settings_snapshot().get("memory_index_type", "flat")
+        )
 
     async def preload_knowledge(
         self, log_item: LogItem | None, kn_dirs: list[str], memory_subdir: str
@@ -270,17 +539,31 @@ class Memory:
         # preload knowledge folders
         index = self._preload_knowledge_folders(log_item, kn_dirs, index)
 
+        # remove original versions of knowledge files that have been changed or removed
+        stale_ids = [
+            id
+            for file in index
+            if index[file]["state"] in ["changed", "removed"]
+            for id in index[file].get("ids", [])
+        ]
+        if stale_ids:
+            await self.delete_documents_by_ids(stale_ids)
+
+        # insert new versions, embedding chunks of all changed files in batches
+        pending = []
         for file in index:
-            if index[file]["state"] in ["changed", "removed"] and index[file].get(
-                "ids", []
-            ):  # for knowledge files that have been changed or removed and have IDs
-                await self.delete_documents_by_ids(
-                    index[file]["ids"]
-                )  # remove original version
             if index[file]["state"] == "changed":
-                index[file]["ids"] = await self.insert_documents(
-                    index[file]["documents"]
-                )  # insert new version
+                index[file]["ids"] = []
+                pending += [(file, doc) for doc in index[file]["documents"]]
+        for start in range(0, len(pending), KNOWLEDGE_INSERT_BATCH):
+            batch = pending[start : start + KNOWLEDGE_INSERT_BATCH]
+            ids = await self.insert_documents([doc for _file, doc in batch])
+            for (file, _doc), id in zip(batch, ids):
+                index[file]["ids"].append(id)
+            if log_item and len(pending) > KNOWLEDGE_INSERT_BATCH:
+                log_item.stream(
+                    progress=f"\nEmbedded {start + len(batch)}/{len(pending)} knowledge chunks"
+                )
 
         # remove index where state="removed"
         index = {k: v for k, v in index.items() if v["state"] != "removed"}
@@ -340,6 +623,37 @@ class Memory:
             filter=comparator,
         )
 
+    async def embed_texts(self, texts: list[str]) -> np.ndarray:
+        """Embed texts as search queries, concurrently, one row per text."""
+        assert self.db.embeddings
+        # embedded like asearch does, as queries and without the document cache
+        vectors = await asyncio.gather(
+            *(self.db.embeddings.aembed_query(text) for text in texts)
+        )
+        return np.array(vectors, dtype=np.float32).reshape(len(texts), self.db.index.d)
+
+    async def search_similarity_threshold_by_vectors(
+        self, vectors: np.ndarray, limits: list[int], threshold: float, filter: str = ""
+    ) -> list[list[Document]]:
+        """search_similarity_threshold for many embedded queries in one index search."""
+        comparator = Memory._get_comparator(filter) if filter else None
+        results = await asyncio.to_thread(
+            self.db.similarity_search_with_score_by_vectors,
+            vectors.tolist(),
+            k=limits,
+            filter=comparator,
+        )
+        relevance = self.db._select_relevance_score_fn()
+        return [
+            [doc for doc, score in found if relevance(score) >= threshold]
+            for found in results
+        ]
+
+    def relevance_scores(self, vectors: np.ndarray, others: np.ndarray) -> np.ndarray:
+        """Relevance scores (as compared to search thresholds) of every vector to every other."""
+        relevance = self.db._select_relevance_score_fn()
+        return np.vectorize(relevance, otypes=[float])(vectors @ others.T)
+
     async def delete_documents_by_query(
         self, query: str, threshold: float, filter: str = ""
     ):
@@ -415,7 +729,15 @@ class Memory:
         return ins
 
     def _save_db(self):
-        Memory._save_db_file(self.db, self.memory_subdir)
+        db = self.db
+        if db.journal is None or db.journal_ops is None:
+            return Memory._save_db_file(db, self.memory_subdir)
+        # append this batch of changes to the journal instead of rewriting the snapshot
+        with db._lock:
+            operations, db.journal_ops = db.journal_ops, []
+            db.journal.append(operations)
+        if db.journal.needs_compaction():
+            Memory._compact_in_background(db, self.memory_subdir)
 
     def _generate_doc_id(self):
         while True:
@@ -426,7 +748,37 @@ class Memory:
     @staticmethod
     def _save_db_file(db: MyFaiss, memory_subdir: str):
         abs_dir = abs_db_dir(memory_subdir)
-        db.save_local(folder_path=abs_dir)
+        with db._lock:
+            memory_journal.write_snapshot(abs_dir, *memory_journal.snapshot_state(db))
+            # the snapshot now contains everything journaled so far
+            if db.journal_ops is not None:
+                db.journal_ops = []
+            if db.journal is not None:
+                db.journal.discard()
+
+    @staticmethod
+    def _compact_in_background(db: MyFaiss, memory_subdir: str):
+        journal = db.journal
+        if journal is None or journal.compacting:
+            return
+        journal.compacting = True
+
+        def compact():
+            try:
+                # serialize under lock, write files without blocking memory operations
+                with db._lock:
+                    index_bytes, state_bytes = memory_journal.snapshot_state(db)
+                    journaled = journal.size
+                memory_journal.write_snapshot(
+                    abs_db_dir(memory_subdir), index_bytes, state_bytes
+                )
+                journal.discard(journaled)
+            except Exception as e:
+                PrintStyle.error(f"Memory journal compaction failed: {e}")
+            finally:
+                journal.compacting = False
+
+        threading.Thread(target=compact, name="MemoryCompaction", daemon=True).start()
 
     @staticmethod
     def _get_comparator(condition: str):
@@ -438,6 +790,8 @@ class Memory:
                 PrintStyle.error(f"Error evaluating condition: {e}")
                 return False
 
+        # lets MyFaiss resolve the condition from its metadata index
+        comparator.condition = condition  # type: ignore
         return comparator
 
     @staticmethod
@@ -545,9 +899,7 @@ def get_existing_memory_subdirs() -> list[str]:
 
         project_subdirs = files.get_subdirectories(get_projects_parent_folder())
         for project_subdir in project_subdirs:
-            if files.exists(
-                get_project_meta_folder(project_subdir), "memory", "index.faiss"
-            ):
+            if memory_journal.has_snapshot(get_project_meta_folder(project_subdir, "memory")):
                 subdirs.append(f"projects/{project_subdir}")
 
         # Ensure 'default' is always available
@@ -34,7 +34,11 @@ class ConsolidationConfig:
     max_llm_context_memories: int = 5
     keyword_extraction_sys_prompt: str = "memory.keyword_extraction.sys.md"
     keyword_extraction_msg_prompt: str = "memory.keyword_extraction.msg.md"
+    keyword_extraction_batch_sys_prompt: str = "memory.keyword_extraction_batch.sys.md"
+    keyword_extraction_batch_msg_prompt: str = "memory.keyword_extraction_batch.msg.md"
     processing_timeout_seconds: int = 60
+    # Maximum LLM consolidation analyses running at once when processing a batch
+    max_concurrent_analyses: int = 4
     # Add safety threshold for REPLACE actions
     replace_similarity_threshold: float = 0.9  # Higher threshold for replacement safety
 
@@ -60,6 +64,17 @@ class MemoryAnalysisContext:
     existing_metadata: Dict[str, Any]
 
 
+@dataclass
+class MemorySearchResult:
+    """Similarity search results of one memory of a batch."""
+    all_similar: List[Document]
+    query_vectors: Any  # np.ndarray, first row is the memory itself
+
+    @property
+    def candidate_ids(self) -> set:
+        return {doc.metadata.get('id') for doc in self.all_similar if doc.metadata.get('id')}
+
+
 class MemoryConsolidator:
     """
     Intelligent memory consolidation system that uses LLM analysis to determine
@@ -109,6 +124,120 @@ class MemoryConsolidator:
             PrintStyle().error(f"Memory consolidation error for area {area}: {str(e)}")
             return {"success": False, "memory_ids": []}
 
+    async def process_new_memories(
+        self,
+        new_memories: List[str],
+        area: str,
+        metadata: Dict[str, Any],
+        log_item: Optional[LogItem] = None
+    ) -> List[dict]:
+        """
+        Process a batch of new memories through the consolidation pipeline.
+
+        Keywords of all memories are extracted in one utility LLM call, their similarity
+        searches run as one vectorized index search and LLM analyses run concurrently.
+        A memory related to an earlier one of the batch (similar to it, or sharing similar
+        memories with it) waits until the earlier one is applied and is searched again,
+        so decisions are the same as processing the memories one by one.
+
+        Args:
+            new_memories: The new memory contents to process, in order
+            area: Memory area (MAIN, FRAGMENTS, SOLUTIONS)
+            metadata: Initial metadata for each memory
+            log_item: Optional log item for progress tracking
+
+        Returns:
+            list: {"success": bool, "memory_ids": [str, ...]} for each memory
+        """
+        results = [{"success": False, "memory_ids": []} for _ in new_memories]
+        if not new_memories:
+            return results
+
+        try:
+            if log_item:
+                log_item.update(progress=f"Extracting keywords for {len(new_memories)} memories...")
+            keywords = await self._extract_search_keywords_batch(new_memories, log_item)
+
+            semaphore = asyncio.Semaphore(self.config.max_concurrent_analyses)
+            pending = list(range(len(new_memories)))
+            while pending:
+                db = await Memory.get(self.agent)
+                found = await self._find_similar_memories_batch(
+                    db,
+                    [new_memories[i] for i in pending],
+                    [keywords[i] for i in pending],
+                    area
+                )
+
+                # memories related to an earlier pending memory wait for the next round
+                ready, deferred = [], []
+                for position, index in enumerate(pending):
+                    if any(
+                        self._is_related(db, found[position], found[earlier])
+                        for earlier in range(position)
+                    ):
+                        deferred.append(index)
+                    else:
+                        ready.append((index, found[position]))
+
+                if log_item:
+                    log_item.update(
+                        progress=f"Consolidating {len(ready)} memories, {len(deferred)} waiting for related memories..."
+                    )
+
+                # similarity estimates are written to the documents, select them just before analysis
+                processed = await asyncio.gather(*[
+                    self._consolidate_with_timeout(
+                        semaphore,
+                        new_memories[index],
+                        self._select_similar_memories(result.all_similar),
+                        area,
+                        dict(metadata),
+                        log_item
+                    )
+                    for index, result in ready
+                ])
+                for (index, _), result in zip(ready, processed):
+                    results[index] = result
+                pending = deferred
+
+        except Exception as e:
+            PrintStyle().error(f"Memory batch consolidation error for area {area}: {str(e)}")
+
+        return results
+
+    def _is_related(self, db: Memory, result: MemorySearchResult, earlier: MemorySearchResult) -> bool:
+        """Whether applying the earlier memory could change the consolidation of this one."""
+        if result.candidate_ids & earlier.candidate_ids:
+            return True
+        # the earlier memory, once inserted, would be found by the searches of this one
+        scores = db.relevance_scores(result.query_vectors, earlier.query_vectors[:1])
+        return bool((scores >= self.config.similarity_threshold).any())
+
+    async def _consolidate_with_timeout(
+        self,
+        semaphore: asyncio.Semaphore,
+        new_memory: str,
+        similar_memories: List[Document],
+        area: str,
+        metadata: Dict[str, Any],
+        log_item: Optional[LogItem] = None
+    ) -> dict:
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(
+                    self._consolidate_similar_memories(new_memory, similar_memories, area, metadata, log_item),
+                    timeout=self.config.processing_timeout_seconds
+                )
+
+            except asyncio.TimeoutError:
+                PrintStyle().error(f"Memory consolidation timeout for area {area}")
+                return {"success": False, "memory_ids": []}
+
+            except Exception as e:
+                PrintStyle().error(f"Memory consolidation error for area {area}: {str(e)}")
+                return {"success": False, "memory_ids": []}
+
     async def _process_memory_with_consolidation(
         self,
         new_memory: str,
@@ -124,6 +253,18 @@ class MemoryConsolidator:
         # Step 1: Discover similar memories
         similar_memories = await self._find_similar_memories(new_memory, area, log_item)
 
+        return await self._consolidate_similar_memories(new_memory, similar_memories, area, metadata, log_item)
+
+    async def _consolidate_similar_memories(
+        self,
+        new_memory: str,
+        similar_memories: List[Document],
+        area: str,
+        metadata: Dict[str, Any],
+        log_item: Optional[LogItem] = None
+    ) -> dict:
+        """Consolidate a new memory with the similar memories found for it."""
+
         # this block always returns
         if not similar_memories:
             # No similar memories found, insert directly
@@ -334,29 +475,62 @@ class MemoryConsolidator:
         # Step 1: Extract keywords/queries for enhanced search
         search_queries = await self._extract_search_keywords(new_memory, log_item)
 
+        # Step 2: Semantic similarity search and keyword-based searches
         all_similar = []
+        for query, limit in self._get_search_queries(new_memory, search_queries):
+            all_similar.extend(await db.search_similarity_threshold(
+                query=query,
+                limit=limit,
+                threshold=self.config.similarity_threshold,
+                filter=f"area == '{area}'"
+            ))
+
+        return self._select_similar_memories(all_similar)
 
-        # Step 2: Semantic similarity search with scores
-        semantic_similar = await db.search_similarity_threshold(
-            query=new_memory,
-            limit=self.config.max_similar_memories,
+    async def _find_similar_memories_batch(
+        self,
+        db: Memory,
+        new_memories: List[str],
+        search_queries: List[List[str]],
+        area: str
+    ) -> List[MemorySearchResult]:
+        """Run the similarity searches of multiple memories as one vectorized index search."""
+
+        plans = [
+            self._get_search_queries(new_memory, queries)
+            for new_memory, queries in zip(new_memories, search_queries)
+        ]
+        vectors = await db.embed_texts([query for plan in plans for query, _ in plan])
+        found = await db.search_similarity_threshold_by_vectors(
+            vectors,
+            limits=[limit for plan in plans for _, limit in plan],
             threshold=self.config.similarity_threshold,
             filter=f"area == '{area}'"
         )
-        all_similar.extend(semantic_similar)
 
-        # Step 3: Keyword-based searches
+        results = []
+        offset = 0
+        for plan in plans:
+            rows = slice(offset, offset + len(plan))
+            offset += len(plan)
+            results.append(MemorySearchResult(
+                all_similar=[doc for docs in found[rows] for doc in docs],
+                query_vectors=vectors[rows]
+            ))
+        return results
+
+    def _get_search_queries(self, new_memory: str, search_queries: List[str]) -> List[tuple]:
+        """Similarity search queries with their limits: the memory itself, then each keyword query."""
+        queries = [(new_memory, self.config.max_similar_memories)]
+        # Fix division by zero: ensure len(search_queries) > 0
+        queries_count = max(1, len(search_queries))  # Prevent division by zero
         for query in search_queries:
             if query.strip():
-                # Fix division by zero: ensure len(search_queries) > 0
-                queries_count = max(1, len(search_queries))  # Prevent division by zero
-                keyword_similar = await db.search_similarity_threshold(
-                    query=query.strip(),
-                    limit=max(3, self.config.max_similar_memories // queries_count),
-                    threshold=self.config.similarity_threshold,
-                    filter=f"area == '{area}'"
-                )
-                all_similar.extend(keyword_similar)
+                queries.append((query.strip(), max(3, self.config.max_similar_memories // queries_count)))
+        return queries
+
+    def _select_similar_memories(self, all_similar: List[Document]) -> List[Document]:
+        """Deduplicate search results, estimate their similarity and limit them for the LLM."""
 
         # Step 4: Deduplicate by document ID and store similarity info
         seen_ids = set()
@@ -433,13 +607,7 @@ class MemoryConsolidator:
 
             # Parse the response - expect JSON array of strings
             keywords_json = DirtyJson.parse_string(keywords_response.strip())
-
-            if isinstance(keywords_json, list):
-                return [str(k) for k in keywords_json if k]
-            elif isinstance(keywords_json, str):
-                return [keywords_json]
-            else:
-                return []
+            return self._parse_keywords(keywords_json)
 
         except Exception as e:
             PrintStyle().warning(f"Keyword extraction failed: {str(e)}")
@@ -452,6 +620,60 @@ class MemoryConsolidator:
                 fallback_content = first_sentence[:200] if len(first_sentence) <= 200 else new_memory[:200]
             return [fallback_content.strip()]
 
+    async def _extract_search_keywords_batch(
+        self,
+        new_memories: List[str],
+        log_item: Optional[LogItem] = None
+    ) -> List[List[str]]:
+        """Extract search keywords/queries for multiple memories in one utility LLM call."""
+
+        if len(new_memories) == 1:
+            return [await self._extract_search_keywords(new_memories[0], log_item)]
+
+        try:
+            system_prompt = self.agent.read_prompt(
+                self.config.keyword_extraction_batch_sys_prompt,
+            )
+
+            memories_text = "\n\n".join(
+                f"**Memory {i + 1}:**\n{memory}" for i, memory in enumerate(new_memories)
+            )
+            message_prompt = self.agent.read_prompt(
+                self.config.keyword_extraction_batch_msg_prompt,
+                memories=memories_text
+            )
+
+            keywords_response = await self.agent.call_utility_model(
+                system=system_prompt,
+                message=message_prompt,
+                background=True
+            )
+
+            # Parse the response - expect JSON array with one array of strings per memory
+            keywords_json = DirtyJson.parse_string(keywords_response.strip())
+            if (
+                not isinstance(keywords_json, list)
+                or len(keywords_json) != len(new_memories)
+                or not all(isinstance(keywords, list) for keywords in keywords_json)
+            ):
+                raise ValueError("Response does not contain one keyword list per memory")
+            return [self._parse_keywords(keywords) for keywords in keywords_json]
+
+        except Exception as e:
+            PrintStyle().warning(f"Batch keyword extraction failed, extracting per memory: {str(e)}")
+            return list(await asyncio.gather(*[
+                self._extract_search_keywords(new_memory, log_item) for new_memory in new_memories
+            ]))
+
+    @staticmethod
+    def _parse_keywords(keywords_json: Any) -> List[str]:
+        if isinstance(keywords_json, list):
+            return [str(k) for k in keywords_json if k]
+        elif isinstance(keywords_json, str):
+            return [keywords_json]
+        else:
+            return []
+
     async def _analyze_memory_consolidation(
         self,
         context: MemoryAnalysisContext,
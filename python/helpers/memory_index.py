@@ -0,0 +1,340 @@
+import ast
+import bisect
+import math
+import operator
+import threading
+from typing import Any, Callable, Iterable
+
+import numpy as np
+
+# faiss needs to be patched for python 3.12 on arm #TODO remove once not needed
+from python.helpers import faiss_monkey_patch
+import faiss
+
+# metadata fields kept in the inverted index
+INDEXED_FIELDS = ("area", "knowledge_source", "timestamp")
+
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+
+# below this number of vectors (or filtered candidates) the exact flat index is used
+ANN_MIN_VECTORS = 10000
+# IVF is re-clustered when the store grows or shrinks by this factor since training
+IVF_RETRAIN_FACTOR = 2.0
+IVF_MAX_TRAINING_VECTORS = 100000
+# HNSW cannot remove vectors, it is rebuilt when this share of them is deleted
+HNSW_MAX_DELETED_RATIO = 0.2
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 80
+
+
+class MetadataIndex:
+    """
+    Inverted index over selected metadata fields of documents.
+    Resolves simple filter conditions (the ones used with simple_eval) to the set
+    of matching document ids without evaluating each document.
+    """
+
+    def __init__(self, fields: Iterable[str] = INDEXED_FIELDS):
+        self.fields = tuple(fields)
+        self._values: dict[str, dict[Any, set[str]]] = {f: {} for f in self.fields}
+        self._sorted_keys: dict[str, list | None] = {f: None for f in self.fields}
+        self._unhashable: dict[str, set[str]] = {f: set() for f in self.fields}
+        self._docs: dict[str, dict[str, Any]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, doc_id: str, metadata: dict[str, Any]):
+        with self._lock:
+            self.remove(doc_id)
+            indexed = {}
+            for field in self.fields:
+                if field not in metadata:
+                    continue
+                value = metadata[field]
+                indexed[field] = value
+                try:
+                    bucket = self._values[field].get(value)
+                except TypeError:
+                    self._unhashable[field].add(doc_id)
+                    continue
+                if bucket is None:
+                    self._values[field][value] = bucket = set()
+                    self._sorted_keys[field] = None
+                bucket.add(doc_id)
+            self._docs[doc_id] = indexed
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            indexed = self._docs.pop(doc_id, None)
+            if indexed is None:
+                return
+            for field, value in indexed.items():
+                self._unhashable[field].discard(doc_id)
+                try:
+                    bucket = self._values[field].get(value)
+                except TypeError:
+                    continue
+                if bucket is not None:
+                    bucket.discard(doc_id)
+                    if not bucket:
+                        del self._values[field][value]
+                        self._sorted_keys[field] = None
+
+    def select(self, condition: str) -> tuple[set[str] | None, bool]:
+        """
+        Returns (ids, exact). ids is None when the condition cannot be resolved
+        from the index, exact tells whether ids match the condition precisely or
+        are only a superset of candidates.
+        """
+        try:
+            tree = ast.parse(condition.strip(), mode="eval").body
+        except SyntaxError:
+            return None, False
+        with self._lock:
+            return self._select(tree)
+
+    def _select(self, node: ast.AST) -> tuple[set[str] | None, bool]:
+        if isinstance(node, ast.BoolOp):
+            parts = [self._select(value) for value in node.values]
+            if isinstance(node.op, ast.And):
+                resolved = [ids for ids, _exact in parts if ids is not None]
+                if not resolved:
+                    return None, False
+                ids = set.intersection(*sorted(resolved, key=len))
+                return ids, all(exact for _ids, exact in parts)
+            if any(ids is None for ids, _exact in parts):
+                return None, False
+            return set().union(*(ids for ids, _exact in parts)), all(  # type: ignore
+                exact for _ids, exact in parts
+            )
+
+        if isinstance(node, ast.Name) and node.id in self.fields:
+            if self._unhashable[node.id]:
+                return None, False
+            return self._match(node.id, lambda key: bool(key)), True
+
+        if isinstance(node, ast.Compare) and len(node.ops) == 1:
+            left, op, right = node.left, node.ops[0], node.comparators[0]
+            if isinstance(right, ast.Name) and not isinstance(left, ast.Name):
+                left, right = right, left
+                op = _REVERSED_OPS.get(type(op), op)
+            if not isinstance(left, ast.Name) or left.id not in self.fields:
+                return None, False
+            if self._unhashable[left.id]:
+                return None, False
+            try:
+                value = ast.literal_eval(right)
+            except (ValueError, TypeError, SyntaxError):
+                return None, False
+            return self._compare(left.id, op, value)
+
+        return None, False
+
+    def _compare(self, field: str, op: ast.cmpop, value: Any) -> tuple[set[str] | None, bool]:
+        values = self._values[field]
+        if isinstance(op, ast.Eq):
+            try:
+                return set(values.get(value, ())), True
+            except TypeError:
+                return None, False
+        if isinstance(op, ast.NotEq):
+            return self._match(field, lambda key: key != value), True
+        compare = _RANGE_OPS.get(type(op))
+        if compare is None:
+            return None, False
+        keys = self._get_sorted_keys(field)
+        if keys is None:
+            return self._match(field, lambda key: compare(key, value)), True
+        try:
+            if isinstance(op, (ast.Gt, ast.GtE)):
+                start = (bisect.bisect_right if isinstance(op, ast.Gt) else bisect.bisect_left)(keys, value)
+                selected = keys[start:]
+            else:
+                end = (bisect.bisect_left if isinstance(op, ast.Lt) else bisect.bisect_right)(keys, value)
+                selected = keys[:end]
+        except TypeError:
+            return self._match(field, lambda key: compare(key, value)), True
+        result: set[str] = set()
+        for key in selected:
+            result |= values[key]
+        return result, True
+
+    def _match(self, field: str, predicate: Callable[[Any], Any]) -> set[str]:
+        result: set[str] = set()
+        for key, ids in self._values[field].items():
+            try:
+                matched = predicate(key)
+            except Exception:
+                matched = False  # same as a failing comparator
+            if matched:
+                result |= ids
+        return result
+
+    def _get_sorted_keys(self, field: str) -> list | None:
+        keys = self._sorted_keys[field]
+        if keys is None:
+            try:
+                keys = sorted(self._values[field])
+            except TypeError:
+                return None  # mixed types, compare key by key
+            self._sorted_keys[field] = keys
+        return keys
+
+
+_REVERSED_OPS = {
+    ast.Lt: ast.Gt(),
+    ast.LtE: ast.GtE(),
+    ast.Gt: ast.Lt(),
+    ast.GtE: ast.LtE(),
+}
+
+_RANGE_OPS: dict[type, Callable[[Any, Any], bool]] = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+
+
+class AnnIndex:
+    """
+    Approximate inner-product index (IVF or HNSW) over a subset of documents,
+    addressed by document id. Built from vectors of the exact flat index.
+    """
+
+    def __init__(self, index_type: str, dimension: int):
+        if index_type not in ("ivf", "hnsw"):
+            raise ValueError(f"Unsupported ANN index type: {index_type}")
+        self.index_type = index_type
+        self.dimension = dimension
+        self.index: Any = None
+        self.trained_size = 0
+        self._labels: dict[str, int] = {}
+        self._doc_ids: dict[int, str] = {}
+        self._deleted: set[int] = set()
+        self._next_label = 0
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def build(self, vectors: np.ndarray, doc_ids: list[str]):
+        count = len(doc_ids)
+        if self.index_type == "ivf":
+            nlist = max(1, int(4 * math.sqrt(count)))
+            quantizer = faiss.IndexFlatIP(self.dimension)
+            index = faiss.IndexIVFFlat(
+                quantizer, self.dimension, nlist, faiss.METRIC_INNER_PRODUCT
+            )
+            if count > IVF_MAX_TRAINING_VECTORS:
+                sample = np.random.default_rng(0).choice(
+                    count, IVF_MAX_TRAINING_VECTORS, replace=False
+                )
+                index.train(vectors[sample])
+            else:
+                index.train(vectors)
+            index.nprobe = max(8, nlist // 16)
+            # keep quantizer referenced alongside the index
+            index._quantizer = quantizer  # type: ignore
+        else:
+            index = faiss.IndexHNSWFlat(self.dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        self.index = index
+        self.trained_size = count
+        self._labels = {}
+        self._doc_ids = {}
+        self._deleted = set()
+        self._next_label = 0
+        self.add(vectors, doc_ids)
+
+    def add(self, vectors: np.ndarray, doc_ids: list[str]):
+        if not doc_ids:
+            return
+        labels = np.arange(self._next_label, self._next_label + len(doc_ids), dtype=np.int64)
+        self._next_label += len(doc_ids)
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if self.index_type == "ivf":
+            self.index.add_with_ids(vectors, labels)
+        else:
+            self.index.add(vectors)  # HNSW labels are insertion positions
+        for doc_id, label in zip(doc_ids, labels.tolist()):
+            self._labels[doc_id] = label
+            self._doc_ids[label] = doc_id
+
+    def remove(self, doc_ids: Iterable[str]):
+        labels = [self._labels.pop(doc_id) for doc_id in doc_ids if doc_id in self._labels]
+        if not labels:
+            return
+        for label in labels:
+            del self._doc_ids[label]
+        if self.index_type == "ivf":
+            self.index.remove_ids(np.array(labels, dtype=np.int64))
+        else:
+            self._deleted.update(labels)
+
+    def needs_rebuild(self, size: int) -> bool:
+        if self.index is None:
+            return True
+        if self.index_type == "ivf":
+            return (
+                size > self.trained_size * IVF_RETRAIN_FACTOR
+                or size * IVF_RETRAIN_FACTOR < self.trained_size
+            )
+        return len(self._deleted) > HNSW_MAX_DELETED_RATIO * max(1, self.index.ntotal)
+
+    def search_batch(
+        self, vectors: np.ndarray, k: int, doc_ids: set[str] | None = None
+    ) -> list[list[tuple[str, float]]]:
+        """Search all query vectors (rows) at once, returns results per row."""
+        selector = None
+        if doc_ids is not None:
+            allowed = [self._labels[doc_id] for doc_id in doc_ids if doc_id in self._labels]
+            if not allowed:
+                return [[] for _ in range(len(vectors))]
+            selector = faiss.IDSelectorBatch(np.array(allowed, dtype=np.int64))
+        elif self._deleted:
+            excluded = faiss.IDSelectorBatch(np.array(list(self._deleted), dtype=np.int64))
+            selector = faiss.IDSelectorNot(excluded)
+            selector._excluded = excluded  # type: ignore # keep alive
+
+        if self.index_type == "ivf":
+            params = faiss.SearchParametersIVF(nprobe=self.index.nprobe)
+        else:
+            params = faiss.SearchParametersHNSW(efSearch=max(64, 2 * k))
+        if selector is not None:
+            params.sel = selector
+        scores, labels = self.index.search(vectors, k, params=params)
+        return [
+            [
+                (self._doc_ids[label], float(score))
+                for score, label in zip(row_scores, row_labels)
+                if label in self._doc_ids
+            ]
+            for row_scores, row_labels in zip(scores.tolist(), labels.tolist())
+        ]
+
+
+def flat_search_batch(
+    index: Any, vectors: np.ndarray, k: int, positions: Iterable[int] | None = None
+) -> list[list[tuple[int, float]]]:
+    """
+    Exact search of all query vectors (rows) over the flat index in one call, optionally
+    restricted to given positions. Returns results per row.
+    """
+    params = None
+    if positions is not None:
+        selected = np.fromiter(positions, dtype=np.int64)
+        if not len(selected):
+            return [[] for _ in range(len(vectors))]
+        k = min(k, len(selected))
+        params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(selected))
+    scores, indices = index.search(vectors, k, params=params)
+    return [
+        [
+            (position, float(score))
+            for score, position in zip(row_scores, row_positions)
+            if position != -1
+        ]
+        for row_scores, row_positions in zip(scores.tolist(), indices.tolist())
+    ]
@@ -0,0 +1,170 @@
+import os
+import pickle
+import shutil
+import struct
+import threading
+import time
+import zlib
+from typing import Any
+
+# faiss needs to be patched for python 3.12 on arm #TODO remove once not needed
+from python.helpers import faiss_monkey_patch
+import faiss
+
+JOURNAL_FILE = "journal.bin"
+# snapshots are written to numbered folders under SNAPSHOTS_DIR, the pointer file
+# names the current one so index.faiss and index.pkl are published together
+SNAPSHOTS_DIR = "snapshots"
+SNAPSHOT_POINTER = "snapshot.current"
+# compact the journal into a full snapshot when it grows over this size...
+JOURNAL_MAX_BYTES = 64 * 1024 * 1024
+# ...or when its oldest entry is older than this many seconds
+JOURNAL_MAX_AGE = 600
+
+# each record is: payload length, crc32 of payload, pickled list of operations
+_HEADER = struct.Struct("<II")
+
+_snapshot_lock = threading.Lock()
+
+
+class MemoryJournal:
+    """
+    Append-only journal of memory mutations stored next to the FAISS snapshot.
+    Each flushed batch is one checksummed record, a torn record at the end of the
+    file (crash during write) is ignored on replay.
+    """
+
+    def __init__(self, db_dir: str):
+        self.path = os.path.join(db_dir, JOURNAL_FILE)
+        self._lock = threading.Lock()
+        self._size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        self._started_at = time.time() if self._size else 0.0
+        self.compacting = False
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def append(self, operations: list[tuple]):
+        """Write one batch of operations and fsync it."""
+        if not operations:
+            return
+        payload = pickle.dumps(operations, protocol=pickle.HIGHEST_PROTOCOL)
+        record = _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        with self._lock:
+            with open(self.path, "ab") as f:
+                f.write(record)
+                f.flush()
+                os.fsync(f.fileno())
+            if not self._size:
+                self._started_at = time.time()
+            self._size += len(record)
+
+    def read(self) -> list[tuple]:
+        """Return all operations from intact records, in order."""
+        operations: list[tuple] = []
+        with self._lock:
+            if not os.path.exists(self.path):
+                return operations
+            with open(self.path, "rb") as f:
+                data = f.read()
+        offset = 0
+        while offset + _HEADER.size <= len(data):
+            length, crc = _HEADER.unpack_from(data, offset)
+            payload = data[offset + _HEADER.size : offset + _HEADER.size + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                break  # torn write at the end of the journal
+            operations.extend(pickle.loads(payload))
+            offset += _HEADER.size + length
+        return operations
+
+    def needs_compaction(self) -> bool:
+        if not self._size or self.compacting:
+            return False
+        return (
+            self._size >= JOURNAL_MAX_BYTES
+            or time.time() - self._started_at >= JOURNAL_MAX_AGE
+        )
+
+    def discard(self, upto: int | None = None):
+        """Drop records already contained in a snapshot, keep anything appended after `upto`."""
+        with self._lock:
+            if upto is None or upto >= self._size:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                self._size = 0
+                self._started_at = 0.0
+                return
+            with open(self.path, "rb") as f:
+                f.seek(upto)
+                rest = f.read()
+            _write_file_synced(self.path, rest)
+            self._size = len(rest)
+            self._started_at = time.time()
+
+
+def snapshot_state(db: Any) -> tuple[bytes, bytes]:
+    """Serialize a FAISS store the same way FAISS.save_local does, without writing it."""
+    index_bytes = faiss.serialize_index(db.index).tobytes()
+    state_bytes = pickle.dumps((db.docstore, db.index_to_docstore_id))
+    return index_bytes, state_bytes
+
+
+def snapshot_dir(db_dir: str) -> str:
+    """Folder of the current snapshot, db_dir itself for snapshots saved before generations."""
+    try:
+        with open(os.path.join(db_dir, SNAPSHOT_POINTER), encoding="utf-8") as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return db_dir
+    return os.path.join(db_dir, SNAPSHOTS_DIR, name)
+
+
+def has_snapshot(db_dir: str) -> bool:
+    return os.path.exists(os.path.join(snapshot_dir(db_dir), "index.faiss"))
+
+
+def write_snapshot(folder_path: str, index_bytes: bytes, state_bytes: bytes):
+    """
+    Write serialized snapshot files (index.faiss and index.pkl) into a new
+    generation folder and publish both with one atomic rename of the pointer, a
+    crash never pairs a new index with an old docstore.
+    """
+    with _snapshot_lock:
+        current = snapshot_dir(folder_path)
+        generation = int(os.path.basename(current)) + 1 if current != folder_path else 1
+        name = f"{generation:08d}"
+        target = os.path.join(folder_path, SNAPSHOTS_DIR, name)
+        os.makedirs(target, exist_ok=True)
+        _write_file_synced(os.path.join(target, "index.faiss"), index_bytes)
+        _write_file_synced(os.path.join(target, "index.pkl"), state_bytes)
+        _fsync_dir(target)
+        _write_file_synced(os.path.join(folder_path, SNAPSHOT_POINTER), name.encode("utf-8"))
+        _fsync_dir(folder_path)
+
+        # older generations and files from before generations are unreferenced now
+        for old in os.listdir(os.path.join(folder_path, SNAPSHOTS_DIR)):
+            if old != name:
+                shutil.rmtree(os.path.join(folder_path, SNAPSHOTS_DIR, old), ignore_errors=True)
+        for legacy in ("index.faiss", "index.pkl"):
+            try:
+                os.remove(os.path.join(folder_path, legacy))
+            except FileNotFoundError:
+                pass
+
+
+def _write_file_synced(path: str, data: bytes):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _fsync_dir(path: str):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
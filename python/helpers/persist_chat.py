@@ -1,9 +1,12 @@
 from collections import OrderedDict
 from datetime import datetime
+import os
+import threading
 from typing import Any
 import uuid
 from agent import Agent, AgentConfig, AgentContext, AgentContextType
-from python.helpers import files, history
+from python.helpers import chat_journal, files, history
+from python.helpers.print_style import PrintStyle
 import json
 from initialize import initialize_agent
 
@@ -13,6 +16,21 @@ CHATS_FOLDER = "usr/chats"
 LOG_SIZE = 1000
 CHAT_FILE_NAME = "chat.json"
 
+# per chat journal and what was persisted so far, by context id
+_chat_states: dict[str, "_ChatState"] = {}
+_chat_states_lock = threading.Lock()
+
+
+class _ChatState:
+    def __init__(self, ctxid: str):
+        self.lock = threading.RLock()
+        self.journal = chat_journal.ChatJournal(_get_chat_journal_path(ctxid))
+        # bumped on every full save, a compaction started before it is dropped
+        self.generation = 0
+        self.fields: str | None = None
+        self.agents: list[dict[str, Any]] = []
+        self.log: tuple[str, int, str, int] | None = None
+
 
 def get_chat_folder_path(ctxid: str):
     """
@@ -35,11 +53,17 @@ def save_tmp_chat(context: AgentContext):
     if context.type == AgentContextType.BACKGROUND:
         return
 
-    path = _get_chat_file_path(context.id)
-    files.make_dirs(path)
-    data = _serialize_context(context)
-    js = _safe_json_serialize(data, ensure_ascii=False)
-    files.write_file(path, js)
+    state = _get_chat_state(context.id)
+    with state.lock:
+        operations = None
+        if state.log is not None and os.path.exists(_get_chat_file_path(context.id)):
+            operations = _get_journal_operations(context, state)
+        if operations is None:
+            _save_full_chat(context, state)
+        elif operations:
+            state.journal.append(_safe_json_serialize(operations, ensure_ascii=False))
+            if state.journal.needs_compaction():
+                _start_compaction(context.id, state)
 
 
 def save_tmp_chats():
@@ -64,6 +88,11 @@ def load_tmp_chats():
         try:
             js = files.read_file(file)
             data = json.loads(js)
+            # replay changes journaled since chat.json was last written
+            journal_path = os.path.join(os.path.dirname(file), chat_journal.JOURNAL_FILE_NAME)
+            if os.path.exists(journal_path):
+                operations, _ = chat_journal.ChatJournal(journal_path).read()
+                data = chat_journal.apply_operations(data, operations, LOG_SIZE)
             ctx = _deserialize_context(data)
             ctxids.append(ctx.id)
         except Exception as e:
@@ -75,6 +104,206 @@ def _get_chat_file_path(ctxid: str):
     return files.get_abs_path(CHATS_FOLDER, ctxid, CHAT_FILE_NAME)
 
 
+def _get_chat_journal_path(ctxid: str):
+    return files.get_abs_path(CHATS_FOLDER, ctxid, chat_journal.JOURNAL_FILE_NAME)
+
+
+def _get_chat_state(ctxid: str) -> _ChatState:
+    with _chat_states_lock:
+        state = _chat_states.get(ctxid)
+        if state is None:
+            state = _chat_states[ctxid] = _ChatState(ctxid)
+        return state
+
+
+def _save_full_chat(context: AgentContext, state: _ChatState):
+    path = _get_chat_file_path(context.id)
+    files.make_dirs(path)
+    log_mark = _mark_log(context.log)  # taken first, later updates are journaled again
+    data = _serialize_context(context)
+    js = _safe_json_serialize(data, ensure_ascii=False)
+    _write_file_atomic(path, js)
+    state.journal.discard()
+    state.generation += 1
+    state.fields = _safe_json_serialize(_serialize_context_fields(context), ensure_ascii=False)
+    state.agents = [_mark_agent(agent) for agent in _get_agents(context)]
+    state.log = log_mark
+
+
+def _get_journal_operations(context: AgentContext, state: _ChatState) -> list[dict] | None:
+    """Operations bringing the saved chat up to date, None when a full save is simpler."""
+    operations: list[dict] = []
+
+    fields = _serialize_context_fields(context)
+    fields_js = _safe_json_serialize(fields, ensure_ascii=False)
+    if fields_js != state.fields:
+        operations.append({"op": "context", "fields": fields})
+        state.fields = fields_js
+
+    agents = _get_agents(context)
+    if len(agents) != len(state.agents) or any(
+        agent is not mark["agent"] for agent, mark in zip(agents, state.agents)
+    ):
+        # subordinates were added or replaced
+        operations.append(
+            {"op": "agents", "agents": [_serialize_agent(agent) for agent in agents]}
+        )
+        state.agents = [_mark_agent(agent) for agent in agents]
+    else:
+        for index, (agent, mark) in enumerate(zip(agents, state.agents)):
+            operations.extend(_get_agent_operations(index, agent, mark))
+            state.agents[index] = _mark_agent(agent)
+
+    log_op, state.log = _get_log_operation(context.log, state.log)  # type: ignore[arg-type]
+    if log_op:
+        operations.append(log_op)
+    return operations
+
+
+def _get_agents(context: AgentContext) -> list[Agent]:
+    agents = []
+    agent = context.agent0
+    while agent:
+        agents.append(agent)
+        agent = agent.data.get(Agent.DATA_NAME_SUBORDINATE, None)
+    return agents
+
+
+def _mark_agent(agent: Agent) -> dict[str, Any]:
+    hist = agent.history
+    return {
+        "agent": agent,
+        "data": _safe_json_serialize(_serialize_agent_data(agent), ensure_ascii=False),
+        "history": hist,
+        "counter": hist.counter,
+        "bulks": _mark_records(hist.bulks),
+        "topics": _mark_records(hist.topics),
+        "current": hist.current,
+        "summary": hist.current.summary,
+        "messages": _mark_records(hist.current.messages),
+    }
+
+
+def _mark_records(records: list) -> tuple[list, int, int]:
+    return records, getattr(records, "version", -1), len(records)
+
+
+def _appended_records(records: list, mark: tuple[list, int, int]) -> list | None:
+    """Records added since the mark, None when the list was replaced or edited otherwise."""
+    marked, version, length = mark
+    if records is not marked or version < 0 or getattr(records, "version", -1) != version:
+        return None
+    if len(records) < length:
+        return None
+    return records[length:]
+
+
+def _get_agent_operations(index: int, agent: Agent, mark: dict[str, Any]) -> list[dict]:
+    operations: list[dict] = []
+
+    data = _serialize_agent_data(agent)
+    data_js = _safe_json_serialize(data, ensure_ascii=False)
+    if data_js != mark["data"]:
+        operations.append({"op": "agent", "agent": index, "data": data})
+
+    hist = agent.history
+    if hist is not mark["history"]:
+        operations.append({"op": "history", "agent": index, "history": hist.serialize()})
+        return operations
+
+    changes = []
+    for part in ("bulks", "topics"):
+        records = getattr(hist, part)
+        appended = _appended_records(records, mark[part])
+        if appended is None:
+            changes.append([part, "set", [r.to_dict() for r in records]])
+        elif appended:
+            changes.append([part, "append", [r.to_dict() for r in appended]])
+
+    current = hist.current
+    appended = None
+    if current is mark["current"] and current.summary == mark["summary"]:
+        appended = _appended_records(current.messages, mark["messages"])
+    if appended is None:
+        changes.append(["current", "set", current.to_dict()])
+    elif appended:
+        changes.append(["current", "append", [m.to_dict() for m in appended]])
+
+    if changes or hist.counter != mark["counter"]:
+        operations.append(
+            {"op": "history", "agent": index, "counter": hist.counter, "changes": changes}
+        )
+    return operations
+
+
+def _mark_log(log: Log) -> tuple[str, int, str, int]:
+    with log._lock:
+        return log.guid, len(log.updates), log.progress, log.progress_no
+
+
+def _get_log_operation(
+    log: Log, mark: tuple[str, int, str, int]
+) -> tuple[dict | None, tuple[str, int, str, int]]:
+    guid, updates, progress, progress_no = mark
+    with log._lock:
+        new_mark = (log.guid, len(log.updates), log.progress, log.progress_no)
+        reset = log.guid != guid or len(log.updates) < updates
+        if reset:
+            nos = range(max(0, len(log.logs) - LOG_SIZE), len(log.logs))
+        else:
+            nos = sorted(set(log.updates[updates:]))
+        items = [log.logs[no].output() for no in nos if no < len(log.logs)]
+    if not reset and not items and new_mark[2:] == (progress, progress_no):
+        return None, new_mark
+    op: dict[str, Any] = {
+        "op": "log",
+        "items": items,
+        "progress": new_mark[2],
+        "progress_no": new_mark[3],
+    }
+    if reset:
+        op["reset"] = True
+        op["guid"] = new_mark[0]
+    return op, new_mark
+
+
+def _start_compaction(ctxid: str, state: _ChatState):
+    state.journal.compacting = True
+
+    def compact():
+        try:
+            _compact_chat(ctxid, state)
+        except Exception as e:
+            PrintStyle.error(f"Chat journal compaction failed for {ctxid}: {e}")
+        finally:
+            state.journal.compacting = False
+
+    threading.Thread(target=compact, name="ChatCompaction", daemon=True).start()
+
+
+def _compact_chat(ctxid: str, state: _ChatState):
+    """Fold the journal into chat.json, off the event loop."""
+    path = _get_chat_file_path(ctxid)
+    with state.lock:
+        generation = state.generation
+        js = files.read_file(path)
+        operations, upto = state.journal.read()
+    data = chat_journal.apply_operations(json.loads(js), operations, LOG_SIZE)
+    js = _safe_json_serialize(data, ensure_ascii=False)
+    with state.lock:
+        # a full save or removal in the meantime already superseded this
+        if state.generation != generation or not os.path.exists(path):
+            return
+        _write_file_atomic(path, js)
+        state.journal.discard(upto)
+
+
+def _write_file_atomic(path: str, content: str):
+    tmp_path = path + ".tmp"
+    files.write_file(tmp_path, content)
+    os.replace(tmp_path, path)
+
+
 def _convert_v080_chats():
     json_files = files.list_files(CHATS_FOLDER, "*.json")
     for file in json_files:
@@ -105,8 +334,15 @@ def export_json_chat(context: AgentContext):
 
 def remove_chat(ctxid):
     """Remove a chat or task context"""
+    with _chat_states_lock:
+        state = _chat_states.pop(ctxid, None)
     path = get_chat_folder_path(ctxid)
-    files.delete_dir(path)
+    if state:
+        with state.lock:
+            state.generation += 1
+            files.delete_dir(path)
+    else:
+        files.delete_dir(path)
 
 
 def remove_msg_files(ctxid):
@@ -117,18 +353,21 @@ def remove_msg_files(ctxid):
 
 def _serialize_context(context: AgentContext):
     # serialize agents
-    agents = []
-    agent = context.agent0
-    while agent:
-        agents.append(_serialize_agent(agent))
-        agent = agent.data.get(Agent.DATA_NAME_SUBORDINATE, None)
+    agents = [_serialize_agent(agent) for agent in _get_agents(context)]
 
+    return {
+        "id": context.id,
+        **_serialize_context_fields(context),
+        "agents": agents,
+        "log": _serialize_log(context.log),
+    }
 
+
+def _serialize_context_fields(context: AgentContext):
     data = {k: v for k, v in context.data.items() if not k.startswith("_")}
     output_data = {k: v for k, v in context.output_data.items() if not k.startswith("_")}
 
     return {
-        "id": context.id,
         "name": context.name,
         "created_at": (
             context.created_at.isoformat()
@@ -141,18 +380,16 @@ def _serialize_context(context: AgentContext):
             if context.last_message
             else datetime.fromtimestamp(0).isoformat()
         ),
-        "agents": agents,
         "streaming_agent": (
             context.streaming_agent.number if context.streaming_agent else 0
         ),
-        "log": _serialize_log(context.log),
         "data": data,
         "output_data": output_data,
     }
 
 
 def _serialize_agent(agent: Agent):
-    data = {k: v for k, v in agent.data.items() if not k.startswith("_")}
+    data = _serialize_agent_data(agent)
 
     history = agent.history.serialize()
 
@@ -163,6 +400,10 @@ def _serialize_agent(agent: Agent):
     }
 
 
+def _serialize_agent_data(agent: Agent):
+    return {k: v for k, v in agent.data.items() if not k.startswith("_")}
+
+
 def _serialize_log(log: Log):
     # Guard against concurrent log mutations while serializing.
     with log._lock:
@@ -289,21 +530,9 @@ def _deserialize_log(data: dict[str, Any]) -> "Log":
 
 
 def _safe_json_serialize(obj, **kwargs):
-    def serializer(o):
-        if isinstance(o, dict):
-            return {k: v for k, v in o.items() if is_json_serializable(v)}
-        elif isinstance(o, (list, tuple)):
-            return [item for item in o if is_json_serializable(item)]
-        elif is_json_serializable(o):
-            return o
-        else:
-            return None  # Skip this property
+    # the encoder only calls default for values it cannot serialize itself, skip them
+    return json.dumps(obj, default=_skip_value, **kwargs)
 
-    def is_json_serializable(item):
-        try:
-            json.dumps(item)
-            return True
-        except (TypeError, OverflowError):
-            return False
 
-    return json.dumps(obj, default=serializer, **kwargs)
+def _skip_value(o):
+    return None
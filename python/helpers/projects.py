@@ -498,7 +498,7 @@ def get_file_structure(name: str, basic_data: BasicProjectData|None=None) -> str
     if basic_data is None:
         basic_data = load_basic_project_data(name)
 
-    tree = str(file_tree.file_tree(
+    tree = str(file_tree.cached_file_tree(
         project_folder,
         max_depth=basic_data["file_structure"]["max_depth"],
         max_files=basic_data["file_structure"]["max_files"],
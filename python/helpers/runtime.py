@@ -131,7 +131,7 @@ def _get_rfc_password() -> str:
 
 
 def _get_rfc_url() -> str:
-    set = settings.get_settings()
+    set = settings.get_settings_snapshot()
     url = set["rfc_url"]
     if not "://" in url:
         url = "http://" + url
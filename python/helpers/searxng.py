@@ -1,5 +1,4 @@
-import aiohttp
-from python.helpers import runtime
+from python.helpers import http_session, runtime
 
 URL = "http://localhost:55510/search"
 
@@ -7,6 +6,6 @@ async def search(query:str):
     return await runtime.call_development_function(_search, query=query)
 
 async def _search(query:str):
-    async with aiohttp.ClientSession() as session:
-        async with session.post(URL, data={"q": query, "format": "json"}) as response:
-            return await response.json()
+    session = http_session.get_session()
+    async with session.post(URL, data={"q": query, "format": "json"}) as response:
+        return await response.json()
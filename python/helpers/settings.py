@@ -4,6 +4,7 @@ import json
 import os
 import re
 import subprocess
+import threading
 from typing import Any, Literal, TypedDict, cast, TypeVar
 
 import models
@@ -11,7 +12,7 @@ from python.helpers import runtime, whisper, defer, git
 from . import files, dotenv
 from python.helpers.print_style import PrintStyle
 from python.helpers.providers import get_providers, FieldOption as ProvidersFO
-from python.helpers.secrets import get_default_secrets_manager
+from python.helpers.secrets import get_default_secrets_manager, DEFAULT_SECRETS_FILE
 from python.helpers import dirty_json
 from python.helpers.notification import NotificationManager, NotificationType, NotificationPriority
 
@@ -117,6 +118,7 @@ class Settings(TypedDict):
     memory_memorize_enabled: bool
     memory_memorize_consolidation: bool
     memory_memorize_replace_threshold: float
+    memory_index_type: str
 
     api_keys: dict[str, str]
 
@@ -224,6 +226,12 @@ SETTINGS_FILE = files.get_abs_path("usr/settings.json")
 _settings: Settings | None = None
 _runtime_settings_snapshot: Settings | None = None
 
+# normalized settings incl. sensitive values, shared read-only between callers
+_snapshot: Settings | None = None
+_snapshot_version = 0
+_snapshot_signature: tuple | None = None
+_snapshot_lock = threading.RLock()
+
 OptionT = TypeVar("OptionT", bound=FieldOption)
 
 def _ensure_option_present(options: list[OptionT] | None, current_value: str | None) -> list[OptionT]:
@@ -353,22 +361,113 @@ def convert_in(settings: Settings) -> Settings:
 
 
 def get_settings() -> Settings:
-    global _settings
-    if not _settings:
-        _settings = _read_settings_file()
-    if not _settings:
-        _settings = get_default_settings()
-    norm = normalize_settings(_settings)
-    _load_sensitive_settings(norm)
-    return norm
+    # callers may modify the result, so they get their own copy of the snapshot
+    return _thaw(get_settings_snapshot())
+
+
+def get_settings_snapshot() -> Settings:
+    """Returns the current settings as a shared read-only snapshot.
+    The snapshot is rebuilt only after set_settings/reload_settings or when
+    settings.json, .env or the secrets file changes on disk."""
+    global _settings, _snapshot, _snapshot_version, _snapshot_signature
+    signature = _get_watched_files_signature()
+    snapshot = _snapshot
+    if snapshot is not None and signature == _snapshot_signature:
+        return snapshot
+
+    with _snapshot_lock:
+        if _snapshot is not None and signature == _snapshot_signature:
+            return _snapshot
+
+        if _snapshot_signature is not None:
+            if signature[0] != _snapshot_signature[0]:
+                _settings = None  # settings file changed, read it again
+            if signature[1] != _snapshot_signature[1]:
+                dotenv.load_dotenv()  # .env changed, reload api keys and passwords
+
+        if not _settings:
+            _settings = _read_settings_file()
+        if not _settings:
+            _settings = get_default_settings()
+        norm = normalize_settings(_settings)
+        _load_sensitive_settings(norm)
+
+        _snapshot = cast(Settings, _freeze(norm))
+        # building may create files (.env with persistent id), so sign the state after it
+        _snapshot_signature = _get_watched_files_signature()
+        _snapshot_version += 1
+        return _snapshot
+
+
+def get_settings_version() -> int:
+    """Incremented every time the settings snapshot is rebuilt."""
+    get_settings_snapshot()
+    return _snapshot_version
 
 
 def reload_settings() -> Settings:
     global _settings
-    _settings = None
+    with _snapshot_lock:
+        _settings = None
+        _invalidate_snapshot()
     return get_settings()
 
 
+def _invalidate_snapshot():
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
+
+
+def _get_watched_files_signature() -> tuple:
+    signature = []
+    for path in (
+        SETTINGS_FILE,
+        dotenv.get_dotenv_file_path(),
+        files.get_abs_path(DEFAULT_SECRETS_FILE),
+    ):
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class _FrozenDict(dict):
+    """Dictionary of the settings snapshot, modifications raise TypeError."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Settings snapshot is read-only, use get_settings() for a copy")
+
+    __setitem__ = __delitem__ = _readonly  # type: ignore
+    clear = pop = popitem = setdefault = update = _readonly  # type: ignore
+    __ior__ = _readonly  # type: ignore
+
+    def __deepcopy__(self, memo):
+        return _thaw(self)
+
+    def __reduce__(self):
+        return (dict, (_thaw(self),))
+
+
+def _freeze(value: Any) -> Any:
+    # lists become tuples so nested values are read-only too
+    if isinstance(value, dict):
+        return _FrozenDict({key: _freeze(val) for key, val in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(val) for val in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _thaw(val) for key, val in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_thaw(val) for val in value]
+    return value
+
+
 def set_runtime_settings_snapshot(settings: Settings) -> None:
     global _runtime_settings_snapshot
     _runtime_settings_snapshot = settings.copy()
@@ -377,8 +476,10 @@ def set_runtime_settings_snapshot(settings: Settings) -> None:
 def set_settings(settings: Settings, apply: bool = True):
     global _settings
     previous = _settings
-    _settings = normalize_settings(settings)
-    _write_settings_file(_settings)
+    with _snapshot_lock:
+        _settings = normalize_settings(settings)
+        _write_settings_file(_settings)
+        _invalidate_snapshot()
     if apply:
         _apply_settings(previous)
     return reload_settings()
@@ -561,6 +662,7 @@ def get_default_settings() -> Settings:
         memory_memorize_enabled=get_default_value("memory_memorize_enabled", True),
         memory_memorize_consolidation=get_default_value("memory_memorize_consolidation", True),
         memory_memorize_replace_threshold=get_default_value("memory_memorize_replace_threshold", 0.9),
+        memory_index_type=get_default_value("memory_index_type", "flat"),
         api_keys={},
         auth_login="",
         auth_password="",
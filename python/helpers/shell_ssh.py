@@ -1,4 +1,5 @@
 import asyncio
+import codecs
 import paramiko
 import time
 import re
@@ -7,6 +8,10 @@ from python.helpers.log import Log
 from python.helpers.print_style import PrintStyle
 # from python.helpers.strings import calculate_valid_match_lengths
 
+READ_CHUNK_SIZE = 64 * 1024  # bytes per recv() call
+READ_IDLE_TIMEOUT = 0.05  # seconds without new data that end a read
+OUTPUT_BUFFER_SIZE = 4 * 1024 * 1024  # raw bytes kept for the current command
+
 
 class SSHInteractiveSession:
 
@@ -24,7 +29,8 @@ class SSHInteractiveSession:
         self.client = paramiko.SSHClient()
         self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
         self.shell = None
-        self.full_output = b""
+        self._raw_output = OutputRingBuffer(OUTPUT_BUFFER_SIZE)
+        self._cleaner = IncrementalCleaner()
         self.last_command = b""
         self.trimmed_command_length = 0  # Initialize trimmed_command_length
         self.cwd = cwd
@@ -73,7 +79,7 @@ class SSHInteractiveSession:
                     full, part = await self.read_output()
                     if full and not part:
                         return
-                    time.sleep(0.1)
+                    await asyncio.sleep(0.1)
 
             except Exception as e:
                 errors += 1
@@ -96,7 +102,7 @@ class SSHInteractiveSession:
     async def send_command(self, command: str):
         if not self.shell:
             raise Exception("Shell not connected")
-        self.full_output = b""
+        self._reset_output()
         # if len(command) > 10: # if command is long, add end_comment to split output
         #     command = (command + " \\\n" +SSHInteractiveSession.end_comment + "\n")
         # else:
@@ -105,6 +111,14 @@ class SSHInteractiveSession:
         self.trimmed_command_length = 0
         self.shell.send(self.last_command)
         
+    @property
+    def full_output(self) -> bytes:
+        return self._raw_output.getvalue()
+
+    def _reset_output(self):
+        self._raw_output.clear()
+        self._cleaner.reset()
+
     async def read_output(
         self, timeout: float = 0, reset_full_output: bool = False
     ) -> Tuple[str, str]:
@@ -112,57 +126,69 @@ class SSHInteractiveSession:
             raise Exception("Shell not connected")
 
         if reset_full_output:
-            self.full_output = b""
-        partial_output = b""
-        leftover = b""
-        start_time = time.time()
-
-        while self.shell.recv_ready() and (
-            timeout <= 0 or time.time() - start_time < timeout
-        ):
-
-            # data = self.shell.recv(1024)
-            data = self.receive_bytes()
-
-            # # Trim own command from output
-            # if (
-            #     self.last_command
-            #     and len(self.last_command) > self.trimmed_command_length
-            # ):
-            #     command_to_trim = self.last_command[self.trimmed_command_length :]
-            #     data_to_trim = leftover + data
-
-            #     trim_com, trim_out = calculate_valid_match_lengths(
-            #         command_to_trim,
-            #         data_to_trim,
-            #         deviation_threshold=8,
-            #         deviation_reset=2,
-            #         ignore_patterns=[
-            #             rb"\x1b\[\?\d{4}[a-zA-Z](?:> )?",  # ANSI escape sequences
-            #             rb"\r",  # Carriage return
-            #             rb">\s",  # Greater-than symbol
-            #         ],
-            #         debug=False,
-            #     )
-
-            #     leftover = b""
-            #     if trim_com > 0 and trim_out > 0:
-            #         data = data_to_trim[trim_out:]
-            #         leftover = data
-            #         self.trimmed_command_length += trim_com
-
-            partial_output += data
-            self.full_output += data
-            await asyncio.sleep(0.1)  # Prevent busy waiting
-
-        # Decode once at the end
-        decoded_partial_output = partial_output.decode("utf-8", errors="replace")
-        decoded_full_output = self.full_output.decode("utf-8", errors="replace")
-
-        decoded_partial_output = clean_string(decoded_partial_output)
-        decoded_full_output = clean_string(decoded_full_output)
-
-        return decoded_full_output, decoded_partial_output
+            self._reset_output()
+
+        start_time = time.monotonic()
+        received = bytearray(self._drain())
+
+        # keep draining while data keeps arriving within the idle window
+        while received:
+            wait = READ_IDLE_TIMEOUT
+            if timeout > 0:
+                wait = min(wait, timeout - (time.monotonic() - start_time))
+            if wait <= 0 or not await self._wait_readable(wait):
+                break
+            data = self._drain()
+            if not data:
+                break
+            received += data
+
+        partial_output = ""
+        if received:
+            self._raw_output.write(received)
+            partial_output = clean_string(self._cleaner.feed(bytes(received)))
+
+        return self._cleaner.getvalue(), partial_output
+
+    def _drain(self) -> bytes:
+        """Read everything the channel has buffered in large chunks."""
+        shell = self.shell
+        if not shell:
+            raise Exception("Shell not connected")
+        data = bytearray()
+        while shell.recv_ready():
+            chunk = shell.recv(READ_CHUNK_SIZE)
+            if not chunk:
+                break
+            data += chunk
+        return bytes(data)
+
+    async def _wait_readable(self, timeout: float) -> bool:
+        """Wait until the channel has data, using its pollable fileno."""
+        shell = self.shell
+        if not shell or shell.recv_ready():
+            return True
+        if shell.closed or shell.eof_received:
+            return False
+
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        fd = shell.fileno()
+        try:
+            loop.add_reader(fd, lambda: ready.done() or ready.set_result(True))
+        except (NotImplementedError, ValueError, OSError):
+            # event loops without reader support (e.g. proactor) fall back to a short poll
+            await asyncio.sleep(min(timeout, 0.01))
+            return shell.recv_ready()
+        try:
+            if shell.recv_ready():
+                return True
+            await asyncio.wait_for(ready, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return shell.recv_ready()
+        finally:
+            loop.remove_reader(fd)
 
     def receive_bytes(self, num_bytes=1024):
         if not self.shell:
@@ -212,27 +238,111 @@ class SSHInteractiveSession:
 
         return data
 
-def clean_string(input_string):
-    # Remove ANSI escape codes
-    ansi_escape = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
-    cleaned = ansi_escape.sub("", input_string)
-
-    # remove null bytes
-    cleaned = cleaned.replace("\x00", "")
-
-    # remove ipython \r\r\n> sequences from the start
-    cleaned = re.sub(r'^[ \r]*(?:\r*\n>[ \r]*)*', '', cleaned)
-    # also remove any amount of '> ' sequences from the start
-    cleaned = re.sub(r'^(>\s*)+', '', cleaned)
-
+class OutputRingBuffer:
+    """Fixed-size bytearray keeping the most recent raw output bytes."""
+
+    def __init__(self, capacity: int):
+        self._buffer = bytearray(capacity)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self):
+        self._start = 0
+        self._size = 0
+
+    def write(self, data: bytes | bytearray):
+        capacity = len(self._buffer)
+        if len(data) >= capacity:
+            self._buffer[:] = data[-capacity:]
+            self._start = 0
+            self._size = capacity
+            return
+        end = (self._start + self._size) % capacity
+        first = min(len(data), capacity - end)
+        self._buffer[end : end + first] = data[:first]
+        self._buffer[: len(data) - first] = data[first:]
+        overflow = self._size + len(data) - capacity
+        if overflow > 0:
+            self._start = (self._start + overflow) % capacity
+            self._size = capacity
+        else:
+            self._size += len(data)
+
+    def getvalue(self) -> bytes:
+        end = self._start + self._size
+        if end <= len(self._buffer):
+            return bytes(self._buffer[self._start : end])
+        return bytes(self._buffer[self._start :] + self._buffer[: end - len(self._buffer)])
+
+
+class IncrementalCleaner:
+    """
+    Produces clean_string() of everything fed so far while only processing new text.
+    Complete lines are cleaned once and kept; only the unfinished last line is
+    re-cleaned on each read. Leading prompt/whitespace stripping applies until the
+    first line with real content is complete. Like the raw output, only the most
+    recent max_chars of cleaned lines and of the unfinished line are kept.
+    """
+
+    def __init__(self, max_chars: int = OUTPUT_BUFFER_SIZE):
+        self.max_chars = max_chars
+        self.reset()
+
+    def reset(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._head = ""  # cleaned complete lines
+        self._tail = ""  # decoded text after the last complete line
+        self._started = False
+
+    def feed(self, data: bytes) -> str:
+        """Add raw bytes, returns the newly decoded text."""
+        text = self._decoder.decode(data)
+        self._tail += text
+        split = self._tail.rfind("\n") + 1
+        if split:
+            lines = self._tail[:split]
+            if self._started:
+                self._head += _clean_lines(_remove_escapes(lines))
+                self._tail = self._tail[split:]
+            elif _CONTENT_PATTERN.search(_remove_escapes(lines)):
+                self._head = clean_string(lines)
+                self._tail = self._tail[split:]
+                self._started = True
+        if len(self._head) > self.max_chars:
+            # drop the oldest lines, cutting at a line boundary
+            cut = len(self._head) - self.max_chars
+            newline = self._head.find("\n", cut)
+            self._head = self._head[newline + 1 if newline != -1 else cut :]
+        if len(self._tail) > self.max_chars:
+            self._tail = self._tail[-self.max_chars :]
+        return text
+
+    def getvalue(self) -> str:
+        if not self._started:
+            return clean_string(self._tail)
+        if not self._tail:
+            return self._head
+        return self._head + _clean_lines(_remove_escapes(self._tail))
+
+
+_ANSI_ESCAPE_PATTERN = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+_CONTENT_PATTERN = re.compile(r"[^\s>]")
+
+
+def _remove_escapes(text: str) -> str:
+    # Remove ANSI escape codes and null bytes
+    return _ANSI_ESCAPE_PATTERN.sub("", text).replace("\x00", "")
+
+
+def _clean_lines(text: str) -> str:
     # Replace '\r\n' with '\n'
-    cleaned = cleaned.replace("\r\n", "\n")
-
-    # remove leading \r and spaces
-    cleaned = cleaned.lstrip("\r ")
+    text = text.replace("\r\n", "\n")
 
     # Split the string by newline characters to process each segment separately
-    lines = cleaned.split("\n")
+    lines = text.split("\n")
 
     for i in range(len(lines)):
         # Handle carriage returns '\r' by splitting and taking the last part
@@ -243,3 +353,17 @@ def clean_string(input_string):
             ].rstrip()  # Overwrite with the last part after the last '\r'
 
     return "\n".join(lines)
+
+
+def clean_string(input_string):
+    cleaned = _remove_escapes(input_string)
+
+    # remove ipython \r\r\n> sequences from the start
+    cleaned = re.sub(r'^[ \r]*(?:\r*\n>[ \r]*)*', '', cleaned)
+    # also remove any amount of '> ' sequences from the start
+    cleaned = re.sub(r'^(>\s*)+', '', cleaned)
+
+    # remove leading \r and spaces
+    cleaned = cleaned.lstrip("\r ")
+
+    return _clean_lines(cleaned)
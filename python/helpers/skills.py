@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import copy
+import math
 import os
+import pickle
 import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple, TYPE_CHECKING
@@ -16,6 +22,17 @@ try:
 except Exception:  # pragma: no cover
     yaml = None  # type: ignore
 
+SKILLS_INDEX_FILE = "tmp/skills_index.pkl"
+# bump when the Skill fields or parsing change to drop persisted indexes
+SKILLS_INDEX_VERSION = 1
+SEARCH_INDEX_CACHE_SIZE = 8
+# BM25 parameters and weights of the indexed skill fields
+BM25_K1 = 1.2
+BM25_B = 0.75
+SEARCH_FIELD_WEIGHTS = {"name": 3.0, "description": 2.0, "tags": 1.0}
+# query terms also match longer index terms they are a prefix of, at this weight
+SEARCH_PREFIX_WEIGHT = 0.5
+
 
 @dataclass(slots=True)
 class Skill:
@@ -295,27 +312,28 @@ def list_skills(
     include_content: bool = False,
 ) -> List[Skill]:
     """List skills, optionally filtered by agent scope."""
-    skills: List[Skill] = []
-
     roots = get_skill_roots(agent)
-
-    for root in roots:
-        for skill_md in discover_skill_md_files(Path(root)):
-            s = skill_from_markdown(skill_md, include_content=include_content)
-            if s:
-                skills.append(s)
+    skills = _catalog.list(roots)
+    if include_content:
+        skills = [_catalog.with_content(s) or s for s in skills]
+    else:
+        skills = [copy.copy(s) for s in skills]
 
     # no deduplication for global skills
     if not agent:
         return skills
 
+    return _dedupe_skills(skills)
+
+
+def _dedupe_skills(skills: List[Skill]) -> List[Skill]:
     # Dedupe by normalized name, preserving root_order priority (earlier wins)
     by_name: Dict[str, Skill] = {}
     for s in skills:
         key = _normalize_name(s.name) or _normalize_name(s.path.name)
         if key and key not in by_name:
             by_name[key] = s
-    
+
     return list(by_name.values())
 
 
@@ -354,13 +372,11 @@ def find_skill(
 
     roots = get_skill_roots(agent)
 
-    for root in roots:
-        for skill_md in discover_skill_md_files(Path(root)):
-            s = skill_from_markdown(skill_md, include_content=include_content)
-            if not s:
-                continue
-            if _normalize_name(s.name) == target or _normalize_name(s.path.name) == target:
-                return s
+    for s in _catalog.list(roots):
+        if _normalize_name(s.name) == target or _normalize_name(s.path.name) == target:
+            if include_content:
+                return _catalog.with_content(s)
+            return copy.copy(s)
     return None
 
 def load_skill_for_agent(
@@ -368,10 +384,28 @@ def load_skill_for_agent(
     agent: Agent | None = None,
 ) -> str:
     """Load skill and format it as a complete string for agent context."""
-    skill = find_skill(skill_name, agent=agent, include_content=True)
+    skill = find_skill(skill_name, agent=agent, include_content=False)
     if not skill:
         return f"Error: skill '{skill_name}' not found"
 
+    text = _catalog.get_rendered(skill)
+    if text is None:
+        return f"Error: skill '{skill_name}' not found"
+
+    # File tree
+    files_tree = _get_skill_files(skill.path)
+    lines = [text, ""]
+    if files_tree:
+        lines.append("Files (use skills_tool method=read_file to open):")
+        lines.append(files_tree)
+    else:
+        lines.append("No additional files found.")
+
+    return "\n".join(lines)
+
+
+def _render_skill(skill: Skill) -> str:
+    """Skill metadata and body formatted for agent context, without the file tree."""
     # Get runtime path
     runtime_path = str(skill.path)
     if runtime.is_development():
@@ -397,15 +431,6 @@ def load_skill_for_agent(
 
     lines.extend(["", "Content (SKILL.md body):", skill.content.strip() or "(empty)"])
 
-    # File tree
-    files_tree = _get_skill_files(skill.path)
-    lines.append("")
-    if files_tree:
-        lines.append("Files (use skills_tool method=read_file to open):")
-        lines.append(files_tree)
-    else:
-        lines.append("No additional files found.")
-
     return "\n".join(lines)
 
 
@@ -415,7 +440,7 @@ def _get_skill_files(skill_dir: Path) -> str:
         return ""
 
     tree = str(
-        file_tree.file_tree(
+        file_tree.cached_file_tree(
             str(skill_dir),
             max_depth=10,
             folders_first=True,
@@ -438,33 +463,19 @@ def search_skills(
     limit: int = 25,
     agent: Agent|None=None,
 ) -> List[Skill]:
-    q = (query or "").strip().lower()
-    if not q:
+    terms = _tokenize(query or "")
+    if not terms:
         return []
 
-    terms = [t for t in re.split(r"\s+", q) if t]
-    candidates = list_skills(agent)
-
-    scored: List[Tuple[int, Skill]] = []
-    for s in candidates:
-        name = s.name.lower()
-        desc = (s.description or "").lower()
-        tags = [t.lower() for t in s.tags]
-
-        score = 0
-        for term in terms:
-            if term in name:
-                score += 3
-            if term in desc:
-                score += 2
-            if any(term in tag for tag in tags):
-                score += 1
-
-        if score > 0:
-            scored.append((score, s))
+    roots = get_skill_roots(agent)
+    candidates = _catalog.list(roots)
+    if agent:
+        candidates = _dedupe_skills(candidates)
 
+    index = _catalog.get_search_index(candidates)
+    scored = index.search(terms)
     scored.sort(key=lambda pair: (-pair[0], pair[1].name))
-    return [s for _score, s in scored[:limit]]
+    return [copy.copy(s) for _score, s in scored[:limit]]
 
 
 _NAME_RE = re.compile(r"^[a-z0-9-]+$")
@@ -517,3 +528,234 @@ def validate_skill_md(skill_md_path: Path) -> List[str]:
         return ["Unable to parse SKILL.md frontmatter"]
     return validate_skill(skill)
 
+
+def _tokenize(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class _SkillSearchIndex:
+    """BM25 inverted index over names, descriptions and tags of a set of skills."""
+
+    def __init__(self, skills: List[Skill]):
+        self.skills = skills
+        self.postings: Dict[str, List[Tuple[int, float]]] = {}
+        self.lengths: List[float] = []
+        for doc, skill in enumerate(skills):
+            fields = {
+                "name": _tokenize(skill.name),
+                "description": _tokenize(skill.description or ""),
+                "tags": [t for tag in skill.tags for t in _tokenize(tag)],
+            }
+            frequencies: Dict[str, float] = {}
+            length = 0.0
+            for field_name, tokens in fields.items():
+                weight = SEARCH_FIELD_WEIGHTS[field_name]
+                length += weight * len(tokens)
+                for token in tokens:
+                    frequencies[token] = frequencies.get(token, 0.0) + weight
+            self.lengths.append(length)
+            for token, frequency in frequencies.items():
+                self.postings.setdefault(token, []).append((doc, frequency))
+        self.vocabulary = sorted(self.postings)
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        # the term itself and index terms it is a prefix of
+        expanded: List[Tuple[str, float]] = []
+        start = bisect_left(self.vocabulary, term)
+        for candidate in self.vocabulary[start:]:
+            if not candidate.startswith(term):
+                break
+            expanded.append((candidate, 1.0 if candidate == term else SEARCH_PREFIX_WEIGHT))
+        return expanded
+
+    def search(self, terms: List[str]) -> List[Tuple[float, Skill]]:
+        count = len(self.skills)
+        scores: Dict[int, float] = {}
+        for term in dict.fromkeys(terms):
+            for token, weight in self._expand(term):
+                postings = self.postings[token]
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc, frequency in postings:
+                    norm = 1 - BM25_B + BM25_B * self.lengths[doc] / (self.average_length or 1.0)
+                    score = idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * norm)
+                    scores[doc] = scores.get(doc, 0.0) + weight * score
+        return [(score, self.skills[doc]) for doc, score in scores.items()]
+
+
+@dataclass(slots=True)
+class _RootListing:
+    skill_md_paths: List[Path]
+    directory_mtimes: Dict[str, int]
+
+
+class _SkillCatalog:
+    """
+    Parsed skill metadata for all skill roots, persisted between runs.
+    Roots are re-walked only when one of their directories changed and SKILL.md
+    files are re-parsed only when their mtime or size changed. Search indexes and
+    rendered skills are cached for the current set of skills.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._roots: Dict[str, _RootListing] = {}
+        # SKILL.md path -> (file stamp, skill metadata or None when invalid)
+        self._entries: Dict[str, Tuple[Tuple[int, int], Optional[Skill]]] = {}
+        self._contents: Dict[str, Tuple[Tuple[int, int], Skill]] = {}
+        self._rendered: Dict[Tuple[str, Tuple[int, int], bool], str] = {}
+        self._search_indexes: OrderedDict[Tuple[int, ...], _SkillSearchIndex] = OrderedDict()
+        self._loaded = False
+        self._dirty = False
+
+    def list(self, roots: Iterable[str]) -> List[Skill]:
+        with self._lock:
+            self._load()
+            skills: List[Skill] = []
+            for root in roots:
+                for skill_md in self._get_root(root).skill_md_paths:
+                    skill = self._get_skill(skill_md)
+                    if skill:
+                        skills.append(skill)
+            self._save()
+            return skills
+
+    def with_content(self, skill: Skill) -> Optional[Skill]:
+        """The skill with its body and raw frontmatter, parsed once per file version."""
+        path = str(skill.skill_md_path)
+        with self._lock:
+            stamp = _file_stamp(path)
+            cached = self._contents.get(path)
+            if stamp is not None and cached and cached[0] == stamp:
+                return copy.copy(cached[1])
+            full = skill_from_markdown(skill.skill_md_path, include_content=True)
+            if full and stamp is not None:
+                self._contents[path] = (stamp, full)
+                return copy.copy(full)
+            return full
+
+    def get_rendered(self, skill: Skill) -> Optional[str]:
+        path = str(skill.skill_md_path)
+        with self._lock:
+            stamp = _file_stamp(path)
+            key = (path, stamp or (0, 0), runtime.is_development())
+            rendered = self._rendered.get(key)
+            if rendered is None:
+                full = self.with_content(skill)
+                if not full:
+                    return None
+                rendered = _render_skill(full)
+                if stamp is not None:
+                    self._rendered = {k: v for k, v in self._rendered.items() if k[0] != path}
+                    self._rendered[key] = rendered
+            return rendered
+
+    def get_search_index(self, skills: List[Skill]) -> _SkillSearchIndex:
+        # skills are shared catalog objects, the index keeps them alive so their ids stay unique
+        key = tuple(id(s) for s in skills)
+        with self._lock:
+            index = self._search_indexes.get(key)
+            if index is None:
+                index = self._search_indexes[key] = _SkillSearchIndex(skills)
+                while len(self._search_indexes) > SEARCH_INDEX_CACHE_SIZE:
+                    self._search_indexes.popitem(last=False)
+            else:
+                self._search_indexes.move_to_end(key)
+            return index
+
+    def _get_root(self, root: str) -> _RootListing:
+        listing = self._roots.get(root)
+        if listing is not None and all(
+            _directory_mtime(directory) == mtime
+            for directory, mtime in listing.directory_mtimes.items()
+        ):
+            return listing
+        listing = self._roots[root] = _walk_skill_root(root)
+        return listing
+
+    def _get_skill(self, skill_md: Path) -> Optional[Skill]:
+        path = str(skill_md)
+        stamp = _file_stamp(path)
+        if stamp is None:
+            return None
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        skill = skill_from_markdown(skill_md)
+        self._entries[path] = (stamp, skill)
+        self._dirty = True
+        return skill
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(files.get_abs_path(SKILLS_INDEX_FILE), "rb") as f:
+                version, entries = pickle.load(f)
+            if version == SKILLS_INDEX_VERSION and isinstance(entries, dict):
+                self._entries = entries
+        except Exception:
+            pass
+
+    def _save(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        # entries of removed files are dropped
+        self._entries = {p: e for p, e in self._entries.items() if os.path.exists(p)}
+        path = files.get_abs_path(SKILLS_INDEX_FILE)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + ".tmp", "wb") as f:
+                pickle.dump((SKILLS_INDEX_VERSION, self._entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path + ".tmp", path)
+        except Exception:
+            pass
+
+
+def _directory_mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _walk_skill_root(root: str) -> _RootListing:
+    """Same files as discover_skill_md_files, with the mtimes of all walked directories."""
+    skill_md_paths: List[Path] = []
+    directory_mtimes: Dict[str, int] = {}
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            directory_mtimes[directory] = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as iterator:
+                entries = list(iterator)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not entry.name.startswith("."):
+                        stack.append(entry.path)
+                elif entry.name == "SKILL.md" and entry.is_file():
+                    skill_md_paths.append(Path(entry.path))
+            except OSError:
+                continue
+    if not directory_mtimes:
+        # missing root, picked up once it is created
+        directory_mtimes[root] = _directory_mtime(root)  # type: ignore[assignment]
+    skill_md_paths.sort(key=lambda x: str(x))
+    return _RootListing(skill_md_paths, directory_mtimes)
+
+
+_catalog = _SkillCatalog()
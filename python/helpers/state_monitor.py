@@ -13,6 +13,9 @@ from python.helpers.state_snapshot import (
     StateRequestV1,
     advance_state_request_after_snapshot,
     build_snapshot_from_request,
+    make_snapshot_delta,
+    mark_state_dirty,
+    snapshot_fragments,
 )
 from python.helpers.websocket import ConnectionNotFoundError
 
@@ -48,6 +51,9 @@ class ConnectionProjection:
     # Development-only diagnostics - last known cause of the most recent dirty wave.
     dirty_reason: str | None = None
     dirty_wave_id: str | None = None
+    # Context/task fragments delivered since the last state_request; None means the
+    # next push carries full lists, otherwise only changed fragments are sent.
+    known_fragments: dict[str, Any] | None = None
     created_at: float = field(default_factory=time.time)
 
 
@@ -103,6 +109,7 @@ class StateMonitor:
             with self._lock:
                 self._dirty_wave_seq += 1
                 wave_id = f"all_{self._dirty_wave_seq}"
+        mark_state_dirty()
         with self._lock:
             identities = list(self._projections.keys())
         for namespace, sid in identities:
@@ -117,6 +124,7 @@ class StateMonitor:
             with self._lock:
                 self._dirty_wave_seq += 1
                 wave_id = f"ctx_{self._dirty_wave_seq}"
+        mark_state_dirty()
         with self._lock:
             identities = [
                 identity
@@ -142,6 +150,7 @@ class StateMonitor:
             projection.request = request
             projection.seq_base = seq_base
             projection.seq = seq_base
+            projection.known_fragments = None
         _debug_log(
             f"[StateMonitor] update_projection namespace={namespace} sid={sid} context={request.context!r} "
             f"log_from={request.log_from} notifications_from={request.notifications_from} "
@@ -282,15 +291,25 @@ class StateMonitor:
                 # Advance cursors after successful snapshot emission (incremental mode).
                 projection.request = advance_state_request_after_snapshot(request, snapshot)
 
+                # Send only context/task fragments the client has not received yet.
+                delta = None
+                if projection.known_fragments is not None:
+                    pushed_snapshot, delta = make_snapshot_delta(snapshot, projection.known_fragments)
+                else:
+                    pushed_snapshot = snapshot
+                projection.known_fragments = snapshot_fragments(snapshot)
+
                 # Mark all dirties up to `base_version` as pushed. If new dirties
                 # arrived while building/emitting, a follow-up push will be scheduled.
                 projection.pushed_version = max(projection.pushed_version, base_version)
 
-            payload = {
+            payload: dict[str, Any] = {
                 "runtime_epoch": runtime.get_runtime_id(),
                 "seq": seq,
-                "snapshot": snapshot,
+                "snapshot": pushed_snapshot,
             }
+            if delta is not None:
+                payload["delta"] = delta
 
             try:
                 logs_len = (
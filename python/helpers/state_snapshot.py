@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import threading
+import time
 import types
 from typing import Any, Mapping, TypedDict, Union, get_args, get_origin, get_type_hints
 
@@ -31,6 +33,25 @@ class SnapshotV1(TypedDict):
     notifications_guid: str
     notifications_version: int
 
+class SnapshotDeltaV1(TypedDict):
+    # Ordered ids of all contexts and tasks; the snapshot lists of a delta push only
+    # contain the items that changed since the previous push to the same client.
+    contexts: list[str]
+    tasks: list[str]
+
+
+# Seconds a shared contexts/tasks build is reused when no dirty signal arrived,
+# bounds staleness of changes that are not signalled (scheduler edits, running state).
+COLLECTIONS_MAX_AGE = 1.0
+
+_collections_lock = threading.RLock()
+_state_version = 0
+# timezone -> (state version, built at, contexts, tasks)
+_collections_cache: dict[str, tuple[int, float, list[dict[str, Any]], list[dict[str, Any]]]] = {}
+# (context id, timezone) -> last serialized fragment, reused while unchanged
+_fragments: dict[tuple[str, str], dict[str, Any]] = {}
+
+
 @dataclass(frozen=True)
 class StateRequestV1:
     context: str | None
@@ -211,24 +232,29 @@ def advance_state_request_after_snapshot(
     )
 
 
-async def build_snapshot_from_request(*, request: StateRequestV1) -> SnapshotV1:
-    """Build a poll-shaped snapshot for both /poll and state_push."""
+def mark_state_dirty() -> None:
+    """Invalidate shared contexts/tasks builds, called on every dirty signal."""
+    global _state_version
+    with _collections_lock:
+        _state_version += 1
 
-    Localization.get().set_timezone(request.timezone)
 
-    ctxid = request.context if isinstance(request.context, str) else ""
-    ctxid = ctxid.strip()
+def get_state_collections(timezone: str) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Return (contexts, tasks) serialized for the timezone, shared across all clients.
+    Unchanged items keep the same fragment object between builds."""
+    with _collections_lock:
+        now = time.monotonic()
+        cached = _collections_cache.get(timezone)
+        if cached and cached[0] == _state_version and now - cached[1] < COLLECTIONS_MAX_AGE:
+            return list(cached[2]), list(cached[3])
 
-    from_no = _coerce_non_negative_int(request.log_from, default=0)
-    notifications_from_no = _coerce_non_negative_int(request.notifications_from, default=0)
+        version = _state_version
+        ctxs, tasks = _build_state_collections(timezone)
+        _collections_cache[timezone] = (version, now, ctxs, tasks)
+        return list(ctxs), list(tasks)
 
-    active_context = AgentContext.get(ctxid) if ctxid else None
-
-    logs = active_context.log.output(start=from_no) if active_context else []
-
-    notification_manager = AgentContext.get_notification_manager()
-    notifications = notification_manager.output(start=notifications_from_no)
 
+def _build_state_collections(timezone: str) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
     scheduler = TaskScheduler.get()
 
     ctxs: list[dict[str, Any]] = []
@@ -249,9 +275,7 @@ async def build_snapshot_from_request(*, request: StateRequestV1) -> SnapshotV1:
         context_task = scheduler.get_task_by_uuid(ctx.id)
         is_task_context = context_task is not None and context_task.context_id == ctx.id
 
-        if not is_task_context:
-            ctxs.append(context_data)
-        else:
+        if is_task_context:
             task_details = scheduler.serialize_task(ctx.id)
             if task_details:
                 context_data.update(
@@ -276,12 +300,80 @@ async def build_snapshot_from_request(*, request: StateRequestV1) -> SnapshotV1:
                 else:
                     context_data["token"] = task_details.get("token")
 
+        # keep the previous fragment object if nothing changed, clients compare by identity
+        key = (ctx.id, timezone)
+        previous = _fragments.get(key)
+        if previous == context_data:
+            context_data = previous  # type: ignore[assignment]
+        else:
+            _fragments[key] = context_data
+
+        if is_task_context:
             tasks.append(context_data)
+        else:
+            ctxs.append(context_data)
 
         processed_contexts.add(ctx.id)
 
+    for key in [key for key in _fragments if key[1] == timezone and key[0] not in processed_contexts]:
+        del _fragments[key]
+
     ctxs.sort(key=lambda x: x["created_at"], reverse=True)
     tasks.sort(key=lambda x: x["created_at"], reverse=True)
+    return ctxs, tasks
+
+
+def snapshot_fragments(snapshot: Mapping[str, Any]) -> dict[str, Any]:
+    """Context and task fragments of a full snapshot by collection and id."""
+    return {
+        f"{key}:{item.get('id')}": item
+        for key in ("contexts", "tasks")
+        for item in snapshot.get(key) or []
+        if isinstance(item, dict)
+    }
+
+
+def make_snapshot_delta(
+    snapshot: SnapshotV1,
+    known_fragments: Mapping[str, Any],
+) -> tuple[SnapshotV1, SnapshotDeltaV1]:
+    """Reduce contexts and tasks of a full snapshot to the fragments the client has not
+    received yet. The delta carries the ordered ids to rebuild the full lists."""
+    reduced: SnapshotV1 = {**snapshot}  # type: ignore[typeddict-item]
+    reduced["contexts"] = [
+        item for item in snapshot["contexts"]
+        if known_fragments.get(f"contexts:{item.get('id')}") is not item
+    ]
+    reduced["tasks"] = [
+        item for item in snapshot["tasks"]
+        if known_fragments.get(f"tasks:{item.get('id')}") is not item
+    ]
+    delta: SnapshotDeltaV1 = {
+        "contexts": [item.get("id") for item in snapshot["contexts"]],
+        "tasks": [item.get("id") for item in snapshot["tasks"]],
+    }
+    return reduced, delta
+
+
+async def build_snapshot_from_request(*, request: StateRequestV1) -> SnapshotV1:
+    """Build a poll-shaped snapshot for both /poll and state_push."""
+
+    Localization.get().set_timezone(request.timezone)
+
+    ctxid = request.context if isinstance(request.context, str) else ""
+    ctxid = ctxid.strip()
+
+    from_no = _coerce_non_negative_int(request.log_from, default=0)
+    notifications_from_no = _coerce_non_negative_int(request.notifications_from, default=0)
+
+    active_context = AgentContext.get(ctxid) if ctxid else None
+
+    logs = active_context.log.output(start=from_no, deltas=True) if active_context else []
+
+    notification_manager = AgentContext.get_notification_manager()
+    notifications = notification_manager.output(start=notifications_from_no)
+
+    ctxs, tasks = get_state_collections(request.timezone)
 
     snapshot: SnapshotV1 = {
         "deselect_chat": bool(ctxid) and active_context is None,
@@ -1,5 +1,7 @@
 import asyncio
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
+import heapq
 import os
 import random
 import threading
@@ -27,6 +29,8 @@ import pytz
 from typing import Annotated
 
 SCHEDULER_FOLDER = "usr/scheduler"
+# a cron run is skipped when the scheduler gets to it later than this many seconds
+MISSED_RUN_GRACE = 60.0
 
 # ----------------------
 # Task Models
@@ -184,6 +188,10 @@ class BaseTask(BaseModel):
     def get_next_run(self) -> datetime | None:
         return None
 
+    def get_next_due(self, after: datetime) -> datetime | None:
+        """Next time the task is due to run after the given time, None if it is not scheduled."""
+        return None
+
     def is_dedicated(self) -> bool:
         return self.context_id == self.uuid
 
@@ -341,7 +349,7 @@ class ScheduledTask(BaseTask):
 
     def check_schedule(self, frequency_seconds: float = 60.0) -> bool:
         with self._lock:
-            crontab = CronTab(crontab=self.schedule.to_crontab())  # type: ignore
+            crontab = _get_crontab(self.schedule.to_crontab())
 
             # Get the timezone from the schedule or use UTC as fallback
             task_timezone = pytz.timezone(self.schedule.timezone or Localization.get().get_timezone())
@@ -363,9 +371,15 @@ class ScheduledTask(BaseTask):
 
     def get_next_run(self) -> datetime | None:
         with self._lock:
-            crontab = CronTab(crontab=self.schedule.to_crontab())  # type: ignore
+            crontab = _get_crontab(self.schedule.to_crontab())
             return crontab.next(now=datetime.now(timezone.utc), return_datetime=True)  # type: ignore
 
+    def get_next_due(self, after: datetime) -> datetime | None:
+        with self._lock:
+            crontab = _get_crontab(self.schedule.to_crontab())
+            task_timezone = pytz.timezone(self.schedule.timezone or Localization.get().get_timezone())
+            return crontab.next(now=after.astimezone(task_timezone), return_datetime=True)  # type: ignore
+
 
 class PlannedTask(BaseTask):
     type: Literal[TaskType.PLANNED] = TaskType.PLANNED
@@ -422,6 +436,10 @@ class PlannedTask(BaseTask):
         with self._lock:
             return self.plan.get_next_launch_time()
 
+    def get_next_due(self, after: datetime) -> datetime | None:
+        # planned launches are due until they are taken, however late
+        return self.get_next_run()
+
     async def on_run(self):
         with self._lock:
             # Get the next launch time and set it as in_progress
@@ -474,7 +492,7 @@ class SchedulerTaskList(BaseModel):
                 make_dirs(path)
                 cls.__instance = asyncio.run(cls(tasks=[]).save())
             else:
-                cls.__instance = cls.model_validate_json(read_file(path))
+                cls.__instance = asyncio.run(cls(tasks=[]).reload())
         else:
             asyncio.run(cls.__instance.reload())
         return cls.__instance
@@ -482,14 +500,33 @@ class SchedulerTaskList(BaseModel):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._lock = threading.RLock()
+        # tasks.json content and (mtime, size) as last read or written by this process
+        self._saved_json: str | None = None
+        self._file_stamp: tuple[int, int] | None = None
+        self._tasks_by_uuid: dict[str, Union[ScheduledTask, AdHocTask, PlannedTask]] = {}
+        # min-heap of (due timestamp, uuid), entries not matching _due_times are stale
+        self._due_heap: list[tuple[float, str]] = []
+        self._due_times: dict[str, float] = {}
+        self._schedule_keys: dict[str, tuple] = {}
+        self._last_due: dict[str, float] = {}
+        self._on_schedule_change: Callable[[], None] | None = None
+        self._sync_schedule()
 
     async def reload(self) -> "SchedulerTaskList":
         path = get_abs_path(SCHEDULER_FOLDER, "tasks.json")
-        if exists(path):
-            with self._lock:
-                data = self.__class__.model_validate_json(read_file(path))
+        with self._lock:
+            # only re-read the file when it was changed by someone else
+            stamp = _get_file_stamp(path)
+            if stamp is None or stamp == self._file_stamp:
+                return self
+            content = read_file(path)
+            self._file_stamp = stamp
+            if content != self._saved_json:
+                data = self.__class__.model_validate_json(content)
                 self.tasks.clear()
                 self.tasks.extend(data.tasks)
+                self._saved_json = content
+                self._sync_schedule()
         return self
 
     async def add_task(self, task: Union[ScheduledTask, AdHocTask, PlannedTask]) -> "SchedulerTaskList":
@@ -520,6 +557,10 @@ class SchedulerTaskList(BaseModel):
             # Get the JSON string before writing
             json_data = self.model_dump_json()
 
+            # nothing changed since the file was last read or written
+            if json_data == self._saved_json and _get_file_stamp(path) == self._file_stamp:
+                return self
+
             # Debug: check if 'null' appears as token value in JSON
             if '"type": "adhoc"' in json_data and '"token": null' in json_data:
                 PrintStyle.error(
@@ -527,17 +568,67 @@ class SchedulerTaskList(BaseModel):
                 )
 
             write_file(path, json_data)
-
-            # Debug: Verify after saving
-            if exists(path):
-                loaded_json = read_file(path)
-                if '"type": "adhoc"' in loaded_json and '"token": null' in loaded_json:
-                    PrintStyle.error(
-                        "ERROR: Null token persisted in JSON file for an adhoc task"
-                    )
+            self._saved_json = json_data
+            self._file_stamp = _get_file_stamp(path)
+            self._sync_schedule()
 
         return self
 
+    def on_schedule_change(self, callback: Callable[[], None] | None):
+        """Register a callback invoked when due times of tasks change, used to wake up the job loop."""
+        self._on_schedule_change = callback
+
+    def get_next_due_time(self) -> float | None:
+        """Timestamp of the earliest due task, None if no task is scheduled."""
+        with self._lock:
+            while self._due_heap:
+                due_time, task_uuid = self._due_heap[0]
+                if self._due_times.get(task_uuid) == due_time:
+                    return due_time
+                heapq.heappop(self._due_heap)
+            return None
+
+    def _sync_schedule(self):
+        """Reindex tasks and reschedule those whose state, schedule or plan changed."""
+        with self._lock:
+            self._tasks_by_uuid = {task.uuid: task for task in self.tasks}
+            now = datetime.now(timezone.utc)
+            changed = False
+            for task_uuid in list(self._schedule_keys):
+                if task_uuid not in self._tasks_by_uuid:
+                    del self._schedule_keys[task_uuid]
+                    self._due_times.pop(task_uuid, None)
+                    self._last_due.pop(task_uuid, None)
+            for task in self.tasks:
+                key = _get_schedule_key(task)
+                if self._schedule_keys.get(task.uuid) != key:
+                    self._schedule_keys[task.uuid] = key
+                    self._schedule_task(task, now)
+                    changed = True
+            if len(self._due_heap) > 2 * len(self._due_times) + 64:
+                # drop stale entries once they outnumber live ones
+                self._due_heap = [(t, u) for u, t in self._due_times.items()]
+                heapq.heapify(self._due_heap)
+        if changed and self._on_schedule_change:
+            self._on_schedule_change()
+
+    def _schedule_task(self, task: Union[ScheduledTask, AdHocTask, PlannedTask], now: datetime):
+        self._due_times.pop(task.uuid, None)
+        if task.state != TaskState.IDLE:
+            return  # rescheduled once it is idle again
+        # runs within the grace period are still due, runs already taken are not
+        after = now - timedelta(seconds=MISSED_RUN_GRACE)
+        last_due = self._last_due.get(task.uuid)
+        if last_due is not None and last_due > after.timestamp():
+            after = datetime.fromtimestamp(last_due, timezone.utc)
+        due = task.get_next_due(after)
+        if due is not None:
+            self._push_due(task.uuid, due.timestamp())
+
+    def _push_due(self, task_uuid: str, due_time: float):
+        self._due_times[task_uuid] = due_time
+        heapq.heappush(self._due_heap, (due_time, task_uuid))
+
     async def update_task_by_uuid(
         self,
         task_uuid: str,
@@ -557,8 +648,8 @@ class SchedulerTaskList(BaseModel):
             await self.reload()
 
             # Find the task
-            task = next((task for task in self.tasks if task.uuid == task_uuid and verify_func(task)), None)
-            if task is None:
+            task = self.get_task_by_uuid(task_uuid)
+            if task is None or not verify_func(task):
                 return None
 
             # Apply the updates via the provided function
@@ -581,16 +672,37 @@ class SchedulerTaskList(BaseModel):
                 and (not only_running or task.state == TaskState.RUNNING)
             ]
 
-    async def get_due_tasks(self) -> list[Union[ScheduledTask, AdHocTask, PlannedTask]]:
+    async def get_due_tasks(self, now: datetime | None = None) -> list[Union[ScheduledTask, AdHocTask, PlannedTask]]:
         with self._lock:
             await self.reload()
-            return [
-                task for task in self.tasks
-                if task.check_schedule() and task.state == TaskState.IDLE
-            ]
+            now = now or datetime.now(timezone.utc)
+            now_ts = now.timestamp()
+            due_tasks = []
+            while self._due_heap and self._due_heap[0][0] <= now_ts:
+                due_time, task_uuid = heapq.heappop(self._due_heap)
+                if self._due_times.get(task_uuid) != due_time:
+                    continue  # stale entry
+                del self._due_times[task_uuid]
+                task = self._tasks_by_uuid.get(task_uuid)
+                if task is None:
+                    continue
+                self._last_due[task_uuid] = due_time
+                missed = isinstance(task, ScheduledTask) and due_time < now_ts - MISSED_RUN_GRACE
+                if task.state == TaskState.IDLE and not missed:
+                    due_tasks.append(task)
+                # queue the following run skipping missed ones, planned tasks are requeued when their plan advances
+                after = max(due_time, now_ts - MISSED_RUN_GRACE)
+                next_due = task.get_next_due(datetime.fromtimestamp(after, timezone.utc))
+                if next_due is not None and next_due.timestamp() > due_time:
+                    self._push_due(task_uuid, next_due.timestamp())
+            return due_tasks
 
     def get_task_by_uuid(self, task_uuid: str) -> Union[ScheduledTask, AdHocTask, PlannedTask] | None:
         with self._lock:
+            task = self._tasks_by_uuid.get(task_uuid)
+            if task is not None and task.uuid == task_uuid:
+                return task
+            # the list was changed without saving, fall back to a scan
             return next((task for task in self.tasks if task.uuid == task_uuid), None)
 
     def get_task_by_name(self, name: str) -> Union[ScheduledTask, AdHocTask, PlannedTask] | None:
@@ -706,6 +818,12 @@ class TaskScheduler:
         for task in await self._tasks.get_due_tasks():
             await self._run_task(task)
 
+    def get_next_due_time(self) -> float | None:
+        return self._tasks.get_next_due_time()
+
+    def on_schedule_change(self, callback: Callable[[], None] | None):
+        self._tasks.on_schedule_change(callback)
+
     async def run_task_by_uuid(self, task_uuid: str, task_context: str | None = None):
         # First reload tasks to ensure we have the latest state
         await self._tasks.reload()
@@ -981,6 +1099,28 @@ class TaskScheduler:
         return None
 
 
+@lru_cache(maxsize=1024)
+def _get_crontab(expression: str) -> CronTab:
+    return CronTab(crontab=expression)  # type: ignore
+
+
+def _get_schedule_key(task: Union[ScheduledTask, AdHocTask, PlannedTask]) -> tuple:
+    # what the due time of a task depends on
+    if isinstance(task, ScheduledTask):
+        return (task.state, task.schedule.to_crontab(), task.schedule.timezone)
+    if isinstance(task, PlannedTask):
+        return (task.state, task.plan.get_next_launch_time())
+    return (task.state,)
+
+
+def _get_file_stamp(path: str) -> tuple[int, int] | None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
 # ----------------------
 # Task Serialization Helpers
 # ----------------------
@@ -1,30 +1,67 @@
-from typing import Literal
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
+import threading
+from typing import Iterable, Literal
 import tiktoken
 
 APPROX_BUFFER = 1.1
 TRIM_BUFFER = 0.8
 
+# token counts of longer texts are memoized by content hash, shorter ones are cheap to encode
+MEMO_MIN_LENGTH = 256
+MEMO_MAX_ENTRIES = 4096
+
+_memo: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_encoding(encoding_name: str = "cl100k_base") -> tiktoken.Encoding:
+    return tiktoken.get_encoding(encoding_name)
+
 
 def count_tokens(text: str, encoding_name="cl100k_base") -> int:
     if not text:
         return 0
 
-    # Get the encoding
-    encoding = tiktoken.get_encoding(encoding_name)
+    if len(text) < MEMO_MIN_LENGTH:
+        return _encode_count(text, encoding_name)
 
-    # Encode the text and count the tokens
-    tokens = encoding.encode(text, disallowed_special=())
-    token_count = len(tokens)
+    digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16)
+    key = (encoding_name, digest.digest())
+    with _memo_lock:
+        token_count = _memo.get(key)
+        if token_count is not None:
+            _memo.move_to_end(key)
+            return token_count
+
+    token_count = _encode_count(text, encoding_name)
 
+    with _memo_lock:
+        _memo[key] = token_count
+        if len(_memo) > MEMO_MAX_ENTRIES:
+            _memo.popitem(last=False)
     return token_count
 
 
+def _encode_count(text: str, encoding_name: str) -> int:
+    # Encode the text and count the tokens
+    tokens = get_encoding(encoding_name).encode(text, disallowed_special=())
+    return len(tokens)
+
+
 def approximate_tokens(
     text: str,
 ) -> int:
     return int(count_tokens(text) * APPROX_BUFFER)
 
 
+def approximate_tokens_sum(texts: Iterable[str]) -> int:
+    """Approximate tokens of texts joined together, counted part by part to reuse memoized counts."""
+    return int(sum(count_tokens(text) for text in texts) * APPROX_BUFFER)
+
+
 def trim_to_tokens(
     text: str,
     max_tokens: int,
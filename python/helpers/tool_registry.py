@@ -0,0 +1,64 @@
+import os
+from typing import TYPE_CHECKING
+
+from python.helpers import extract_tools, files, subagents
+from python.helpers.print_style import PrintStyle
+
+if TYPE_CHECKING:
+    from agent import Agent
+    from python.helpers.tool import Tool
+
+TOOLS_FOLDER = "tools"
+DEFAULT_ROOT = "python"
+
+
+def get_tool_class(agent: "Agent|None", name: str) -> "type[Tool] | None":
+    """Returns the tool class for the agent's profile and project, first match in the search paths wins.
+    Tool modules are executed once and again only after the file changes."""
+    paths = subagents.get_paths(agent, TOOLS_FOLDER, name + ".py", default_root=DEFAULT_ROOT)
+    return _load_first(paths)
+
+
+def _load_first(paths: list[str]) -> "type[Tool] | None":
+    from python.helpers.tool import Tool
+
+    for path in paths:
+        try:
+            classes = extract_tools.load_classes_from_file_cached(path, Tool)
+        except Exception:
+            continue
+        if classes:
+            return classes[0]
+    return None
+
+
+def get_tool_folders() -> list[str]:
+    """All tool folders of default and user tools and agent profiles."""
+    folders = [
+        files.get_abs_path(DEFAULT_ROOT, TOOLS_FOLDER),
+        files.get_abs_path(subagents.USER_DIR, TOOLS_FOLDER),
+    ]
+    for agents_dir in (subagents.DEFAULT_AGENTS_DIR, subagents.USER_AGENTS_DIR):
+        for profile in files.get_subdirectories(agents_dir):
+            folders.append(files.get_abs_path(agents_dir, profile, TOOLS_FOLDER))
+    return [folder for folder in folders if os.path.isdir(folder)]
+
+
+def preload() -> int:
+    """Loads all known tool modules into the cache, returns the number of tool classes found."""
+    from python.helpers.tool import Tool
+
+    count = 0
+    for folder in get_tool_folders():
+        for file in sorted(os.listdir(folder)):
+            if not file.endswith(".py") or file.startswith("_"):
+                continue
+            try:
+                count += len(
+                    extract_tools.load_classes_from_file_cached(
+                        os.path.join(folder, file), Tool
+                    )
+                )
+            except Exception as e:
+                PrintStyle().error(f"Error preloading tool {file}: {e}")
+    return count
@@ -1,11 +1,15 @@
+import asyncio
 from python.helpers import git, runtime
 import hashlib
 
 async def check_version():
     import httpx
 
-    current_version = git.get_version()
-    anonymized_id = hashlib.sha256(runtime.get_persistent_id().encode()).hexdigest()[:20]
+    # reads the git repository and .env, called from handlers on the event loop
+    current_version, persistent_id = await asyncio.gather(
+        asyncio.to_thread(git.get_version), asyncio.to_thread(runtime.get_persistent_id)
+    )
+    anonymized_id = hashlib.sha256(persistent_id.encode()).hexdigest()[:20]
     
     url = "https://api.agent-zero.ai/a0-update-check"
     payload = {"current_version": current_version, "anonymized_id": anonymized_id}
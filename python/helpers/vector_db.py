@@ -16,7 +16,7 @@ from langchain.embeddings import CacheBackedEmbeddings
 from simpleeval import simple_eval
 
 from agent import Agent
-from python.helpers import guids
+from python.helpers import files, guids
 
 
 class MyFaiss(FAISS):
@@ -61,6 +61,11 @@ class VectorDB:
         self.agent = agent
         self.cache = cache  # store cache preference
         self.embeddings = self._get_embeddings(agent, cache=cache)
+        # identifies the embedding model for persisted embeddings
+        model_config = agent.config.embeddings_model
+        self.embeddings_namespace = files.safe_file_name(
+            model_config.provider + "_" + model_config.name
+        )
         self.index = faiss.IndexFlatIP(len(self.embeddings.embed_query("example")))
 
         self.db = MyFaiss(
@@ -98,14 +103,24 @@ class VectorDB:
                     break
         return result
 
-    async def insert_documents(self, docs: list[Document]):
+    async def insert_documents(
+        self, docs: list[Document], embeddings: Sequence[Sequence[float]] | None = None
+    ):
         ids = [guids.generate_id() for _ in range(len(docs))]
 
         if ids:
             for doc, id in zip(docs, ids):
                 doc.metadata["id"] = id  # add ids to documents metadata
 
-            self.db.add_documents(documents=docs, ids=ids)
+            if embeddings is None:
+                self.db.add_documents(documents=docs, ids=ids)
+            else:
+                # precomputed (cached) embeddings, skip the embedding model
+                self.db.add_embeddings(
+                    zip([doc.page_content for doc in docs], embeddings),
+                    metadatas=[doc.metadata for doc in docs],
+                    ids=ids,
+                )
         return ids
 
     async def delete_documents_by_ids(self, ids: list[str]):
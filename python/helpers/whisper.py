@@ -1,8 +1,11 @@
 import base64
+import time
 import warnings
 import whisper
-import tempfile
 import asyncio
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from python.helpers import runtime, rfc, settings, files
 from python.helpers.print_style import PrintStyle
 from python.helpers.notification import NotificationManager, NotificationType, NotificationPriority
@@ -10,10 +13,81 @@ from python.helpers.notification import NotificationManager, NotificationType, N
 # Suppress FutureWarning from torch.load
 warnings.filterwarnings("ignore", category=FutureWarning)
 
+SAMPLE_RATE = whisper.audio.SAMPLE_RATE
+
+# energy based voice activity detection used to split audio into chunks
+VAD_FRAME_MS = 30
+VAD_MIN_RMS = 0.01  # frames quieter than this are never speech
+VAD_RELATIVE_RMS = 0.1  # nor quieter than this fraction of the loudest frame
+VAD_MIN_SILENCE_MS = 500  # pause that ends a chunk
+VAD_PAD_MS = 200  # kept around each chunk so words are not clipped
+VAD_MAX_CHUNK_S = 30  # whisper's input window
+
+# live transcription sessions not updated for this long are dropped
+SESSION_TTL = 300
+
 _model = None
 _model_name = ""
 is_updating_model = False  # Tracks whether the model is currently updating
 
+# single worker owns the model, decoding never runs on the event loop
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper")
+
+
+class StreamDecoder:
+    """
+    ffmpeg process decoding a recording that arrives in pieces to 16 kHz mono
+    float32. Each piece is decoded once, samples grow as ffmpeg catches up.
+    """
+
+    def __init__(self):
+        self.process: asyncio.subprocess.Process | None = None
+        self.pcm = bytearray()
+        self._reader: asyncio.Task | None = None
+
+    async def feed(self, audio_bytes: bytes):
+        if not self.process:
+            self.process = await _start_ffmpeg()
+            self._reader = asyncio.create_task(self._read(self.process.stdout))  # type: ignore
+        self.process.stdin.write(audio_bytes)  # type: ignore
+        await self.process.stdin.drain()  # type: ignore
+
+    def samples(self) -> np.ndarray:
+        return _pcm_to_float(self.pcm[: len(self.pcm) // 2 * 2])
+
+    async def close(self) -> np.ndarray:
+        """End of the recording, returns all of its samples."""
+        if self.process:
+            self.process.stdin.close()  # type: ignore
+            await self._reader  # type: ignore
+            err = await self.process.stderr.read()  # type: ignore
+            if await self.process.wait():
+                raise RuntimeError(f"Failed to load audio: {err.decode(errors='replace')}")
+        return self.samples()
+
+    def kill(self):
+        if self.process and self.process.returncode is None:
+            self.process.kill()
+
+    async def _read(self, stdout: asyncio.StreamReader):
+        while data := await stdout.read(65536):
+            self.pcm.extend(data)
+
+
+@dataclass
+class TranscriptionSession:
+    offset: int = 0  # samples already transcribed
+    received: int = 0  # bytes of the recording received
+    finished: bool = False  # kept until pruned so late requests are ignored
+    texts: list[str] = field(default_factory=list)
+    decoder: StreamDecoder = field(default_factory=lambda: StreamDecoder())
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    updated: float = field(default_factory=time.monotonic)
+
+
+_sessions: dict[str, TranscriptionSession] = {}
+
+
 async def preload(model_name:str):
     try:
         # return await runtime.call_development_function(_preload, model_name)
@@ -21,7 +95,7 @@ async def preload(model_name:str):
     except Exception as e:
         # if not runtime.is_development():
         raise e
-        
+
 async def _preload(model_name:str):
     global _model, _model_name, is_updating_model
 
@@ -38,7 +112,7 @@ async def _preload(model_name:str):
                 display_time=99,
                 group="whisper-preload")
             PrintStyle.standard(f"Loading Whisper model: {model_name}")
-            _model = whisper.load_model(name=model_name, download_root=files.get_abs_path("/tmp/models/whisper")) # type: ignore
+            _model = await _run(_load_model, model_name)
             _model_name = model_name
             NotificationManager.send_notification(
                 NotificationType.INFO,
@@ -69,28 +143,149 @@ async def is_downloaded():
 def _is_downloaded():
     return _model is not None
 
-async def transcribe(model_name:str, audio_bytes_b64: str):
-    # return await runtime.call_development_function(_transcribe, model_name, audio_bytes_b64)
-    return await _transcribe(model_name, audio_bytes_b64)
+async def transcribe(model_name:str, audio_bytes_b64: str, session: str = "", final: bool = True, offset: int = 0):
+    # return await runtime.call_development_function(_transcribe, model_name, audio_bytes_b64, session, final, offset)
+    return await _transcribe(model_name, audio_bytes_b64, session, final, offset)
 
 
-async def _transcribe(model_name:str, audio_bytes_b64: str):
+async def _transcribe(model_name:str, audio_bytes_b64: str, session: str = "", final: bool = True, offset: int = 0):
     await _preload(model_name)
-    
+
     # Decode audio bytes if encoded as a base64 string
     audio_bytes = base64.b64decode(audio_bytes_b64)
 
-    # Create temp audio file
-    import os
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as audio_file:
-        audio_file.write(audio_bytes)
-        temp_path = audio_file.name
-    try:
-        # Transcribe the audio file
-        result = _model.transcribe(temp_path, fp16=False) # type: ignore
-        return result
-    finally:
+    if not session:
+        audio = await decode_audio(audio_bytes)
+        texts = [segment["text"] async for segment in stream_transcription(audio)]
+        return {"text": _join(texts), "final": True}
+
+    # live recording: the client sends each new piece of the recording once, offset
+    # is the number of bytes sent before it. Pieces are decoded as they arrive and
+    # the text of finished chunks is returned, each chunk is transcribed only once
+    _prune_sessions()
+    state = _sessions.get(session)
+    if not state and not offset:
+        state = _sessions[session] = TranscriptionSession()
+    if not state:
+        # expired or never started, the beginning of the recording is missing
+        return _lost(final)
+
+    async with state.lock:
+        if state.finished or state.received != offset:
+            # a late request after the final one, failed or pieces out of order
+            return _lost(final)
+        state.received += len(audio_bytes)
+        state.updated = time.monotonic()
+        state.finished = final
         try:
-            os.remove(temp_path)
+            await state.decoder.feed(audio_bytes)
+            audio = await state.decoder.close() if final else state.decoder.samples()
+            async for segment in stream_transcription(audio, state.offset, final):
+                state.texts.append(segment["text"])
+                state.offset = segment["end"]
         except Exception:
-            pass # ignore errors during cleanup
+            state.finished = True
+            state.decoder.kill()
+            raise
+        return {"text": _join(state.texts), "final": final}
+
+
+def _lost(final: bool) -> dict:
+    # the client sends the whole recording again without a session
+    return {"text": "", "final": final, "lost": True}
+
+
+async def stream_transcription(audio: np.ndarray, offset: int = 0, final: bool = True):
+    """
+    Transcribe speech chunks of 16 kHz mono audio starting at sample offset and
+    yield them as they are decoded. Unless final, the last chunk is left out
+    while it may still be growing.
+    """
+    for start, end in split_speech(audio, offset):
+        if not final and len(audio) - end < SAMPLE_RATE * VAD_MIN_SILENCE_MS // 1000:
+            break
+        text = await _run(_transcribe_chunk, audio[start:end])
+        yield {"start": start, "end": end, "text": text}
+
+
+def split_speech(audio: np.ndarray, offset: int = 0) -> list[tuple[int, int]]:
+    """Sample ranges of speech in audio after offset, split at pauses and at whisper's window."""
+    frame = SAMPLE_RATE * VAD_FRAME_MS // 1000
+    count = (len(audio) - offset) // frame
+    if count <= 0:
+        return []
+    frames = audio[offset : offset + count * frame].reshape(count, frame)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+    speech = rms > max(VAD_MIN_RMS, VAD_RELATIVE_RMS * float(rms.max()))
+
+    min_silence = VAD_MIN_SILENCE_MS // VAD_FRAME_MS
+    max_chunk = VAD_MAX_CHUNK_S * 1000 // VAD_FRAME_MS
+    pad = SAMPLE_RATE * VAD_PAD_MS // 1000
+
+    chunks: list[tuple[int, int]] = []
+    start = last = -1
+    for i in np.flatnonzero(speech).tolist():
+        if start >= 0 and (i - last > min_silence or i - start >= max_chunk):
+            chunks.append((start, last + 1))
+            start = -1
+        if start < 0:
+            start = i
+        last = i
+    if start >= 0:
+        chunks.append((start, last + 1))
+
+    end_of_audio = len(audio)
+    return [
+        (max(offset, offset + s * frame - pad), min(end_of_audio, offset + e * frame + pad))
+        for s, e in chunks
+    ]
+
+
+async def decode_audio(audio_bytes: bytes) -> np.ndarray:
+    """Decode any ffmpeg supported audio to 16 kHz mono float32, piped in memory."""
+    process = await _start_ffmpeg()
+    out, err = await process.communicate(audio_bytes)
+    if process.returncode:
+        raise RuntimeError(f"Failed to load audio: {err.decode(errors='replace')}")
+    return _pcm_to_float(out)
+
+
+async def _start_ffmpeg() -> asyncio.subprocess.Process:
+    # fmt: off
+    return await asyncio.create_subprocess_exec(
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error", "-threads", "0",
+        "-i", "pipe:0",
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE),
+        "-",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    # fmt: on
+
+
+def _pcm_to_float(pcm: bytes | bytearray) -> np.ndarray:
+    return np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
+
+
+async def _run(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+
+
+def _load_model(model_name: str):
+    return whisper.load_model(name=model_name, download_root=files.get_abs_path("/tmp/models/whisper")) # type: ignore
+
+
+def _transcribe_chunk(audio: np.ndarray) -> str:
+    result = _model.transcribe(audio, fp16=False) # type: ignore
+    return str(result["text"]).strip()
+
+
+def _join(texts: list[str]) -> str:
+    return " ".join(text for text in texts if text)
+
+
+def _prune_sessions():
+    now = time.monotonic()
+    for key in [k for k, s in _sessions.items() if now - s.updated > SESSION_TTL]:
+        _sessions.pop(key).decoder.kill()
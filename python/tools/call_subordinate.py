@@ -1,29 +1,59 @@
+import asyncio
+from dataclasses import dataclass
+
 from agent import Agent, UserMessage
+from python.helpers import errors
 from python.helpers.tool import Tool, Response
 from initialize import initialize_agent
 from python.extensions.hist_add_tool_result import _90_save_tool_call_file as save_tool_call_file
 
+# subordinates of one fan-out running at the same time unless max_parallel is given
+FANOUT_MAX_PARALLEL = 4
+DATA_NAME_BUDGET = "_subordinate_budget"
+
+
+@dataclass
+class SubordinateBudget:
+    """
+    Limits of one fan-out subordinate. Tokens are the prompt tokens sent to the
+    chat model, counted by the before_main_llm_call extension; exceeding either
+    limit cancels the subordinate's monologue.
+    """
+
+    max_tokens: int = 0
+    timeout: float = 0
+    tokens: int = 0
+    reason: str = ""
+    task: asyncio.Task | None = None
+
+    def spend(self, tokens: int) -> bool:
+        if self.max_tokens and self.tokens + tokens > self.max_tokens:
+            self.stop(f"token budget of {self.max_tokens} exhausted")
+            return True
+        self.tokens += tokens
+        return False
+
+    def stop(self, reason: str):
+        self.reason = reason
+        if self.task:
+            self.task.cancel()
+
 
 class Delegation(Tool):
 
     async def execute(self, message="", reset="", **kwargs):
+        tasks = kwargs.pop("tasks", None)
+        if tasks:
+            return await self.fan_out(tasks, **kwargs)
+
         # create subordinate agent using the data object on this agent and set superior agent to his data object
         if (
             self.agent.get_data(Agent.DATA_NAME_SUBORDINATE) is None
             or str(reset).lower().strip() == "true"
         ):
-            # initialize default config
-            config = initialize_agent()
-
-            # set subordinate prompt profile if provided, if not, keep original
-            agent_profile = kwargs.get("profile", kwargs.get("agent_profile", ""))
-            if agent_profile:
-                config.profile = agent_profile
-
             # crate agent
-            sub = Agent(self.agent.number + 1, config, self.agent.context)
+            sub = self.create_subordinate(kwargs.get("profile", kwargs.get("agent_profile", "")))
             # register superior/subordinate
-            sub.set_data(Agent.DATA_NAME_SUPERIOR, self.agent)
             self.agent.set_data(Agent.DATA_NAME_SUBORDINATE, sub)
 
         # add user message to subordinate agent
@@ -36,6 +66,86 @@ class Delegation(Tool):
         # seal the subordinate's current topic so messages move to `topics` for compression
         subordinate.history.new_topic()
 
+        return self.get_response(result)
+
+    async def fan_out(self, tasks, max_parallel="", max_tokens="", timeout="", **kwargs) -> Response:
+        """
+        Run independent subtasks on fresh subordinates concurrently and join their
+        results into one response. Fan-out subordinates link to this agent as their
+        superior but do not replace its persistent subordinate.
+        """
+        if not isinstance(tasks, list):
+            return Response(message="tasks must be a list of messages", break_loop=False)
+
+        profile = kwargs.get("profile", kwargs.get("agent_profile", ""))
+        semaphore = asyncio.Semaphore(_positive(max_parallel, int) or FANOUT_MAX_PARALLEL)
+        runs = []
+        for index, task in enumerate(tasks, start=1):
+            if isinstance(task, dict):
+                task_message = str(task.get("message", ""))
+                task_profile = task.get("profile", profile)
+            else:
+                task_message, task_profile = str(task), profile
+            sub = self.create_subordinate(task_profile)
+            sub.agent_name = f"{sub.agent_name}.{index}"
+            budget = SubordinateBudget(
+                max_tokens=_positive(max_tokens, int),
+                timeout=_positive(timeout, float),
+            )
+            sub.set_data(DATA_NAME_BUDGET, budget)
+            runs.append(self.run_budgeted(sub, task_message, budget, semaphore))
+
+        try:
+            results = await asyncio.gather(*runs)
+        finally:
+            # subordinates reset the streaming agent when they finish
+            self.agent.context.streaming_agent = self.agent
+
+        # join results into a single tool result for this agent's history
+        joined = "\n\n".join(
+            self.agent.read_prompt(
+                "fw.call_sub.fanout.md",
+                number=index,
+                total=len(results),
+                status=status,
+                result=result,
+            )
+            for index, (status, result) in enumerate(results, start=1)
+        )
+        return self.get_response(joined)
+
+    async def run_budgeted(
+        self, sub: Agent, message: str, budget: SubordinateBudget, semaphore: asyncio.Semaphore
+    ) -> tuple[str, str]:
+        async with semaphore:
+            sub.hist_add_user_message(UserMessage(message=message, attachments=[]))
+            budget.task = asyncio.create_task(sub.monologue())
+            try:
+                # cancelling this coroutine cancels the awaited monologue too
+                result = await asyncio.wait_for(budget.task, budget.timeout or None)
+                return "done", result
+            except asyncio.TimeoutError:
+                budget.reason = f"time budget of {budget.timeout:g}s exceeded"
+            except asyncio.CancelledError:
+                if not budget.reason:
+                    raise
+            except Exception as e:
+                return "failed", errors.error_text(e)
+            return "stopped", budget.reason
+
+    def create_subordinate(self, profile: str = "") -> Agent:
+        # initialize default config
+        config = initialize_agent()
+
+        # set subordinate prompt profile if provided, if not, keep original
+        if profile:
+            config.profile = profile
+
+        sub = Agent(self.agent.number + 1, config, self.agent.context)
+        sub.set_data(Agent.DATA_NAME_SUPERIOR, self.agent)
+        return sub
+
+    def get_response(self, result: str) -> Response:
         # hint to use includes for long responses
         additional = None
         if len(result) >= save_tool_call_file.LEN_MIN:
@@ -53,3 +163,11 @@ class Delegation(Tool):
             content="",
             kvps=self.args,
         )
+
+
+def _positive(value, type_):
+    # tool args come from the model and may be strings, empty or invalid
+    try:
+        return max(type_(value), 0)
+    except (TypeError, ValueError):
+        return type_(0)
@@ -18,10 +18,12 @@ from werkzeug.wrappers.request import Request as WerkzeugRequest
 import initialize
 from python.helpers import files, git, mcp_server, fasta2a_server, settings as settings_helper
 from python.helpers.files import get_abs_path
-from python.helpers import runtime, dotenv, process
+from python.helpers import runtime, dotenv, process, http_session
 from python.helpers.websocket import WebSocketHandler, validate_ws_origin
 from python.helpers.extract_tools import load_classes_from_folder
 from python.helpers.api import ApiHandler
+from python.helpers.api_router import ApiRouter
+from python.helpers.document_cache import DocumentCache
 from python.helpers.print_style import PrintStyle
 from python.helpers import login
 import socketio  # type: ignore[import-untyped]
@@ -433,6 +435,9 @@ def run():
         runtime.get_arg("host") or dotenv.get_dotenv_value("WEB_UI_HOST") or "localhost"
     )
 
+    # api handlers are served natively on the event loop, Flask keeps the legacy routes
+    api_router = ApiRouter(webapp, fallback=WSGIMiddleware(webapp))
+
     def register_api_handler(app, handler: type[ApiHandler]):
         name = handler.__module__.split(".")[-1]
         instance = handler(app, lock)
@@ -449,11 +454,11 @@ def run():
         if handler.requires_csrf():
             handler_wrap = csrf_protect(handler_wrap)
 
-        app.add_url_rule(
-            f"/{name}",
+        api_router.add_route(
             f"/{name}",
             handler_wrap,
             methods=handler.get_methods(),
+            in_thread=not handler.runs_on_event_loop(),
         )
 
     handlers = load_classes_from_folder("python/api", "*.py", ApiHandler)
@@ -470,12 +475,11 @@ def run():
 
     init_a0()
 
-    wsgi_app = WSGIMiddleware(webapp)
     starlette_app = Starlette(
         routes=[
             Mount("/mcp", app=mcp_server.DynamicMcpProxy.get_instance()),
             Mount("/a2a", app=fasta2a_server.DynamicA2AProxy.get_instance()),
-            Mount("/", app=wsgi_app),
+            Mount("/", app=api_router),
         ]
     )
 
@@ -485,7 +489,8 @@ def run():
         """
         TODO(dev): add cleanup + flush-to-disk logic here.
         """
-        return
+        http_session.close_sessions()
+        DocumentCache.flush_all()
     flush_ran = False
 
     def _run_flush(reason: str) -> None:
@@ -0,0 +1,138 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import httpx
+import pytest
+from flask import Flask, Response, request, send_file, session
+from uvicorn.middleware.wsgi import WSGIMiddleware
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers.api import ApiHandler, ApiStream
+from python.helpers.api_router import ApiRouter
+
+
+class Echo(ApiHandler):
+    @classmethod
+    def runs_on_event_loop(cls) -> bool:
+        return True
+
+    async def process(self, input, request):
+        session["calls"] = session.get("calls", 0) + 1
+        return {"input": input, "calls": session["calls"], 1: "non-str key"}
+
+
+class Stream(ApiHandler):
+    @classmethod
+    def runs_on_event_loop(cls) -> bool:
+        return True
+
+    async def process(self, input, request):
+        async def items():
+            for i in range(3):
+                await asyncio.sleep(0)
+                yield {"item": i}
+
+        return ApiStream(items())
+
+
+class ThreadedStream(Stream):
+    @classmethod
+    def runs_on_event_loop(cls) -> bool:
+        return False
+
+
+class Upload(ApiHandler):
+    async def process(self, input, request):
+        file = request.files["file"]
+        return {
+            "name": file.filename,
+            "size": len(file.read()),
+            "main_thread": threading.current_thread() is threading.main_thread(),
+        }
+
+
+@pytest.fixture
+def client(tmp_path):
+    app = Flask("test_api_router")
+    app.secret_key = "test-secret"
+
+    @app.get("/legacy")
+    def legacy():
+        return Response("flask", status=200)
+
+    router = ApiRouter(app, fallback=WSGIMiddleware(app))
+    for path, handler in (
+        ("/echo", Echo),
+        ("/stream", Stream),
+        ("/threaded-stream", ThreadedStream),
+        ("/upload", Upload),
+    ):
+        instance = handler(app, threading.RLock())
+
+        async def view(instance=instance):
+            return await instance.handle_request(request=request)
+
+        router.add_route(path, view, handler.get_methods(), in_thread=not handler.runs_on_event_loop())
+
+    download = tmp_path / "download.bin"
+    download.write_bytes(b"x" * (600 * 1024))
+
+    async def file_view():
+        return send_file(str(download))
+
+    router.add_route("/download", file_view, ["GET"], in_thread=False)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=router), base_url="http://localhost")
+
+
+@pytest.mark.asyncio
+async def test_handlers_run_natively_with_flask_request_and_session(client):
+    async with client:
+        first = await client.post("/echo", json={"text": "hi"})
+        assert first.status_code == 200
+        assert first.headers["content-type"] == "application/json"
+        assert first.json() == {"input": {"text": "hi"}, "calls": 1, "1": "non-str key"}
+        # the session cookie set by the handler is sent back
+        second = await client.post("/echo", json={})
+        assert second.json()["calls"] == 2
+
+        assert (await client.get("/echo")).status_code == 405
+        assert (await client.get("/legacy")).text == "flask"
+
+
+@pytest.mark.asyncio
+async def test_streamed_and_file_responses(client):
+    async with client:
+        response = await client.post("/stream", json={})
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert response.text.splitlines() == ['{"item":0}', '{"item":1}', '{"item":2}']
+
+        download = await client.get("/download")
+        assert download.status_code == 200
+        assert len(download.content) == 600 * 1024
+
+
+@pytest.mark.asyncio
+async def test_handlers_run_in_a_worker_thread_by_default(client):
+    async with client:
+        response = await client.post("/upload", files={"file": ("a.txt", b"a" * (2 * 1024 * 1024))})
+        assert response.json() == {"name": "a.txt", "size": 2 * 1024 * 1024, "main_thread": False}
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_from_a_threaded_route_is_rejected(client):
+    async with client:
+        with pytest.raises(RuntimeError, match="in_thread=False"):
+            await client.post("/threaded-stream", json={})
+
+
+def test_message_handlers_run_on_the_event_loop():
+    from python.api.message import Message
+    from python.api.message_async import MessageAsync
+
+    assert Message.runs_on_event_loop()
+    assert MessageAsync.runs_on_event_loop()
@@ -0,0 +1,177 @@
+import os
+import sys
+import zlib
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import backup, backup_store
+from python.helpers.backup import BackupService
+from python.helpers.backup_store import BackupStore
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    store_path = str(tmp_path / "data" / "backups")
+    monkeypatch.setattr(backup, "BACKUP_STORE_FOLDER", store_path)
+    monkeypatch.setattr(backup_store, "BACKUP_STORE_FOLDER", store_path)
+    monkeypatch.setattr(backup_store, "CHUNK_SIZE", 1024)
+    service = BackupService()
+    service.base_paths = {str(tmp_path): str(tmp_path)}
+    data = tmp_path / "data"
+    (data / "memory").mkdir(parents=True)
+    (data / "memory" / "index.bin").write_bytes(os.urandom(8 * 1024))
+    (data / "chats").mkdir()
+    (data / "chats" / "chat.json").write_text('{"messages": []}')
+    (data / "settings.json").write_text("{}")
+    return service, data
+
+
+async def _snapshot(service: BackupService, data: Path, **kwargs):
+    return await service.create_snapshot(
+        include_patterns=[f"{data}/**"], exclude_patterns=[], backup_name="nightly", **kwargs
+    )
+
+
+def _blob_count(data: Path) -> int:
+    return sum(len(names) for _, _, names in os.walk(data / "backups" / "blobs"))
+
+
+@pytest.mark.asyncio
+async def test_snapshots_store_only_new_chunks(service):
+    service, data = service
+    first = await _snapshot(service, data)
+    assert first["full"] and first["total_files"] == 3
+    # the store itself is never part of a snapshot
+    assert first["changed_files"] == 3
+    blobs = _blob_count(data)
+    assert blobs == 8 + 2
+
+    second = await _snapshot(service, data)
+    assert second["parent"] == first["snapshot_id"]
+    assert not second["full"] and second["changed_files"] == 0 and second["stored_bytes"] == 0
+
+    # rewriting one chunk of a large file stores just that chunk
+    index = data / "memory" / "index.bin"
+    content = bytearray(index.read_bytes())
+    content[2048:2056] = b"changed!"
+    index.write_bytes(bytes(content))
+    (data / "settings.json").unlink()
+    third = await _snapshot(service, data)
+    assert third["changed_files"] == 1 and third["removed_files"] == 1
+    assert _blob_count(data) == blobs + 1
+    assert [s["id"] for s in service.list_snapshots()] == [
+        first["snapshot_id"],
+        second["snapshot_id"],
+        third["snapshot_id"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_restore_resolves_snapshot_chain(service):
+    service, data = service
+    first = await _snapshot(service, data)
+    (data / "chats" / "chat.json").write_text('{"messages": ["hello"]}')
+    (data / "settings.json").unlink()
+    second = await _snapshot(service, data)
+
+    (data / "chats" / "chat.json").write_text("broken")
+    preview = await service.preview_restore(snapshot_id=second["snapshot_id"])
+    assert preview["restore_count"] == 2
+    result = await service.restore_backup(snapshot_id=second["snapshot_id"])
+    assert not result["errors"]
+    assert (data / "chats" / "chat.json").read_text() == '{"messages": ["hello"]}'
+    assert not (data / "settings.json").exists()
+
+    result = await service.restore_backup(
+        snapshot_id=first["snapshot_id"],
+        restore_include_patterns=[f"{data}/settings.json"],
+    )
+    assert [f["target_path"] for f in result["restored_files"]] == [str(data / "settings.json")]
+    metadata = await service.inspect_backup(snapshot_id=first["snapshot_id"])
+    assert metadata["total_files"] == 3 and len(metadata["files_in_archive"]) == 3
+    assert sorted(f["path"] for f in metadata["files"]) == sorted(
+        str(data / name) for name in ("chats/chat.json", "memory/index.bin", "settings.json")
+    )
+    # manifests only keep counts, the file list comes from the resolved chain
+    assert "files" not in BackupStore().read_manifest(second["snapshot_id"])["metadata"]
+
+
+@pytest.mark.asyncio
+async def test_every_nth_snapshot_is_full(service, monkeypatch):
+    service, data = service
+    monkeypatch.setattr(backup_store, "FULL_MANIFEST_INTERVAL", 2)
+    snapshots = [await _snapshot(service, data) for _ in range(4)]
+    assert [s["full"] for s in snapshots] == [True, False, True, False]
+
+    # corrupted chunks are detected on restore
+    store = BackupStore()
+    entry = store.resolve(snapshots[-1]["snapshot_id"])[str(data / "settings.json")]
+    blob = store._blob_path(entry["chunks"][0])
+    with open(blob, "wb") as f:
+        f.write(zlib.compress(b"tampered"))
+    result = await service.restore_backup(snapshot_id=snapshots[-1]["snapshot_id"])
+    assert [e["path"] for e in result["errors"]] == [str(data / "settings.json").lstrip("/")]
+    assert (data / "settings.json").read_text() == "{}"
+
+
+@pytest.mark.asyncio
+async def test_deleting_a_snapshot_keeps_later_snapshots_restorable(service):
+    service, data = service
+    first = await _snapshot(service, data)
+    (data / "chats" / "chat.json").write_text('{"messages": ["hello"]}')
+    second = await _snapshot(service, data)
+    (data / "settings.json").write_text('{"theme": "dark"}')
+    third = await _snapshot(service, data)
+    store = BackupStore()
+    expected = store.resolve(third["snapshot_id"])
+    blobs = _blob_count(data)
+
+    # the full snapshot goes, its child becomes full and the grandchild still resolves
+    result = await service.delete_snapshots([first["snapshot_id"]])
+    assert result["removed_blobs"] == 1  # only the first chat.json chunk
+    assert _blob_count(data) == blobs - 1
+    assert [s["id"] for s in service.list_snapshots()] == [second["snapshot_id"], third["snapshot_id"]]
+    assert store.read_manifest(second["snapshot_id"])["full"]
+    assert store.resolve(third["snapshot_id"]) == expected
+
+    (data / "settings.json").write_text("broken")
+    result = await service.restore_backup(snapshot_id=third["snapshot_id"])
+    assert not result["errors"]
+    assert (data / "settings.json").read_text() == '{"theme": "dark"}'
+    with pytest.raises(Exception):
+        await service.delete_snapshots([first["snapshot_id"]])
+
+
+@pytest.mark.asyncio
+async def test_retention_keeps_newest_snapshots_and_sweeps_unreferenced_chunks(service):
+    service, data = service
+    ids = []
+    for i in range(4):
+        (data / "settings.json").write_text(f'{{"run": {i}}}')
+        ids.append((await _snapshot(service, data))["snapshot_id"])
+    store = BackupStore()
+    latest = store.resolve(ids[-1])
+    stale = os.path.join(store.blobs_dir, "00", "interrupted.tmp")
+    os.makedirs(os.path.dirname(stale), exist_ok=True)
+    with open(stale, "wb") as f:
+        f.write(b"partial")
+
+    result = await service.prune_snapshots(2)
+    assert result["deleted"] == ids[:2]
+    assert [s["id"] for s in service.list_snapshots()] == ids[2:]
+    assert store.resolve(ids[-1]) == latest
+    # chunks of the two deleted settings.json versions and the temp file are gone
+    assert _blob_count(data) == 8 + 1 + 2
+    assert not os.path.exists(stale)
+    for entry in store.resolve(ids[2]).values():
+        for digest in entry["chunks"]:
+            store.read_chunk(digest)
+
+    # collecting again finds nothing to free
+    assert store.collect_garbage() == {"removed_blobs": 0, "freed_bytes": 0}
+    assert (await service.prune_snapshots(5))["deleted"] == []
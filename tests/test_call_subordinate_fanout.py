@@ -0,0 +1,137 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from agent import Agent
+from python.extensions.before_main_llm_call._05_subordinate_budget import SubordinateBudgetCheck
+from python.tools import call_subordinate
+from python.tools.call_subordinate import Delegation
+
+STEP_DELAY = 0.05
+
+
+class FakeAgent:
+    def __init__(self, number: int, context, steps: int = 3, prompt_tokens: int = 100, fail: bool = False):
+        self.number = number
+        self.agent_name = f"A{number}"
+        self.context = context
+        self.steps = steps
+        self.prompt_tokens = prompt_tokens
+        self.fail = fail
+        self.data = {}
+        self.message = ""
+
+    def get_data(self, field):
+        return self.data.get(field)
+
+    def set_data(self, field, value):
+        self.data[field] = value
+
+    def hist_add_user_message(self, message):
+        self.message = message.message
+
+    def read_prompt(self, file, **kwargs):
+        return "{number}/{total} {status}: {result}".format(**kwargs)
+
+    async def monologue(self):
+        self.context.running += 1
+        self.context.max_running = max(self.context.max_running, self.context.running)
+        try:
+            for _ in range(self.steps):
+                # what the message loop does before each model call
+                self.set_data(Agent.DATA_NAME_CTX_WINDOW, {"tokens": self.prompt_tokens})
+                await SubordinateBudgetCheck(self).execute()
+                await asyncio.sleep(STEP_DELAY)
+                if self.fail:
+                    raise RuntimeError("model unavailable")
+            return f"answer to {self.message}"
+        finally:
+            self.context.running -= 1
+
+
+def _delegation(monkeypatch, overrides: dict[int, dict] | None = None):
+    context = SimpleNamespace(streaming_agent=None, running=0, max_running=0)
+    superior = FakeAgent(0, context)
+    subs = []
+
+    def create_subordinate(self, profile=""):
+        kwargs = (overrides or {}).get(len(subs), {})
+        sub = FakeAgent(self.agent.number + 1, context, **kwargs)
+        sub.profile = profile
+        sub.set_data(Agent.DATA_NAME_SUPERIOR, self.agent)
+        subs.append(sub)
+        return sub
+
+    monkeypatch.setattr(Delegation, "create_subordinate", create_subordinate)
+    tool = Delegation(superior, "call_subordinate", None, {}, "", None)  # type: ignore[arg-type]
+    return tool, superior, subs
+
+
+@pytest.mark.asyncio
+async def test_fan_out_runs_concurrently_up_to_cap(monkeypatch):
+    tool, superior, subs = _delegation(monkeypatch)
+    tasks = [f"question {i}" for i in range(6)]
+
+    started = time.perf_counter()
+    response = await tool.execute(tasks=tasks, max_parallel="3", profile="researcher")
+    elapsed = time.perf_counter() - started
+
+    # two waves of three instead of six serial runs
+    assert superior.context.max_running == 3
+    assert elapsed < 6 * 3 * STEP_DELAY * 0.75
+    assert response.message.split("\n\n") == [
+        f"{i + 1}/6 done: answer to question {i}" for i in range(6)
+    ] and not response.break_loop
+
+    # subordinates link back to the superior, its own subordinate chain is untouched
+    assert all(sub.get_data(Agent.DATA_NAME_SUPERIOR) is superior for sub in subs)
+    assert [sub.agent_name for sub in subs] == [f"A1.{i}" for i in range(1, 7)]
+    assert {sub.profile for sub in subs} == {"researcher"}
+    assert superior.get_data(Agent.DATA_NAME_SUBORDINATE) is None
+    assert superior.context.streaming_agent is superior
+
+
+@pytest.mark.asyncio
+async def test_fan_out_budgets_and_failures_are_reported_per_task(monkeypatch):
+    tool, _superior, subs = _delegation(
+        monkeypatch, {1: {"steps": 100}, 2: {"prompt_tokens": 1000}, 3: {"fail": True}}
+    )
+    monkeypatch.setattr(call_subordinate.errors, "error_text", lambda e: f"error: {e}")
+
+    response = await tool.execute(
+        tasks=["a", {"message": "b", "profile": "developer"}, "c", "d"],
+        max_tokens=2500,
+        timeout=1,
+    )
+
+    assert response.message.split("\n\n") == [
+        "1/4 done: answer to a",
+        "2/4 stopped: time budget of 1s exceeded",
+        "3/4 stopped: token budget of 2500 exhausted",
+        "4/4 failed: error: model unavailable",
+    ]
+    assert subs[1].profile == "developer"
+    assert subs[2].get_data(call_subordinate.DATA_NAME_BUDGET).tokens == 2000
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_superior_cancels_its_subordinates(monkeypatch):
+    tool, superior, subs = _delegation(monkeypatch, {0: {"steps": 100}, 1: {"steps": 100}})
+
+    task = asyncio.create_task(tool.execute(tasks=["a", "b"]))
+    await asyncio.sleep(STEP_DELAY * 2)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await asyncio.sleep(0)
+
+    assert superior.context.running == 0
+    assert all(sub.get_data(call_subordinate.DATA_NAME_BUDGET).task.cancelled() for sub in subs)
@@ -0,0 +1,89 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers.dirty_json import DirtyJson, DirtyJsonStream
+
+
+SAMPLES = [
+    (
+        '{"a": 1, "b": [1, 2.5, -3e2], "c": {"d": "x\\ny \\u0041"}, e: hello world, f: true, g: null}',
+        {"a": 1, "b": [1, 2.5, -300.0], "c": {"d": "x\ny A"}, "e": "hello world", "f": True, "g": None},
+    ),
+    (
+        'text before {"headline": "Hi", "tool_name": "response", "tool_args": {"text": "Hello \\"there\\""}} trailing',
+        {"headline": "Hi", "tool_name": "response", "tool_args": {"text": 'Hello "there"'}, "trailing": None},
+    ),
+    (
+        "{'a': 'b', /* comment */ 'd': `e`, // line\n 'f': '''multi\nline''' }",
+        {"a": "b", "d": "e", "f": "multi\nline"},
+    ),
+    ("[1, 2, 3,]", [1, 2, 3]),
+    ('{"a": undefined, "b": False, "c": NULL}', {"a": None, "b": False, "c": None}),
+    ('{"a": {"b": {"c": [{"d": "e"}, [], {}]}}}', {"a": {"b": {"c": [{"d": "e"}, [], {}]}}}),
+    (
+        '```json\n{"tool_name": "code_execution_tool", "tool_args": {"code": "x = {1: 2}"}}\n```',
+        {"tool_name": "code_execution_tool", "tool_args": {"code": "x = {1: 2}"}, "```": None},
+    ),
+    ('{"a": "unterminated', {"a": "unterminated"}),
+    # truncated output keeps the nested values parsed so far
+    ('{"a": 1, "b": {"c": [1, {"d": "e', {"a": 1, "b": {"c": [1, {"d": "e"}]}}),
+    ('"just a string"', "just a string"),
+    ("plain text", "plain text"),
+    ("", None),
+]
+
+
+@pytest.mark.parametrize("text,expected", SAMPLES)
+def test_parse_string(text: str, expected):
+    assert DirtyJson.parse_string(text) == expected
+
+
+@pytest.mark.parametrize("text,expected", SAMPLES)
+def test_stream_in_any_chunks_matches_full_parse(text: str, expected):
+    rng = random.Random(text)
+    for _ in range(10):
+        parser = DirtyJsonStream()
+        index = 0
+        while index < len(text):
+            size = rng.randint(1, 7)
+            parser.feed(text[index : index + size])
+            index += size
+        assert parser.finish() == expected
+
+    parser = DirtyJson()
+    for char in text:
+        parser.feed(char)
+    assert parser.stream.finish() == expected
+
+
+def test_partial_results_grow_in_place():
+    parser = DirtyJsonStream()
+    assert parser.feed('{"headline": "Wri') == {"headline": "Wri"}
+    assert parser.feed('ting", "tool_args": {"code": "ab') == {
+        "headline": "Writing",
+        "tool_args": {"code": "ab"},
+    }
+    assert parser.feed('c"}}') == {"headline": "Writing", "tool_args": {"code": "abc"}}
+    assert parser.finish() == {"headline": "Writing", "tool_args": {"code": "abc"}}
+    assert parser.done
+
+
+def test_feed_text_restarts_when_text_is_not_a_continuation():
+    parser = DirtyJsonStream()
+    parser.feed_text('{"a": "secret')
+    assert parser.feed_text('{"a": "******", "b": 1}') == {"a": "******", "b": 1}
+
+
+def test_snapshot_is_detached():
+    parser = DirtyJsonStream()
+    parser.feed('{"tool_args": {"text": "a')
+    snapshot = parser.snapshot()
+    snapshot["tool_args"] = {}
+    assert parser.feed('b"}}') == {"tool_args": {"text": "ab"}}
@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from langchain_core.embeddings import Embeddings
+
+from python.helpers import document_cache
+from python.helpers.document_cache import DocumentCache
+from python.helpers.document_query import DocumentQueryHelper, DocumentQueryStore
+from python.helpers.vector_db import VectorDB
+
+DIM = 8
+
+
+class _CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.embedded: list[str] = []
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        seed = int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
+        return np.random.default_rng(seed).normal(size=DIM).astype(np.float32).tolist()
+
+
+def _store(tmp_path) -> tuple[DocumentQueryStore, _CountingEmbeddings]:
+    embeddings = _CountingEmbeddings()
+    agent = SimpleNamespace(
+        get_embedding_model=lambda: embeddings,
+        config=SimpleNamespace(
+            embeddings_model=SimpleNamespace(provider="test", name="counting")
+        ),
+    )
+    store = DocumentQueryStore(agent)  # type: ignore
+    store.cache = DocumentCache(str(tmp_path))
+    store.vector_db = VectorDB(agent, cache=False)  # type: ignore
+    return store, embeddings
+
+
+def _paragraphs(count: int, prefix: str = "paragraph") -> str:
+    return "\n\n".join(f"{prefix} {i} " + "lorem ipsum " * 80 for i in range(count))
+
+
+def test_round_trip_and_persistence(tmp_path):
+    cache = DocumentCache(str(tmp_path))
+    key = DocumentCache.content_key(b"document")
+    assert cache.get_text(key) is None
+
+    cache.put_text(key, "file:///doc.txt", "document text")
+    cache.put_chunks(key, 100, 10, ["a", "b"])
+    cache.put_embeddings(key, "model", 100, 10, np.ones((2, DIM)))
+
+    reopened = DocumentCache(str(tmp_path))
+    assert reopened.get_text(key) == "document text"
+    assert reopened.get_chunks(key, 100, 10) == ["a", "b"]
+    assert reopened.get_chunks(key, 200, 10) is None
+    assert reopened.get_embeddings(key, "model", 100, 10).shape == (2, DIM)  # type: ignore
+    assert reopened.get_embeddings(key, "other", 100, 10) is None
+    assert reopened.find_previous_key("file:///doc.txt", exclude="x") == key
+    assert reopened.find_previous_key("file:///doc.txt", exclude=key) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = DocumentCache(str(tmp_path), max_bytes=2500)
+    keys = [DocumentCache.content_key(bytes([i])) for i in range(3)]
+    cache.put_text(keys[0], "a", "x" * 1000)
+    cache.put_text(keys[1], "b", "x" * 1000)
+    assert cache.get_text(keys[0])  # keys[1] is now least recently used
+    cache.put_text(keys[2], "c", "x" * 1000)
+
+    assert cache.get_text(keys[1]) is None
+    assert cache.get_text(keys[0]) and cache.get_text(keys[2])
+    assert cache.total_size() <= 2500
+
+
+def test_cache_hits_save_the_index_lazily(tmp_path, monkeypatch):
+    cache = DocumentCache(str(tmp_path))
+    keys = [DocumentCache.content_key(bytes([i])) for i in range(2)]
+    cache.put_text(keys[0], "a", "first")
+    cache.put_text(keys[1], "b", "second")
+    index_file = tmp_path / "index.json"
+    saved = index_file.read_text()
+
+    assert cache.get_text(keys[0]) == "first"
+    assert index_file.read_text() == saved
+    cache.flush()
+    assert index_file.read_text() != saved
+    used = json.loads(index_file.read_text())[keys[0]]["used"]
+
+    # the next write saves pending usage too
+    assert cache.get_text(keys[0]) == "first"
+    cache.put_text(keys[1], "b", "second")
+    assert json.loads(index_file.read_text())[keys[0]]["used"] > used
+
+    monkeypatch.setattr(document_cache, "DOCUMENT_CACHE_INDEX_SAVE_INTERVAL", 0)
+    saved = index_file.read_text()
+    assert cache.get_text(keys[1]) == "second"
+    assert index_file.read_text() != saved
+
+
+@pytest.mark.asyncio
+async def test_only_changed_chunks_are_embedded(tmp_path):
+    store, embeddings = _store(tmp_path)
+    uri = "file:///docs/report.txt"
+    text = _paragraphs(6)
+    key = DocumentCache.content_key(text.encode())
+    store.cache.put_text(key, uri, text)
+
+    success, ids = await store.add_document(text, uri, cache_key=key)
+    assert success and len(ids) > 1
+    assert await store.document_exists(uri, key)
+    first_count = len(embeddings.embedded)
+    assert first_count == len(ids)
+
+    # same content in a new store (e.g. after restart) embeds nothing
+    store, embeddings = _store(tmp_path)
+    await store.add_document(text, uri, cache_key=key)
+    assert embeddings.embedded == []
+
+    # edited document: only the chunks that differ are embedded
+    edited = text.replace("paragraph 5 ", "paragraph five ")
+    edited_key = DocumentCache.content_key(edited.encode())
+    store.cache.put_text(edited_key, uri, edited)
+    assert not await store.document_exists(uri, edited_key)
+    success, ids = await store.add_document(edited, uri, cache_key=edited_key)
+    assert success
+    assert 0 < len(embeddings.embedded) < len(ids)
+    assert all("paragraph five" in chunk for chunk in embeddings.embedded)
+
+    results = await store.search_documents("paragraph five", limit=3, threshold=0.0)
+    assert len(results) <= 3
+    assert len(await store._get_document_chunks(uri)) == len(ids)
+
+
+@pytest.mark.asyncio
+async def test_changed_remote_document_is_fetched_and_indexed_again(tmp_path, monkeypatch):
+    store, _embeddings = _store(tmp_path)
+
+    async def handle_intervention():
+        pass
+
+    helper = DocumentQueryHelper.__new__(DocumentQueryHelper)
+    helper.agent = SimpleNamespace(handle_intervention=handle_intervention)  # type: ignore
+    helper.store = store
+    helper.progress_callback = lambda msg: None
+    helper.store_lock = asyncio.Lock()
+
+    page = {"body": _paragraphs(2, "first")}
+
+    async def fetch_web_document(document, scheme):
+        return page["body"].encode(), "utf-8"
+
+    monkeypatch.setattr(helper, "fetch_web_document", fetch_web_document)
+    uri = "https://example.com/notes.txt"
+
+    assert await helper.document_get_content(uri, True) == page["body"]
+    # unchanged content is served from the store
+    assert (await helper.document_get_content(uri, True)).startswith("first 0")
+
+    page["body"] = _paragraphs(2, "second")
+    assert await helper.document_get_content(uri, True) == page["body"]
+    doc = await store.get_document(uri)
+    assert doc and doc.page_content.startswith("second 0")
@@ -0,0 +1,96 @@
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers.embedding_service import EmbeddingService
+
+
+class _Encoder:
+    def __init__(self):
+        self.batches: list[list[str]] = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, texts):
+        self.release.wait(5)
+        self.batches.append(list(texts))
+        return [[float(len(text)), float(text.count("a"))] for text in texts]
+
+
+def _expected(text):
+    return [float(len(text)), float(text.count("a"))]
+
+
+def test_concurrent_requests_are_batched_and_routed():
+    encoder = _Encoder()
+    service = EmbeddingService(encoder, name="test", max_latency=0.05)
+    texts = [f"text {'a' * i}" for i in range(40)]
+    results: dict[int, list] = {}
+
+    def request(i):
+        results[i] = service.embed([texts[i]]) if i % 2 else service.embed([texts[i], "x"])
+
+    threads = [threading.Thread(target=request, args=(i,)) for i in range(len(texts))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    for i, text in enumerate(texts):
+        expected = [_expected(text)] if i % 2 else [_expected(text), _expected("x")]
+        assert results[i] == expected
+    assert len(encoder.batches) < len(texts)
+    assert all(len(batch) <= service.max_batch_size + 1 for batch in encoder.batches)
+
+
+@pytest.mark.asyncio
+async def test_async_requests_wait_without_blocking_the_loop():
+    encoder = _Encoder()
+    encoder.release.clear()
+    service = EmbeddingService(encoder, name="test-async", max_latency=0.01)
+
+    pending = asyncio.gather(*[service.aembed([f"q{i}"]) for i in range(8)])
+    await asyncio.sleep(0.05)  # the loop keeps running while the model is busy
+    encoder.release.set()
+    results = await pending
+    assert [result[0] for result in results] == [_expected(f"q{i}") for i in range(8)]
+    assert await service.aembed([]) == []
+
+
+def test_errors_are_raised_to_every_request_of_the_batch():
+    def fail(texts):
+        raise RuntimeError("model failed")
+
+    service = EmbeddingService(fail, name="test-error")
+    with pytest.raises(RuntimeError, match="model failed"):
+        service.embed(["text"])
+    # the worker keeps serving later requests
+    with pytest.raises(RuntimeError):
+        service.embed(["again"])
+
+
+def test_model_is_loaded_once_per_configuration():
+    loads = []
+
+    def load():
+        loads.append(1)
+        return "model"
+
+    def encode(model, texts):
+        return [[1.0] for _ in texts]
+
+    first = EmbeddingService.get(("test", "same-config"), load, encode)
+    second = EmbeddingService.get(("test", "same-config"), load, encode)
+    other = EmbeddingService.get(("test", "other-config"), load, encode)
+    assert first is second and first is not other
+    assert len(loads) == 2
+    assert first.model == "model"
+    assert np.array(first.embed(["a", "b"])).shape == (2, 1)
@@ -0,0 +1,114 @@
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import defer
+from python.helpers.defer import DeferredTask, EventLoopLanes, EventLoopThread
+from python.helpers.rate_limiter import RateLimiter
+
+
+def _lanes(size: int) -> EventLoopLanes:
+    return EventLoopLanes(f"LanesTest-{uuid.uuid4()}", size)
+
+
+def _terminate(lanes: EventLoopLanes):
+    for lane in range(lanes.size):
+        thread = EventLoopThread._instances.get(lanes._lane_name(lane))
+        if thread:
+            thread.terminate()
+
+
+def test_keys_stick_to_balanced_lanes():
+    lanes = _lanes(3)
+    names = [lanes.get_thread_name(f"ctx-{i}") for i in range(6)]
+
+    assert len(set(names)) == 3
+    assert all(names.count(name) == 2 for name in names)
+    assert lanes.get_thread_name("ctx-0") == names[0]
+
+    lanes.release("ctx-0")
+    assert lanes.get_thread_name("ctx-new") == names[0]
+
+
+def test_blocking_work_does_not_stall_other_lanes(monkeypatch):
+    monkeypatch.setattr(defer, "HEARTBEAT_INTERVAL", 0.05)
+    lanes = _lanes(2)
+    release = threading.Event()
+
+    async def blocking():
+        release.wait(5)  # synchronous work holding its loop
+
+    async def quick():
+        return "done"
+
+    try:
+        slow_task = DeferredTask(lanes.get_thread_name("slow")).start_task(blocking)
+        fast_task = DeferredTask(lanes.get_thread_name("fast")).start_task(quick)
+        assert fast_task.result_sync(timeout=2) == "done"
+
+        time.sleep(0.2)
+        metrics = {m["thread_name"]: m for m in lanes.get_metrics()}
+        slow_lane = metrics[lanes.get_thread_name("slow")]
+        assert slow_lane["active"] == 1
+        assert slow_lane["lag"] > 0.1
+        assert metrics[lanes.get_thread_name("fast")]["completed"] == 1
+    finally:
+        release.set()
+        slow_task.result_sync(timeout=2)
+        _terminate(lanes)
+
+
+def test_lanes_are_created_once_under_concurrent_first_use(monkeypatch):
+    from agent import AgentContext
+
+    created = []
+    barrier = threading.Barrier(8)
+
+    class SlowLanes(EventLoopLanes):
+        def __init__(self, *args):
+            created.append(self)
+            time.sleep(0.05)  # widen the window between check and assignment
+            super().__init__(*args)
+
+    monkeypatch.setattr(AgentContext, "_lanes", None)
+    monkeypatch.setattr("agent.EventLoopLanes", SlowLanes)
+    results = []
+
+    def first_use():
+        barrier.wait()
+        results.append(AgentContext.get_lanes())
+
+    threads = [threading.Thread(target=first_use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(lanes is created[0] for lanes in results)
+
+
+def test_rate_limiter_is_shared_across_lanes():
+    lanes = _lanes(4)
+    limiter = RateLimiter(seconds=60, requests=1000)
+
+    async def call_model():
+        for _ in range(50):
+            limiter.add(requests=1)
+            await limiter.wait()
+        return await limiter.get_total("requests")
+
+    try:
+        tasks = [DeferredTask(lanes.get_thread_name(f"ctx-{i}")).start_task(call_model) for i in range(8)]
+        totals = [task.result_sync(timeout=10) for task in tasks]
+    finally:
+        _terminate(lanes)
+
+    assert max(totals) == 400
+    assert len(limiter.values["requests"]) == 400
@@ -0,0 +1,77 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import file_tree
+from python.helpers.file_tree import cached_file_tree
+
+IGNORE = "node_modules/\n*.log\n"
+
+
+def _make_tree(root: Path):
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "src" / "pkg" / "module.py").write_text("x = 1")
+    (root / "src" / "main.py").write_text("print()")
+    (root / "node_modules" / "lib" / "dist").mkdir(parents=True)
+    (root / "node_modules" / "lib" / "dist" / "index.js").write_text("")
+    (root / "debug.log").write_text("")
+    (root / "README.md").write_text("readme")
+
+
+def _touch(path: Path, offset: int):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + offset * 10**9))
+
+
+def _assert_same(root: Path, **kwargs):
+    expected = file_tree.file_tree(str(root), ignore=IGNORE, **kwargs)
+    assert cached_file_tree(str(root), ignore=IGNORE, **kwargs) == expected
+
+
+@pytest.fixture(params=["inotify", "polling"])
+def tree(request, tmp_path, monkeypatch):
+    if request.param == "polling":
+        monkeypatch.setattr(file_tree.DirWatcher, "create", staticmethod(lambda: None))
+    elif file_tree.DirWatcher.create() is None:
+        pytest.skip("inotify not available")
+    root = tmp_path / request.param
+    root.mkdir()
+    _make_tree(root)
+    return root
+
+
+def test_cached_tree_follows_changes(tree):
+    _assert_same(tree)
+    _assert_same(tree, max_depth=1)
+
+    (tree / "src" / "pkg" / "new.py").write_text("")
+    _assert_same(tree)
+    (tree / "node_modules" / "lib" / "dist" / "index.js").unlink()
+    _assert_same(tree)
+    (tree / "src" / "pkg" / "module.py").rename(tree / "src" / "renamed.py")
+    _assert_same(tree, max_depth=2, max_files=1)
+
+
+def test_modified_files_reorder_the_tree(tree, monkeypatch):
+    monkeypatch.setattr(file_tree, "POLL_REFRESH_INTERVAL", 0.0)
+    _assert_same(tree)
+    # content changes do not change the folder, only the file's mtime
+    (tree / "README.md").write_text("edited")
+    _touch(tree / "README.md", 100)
+    _assert_same(tree)
+
+
+def test_rendered_output_is_memoized(tree, monkeypatch):
+    first = cached_file_tree(str(tree), ignore=IGNORE, max_lines=10)
+
+    def fail(_directory):
+        raise AssertionError("unchanged tree was scanned")
+
+    monkeypatch.setattr(file_tree._DirectoryScanner, "scan", fail)
+    assert cached_file_tree(str(tree), ignore=IGNORE, max_lines=10) == first
@@ -0,0 +1,109 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import history, tokens
+from python.helpers.history import Bulk, History, Message, Topic
+
+
+def _expected_tokens(record) -> int:
+    # token count recalculated from scratch, without any cached values
+    if isinstance(record, Message):
+        return tokens.approximate_tokens(record.output_text())
+    if isinstance(record, History):
+        return sum(_expected_tokens(r) for r in [*record.bulks, *record.topics, record.current])
+    if record.summary:
+        return tokens.approximate_tokens(record.summary)
+    children = record.messages if isinstance(record, Topic) else record.records
+    return sum(_expected_tokens(r) for r in children)
+
+
+def _long_text(i: int) -> str:
+    return f"message {i} " + "lorem ipsum dolor sit amet " * 30
+
+
+def test_token_counts_are_memoized(monkeypatch):
+    calls = []
+    encode = tokens._encode_count
+
+    def counting_encode(text, encoding_name):
+        calls.append(text)
+        return encode(text, encoding_name)
+
+    monkeypatch.setattr(tokens, "_encode_count", counting_encode)
+    monkeypatch.setattr(tokens, "_memo", type(tokens._memo)())
+    text = _long_text(1)
+    assert tokens.count_tokens(text) == tokens.count_tokens(text) > 0
+    assert len(calls) == 1
+    assert tokens.count_tokens("short") == tokens.count_tokens("short")
+    assert len(calls) == 3  # short texts are not memoized
+
+    monkeypatch.setattr(tokens, "MEMO_MAX_ENTRIES", 2)
+    for i in range(3):
+        tokens.count_tokens(_long_text(i + 10))
+    assert len(tokens._memo) == 2
+
+
+def test_history_total_is_maintained_incrementally(monkeypatch):
+    hist = History(agent=None)
+    for i in range(6):
+        hist.add_message(i % 2 == 1, _long_text(i))
+        if i % 2:
+            hist.new_topic()
+    hist.add_message(False, {"tool": "result", "text": _long_text(99)})
+    assert hist.get_tokens() == _expected_tokens(hist)
+
+    # cached totals are reused, nothing is tokenized again
+    def fail(*args):
+        raise AssertionError("tokens recalculated")
+
+    total = hist.get_tokens()
+    message = Message(True, _long_text(42))
+    monkeypatch.setattr(tokens, "count_tokens", fail)
+    assert hist.get_tokens() == total
+    hist.current.messages.append(message)  # appended records only add their own count
+    assert hist.get_tokens() == total + message.tokens
+    monkeypatch.undo()
+
+    # mutations invalidate the affected totals
+    hist.topics[0].messages[0].set_summary("short summary")
+    assert hist.get_tokens() == _expected_tokens(hist)
+
+    hist.topics[1].summary = "topic summary " * 40
+    assert hist.get_tokens() == _expected_tokens(hist)
+
+    hist.current.messages[0].content = "replaced content"
+    assert hist.get_tokens() == _expected_tokens(hist)
+
+    bulk = Bulk(history=hist)
+    bulk.records.extend(hist.topics[:2])
+    hist.bulks.append(bulk)
+    hist.topics[:2] = []
+    assert hist.get_tokens() == _expected_tokens(hist)
+
+    bulk.records[0].messages.append(Message(False, _long_text(50)))
+    assert hist.get_tokens() == _expected_tokens(hist)
+
+    bulk.summary = "bulk summary"
+    assert hist.get_tokens() == _expected_tokens(hist)
+
+    hist.bulks.pop(0)
+    assert hist.get_tokens() == _expected_tokens(hist)
+
+
+def test_deserialized_history_keeps_counts():
+    hist = History(agent=None)
+    for i in range(4):
+        hist.add_message(i % 2 == 1, _long_text(i))
+    hist.new_topic()
+    hist.add_message(False, "next topic")
+
+    restored = history.deserialize_history(hist.serialize(), agent=None)
+    assert restored.get_tokens() == hist.get_tokens() == _expected_tokens(restored)
+    restored.current.messages.append(Message(True, _long_text(7)))
+    assert restored.get_tokens() == _expected_tokens(restored)
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import sys
+import threading
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import http_session, rfc
+
+REQUESTS = 50
+
+
+@asynccontextmanager
+async def _server():
+    connections = set()
+
+    async def handle(request: web.Request):
+        connections.add(request.transport.get_extra_info("peername"))  # type: ignore[union-attr]
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_post("/", handle)
+    app.router.add_get("/headers", lambda request: web.json_response(dict(request.headers)))
+    test_server = TestServer(app)
+    await test_server.start_server()
+    try:
+        yield str(test_server.make_url("/")), connections
+    finally:
+        await http_session.close_session()
+        await test_server.close()
+
+
+@pytest.mark.asyncio
+async def test_requests_reuse_pooled_connections():
+    async with _server() as (url, connections):
+        # a fresh session per call, as callers did before
+        for _ in range(REQUESTS):
+            async with aiohttp.ClientSession() as session:
+                async with session.post(url, json={}) as response:
+                    await response.json()
+        fresh_connections = len(connections)
+        connections.clear()
+
+        for _ in range(REQUESTS):
+            assert await rfc._send_json_data(url, {}) == {"ok": True}
+
+    assert fresh_connections == REQUESTS
+    assert len(connections) == 1
+
+
+@pytest.mark.asyncio
+async def test_web_documents_are_fetched_with_browser_headers():
+    from python.helpers.document_query import DocumentQueryHelper, WEB_DOCUMENT_HEADERS
+
+    async with _server() as (url, _connections):
+        helper = object.__new__(DocumentQueryHelper)  # fetching needs no agent
+        body, _charset = await helper.fetch_web_document(url + "headers", "http")  # type: ignore[misc]
+
+    headers = json.loads(body)
+    assert WEB_DOCUMENT_HEADERS["User-Agent"]
+    for name in ("User-Agent", "Accept", "Accept-Language", "Referer"):
+        assert headers[name] == WEB_DOCUMENT_HEADERS[name]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_respect_per_host_limit(monkeypatch):
+    monkeypatch.setattr(http_session, "CONNECTION_LIMIT_PER_HOST", 2)
+    async with _server() as (url, connections):
+        await asyncio.gather(*(rfc._send_json_data(url, {}) for _ in range(20)))
+    assert 1 <= len(connections) <= 2
+
+
+def test_sessions_are_per_loop_and_closed_by_shutdown_hook():
+    sessions = []
+
+    async def use():
+        session = http_session.get_session()
+        assert http_session.get_session() is session
+        sessions.append(session)
+
+    def run_loop():
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(use())
+            loop.run_until_complete(http_session.close_session())
+        finally:
+            loop.close()
+
+    run_loop()
+    thread = threading.Thread(target=run_loop)
+    thread.start()
+    thread.join()
+    assert sessions[0] is not sessions[1]
+    assert all(session.closed for session in sessions)
+
+    # a loop still running at shutdown gets its session closed from outside
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever)
+    thread.start()
+    try:
+        asyncio.run_coroutine_threadsafe(use(), loop).result(5)
+        session = sessions[-1]
+        http_session.close_sessions()
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.1), loop).result(5)
+        assert session.closed
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
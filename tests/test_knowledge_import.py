@@ -0,0 +1,107 @@
+import os
+import sys
+import types
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import knowledge_import, knowledge_loader
+
+
+def _write(path: Path, text: str):
+    path.write_text(text, encoding="utf-8")
+
+
+def _finish(index: dict) -> dict:
+    # what Memory.preload_knowledge persists between runs
+    for data in index.values():
+        data.pop("documents", None)
+        data.pop("state", None)
+    return index
+
+
+def test_unchanged_files_are_not_read(tmp_path, monkeypatch):
+    for i in range(3):
+        _write(tmp_path / f"doc{i}.md", f"# Document {i}\n\ncontent {i}")
+
+    index = knowledge_import.load_knowledge(None, str(tmp_path), {}, {"area": "main"})
+    assert sorted(data["state"] for data in index.values()) == ["changed"] * 3
+    first = index[str(tmp_path / "doc0.md")]
+    assert first["documents"][0].metadata["area"] == "main"
+    assert first["documents"][0].metadata["knowledge_source"] is True
+    index = _finish(index)
+
+    def fail(_path):
+        raise AssertionError("unchanged file was read")
+
+    monkeypatch.setattr(knowledge_import, "calculate_checksum", fail)
+    index = knowledge_import.load_knowledge(None, str(tmp_path), index, {"area": "main"})
+    assert [data["state"] for data in index.values()] == ["original"] * 3
+    monkeypatch.undo()
+
+    # touched but identical content is detected by checksum, edited content is reloaded
+    touched = tmp_path / "doc1.md"
+    os.utime(touched, ns=(touched.stat().st_atime_ns, touched.stat().st_mtime_ns + 10**9))
+    _write(tmp_path / "doc2.md", "# Document 2\n\nedited")
+    index = knowledge_import.load_knowledge(None, str(tmp_path), _finish(index), {})
+    assert index[str(touched)]["state"] == "original"
+    assert index[str(touched)]["mtime"] == touched.stat().st_mtime_ns
+    assert index[str(tmp_path / "doc2.md")]["state"] == "changed"
+    assert "edited" in index[str(tmp_path / "doc2.md")]["documents"][0].page_content
+
+
+def test_files_are_loaded_in_parallel_and_in_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(knowledge_import, "LOADER_WORKERS", 2)
+    files = []
+    for i in range(knowledge_import.PARALLEL_MIN_FILES + 2):
+        path = tmp_path / f"file{i}.txt"
+        _write(path, f"text of file {i}")
+        files.append((str(path), "txt"))
+    files.append((str(tmp_path / "missing.txt"), "txt"))
+
+    results = knowledge_import.load_files(files)
+    for i, documents in enumerate(results[:-1]):
+        assert isinstance(documents, list)
+        assert documents[0].page_content == f"text of file {i}"
+    assert isinstance(results[-1], Exception)
+
+
+def test_workers_do_not_import_the_server_main_module(tmp_path, monkeypatch):
+    # stands in for run_ui, leaves a marker when a worker imports it
+    marker = tmp_path / "imported"
+    server = tmp_path / "server.py"
+    _write(server, f"open({str(marker)!r}, 'w').close()\n")
+    main = types.ModuleType("__main__")
+    main.__file__ = str(server)
+    main.__spec__ = None
+    monkeypatch.setitem(sys.modules, "__main__", main)
+    monkeypatch.setattr(knowledge_import, "LOADER_WORKERS", 2)
+
+    files = []
+    for i in range(knowledge_import.PARALLEL_MIN_FILES):
+        _write(tmp_path / f"file{i}.txt", f"text of file {i}")
+        files.append((str(tmp_path / f"file{i}.txt"), "txt"))
+
+    results = knowledge_import.load_files(files)
+    assert [docs[0].page_content for docs in results] == [f"text of file {i}" for i in range(len(files))]  # type: ignore
+    assert knowledge_loader.get_mp_context().get_start_method() != "fork"
+    assert not marker.exists()
+    assert sys.modules["__main__"] is main
+
+
+def test_failed_load_keeps_previous_version(tmp_path, monkeypatch):
+    path = tmp_path / "doc.md"
+    _write(path, "first")
+    index = _finish(knowledge_import.load_knowledge(None, str(tmp_path), {}, {}))
+    index[str(path)]["ids"] = ["old-id"]
+
+    _write(path, "second version")
+    monkeypatch.setattr(
+        knowledge_import, "load_files", lambda files: [RuntimeError("parse error")] * len(files)
+    )
+    index = knowledge_import.load_knowledge(None, str(tmp_path), index, {})
+    assert index[str(path)]["state"] == "original"
+    assert index[str(path)]["ids"] == ["old-id"]
+    assert index[str(path)]["checksum"] == ""  # retried on next import
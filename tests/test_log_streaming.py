@@ -0,0 +1,84 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import log as log_module
+from python.helpers.log import Log
+from python.helpers.secrets import SecretsManager
+
+SECRETS = {"API_TOKEN": "tok-1234567890", "PASSWORD": "hunter22", "SHORT": "abc"}
+
+
+@pytest.fixture
+def secrets_mgr(monkeypatch):
+    mgr = SecretsManager("tmp/test-log-streaming-secrets.env")
+    mgr._secrets_cache = dict(SECRETS)
+    monkeypatch.setattr(log_module, "get_secrets_manager", lambda *_args: mgr)
+    return mgr
+
+
+def _expand(logs: list[dict], known: dict[int, str]):
+    for item in logs:
+        content = item["content"]
+        if "content_from" in item:
+            content = known[item["no"]][: item["content_from"]] + content
+        known[item["no"]] = content
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_masking_matches_full_masking(secrets_mgr, seed):
+    rng = random.Random(seed)
+    words = ["hello", "tok-1234567890", "hunter22", "abc", "tok-12", "hunt", " ", "\n"]
+    text = "".join(rng.choice(words) for _ in range(300))
+
+    log = Log()
+    item = log.log(type="agent", heading="streaming")
+    known: dict[int, str] = {}
+    version = 0
+    index = 0
+    while index < len(text):
+        index += rng.randint(1, 9)
+        item.update(content=text[:index])
+        # client catches up every few chunks
+        if rng.random() < 0.5:
+            _expand(log.output(start=version, deltas=True), known)
+            version = len(log.updates)
+
+    expected = secrets_mgr.mask_values(text)
+    assert "tok-1234567890" not in item.content and "hunter22" not in item.content
+    assert item.content == expected
+    _expand(log.output(start=version, deltas=True), known)
+    assert known[item.no] == expected
+
+
+def test_stream_sends_append_deltas(secrets_mgr):
+    log = Log()
+    item = log.log(type="agent", heading="h", content="Hello, this is a longer first line.")
+    version = len(log.updates)
+
+    item.stream(content=" world, password hunter22")
+    delta = log.output(start=version, deltas=True)
+    assert delta[0]["content_from"] > 0
+    assert item.content.endswith("line. world, password §§secret(PASSWORD)")
+    # without deltas (api_log_get) items are sent whole
+    full = log.output(start=version)
+    assert "content_from" not in full[0] and full[0]["content"] == item.content
+
+    version = len(log.updates)
+    item.update(content="replaced by a different and longer text")
+    full = log.output(start=version, deltas=True)
+    assert "content_from" not in full[0]
+    assert full[0]["content"] == "replaced by a different and longer text"
+
+    # kvps-only updates keep the content prefix
+    version = len(log.updates)
+    item.update(kvps={"step": "x"})
+    delta = log.output(start=version, deltas=True)[0]
+    assert delta["content_from"] > 0
+    assert delta["content"] == item.content[delta["content_from"] :]
@@ -0,0 +1,125 @@
+import asyncio
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import mcp_session_pool
+from python.helpers.defer import DeferredTask
+from python.helpers.mcp_session_pool import MCPSessionPool
+
+
+class FakeSession:
+    def __init__(self, no: int):
+        self.no = no
+        self.closed = False
+        self.healthy = True
+
+    async def ping(self):
+        if not self.healthy:
+            raise ConnectionError("dead")
+
+
+class FakeServer:
+    """Stands in for a stdio transport: every opened session is a new 'process'."""
+
+    def __init__(self, fail_first: int = 0):
+        self.opened: list[FakeSession] = []
+        self.fail_first = fail_first
+
+    async def open(self, stack):
+        if self.fail_first:
+            self.fail_first -= 1
+            raise ConnectionError("spawn failed")
+        session = FakeSession(len(self.opened))
+        self.opened.append(session)
+
+        async def _close():
+            session.closed = True
+
+        stack.push_async_callback(_close)
+        return session
+
+
+@pytest.fixture
+def pool():
+    pool = MCPSessionPool(thread_name=f"MCPSessionPoolTest-{uuid.uuid4()}")
+    yield pool
+    pool.loop_thread.run_coroutine(DeferredTask._drain_event_loop_tasks()).result()
+    pool.loop_thread.terminate()
+
+
+async def _echo(session: FakeSession):
+    return session.no
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_reused(pool: MCPSessionPool):
+    server = FakeServer()
+    results = [await pool.run("echo", server.open, _echo) for _ in range(5)]
+
+    assert results == [0] * 5
+    assert len(server.opened) == 1
+    stats = pool.get_stats("echo")
+    assert stats and stats["calls"] == 5 and stats["reused"] == 4
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_limited_per_server(pool: MCPSessionPool):
+    server = FakeServer()
+    running = 0
+    peak = 0
+
+    async def slow(session: FakeSession):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+
+    await asyncio.gather(
+        *[pool.run("echo", server.open, slow, max_sessions=2) for _ in range(6)]
+    )
+
+    assert peak == 2
+    assert len(server.opened) == 2
+
+
+@pytest.mark.asyncio
+async def test_reconnects_with_backoff(pool: MCPSessionPool, monkeypatch):
+    monkeypatch.setattr(mcp_session_pool, "BACKOFF_BASE", 0.01)
+    server = FakeServer(fail_first=2)
+
+    assert await pool.run("echo", server.open, _echo) == 0
+    assert pool.get_stats("echo")["failed"] == 2  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_session_is_replaced(pool: MCPSessionPool, monkeypatch):
+    monkeypatch.setattr(mcp_session_pool, "HEALTH_CHECK_AFTER", 0)
+    server = FakeServer()
+
+    await pool.run("echo", server.open, _echo, health_check=FakeSession.ping)
+    server.opened[0].healthy = False
+    result = await pool.run("echo", server.open, _echo, health_check=FakeSession.ping)
+
+    assert result == 1
+    await asyncio.sleep(0.05)
+    assert server.opened[0].closed
+
+
+@pytest.mark.asyncio
+async def test_close_releases_sessions(pool: MCPSessionPool):
+    server = FakeServer()
+    await pool.run("echo", server.open, _echo)
+
+    pool.close("echo")
+    await asyncio.sleep(0.05)
+
+    assert server.opened[0].closed
+    assert pool.get_stats("echo") is None
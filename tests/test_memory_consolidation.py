@@ -0,0 +1,268 @@
+import asyncio
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import faiss
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.embeddings import Embeddings
+
+from python.helpers import memory as memory_module
+from python.helpers import memory_journal
+from python.helpers.memory import Memory, MyFaiss
+from python.helpers.memory_consolidation import create_memory_consolidator
+
+DIM = 256
+AREA = Memory.Area.FRAGMENTS.value
+
+EXISTING = [
+    "python projects use venv for isolated environments",
+    "docker images are built from a dockerfile",
+    "postgres backups run nightly with pg_dump",
+]
+
+NEW_MEMORIES = [
+    "python venv is created with python -m venv",
+    "kubernetes pods restart on failure",
+    "python environments should pin requirements with venv",
+    "rust crates are published to crates.io",
+    "docker compose starts multiple containers from a dockerfile",
+    "kubernetes pods are scheduled on nodes",
+]
+
+
+class _BagOfWordsEmbeddings(Embeddings):
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        self.calls += 1
+        return self._embed(text)
+
+    @staticmethod
+    def _embed(text):
+        vector = np.zeros(DIM, dtype=np.float32)
+        for word in re.findall(r"[a-z.\-_]+", text.lower()):
+            vector[int(hashlib.md5(word.encode()).hexdigest()[:8], 16) % DIM] += 1
+        return (vector / max(np.linalg.norm(vector), 1e-9)).tolist()
+
+
+class _FakeAgent:
+    """Utility model with deterministic answers, prompts are passed through as JSON."""
+
+    def __init__(self):
+        self.keyword_calls = 0
+        self.analysis_calls = 0
+        self.running = 0
+        self.max_running = 0
+
+    def read_prompt(self, file, **kwargs):
+        return json.dumps({"file": file, **kwargs})
+
+    async def call_utility_model(self, system, message, callback=None, background=False):
+        prompt = json.loads(message)
+        file = prompt["file"]
+        if file == "memory.keyword_extraction.msg.md":
+            self.keyword_calls += 1
+            return json.dumps(self._keywords(prompt["memory_content"]))
+        if file == "memory.keyword_extraction_batch.msg.md":
+            self.keyword_calls += 1
+            memories = re.split(r"\*\*Memory \d+:\*\*\n", prompt["memories"])[1:]
+            return json.dumps([self._keywords(memory.strip()) for memory in memories])
+        if file == "memory.consolidation.msg.md":
+            self.analysis_calls += 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            await asyncio.sleep(0.01)
+            self.running -= 1
+            return json.dumps(self._analysis(prompt))
+        raise AssertionError(f"unexpected prompt {file}")
+
+    @staticmethod
+    def _keywords(memory):
+        return [word for word in memory.split() if len(word) > 4][:2]
+
+    @staticmethod
+    def _analysis(prompt):
+        topic = prompt["new_memory"].split()[0]
+        similar = re.findall(r"ID: (\S+)\nTimestamp: .*\nContent: (.*)", prompt["similar_memories"])
+        related = [(id, content) for id, content in similar if content.split()[0] == topic]
+        if not related:
+            return {"action": "keep_separate", "new_memory_content": prompt["new_memory"]}
+        merged = "; ".join(sorted([content for _, content in related] + [prompt["new_memory"]]))
+        return {
+            "action": "merge",
+            "memories_to_remove": [id for id, _ in related],
+            "new_memory_content": merged,
+        }
+
+
+@pytest.fixture
+def new_memory_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_module, "abs_db_dir", lambda subdir: str(tmp_path / subdir))
+
+    async def create(subdir):
+        db = MyFaiss(
+            embedding_function=_BagOfWordsEmbeddings(),
+            index=faiss.IndexFlatIP(DIM),
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={},
+            distance_strategy=DistanceStrategy.COSINE,
+            relevance_score_fn=Memory._cosine_normalizer,
+        )
+        db.journal = memory_journal.MemoryJournal(str(tmp_path))
+        db.journal_ops = []
+        memory = Memory(db, memory_subdir=subdir)
+        for text in EXISTING:
+            await memory.insert_text(text, {"area": AREA})
+
+        async def get(_agent):
+            return memory
+
+        monkeypatch.setattr(Memory, "get", staticmethod(get))
+        return memory
+
+    return create
+
+
+def _contents(memory: Memory) -> list[tuple[str, str]]:
+    return sorted(
+        (doc.page_content, doc.metadata.get("consolidation_action", "existing"))
+        for doc in memory.db.get_all_docs().values()
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_makes_the_same_decisions_as_sequential(new_memory_db):
+    sequential_memory = await new_memory_db("sequential")
+    sequential_agent = _FakeAgent()
+    consolidator = create_memory_consolidator(sequential_agent, max_llm_context_memories=4)  # type: ignore
+    for text in NEW_MEMORIES:
+        result = await consolidator.process_new_memory(text, AREA, {"area": AREA})
+        assert result["success"]
+
+    batch_memory = await new_memory_db("batch")
+    batch_agent = _FakeAgent()
+    consolidator = create_memory_consolidator(
+        batch_agent, max_llm_context_memories=4, max_concurrent_analyses=2  # type: ignore
+    )
+    rounds = []
+    find_batch = consolidator._find_similar_memories_batch
+
+    async def counting_find_batch(db, new_memories, *args):
+        rounds.append(len(new_memories))
+        return await find_batch(db, new_memories, *args)
+
+    consolidator._find_similar_memories_batch = counting_find_batch  # type: ignore
+    results = await consolidator.process_new_memories(NEW_MEMORIES, AREA, {"area": AREA})
+
+    assert all(result["success"] for result in results)
+    assert _contents(batch_memory) == _contents(sequential_memory)
+    assert any(action == "merge" for _, action in _contents(batch_memory))
+    assert batch_agent.analysis_calls == sequential_agent.analysis_calls
+    assert batch_agent.keyword_calls == 1 < sequential_agent.keyword_calls
+    # related memories are searched again after the earlier ones are applied
+    assert rounds[0] == len(NEW_MEMORIES) and 1 < len(rounds) < len(NEW_MEMORIES)
+    assert 1 < batch_agent.max_running <= 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "response",
+    [
+        '["only one list"]',
+        # a flat list with one string per memory is not a keyword list per memory
+        '["first", "second", "third"]',
+    ],
+)
+async def test_batch_keyword_extraction_falls_back_per_memory(new_memory_db, response):
+    await new_memory_db("fallback")
+    agent = _FakeAgent()
+
+    async def broken_batch(system, message, callback=None, background=False):
+        if json.loads(message)["file"] == "memory.keyword_extraction_batch.msg.md":
+            agent.keyword_calls += 1
+            return response
+        return await _FakeAgent.call_utility_model(agent, system, message, callback, background)
+
+    agent.call_utility_model = broken_batch  # type: ignore
+    consolidator = create_memory_consolidator(agent)  # type: ignore
+    keywords = await consolidator._extract_search_keywords_batch(NEW_MEMORIES[:3])
+    assert keywords == [_FakeAgent._keywords(text) for text in NEW_MEMORIES[:3]]
+    assert agent.keyword_calls == 4
+
+
+def test_batch_keyword_prompt_asks_only_for_one_list_per_memory():
+    prompts = PROJECT_ROOT / "prompts"
+    batch = (prompts / "memory.keyword_extraction_batch.sys.md").read_text()
+    rules = (prompts / "memory.keyword_extraction.rules.md").read_text()
+    assert '{{ include "memory.keyword_extraction.rules.md" }}' in batch
+    assert "## Output Format" not in rules and "JSON" not in rules
+    assert "JSON array of strings" not in batch
+
+
+def test_batched_index_search_matches_single_searches():
+    db = MyFaiss(
+        embedding_function=_BagOfWordsEmbeddings(),
+        index=faiss.IndexFlatIP(DIM),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+        distance_strategy=DistanceStrategy.COSINE,
+        relevance_score_fn=Memory._cosine_normalizer,
+    )
+    texts = EXISTING + NEW_MEMORIES
+    db.add_texts(texts, metadatas=[{"area": ["main", "fragments"][i % 2]} for i in range(len(texts))])
+    comparator = Memory._get_comparator("area == 'fragments'")
+    vectors = [_BagOfWordsEmbeddings._embed(text) for text in NEW_MEMORIES]
+    limits = [1, 3, 5, 2, 4, 6]
+
+    batch = db.similarity_search_with_score_by_vectors(vectors, k=limits, filter=comparator)
+    for vector, limit, found in zip(vectors, limits, batch):
+        single = db.similarity_search_with_score_by_vector(vector, k=limit, filter=comparator)
+        # equal scores may come in any order
+        assert [score for _, score in found] == pytest.approx([score for _, score in single])
+        assert {doc.page_content for doc, score in found if score > found[-1][1]} == {
+            doc.page_content for doc, score in single if score > single[-1][1]
+        }
+        assert len(found) == min(limit, len(texts) // 2)
+
+
+@pytest.mark.asyncio
+async def test_embed_texts_embeds_queries_without_the_document_cache():
+    class _AsymmetricEmbeddings(_BagOfWordsEmbeddings):
+        def embed_query(self, text):
+            return super().embed_query("query " + text)
+
+    from langchain.embeddings import CacheBackedEmbeddings
+    from langchain.storage import InMemoryByteStore
+
+    store = InMemoryByteStore()
+    embedder = CacheBackedEmbeddings.from_bytes_store(_AsymmetricEmbeddings(), store, namespace="test")
+    db = MyFaiss(
+        embedding_function=embedder,
+        index=faiss.IndexFlatIP(DIM),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+        distance_strategy=DistanceStrategy.COSINE,
+        relevance_score_fn=Memory._cosine_normalizer,
+    )
+
+    vectors = await Memory(db, memory_subdir="test").embed_texts(NEW_MEMORIES[:2])
+
+    expected = [_BagOfWordsEmbeddings._embed("query " + text) for text in NEW_MEMORIES[:2]]
+    assert np.allclose(vectors, np.array(expected))
+    assert list(store.yield_keys()) == []
@@ -0,0 +1,195 @@
+import random
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+from simpleeval import simple_eval
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import faiss
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from python.helpers import memory_index
+from python.helpers.memory import Memory, MyFaiss
+from python.helpers.memory_index import MetadataIndex
+
+DIM = 16
+
+CONDITIONS = [
+    "area == 'main'",
+    "area=='fragments'",
+    "area == 'main' or area == 'fragments'",
+    "area != 'solutions'",
+    "area in ['main', 'solutions']",
+    "area not in ('main',)",
+    "knowledge_source == True",
+    "knowledge_source",
+    "area == 'main' and timestamp >= '2024-06-01 00:00:00'",
+    "timestamp < '2024-03-01 00:00:00'",
+    "'2024-03-01 00:00:00' < timestamp",
+    "area == 'main' and source == 'x'",
+    "source == 'x' or area == 'main'",
+    "not knowledge_source",
+]
+
+
+def _random_metadata(rng: random.Random) -> dict:
+    metadata = {
+        "area": rng.choice(["main", "fragments", "solutions"]),
+        "timestamp": f"2024-{rng.randint(1, 12):02d}-01 00:00:00",
+        "source": rng.choice(["x", "y"]),
+    }
+    if rng.random() < 0.3:
+        metadata["knowledge_source"] = True
+    if rng.random() < 0.1:
+        del metadata["area"]
+    return metadata
+
+
+def _evaluate(condition: str, metadata: dict) -> bool:
+    try:
+        return bool(simple_eval(condition, names=metadata))
+    except Exception:
+        return False
+
+
+@pytest.mark.parametrize("condition", CONDITIONS)
+def test_metadata_index_matches_simple_eval(condition):
+    rng = random.Random(7)
+    docs = {f"id{i}": _random_metadata(rng) for i in range(300)}
+    index = MetadataIndex()
+    for doc_id, metadata in docs.items():
+        index.add(doc_id, metadata)
+    for doc_id in list(docs)[:40]:
+        index.remove(doc_id)
+        del docs[doc_id]
+
+    expected = {doc_id for doc_id, metadata in docs.items() if _evaluate(condition, metadata)}
+    ids, exact = index.select(condition)
+    if ids is None:
+        assert not exact
+        return
+    if exact:
+        assert ids == expected
+    else:
+        assert expected <= ids
+
+
+class _VectorEmbeddings(Embeddings):
+    def __init__(self, vectors: dict[str, list[float]]):
+        self.vectors = vectors
+
+    def embed_documents(self, texts):
+        return [self.vectors[text] for text in texts]
+
+    def embed_query(self, text):
+        return self.vectors[text]
+
+
+def _make_db(count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(count + 1, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    texts = [f"doc{i}" for i in range(count)]
+    embeddings = _VectorEmbeddings({t: v.tolist() for t, v in zip(texts + ["query"], vectors)})
+    db = MyFaiss(
+        embedding_function=embeddings,
+        index=faiss.IndexFlatIP(DIM),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+        distance_strategy=DistanceStrategy.COSINE,
+        relevance_score_fn=Memory._cosine_normalizer,
+    )
+    areas = ["main", "fragments", "solutions"]
+    db.add_documents(
+        [Document(t, metadata={"area": areas[i % 3], "id": t}) for i, t in enumerate(texts)],
+        ids=texts,
+    )
+    return db, vectors
+
+
+def _brute_force(vectors, count, allowed, k):
+    scores = vectors[:count] @ vectors[count]
+    order = [i for i in np.argsort(-scores) if allowed(i)]
+    return [f"doc{i}" for i in order[:k]]
+
+
+def test_filter_is_applied_before_scoring():
+    db, vectors = _make_db(3000)
+    comparator = Memory._get_comparator("area == 'solutions'")
+    results = db.similarity_search_with_score("query", k=10, filter=comparator)
+    # the old path only considered the 20 best overall candidates
+    assert [doc.metadata["id"] for doc, _ in results] == _brute_force(
+        vectors, 3000, lambda i: i % 3 == 2, 10
+    )
+
+    db.delete([doc.metadata["id"] for doc, _ in results[:5]])
+    results = db.similarity_search_with_score("query", k=5, filter=comparator)
+    assert [doc.metadata["id"] for doc, _ in results] == _brute_force(
+        vectors, 3000, lambda i: i % 3 == 2, 10
+    )[5:]
+
+
+@pytest.mark.parametrize("index_type", ["ivf", "hnsw"])
+def test_ann_backend_recall_and_updates(index_type, monkeypatch):
+    monkeypatch.setattr(memory_index, "ANN_MIN_VECTORS", 500)
+    db, vectors = _make_db(4000, seed=1)
+    db.set_index_type(index_type)
+
+    expected = _brute_force(vectors, 4000, lambda i: True, 10)
+    # exact flat results while the index is built in the background
+    found = [doc.metadata["id"] for doc, _ in db.similarity_search_with_score("query", k=10)]
+    assert found == expected
+    db._ann_thread.join()
+    found = [doc.metadata["id"] for doc, _ in db.similarity_search_with_score("query", k=10)]
+    assert db._ann_index is not None and db._ann_index.index_type == index_type
+    assert len(set(found) & set(expected)) >= 8
+
+    # deleted documents disappear from ANN results, filtered search still works
+    db.delete(expected[:3])
+    found = [doc.metadata["id"] for doc, _ in db.similarity_search_with_score("query", k=10)]
+    assert not set(found) & set(expected[:3])
+
+    comparator = Memory._get_comparator("area == 'main' or area == 'fragments'")
+    filtered = db.similarity_search_with_score("query", k=10, filter=comparator)
+    assert filtered and all(doc.metadata["area"] != "solutions" for doc, _ in filtered)
+
+
+def test_ann_index_keeps_changes_made_while_it_is_built(monkeypatch):
+    monkeypatch.setattr(memory_index, "ANN_MIN_VECTORS", 500)
+    db, vectors = _make_db(2000, seed=2)
+    db.set_index_type("ivf")
+
+    started, release = threading.Event(), threading.Event()
+    build = memory_index.AnnIndex.build
+
+    def blocked_build(self, *args):
+        started.set()
+        release.wait(10)
+        build(self, *args)
+
+    monkeypatch.setattr(memory_index.AnnIndex, "build", blocked_build)
+    expected = _brute_force(vectors, 2000, lambda i: True, 5)
+    db.similarity_search_with_score("query", k=5)
+    assert started.wait(10)
+
+    # searches and changes are not blocked by the build
+    db.delete(expected[:2])
+    db.add_embeddings([("late", vectors[2000].tolist())], metadatas=[{"id": "late"}], ids=["late"])
+    found = [doc.metadata["id"] for doc, _ in db.similarity_search_with_score("query", k=5)]
+    assert found == ["late"] + expected[2:5] + [found[-1]]
+    assert db._ann_index is None
+
+    release.set()
+    db._ann_thread.join()
+    found = [doc.metadata["id"] for doc, _ in db.similarity_search_with_score("query", k=5)]
+    assert db._ann_index is not None and len(db._ann_index) == 1999
+    assert found[0] == "late" and not set(found) & set(expected[:2])
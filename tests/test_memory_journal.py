@@ -0,0 +1,160 @@
+import hashlib
+import os
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import faiss
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores.utils import DistanceStrategy
+from langchain_core.embeddings import Embeddings
+
+from python.helpers import memory as memory_module
+from python.helpers import memory_journal
+from python.helpers.memory import Memory, MyFaiss
+
+DIM = 8
+
+
+class _HashEmbeddings(Embeddings):
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        seed = int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
+        return np.random.default_rng(seed).normal(size=DIM).astype(np.float32).tolist()
+
+
+def _new_db() -> MyFaiss:
+    return MyFaiss(
+        embedding_function=_HashEmbeddings(),
+        index=faiss.IndexFlatIP(DIM),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={},
+        distance_strategy=DistanceStrategy.COSINE,
+        relevance_score_fn=Memory._cosine_normalizer,
+    )
+
+
+def _load_db(db_dir: Path) -> MyFaiss:
+    db = MyFaiss.load_local(
+        folder_path=memory_journal.snapshot_dir(str(db_dir)),
+        embeddings=_HashEmbeddings(),
+        allow_dangerous_deserialization=True,
+        distance_strategy=DistanceStrategy.COSINE,
+        relevance_score_fn=Memory._cosine_normalizer,
+    )
+    journal = memory_journal.MemoryJournal(str(db_dir))
+    db.replay_journal(journal.read())
+    db.journal = journal
+    db.journal_ops = []
+    return db
+
+
+@pytest.fixture
+def memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_module, "abs_db_dir", lambda _subdir: str(tmp_path))
+    db = _new_db()
+    db.journal = memory_journal.MemoryJournal(str(tmp_path))
+    db.journal_ops = []
+    Memory._save_db_file(db, "test")
+    return Memory(db, memory_subdir="test")
+
+
+def _snapshot_mtime(db_dir: Path) -> int:
+    return (Path(memory_journal.snapshot_dir(str(db_dir))) / "index.pkl").stat().st_mtime_ns
+
+
+@pytest.mark.asyncio
+async def test_mutations_are_journaled_and_replayed(memory, tmp_path):
+    snapshot_mtime = _snapshot_mtime(tmp_path)
+
+    ids = await memory.insert_documents(
+        [memory_module.Document(f"fact {i}", metadata={"area": "main"}) for i in range(5)]
+    )
+    await memory.delete_documents_by_ids(ids[:2])
+    updated = memory.db.get_by_ids(ids[2])[0]
+    updated.page_content = "fact 2 updated"
+    await memory.update_documents([updated])
+
+    # the snapshot was not rewritten, the journal holds the changes
+    assert _snapshot_mtime(tmp_path) == snapshot_mtime
+    assert memory.db.journal and memory.db.journal.size > 0
+
+    loaded = _load_db(tmp_path)
+    assert set(loaded.get_all_docs()) == set(ids[2:])
+    assert loaded.get_by_ids(ids[2])[0].page_content == "fact 2 updated"
+    assert loaded.index.ntotal == 3
+    results = loaded.similarity_search_with_score("fact 4", k=1)
+    assert results[0][0].metadata["id"] == ids[4]
+
+
+@pytest.mark.asyncio
+async def test_torn_journal_tail_is_ignored(memory, tmp_path):
+    ids = await memory.insert_documents([memory_module.Document("kept", metadata={})])
+    with open(tmp_path / memory_journal.JOURNAL_FILE, "ab") as f:
+        f.write(b"\x10\x00\x00\x00garbage")
+
+    loaded = _load_db(tmp_path)
+    assert list(loaded.get_all_docs()) == ids
+
+
+@pytest.mark.asyncio
+async def test_compaction_writes_snapshot_and_keeps_later_entries(memory, tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_journal, "JOURNAL_MAX_BYTES", 1)
+    ids = await memory.insert_documents([memory_module.Document("first", metadata={})])
+
+    for thread in threading.enumerate():
+        if thread.name == "MemoryCompaction":
+            thread.join(timeout=10)
+    assert memory.db.journal.size == 0  # type: ignore
+    assert not os.path.exists(tmp_path / memory_journal.JOURNAL_FILE)
+
+    # the compacted snapshot alone holds the data
+    loaded = _load_db(tmp_path)
+    assert list(loaded.get_all_docs()) == ids
+
+    monkeypatch.setattr(memory_journal, "JOURNAL_MAX_BYTES", 1 << 30)
+    more = await memory.insert_documents([memory_module.Document("second", metadata={})])
+    loaded = _load_db(tmp_path)
+    assert set(loaded.get_all_docs()) == set(ids + more)
+
+
+@pytest.mark.asyncio
+async def test_crash_while_writing_snapshot_keeps_previous_generation(memory, tmp_path, monkeypatch):
+    ids = await memory.insert_documents([memory_module.Document("first", metadata={})])
+    Memory._save_db_file(memory.db, "test")
+    previous = memory_journal.snapshot_dir(str(tmp_path))
+    more = await memory.insert_documents([memory_module.Document("second", metadata={})])
+
+    write = memory_journal._write_file_synced
+
+    def crash_on_state(path, data):
+        if path.endswith("index.pkl"):
+            raise OSError("disk full")
+        write(path, data)
+
+    # the new index is written, the docstore is not
+    with monkeypatch.context() as patch:
+        patch.setattr(memory_journal, "_write_file_synced", crash_on_state)
+        with pytest.raises(OSError):
+            memory_journal.write_snapshot(str(tmp_path), *memory_journal.snapshot_state(memory.db))
+
+    assert memory_journal.snapshot_dir(str(tmp_path)) == previous
+    loaded = _load_db(tmp_path)
+    assert set(loaded.get_all_docs()) == set(ids + more)
+    assert loaded.index.ntotal == 2
+
+    # the next snapshot replaces the abandoned generation
+    Memory._save_db_file(memory.db, "test")
+    assert os.listdir(tmp_path / memory_journal.SNAPSHOTS_DIR) == [
+        os.path.basename(memory_journal.snapshot_dir(str(tmp_path)))
+    ]
+    assert not (tmp_path / "index.faiss").exists()
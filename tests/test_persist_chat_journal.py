@@ -0,0 +1,113 @@
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from agent import AgentContext
+from initialize import initialize_agent
+from python.helpers import chat_journal, persist_chat
+
+
+@pytest.fixture
+def chats(tmp_path, monkeypatch):
+    monkeypatch.setattr(persist_chat, "CHATS_FOLDER", str(tmp_path))
+    contexts = []
+
+    def new_context():
+        context = AgentContext(config=initialize_agent(), name="journal test")
+        contexts.append(context)
+        return context
+
+    yield new_context
+    for context in contexts:
+        persist_chat.remove_chat(context.id)
+        AgentContext.remove(context.id)
+
+
+def _load(ctxid: str) -> dict:
+    path = persist_chat._get_chat_file_path(ctxid)
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    operations, _ = chat_journal.ChatJournal(persist_chat._get_chat_journal_path(ctxid)).read()
+    return chat_journal.apply_operations(data, operations, persist_chat.LOG_SIZE)
+
+
+def _expected(context) -> dict:
+    return json.loads(persist_chat.export_json_chat(context))
+
+
+def test_saves_after_the_first_are_journaled(chats):
+    context = chats()
+    agent = context.agent0
+    agent.hist_add_message(False, "first question")
+    context.log.log(type="user", heading="User", content="first question")
+    persist_chat.save_tmp_chat(context)
+
+    chat_path = persist_chat._get_chat_file_path(context.id)
+    journal_path = persist_chat._get_chat_journal_path(context.id)
+    chat_mtime = os.stat(chat_path).st_mtime_ns
+    assert not os.path.exists(journal_path)
+
+    agent.hist_add_message(True, "first answer")
+    item = context.log.log(type="response", heading="Agent", content="first")
+    persist_chat.save_tmp_chat(context)
+    item.update(content="first answer")
+    agent.history.new_topic()
+    agent.hist_add_message(False, "second question")
+    context.name = "renamed"
+    persist_chat.save_tmp_chat(context)
+
+    # edits of earlier messages are journaled as a replacement of the topic
+    agent.history.topics[0].messages[0].summary = "summarized"
+    agent.set_data("note", {"value": 1})
+    persist_chat.save_tmp_chat(context)
+
+    assert os.stat(chat_path).st_mtime_ns == chat_mtime
+    with open(journal_path, encoding="utf-8") as f:
+        assert len(f.readlines()) == 3
+    assert _load(context.id) == _expected(context)
+
+
+def test_load_replays_journal_and_ignores_torn_tail(chats):
+    context = chats()
+    context.agent0.hist_add_message(False, "kept")
+    persist_chat.save_tmp_chat(context)
+    context.agent0.hist_add_message(True, "journaled")
+    persist_chat.save_tmp_chat(context)
+    with open(persist_chat._get_chat_journal_path(context.id), "a", encoding="utf-8") as f:
+        f.write('[{"op": "context", "fields": {"name": "tor')
+
+    expected = _expected(context)
+    AgentContext.remove(context.id)
+    assert context.id in persist_chat.load_tmp_chats()
+    loaded = AgentContext.get(context.id)
+    assert loaded is not None
+    assert [m.content for m in loaded.agent0.history.current.messages][-2:] == [
+        "kept",
+        "journaled",
+    ]
+    assert loaded.name == expected["name"]
+
+
+def test_compaction_folds_journal_into_chat_file(chats, monkeypatch):
+    context = chats()
+    context.agent0.hist_add_message(False, "before")
+    persist_chat.save_tmp_chat(context)
+
+    monkeypatch.setattr(chat_journal, "JOURNAL_MAX_BYTES", 1)
+    context.agent0.hist_add_message(True, "after")
+    persist_chat.save_tmp_chat(context)
+    for thread in threading.enumerate():
+        if thread.name == "ChatCompaction":
+            thread.join(timeout=10)
+
+    assert not os.path.exists(persist_chat._get_chat_journal_path(context.id))
+    with open(persist_chat._get_chat_file_path(context.id), encoding="utf-8") as f:
+        assert json.load(f) == _expected(context)
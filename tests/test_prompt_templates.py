@@ -0,0 +1,70 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import files
+
+
+def _legacy_read(path: Path, directories: list[str], **kwargs) -> str:
+    content = path.read_text(encoding="utf-8")
+    content = files.evaluate_text_conditions(content, **kwargs)
+    content = files.replace_placeholders_text(content, **kwargs)
+    return files.process_includes(content, directories, **kwargs)
+
+
+TEMPLATES = [
+    "Hello {{name}}, you are {{role}}.",
+    "{{if flag}}on {{name}}{{endif}} / {{if not flag}}off{{endif}}",
+    "a{{if flag}} b{{if count > 2}} c {{name}}{{endif}} d{{endif}} e",
+    "{{if flag}}unterminated {{name}}",
+    "{{if broken ===}}kept {{name}}{{endif}} after",
+    "{{ include 'part.md' }} | {{include \"{{part}}\"}} | {{ include 'missing.md' }}",
+    "unknown {{other}} stays, {{ name }} with spaces stays",
+]
+
+VARIABLES = [
+    {"name": "Ann", "role": "admin", "flag": True, "count": 3, "part": "part.md"},
+    {"name": "Bob", "role": "user", "flag": False, "count": 1, "part": "part.md"},
+    {"name": "{{role}}", "role": "nested", "flag": True, "count": 5, "part": "part.md"},
+]
+
+
+@pytest.mark.parametrize("template", TEMPLATES)
+@pytest.mark.parametrize("variables", VARIABLES)
+def test_compiled_template_matches_legacy_pipeline(tmp_path, template, variables):
+    (tmp_path / "part.md").write_text("included {{name}}", encoding="utf-8")
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text(template, encoding="utf-8")
+    directories = [str(tmp_path)]
+
+    expected = _legacy_read(prompt, directories, **variables)
+    assert files.read_prompt_file("prompt.md", directories, **variables) == expected
+    # second render comes from the cache
+    assert files.read_prompt_file("prompt.md", directories, **variables) == expected
+
+
+def test_template_is_recompiled_when_file_changes(tmp_path):
+    prompt = tmp_path / "prompt.md"
+    prompt.write_text("first {{name}}", encoding="utf-8")
+    directories = [str(tmp_path)]
+    assert files.read_prompt_file("prompt.md", directories, name="x") == "first x"
+
+    prompt.write_text("second version {{name}}", encoding="utf-8")
+    stat = prompt.stat()
+    os.utime(prompt, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert files.read_prompt_file("prompt.md", directories, name="x") == "second version x"
+
+
+def test_parse_file_json_and_text(tmp_path):
+    (tmp_path / "data.md").write_text('```json\n{"a": {{value}}}\n```', encoding="utf-8")
+    (tmp_path / "text.md").write_text("```\nvalue {{value}}\n```", encoding="utf-8")
+    directories = [str(tmp_path)]
+
+    assert files.parse_file("data.md", directories, value=[1, "b"]) == {"a": [1, "b"]}
+    assert files.parse_file("text.md", directories, value=2) == "value 2\n"
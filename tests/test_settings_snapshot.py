@@ -0,0 +1,98 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import settings
+
+
+@pytest.fixture
+def settings_file(tmp_path, monkeypatch):
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"chat_model_ctx_length": 1234}), encoding="utf-8")
+    monkeypatch.setattr(settings, "SETTINGS_FILE", str(path))
+    settings._settings = None
+    settings._invalidate_snapshot()
+    yield path
+    settings._settings = None
+    settings._invalidate_snapshot()
+
+
+def test_snapshot_is_cached_until_file_changes(settings_file, monkeypatch):
+    loads = 0
+    original = settings._load_sensitive_settings
+
+    def counting(s):
+        nonlocal loads
+        loads += 1
+        original(s)
+
+    monkeypatch.setattr(settings, "_load_sensitive_settings", counting)
+
+    first = settings.get_settings_snapshot()
+    version = settings.get_settings_version()
+    assert first["chat_model_ctx_length"] == 1234
+    assert settings.get_settings_snapshot() is first
+    assert settings.get_settings_version() == version
+    assert loads == 1
+
+    settings_file.write_text(json.dumps({"chat_model_ctx_length": 4321}), encoding="utf-8")
+    stat = settings_file.stat()
+    os.utime(settings_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert settings.get_settings_snapshot()["chat_model_ctx_length"] == 4321
+    assert settings.get_settings_version() == version + 1
+    assert loads == 2
+
+
+def test_snapshot_is_read_only_and_copies_are_not(settings_file):
+    snapshot = settings.get_settings_snapshot()
+    with pytest.raises(TypeError):
+        snapshot["chat_model_ctx_length"] = 1  # type: ignore
+    with pytest.raises(TypeError):
+        snapshot["api_keys"]["x"] = "y"
+
+    copy = settings.get_settings()
+    copy["chat_model_ctx_length"] = 1
+    copy["api_keys"]["x"] = "y"
+    assert snapshot["chat_model_ctx_length"] == 1234
+    assert "x" not in snapshot["api_keys"]
+    assert json.loads(json.dumps(snapshot)) == settings.get_settings()
+
+
+def test_reload_rebuilds_snapshot(settings_file):
+    snapshot = settings.get_settings_snapshot()
+    version = settings.get_settings_version()
+    settings.reload_settings()
+    assert settings.get_settings_snapshot() is not snapshot
+    assert settings.get_settings_version() == version + 1
+
+
+def test_nested_lists_are_read_only_and_model_kwargs_are_copies(settings_file):
+    settings_file.write_text(
+        json.dumps(
+            {
+                "chat_model_ctx_length": 1234,
+                "litellm_global_kwargs": {"extra_headers": {"X-Test": "1"}, "fallbacks": ["a", "b"]},
+            }
+        ),
+        encoding="utf-8",
+    )
+    snapshot = settings.get_settings_snapshot()
+    assert snapshot["litellm_global_kwargs"]["fallbacks"] == ("a", "b")
+    assert settings.get_settings()["litellm_global_kwargs"]["fallbacks"] == ["a", "b"]
+
+    import models
+
+    _, kwargs = models._merge_provider_defaults("chat", "openai", {})
+    # litellm merges headers into extra_headers in place
+    kwargs["extra_headers"].update({"X-Other": "2"})
+    kwargs["fallbacks"].append("c")
+    assert type(kwargs["extra_headers"]) is dict
+    assert dict(snapshot["litellm_global_kwargs"]["extra_headers"]) == {"X-Test": "1"}
@@ -0,0 +1,144 @@
+import random
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import paramiko
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers.shell_ssh import (
+    IncrementalCleaner,
+    OutputRingBuffer,
+    SSHInteractiveSession,
+    clean_string,
+)
+
+PIECES = [
+    "line", " ", "\r\n", "\n", "\r", ">", "> ", "\x1b[31m", "\x1b[0m", "\x1b[?2004h",
+    "\x00", "ünï", "€", "𝄞", "Collecting pkg", "  ", "\t",
+]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_incremental_cleaner_matches_clean_string(seed):
+    rng = random.Random(seed)
+    text = "".join(rng.choice(PIECES) for _ in range(400))
+    data = text.encode("utf-8")
+
+    cleaner = IncrementalCleaner()
+    index = 0
+    while index < len(data):
+        step = rng.randint(1, 40)
+        cleaner.feed(data[index : index + step])
+        index += step
+        assert cleaner.getvalue() == clean_string(data[:index].decode("utf-8", errors="ignore"))
+    assert cleaner.getvalue() == clean_string(text)
+
+
+def test_incremental_cleaner_keeps_most_recent_lines():
+    cleaner = IncrementalCleaner(max_chars=100)
+    for i in range(1000):
+        cleaner.feed(f"line {i:04d}\r\n".encode())
+        assert len(cleaner.getvalue()) <= 100
+    assert cleaner.getvalue().endswith("line 0998\nline 0999\n")
+    assert cleaner.getvalue().startswith("line ")
+
+    cleaner.feed(b"x" * 1000)
+    assert cleaner.getvalue().endswith("x" * 100)
+    assert len(cleaner.getvalue()) <= 200
+
+
+def test_ring_buffer_keeps_most_recent_bytes():
+    ring = OutputRingBuffer(10)
+    written = b""
+    rng = random.Random(1)
+    for _ in range(200):
+        chunk = bytes(rng.randrange(256) for _ in range(rng.randint(0, 14)))
+        ring.write(chunk)
+        written += chunk
+        assert ring.getvalue() == written[-10:]
+        assert len(ring) == len(written[-10:])
+    ring.clear()
+    assert ring.getvalue() == b""
+
+
+class _StubServer(paramiko.ServerInterface):
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def get_allowed_auths(self, username):
+        return "password"
+
+    def check_auth_password(self, username, password):
+        return paramiko.AUTH_SUCCESSFUL
+
+    def check_channel_pty_request(self, *args):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        return True
+
+
+def _serve(listener: socket.socket, payload: bytes):
+    conn, _ = listener.accept()
+    transport = paramiko.Transport(conn)
+    transport.add_server_key(paramiko.RSAKey.generate(1024))
+    transport.start_server(server=_StubServer())
+    channel = transport.accept(10)
+    if channel is None:
+        return
+    stream = channel.makefile("rb")
+    try:
+        for line in stream:
+            if b"stty -echo" in line:
+                channel.sendall(b"$ ")
+            elif line.strip() == b"build":
+                for start in range(0, len(payload), 777):
+                    channel.sendall(payload[start : start + 777])
+                channel.sendall(b"\r\nDONE\r\n$ ")
+    except Exception:
+        pass
+    finally:
+        transport.close()
+
+
+@pytest.mark.asyncio
+async def test_reads_large_output_from_ssh_server():
+    payload = "".join(
+        f"\x1b[32mStep {i}\x1b[0m: compiling ünicode €\r\n" for i in range(40000)
+    ).encode()  # ~1.4 MB, split mid-character by the server
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    server = threading.Thread(target=_serve, args=(listener, payload), daemon=True)
+    server.start()
+
+    session = SSHInteractiveSession(
+        MagicMock(), "127.0.0.1", listener.getsockname()[1], "user", "pass"
+    )
+    try:
+        await session.connect()
+        await session.send_command("build")
+
+        started = time.monotonic()
+        full = ""
+        while "DONE" not in full and time.monotonic() - started < 30:
+            full, _partial = await session.read_output(timeout=1)
+        elapsed = time.monotonic() - started
+    finally:
+        await session.close()
+        listener.close()
+
+    expected = clean_string((payload + b"\r\nDONE\r\n$ ").decode())
+    assert full == expected
+    assert session.full_output.endswith(b"DONE\r\n$ ")
+    assert elapsed < 10
@@ -0,0 +1,80 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import skills
+
+
+def _write_skill(root: Path, folder: str, name: str, description: str, tags: list[str] | None = None):
+    path = root / folder
+    path.mkdir(parents=True, exist_ok=True)
+    tag_line = f"tags: [{', '.join(tags)}]\n" if tags else ""
+    (path / "SKILL.md").write_text(
+        f"---\nname: {name}\ndescription: {description}\n{tag_line}---\n\n# {name}\nBody of {name}.\n"
+    )
+    return path / "SKILL.md"
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    root = tmp_path / "skills"
+    root.mkdir()
+    monkeypatch.setattr(skills, "SKILLS_INDEX_FILE", str(tmp_path / "index" / "skills_index.pkl"))
+    monkeypatch.setattr(skills, "_catalog", skills._SkillCatalog())
+    monkeypatch.setattr(skills, "get_skill_roots", lambda agent=None: [str(root)])
+    return root
+
+
+def test_listing_follows_added_edited_and_removed_skills(catalog):
+    _write_skill(catalog, "pdf-tools", "pdf-tools", "Read and merge PDF files")
+    _write_skill(catalog, ".hidden/secret", "secret", "Never listed")
+    assert [s.name for s in skills.list_skills()] == ["pdf-tools"]
+
+    _write_skill(catalog, "nested/csv-tools", "csv-tools", "Parse CSV tables")
+    assert [s.name for s in skills.list_skills()] == ["csv-tools", "pdf-tools"]
+
+    skill_md = _write_skill(catalog, "pdf-tools", "pdf-tools", "Split PDF documents and more")
+    stat = skill_md.stat()
+    os.utime(skill_md, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    found = skills.find_skill("pdf-tools", include_content=True)
+    assert found is not None
+    assert found.description == "Split PDF documents and more"
+    assert found.content.strip().startswith("# pdf-tools")
+
+    (catalog / "nested" / "csv-tools" / "SKILL.md").unlink()
+    assert [s.name for s in skills.list_skills()] == ["pdf-tools"]
+
+
+def test_search_ranks_by_bm25_with_prefix_matches(catalog):
+    _write_skill(catalog, "pdf-tools", "pdf-tools", "Read and merge PDF files", ["documents"])
+    _write_skill(catalog, "docx", "docx", "Edit Word documents, including PDF export", ["office"])
+    _write_skill(catalog, "browser", "browser", "Browse websites", ["web"])
+
+    assert [s.name for s in skills.search_skills("pdf")] == ["pdf-tools", "docx"]
+    assert [s.name for s in skills.search_skills("doc")] == ["docx", "pdf-tools"]
+    assert [s.name for s in skills.search_skills("brows web")] == ["browser"]
+    assert skills.search_skills("   ") == []
+    assert skills.search_skills("spreadsheet") == []
+
+
+def test_unchanged_skills_are_not_parsed_again(catalog, monkeypatch):
+    _write_skill(catalog, "pdf-tools", "pdf-tools", "Read and merge PDF files")
+    first = skills.load_skill_for_agent("pdf-tools")
+    assert "Body of pdf-tools." in first
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unchanged skill was parsed")
+
+    monkeypatch.setattr(skills, "skill_from_markdown", fail)
+    assert skills.load_skill_for_agent("pdf-tools") == first
+    assert [s.name for s in skills.search_skills("merge")] == ["pdf-tools"]
+
+    # a new process loads the persisted index instead of parsing
+    monkeypatch.setattr(skills, "_catalog", skills._SkillCatalog())
+    assert [s.name for s in skills.list_skills()] == ["pdf-tools"]
@@ -0,0 +1,110 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from agent import AgentContext
+from initialize import initialize_agent
+from python.helpers import state_snapshot as snapshot
+from python.helpers.state_snapshot import StateRequestV1
+
+
+def _request() -> StateRequestV1:
+    return StateRequestV1(context=None, log_from=0, notifications_from=0, timezone="UTC")
+
+
+def _ids(items: list[dict]) -> list[str]:
+    return [item["id"] for item in items]
+
+
+@pytest.mark.asyncio
+async def test_collections_are_shared_until_dirty():
+    ctx = AgentContext(config=initialize_agent(), id="ctx-delta-shared", set_current=False)
+    try:
+        snapshot.mark_state_dirty()
+        first = await snapshot.build_snapshot_from_request(request=_request())
+        second = await snapshot.build_snapshot_from_request(request=_request())
+        fragment = next(item for item in first["contexts"] if item["id"] == ctx.id)
+        assert any(item is fragment for item in second["contexts"])
+
+        # unchanged fragments keep their identity across rebuilds
+        snapshot.mark_state_dirty()
+        third = await snapshot.build_snapshot_from_request(request=_request())
+        assert any(item is fragment for item in third["contexts"])
+    finally:
+        AgentContext.remove(ctx.id)
+
+
+@pytest.mark.asyncio
+async def test_delta_contains_only_changed_fragments():
+    a = AgentContext(config=initialize_agent(), id="ctx-delta-a", set_current=False)
+    b = AgentContext(config=initialize_agent(), id="ctx-delta-b", set_current=False)
+    try:
+        snapshot.mark_state_dirty()
+        full = await snapshot.build_snapshot_from_request(request=_request())
+        known = snapshot.snapshot_fragments(full)
+
+        a.log.log(type="user", heading="hi", content="hello")
+        snapshot.mark_state_dirty()
+        current = await snapshot.build_snapshot_from_request(request=_request())
+        reduced, delta = snapshot.make_snapshot_delta(current, known)
+
+        assert _ids(reduced["contexts"]) == [a.id]
+        assert delta["contexts"] == _ids(current["contexts"])
+        snapshot.validate_snapshot_schema_v1(reduced)
+
+        AgentContext.remove(b.id)
+        snapshot.mark_state_dirty()
+        after_remove = await snapshot.build_snapshot_from_request(request=_request())
+        reduced, delta = snapshot.make_snapshot_delta(
+            after_remove, snapshot.snapshot_fragments(current)
+        )
+        assert reduced["contexts"] == []
+        assert b.id not in delta["contexts"]
+    finally:
+        AgentContext.remove(a.id)
+        AgentContext.remove(b.id)
+
+
+@pytest.mark.asyncio
+async def test_state_monitor_pushes_full_then_delta():
+    import asyncio
+    from unittest.mock import AsyncMock
+
+    from python.helpers.state_monitor import StateMonitor
+
+    loop = asyncio.get_running_loop()
+    pushes: list[dict] = []
+    received = asyncio.Event()
+
+    async def _emit_to(namespace, sid, event_type, payload, **_kwargs):
+        if event_type == "state_push":
+            pushes.append(payload)
+            received.set()
+
+    class FakeManager:
+        def __init__(self):
+            self._dispatcher_loop = loop
+            self.emit_to = AsyncMock(side_effect=_emit_to)
+
+    monitor = StateMonitor(debounce_seconds=0.0)
+    monitor.bind_manager(FakeManager(), handler_id="tester")
+    monitor.register_sid("/state_sync", "sid-delta")
+    monitor.update_projection("/state_sync", "sid-delta", request=_request(), seq_base=1)
+
+    async def _push():
+        received.clear()
+        monitor.mark_dirty("/state_sync", "sid-delta", reason="test")
+        await asyncio.wait_for(received.wait(), timeout=5.0)
+
+    await _push()
+    await _push()
+    monitor.unregister_sid("/state_sync", "sid-delta")
+
+    assert "delta" not in pushes[0]
+    assert pushes[1]["delta"]["contexts"] == _ids(pushes[0]["snapshot"]["contexts"])
+    assert pushes[1]["snapshot"]["contexts"] == []
@@ -0,0 +1,94 @@
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import task_scheduler
+from python.helpers.task_scheduler import (
+    AdHocTask,
+    PlannedTask,
+    ScheduledTask,
+    SchedulerTaskList,
+    TaskPlan,
+    TaskSchedule,
+    TaskState,
+)
+
+
+@pytest.fixture
+def task_list(tmp_path, monkeypatch):
+    monkeypatch.setattr(task_scheduler, "SCHEDULER_FOLDER", str(tmp_path))
+    return SchedulerTaskList(tasks=[])
+
+
+def _every_minute() -> ScheduledTask:
+    schedule = TaskSchedule(minute="*", hour="*", day="*", month="*", weekday="*", timezone="UTC")
+    return ScheduledTask.create(
+        name="every minute", system_prompt="", prompt="run", schedule=schedule, timezone="UTC"
+    )
+
+
+@pytest.mark.asyncio
+async def test_scheduled_task_is_due_once_per_run(task_list):
+    task = _every_minute()
+    await task_list.add_task(task)
+    await task_list.add_task(AdHocTask.create(name="adhoc", system_prompt="", prompt="", token="1"))
+
+    now = datetime.now(timezone.utc)
+    assert await task_list.get_due_tasks(now) == [task]
+    # the same run is not due again, the next one is
+    assert await task_list.get_due_tasks(now) == []
+    next_due = task_list.get_next_due_time()
+    assert next_due is not None and now.timestamp() < next_due <= now.timestamp() + 60
+    assert await task_list.get_due_tasks(now + timedelta(seconds=61)) == [task]
+
+    # runs are not due while the task is running and resume after it
+    task.update(state=TaskState.RUNNING)
+    await task_list.save()
+    assert task_list.get_next_due_time() is None
+    task.update(state=TaskState.IDLE)
+    await task_list.save()
+    assert task_list.get_next_due_time() is not None
+
+
+@pytest.mark.asyncio
+async def test_missed_runs_are_skipped_and_planned_runs_are_kept(task_list):
+    scheduled = _every_minute()
+    plan = TaskPlan.create(todo=[datetime.now(timezone.utc) - timedelta(seconds=1)])
+    planned = PlannedTask.create(name="planned", system_prompt="", prompt="", plan=plan)
+    await task_list.add_task(scheduled)
+    await task_list.add_task(planned)
+
+    # after a long pause only the latest cron run is due, the planned launch is still due
+    late = datetime.now(timezone.utc) + timedelta(minutes=10)
+    due = await task_list.get_due_tasks(late)
+    assert sorted(task.name for task in due) == ["every minute", "planned"]
+    # the planned launch is not repeated until the plan advances
+    assert await task_list.get_due_tasks(late) == []
+
+
+@pytest.mark.asyncio
+async def test_file_is_written_only_on_change_and_reloaded_when_changed(task_list, tmp_path):
+    task = _every_minute()
+    await task_list.add_task(task)
+    path = tmp_path / "tasks.json"
+    stamp = path.stat().st_mtime_ns
+
+    await task_list.save()
+    assert path.stat().st_mtime_ns == stamp
+
+    # another process edits the file
+    other = SchedulerTaskList.model_validate_json(path.read_text())
+    other.tasks[0].name = "renamed"
+    path.write_text(other.model_dump_json())
+    os.utime(path, ns=(stamp, stamp + 10**9))
+
+    await task_list.reload()
+    assert task_list.get_task_by_uuid(task.uuid).name == "renamed"  # type: ignore[union-attr]
+    assert task_list.get_task_by_uuid("missing") is None
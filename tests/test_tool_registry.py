@@ -0,0 +1,65 @@
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import subagents, tool_registry
+
+TOOL_SOURCE = """
+from python.helpers.tool import Tool, Response
+
+open(__file__ + ".count", "a").write("x")
+
+class {name}(Tool):
+    async def execute(self, **kwargs):
+        return Response(message="{name}", break_loop=False)
+"""
+
+
+def _write_tool(path: Path, class_name: str, bump_mtime: bool = False):
+    path.write_text(TOOL_SOURCE.format(name=class_name), encoding="utf-8")
+    if bump_mtime:
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def _executions(path: Path) -> int:
+    count_file = Path(str(path) + ".count")
+    return len(count_file.read_text()) if count_file.exists() else 0
+
+
+def test_tool_module_is_executed_once_until_changed(tmp_path, monkeypatch):
+    tool_file = tmp_path / "my_tool.py"
+    _write_tool(tool_file, "MyTool")
+    monkeypatch.setattr(subagents, "get_paths", lambda *a, **k: [str(tool_file)])
+
+    first = tool_registry.get_tool_class(None, "my_tool")
+    second = tool_registry.get_tool_class(None, "my_tool")
+    assert first is second and first.__name__ == "MyTool"  # type: ignore
+    assert _executions(tool_file) == 1
+
+    _write_tool(tool_file, "MyChangedTool", bump_mtime=True)
+    changed = tool_registry.get_tool_class(None, "my_tool")
+    assert changed.__name__ == "MyChangedTool"  # type: ignore
+    assert _executions(tool_file) == 2
+
+
+def test_falls_back_to_next_path_and_unknown(tmp_path, monkeypatch):
+    broken = tmp_path / "broken.py"
+    broken.write_text("raise RuntimeError('broken')", encoding="utf-8")
+    fallback = tmp_path / "fallback.py"
+    _write_tool(fallback, "FallbackTool")
+
+    monkeypatch.setattr(subagents, "get_paths", lambda *a, **k: [str(broken), str(fallback)])
+    assert tool_registry.get_tool_class(None, "x").__name__ == "FallbackTool"  # type: ignore
+
+    monkeypatch.setattr(subagents, "get_paths", lambda *a, **k: [])
+    assert tool_registry.get_tool_class(None, "x") is None
+
+
+def test_preload_loads_default_tools():
+    assert tool_registry.preload() > 0
+    assert tool_registry.get_tool_class(None, "response").__name__ == "ResponseTool"  # type: ignore
@@ -0,0 +1,203 @@
+import asyncio
+import base64
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from python.helpers import whisper
+
+SR = whisper.SAMPLE_RATE
+TINY_MODEL = PROJECT_ROOT / "tmp" / "models" / "whisper" / "tiny.pt"
+
+
+def _tone(seconds: float) -> np.ndarray:
+    t = np.arange(int(seconds * SR)) / SR
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SR), dtype=np.float32)
+
+
+class FakeModel:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls: list[tuple[int, str]] = []
+
+    def transcribe(self, audio, fp16=True):
+        assert isinstance(audio, np.ndarray) and not fp16
+        time.sleep(self.delay)  # blocks like real decoding
+        self.calls.append((len(audio), threading.current_thread().name))
+        return {"text": f" chunk{len(self.calls)} "}
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    model = FakeModel()
+    monkeypatch.setattr(whisper, "_model", model)
+    monkeypatch.setattr(whisper, "_model_name", "tiny")
+    monkeypatch.setattr(whisper, "_sessions", {})
+    return model
+
+
+def test_split_speech_cuts_at_pauses():
+    audio = np.concatenate([_silence(0.3), _tone(1.0), _silence(1.0), _tone(0.5), _silence(0.3)])
+    pad = SR * whisper.VAD_PAD_MS // 1000
+
+    chunks = whisper.split_speech(audio)
+
+    assert len(chunks) == 2
+    (s1, e1), (s2, e2) = chunks
+    assert abs(s1 - (int(0.3 * SR) - pad)) < SR * 0.05
+    assert abs(e1 - (int(1.3 * SR) + pad)) < SR * 0.05
+    assert abs(s2 - (int(2.3 * SR) - pad)) < SR * 0.05
+    assert e2 <= len(audio)
+    [(s3, e3)] = whisper.split_speech(audio, offset=e1)
+    assert abs(s3 - s2) < SR * 0.05 and e3 <= len(audio)
+    assert whisper.split_speech(_silence(2.0)) == []
+
+
+@pytest.mark.asyncio
+async def test_transcription_runs_off_the_event_loop(fake_model):
+    fake_model.delay = 0.2
+    audio = np.concatenate([_tone(0.5), _silence(1.0), _tone(0.5)])
+    ticks = 0
+
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    beat = asyncio.create_task(heartbeat())
+    try:
+        segments = [s async for s in whisper.stream_transcription(audio)]
+    finally:
+        beat.cancel()
+
+    assert [s["text"] for s in segments] == ["chunk1", "chunk2"]
+    assert all(name.startswith("whisper") for _, name in fake_model.calls)
+    # the loop kept running during 0.4 s of blocking decode
+    assert ticks >= 20
+
+
+class FakeDecoder:
+    """Decodes pieces named by the test, like ffmpeg fed a growing recording."""
+
+    pieces: dict[bytes, np.ndarray] = {}
+    fed = 0
+
+    def __init__(self):
+        self.audio = np.zeros(0, dtype=np.float32)
+        self.killed = False
+
+    async def feed(self, audio_bytes):
+        FakeDecoder.fed += len(audio_bytes)
+        if audio_bytes:
+            self.audio = np.concatenate([self.audio, self.pieces[audio_bytes]])
+
+    def samples(self):
+        return self.audio
+
+    async def close(self):
+        return self.audio
+
+    def kill(self):
+        self.killed = True
+
+
+@pytest.fixture
+def fake_decoder(monkeypatch):
+    first = np.concatenate([_tone(1.0), _silence(1.0), _tone(0.5)])
+    monkeypatch.setattr(FakeDecoder, "pieces", {b"first": first, b"second": np.concatenate([_tone(0.5), _silence(1.0)])})
+    monkeypatch.setattr(FakeDecoder, "fed", 0)
+    monkeypatch.setattr(whisper, "StreamDecoder", FakeDecoder)
+
+    async def decode_audio(audio_bytes):
+        return np.concatenate([FakeDecoder.pieces[piece] for piece in audio_bytes.split(b"+")])
+
+    monkeypatch.setattr(whisper, "decode_audio", decode_audio)
+    return FakeDecoder
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+@pytest.mark.asyncio
+async def test_live_session_streams_finished_chunks_once(fake_model, fake_decoder):
+    # the second chunk is still being spoken
+    partial = await whisper.transcribe("tiny", _b64(b"first"), session="s1", final=False)
+    assert partial == {"text": "chunk1", "final": False}
+    assert len(fake_model.calls) == 1
+
+    # only the new piece is sent and decoded
+    final = await whisper.transcribe("tiny", _b64(b"second"), session="s1", final=True, offset=5)
+    assert final == {"text": "chunk1 chunk2", "final": True}
+    assert len(fake_model.calls) == 2
+    assert fake_decoder.fed == len(b"first") + len(b"second")
+
+    # without a session the whole recording is transcribed in one go
+    single = await whisper.transcribe("tiny", _b64(b"first+second"))
+    assert single == {"text": "chunk3 chunk4", "final": True}
+
+
+@pytest.mark.asyncio
+async def test_late_and_out_of_order_requests_are_ignored(fake_model, fake_decoder):
+    await whisper.transcribe("tiny", _b64(b"first"), session="s1", final=False)
+    await whisper.transcribe("tiny", _b64(b"second"), session="s1", final=True, offset=5)
+
+    # a partial request that arrives after the final one does not revive the session
+    late = await whisper.transcribe("tiny", _b64(b"first"), session="s1", final=False)
+    assert late == {"text": "", "final": False, "lost": True}
+    late = await whisper.transcribe("tiny", _b64(b"second"), session="s1", final=False, offset=5)
+    assert late == {"text": "", "final": False, "lost": True}
+    assert whisper._sessions["s1"].finished
+
+    # unknown sessions only start at the beginning of the recording
+    assert await whisper.transcribe("tiny", _b64(b"second"), session="s2", final=False, offset=5) == {
+        "text": "",
+        "final": False,
+        "lost": True,
+    }
+    assert "s2" not in whisper._sessions
+    final = await whisper.transcribe("tiny", _b64(b"second"), session="s2", final=True, offset=5)
+    assert final == {"text": "", "final": True, "lost": True}
+
+    # a piece that does not continue the recording is skipped
+    await whisper.transcribe("tiny", _b64(b"first"), session="s3", final=False)
+    skipped = await whisper.transcribe("tiny", _b64(b"second"), session="s3", final=False, offset=99)
+    assert skipped == {"text": "", "final": False, "lost": True}
+    assert whisper._sessions["s3"].received == len(b"first")
+    assert fake_decoder.fed == 2 * len(b"first") + len(b"second")
+
+    # a failed chunk loses the session, later pieces ask for the whole recording
+    fake_model.transcribe = lambda audio, fp16=True: 1 / 0
+    with pytest.raises(ZeroDivisionError):
+        await whisper.transcribe("tiny", _b64(b"first"), session="s4", final=False)
+    final = await whisper.transcribe("tiny", _b64(b"second"), session="s4", final=True, offset=5)
+    assert final == {"text": "", "final": True, "lost": True}
+
+    # expired sessions are dropped and their decoders stopped
+    state = whisper._sessions["s3"]
+    state.updated -= whisper.SESSION_TTL + 1
+    whisper._prune_sessions()
+    assert "s3" not in whisper._sessions and state.decoder.killed
+
+
+@pytest.mark.skipif(not TINY_MODEL.exists(), reason="tiny whisper model not downloaded")
+@pytest.mark.asyncio
+async def test_tiny_model_transcribes_numpy_buffers(monkeypatch):
+    monkeypatch.setattr(whisper.files, "get_abs_path", lambda *a: str(TINY_MODEL.parent))
+    monkeypatch.setattr(whisper.NotificationManager, "send_notification", lambda *a, **k: None)
+    await whisper.preload("tiny")
+    segments = [s async for s in whisper.stream_transcription(np.concatenate([_tone(1.0), _silence(1.0)]))]
+    assert len(segments) == 1 and isinstance(segments[0]["text"], str)
@@ -628,6 +628,9 @@ const model = {
     this.microphoneInput = new MicrophoneInput(async (text, isFinal) => {
       if (isFinal) {
         this.sendMessage(text);
+      } else if (!this.microphoneInput.messageSent) {
+        // preview of the chunks transcribed while still speaking
+        updateChatInput("(voice) " + text);
       }
     });
 
@@ -669,6 +672,11 @@ class MicrophoneInput {
     this.silenceStartTime = null;
     this.hasStartedRecording = false;
     this.analysisFrame = null;
+    this.session = null;
+    this.sentChunks = 0;
+    this.sentBytes = 0;
+    this.sessionLost = false;
+    this.partialRequest = null;
   }
 
   get status() {
@@ -715,6 +723,7 @@ class MicrophoneInput {
             this.lastChunk = null;
           }
           this.audioChunks.push(event.data);
+          this.processPartial();
         } else if (this.status === Status.LISTENING) {
           this.lastChunk = event.data;
         }
@@ -775,6 +784,10 @@ class MicrophoneInput {
   handleRecordingState() {
     if (!this.hasStartedRecording && this.mediaRecorder.state !== "recording") {
       this.hasStartedRecording = true;
+      this.session = Math.random().toString(36).slice(2) + Date.now().toString(36);
+      this.sentChunks = 0;
+      this.sentBytes = 0;
+      this.sessionLost = false;
       this.mediaRecorder.start(1000);
       console.log("Speech started");
     }
@@ -877,11 +890,19 @@ class MicrophoneInput {
       return;
     }
 
-    const audioBlob = new Blob(this.audioChunks, { type: "audio/wav" });
-    const base64 = await this.convertBlobToBase64Wav(audioBlob);
+    // partial requests of this session must reach the server first
+    await this.partialRequest;
+    const session = this.sessionLost ? null : this.session;
+    this.session = null;
 
     try {
-      const result = await sendJsonData("/transcribe", { audio: base64 });
+      let result = session ? await this.sendUnsentAudio(session, true) : null;
+      if (!result || result.lost) {
+        // the session missed a piece, transcribe the whole recording in one go
+        const audioBlob = new Blob(this.audioChunks, { type: "audio/wav" });
+        const base64 = await this.convertBlobToBase64Wav(audioBlob);
+        result = await sendJsonData("/transcribe", { audio: base64 });
+      }
       const text = this.filterResult(result.text || "");
 
       if (text) {
@@ -897,6 +918,53 @@ class MicrophoneInput {
     }
   }
 
+  // transcribe finished chunks of the recording while the user keeps speaking
+  processPartial() {
+    if (this.partialRequest || !this.session || this.sessionLost) return;
+    this.partialRequest = this.sendPartial(this.session).finally(() => {
+      this.partialRequest = null;
+    });
+  }
+
+  async sendPartial(session) {
+    try {
+      const result = await this.sendUnsentAudio(session, false);
+      if (result.lost) {
+        this.sessionLost = true;
+        return;
+      }
+      const text = this.filterResult(result.text || "");
+      if (text && session === this.session) {
+        await this.updateCallback(text, false);
+      }
+    } catch (error) {
+      // the server may or may not have the piece, the final request sends everything
+      this.sessionLost = true;
+      console.error("Partial transcription error:", error);
+    }
+  }
+
+  // send the chunks recorded since the last accepted request, the server keeps the rest
+  async sendUnsentAudio(session, final) {
+    const end = this.audioChunks.length;
+    const audioBlob = new Blob(this.audioChunks.slice(this.sentChunks, end), {
+      type: "audio/wav",
+    });
+    const offset = this.sentBytes;
+    const base64 = await this.convertBlobToBase64Wav(audioBlob);
+    const result = await sendJsonData("/transcribe", {
+      audio: base64,
+      session,
+      offset,
+      final,
+    });
+    if (!result.lost) {
+      this.sentChunks = end;
+      this.sentBytes = offset + audioBlob.size;
+    }
+    return result;
+  }
+
   convertBlobToBase64Wav(audioBlob) {
     return new Promise((resolve, reject) => {
       const reader = new FileReader();
@@ -72,6 +72,8 @@ const model = {
   runtimeEpoch: null,
   seqBase: 0,
   lastSeq: 0,
+  // contexts/tasks received since the last full push, by id (delta pushes only carry changes)
+  _collections: { contexts: new Map(), tasks: new Map() },
 
   _setMode(newMode, reason = "") {
     const oldMode = this.mode;
@@ -443,6 +445,26 @@ const model = {
     return await this.handshakePromise;
   },
 
+  // Rebuild full contexts/tasks lists of a delta push in place.
+  // Full pushes (no delta) replace the known items. Returns false if the delta
+  // references an item that was never received.
+  _mergeCollections(snapshot, delta) {
+    for (const key of ["contexts", "tasks"]) {
+      const items = Array.isArray(snapshot[key]) ? snapshot[key] : [];
+      if (!delta || typeof delta !== "object") {
+        this._collections[key] = new Map(items.map((item) => [item.id, item]));
+        continue;
+      }
+      const known = this._collections[key];
+      for (const item of items) known.set(item.id, item);
+      const ids = Array.isArray(delta[key]) ? delta[key] : [];
+      if (ids.some((id) => !known.has(id))) return false;
+      this._collections[key] = new Map(ids.map((id) => [id, known.get(id)]));
+      snapshot[key] = ids.map((id) => known.get(id));
+    }
+    return true;
+  },
+
   async _handlePush(envelope) {
     if (this.mode === SYNC_MODES.DEGRADED) {
       debug("[syncStore] ignoring state_push while DEGRADED");
@@ -481,6 +503,12 @@ const model = {
     }
 
     if (data.snapshot && typeof data.snapshot === "object") {
+      if (!this._mergeCollections(data.snapshot, data.delta)) {
+        debug("[syncStore] delta references unknown items -> resync");
+        this._setMode(SYNC_MODES.HANDSHAKE_PENDING, "delta mismatch");
+        await this.sendStateRequest({ forceFull: true });
+        return;
+      }
       await applySnapshot(data.snapshot, {
         onLogGuidReset: async () => {
           debug("[syncStore] log_guid reset -> resync (forceFull)");
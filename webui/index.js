@@ -275,6 +275,24 @@ function setConnectionStatus(connected) {
 let lastLogVersion = 0;
 let lastLogGuid = "";
 let lastSpokenNo = 0;
+// full content of received log items by no, used to expand append-only updates
+let logContents = new Map();
+
+// Log items streamed since the last snapshot only carry the appended content and
+// the length of the prefix the client already has (content_from).
+// Returns false if a prefix is not known and the log needs to be reloaded.
+function expandLogContents(logs) {
+  for (const log of logs || []) {
+    if (typeof log.content_from === "number") {
+      const known = logContents.get(log.no);
+      if (known === undefined || known.length < log.content_from) return false;
+      log.content = known.slice(0, log.content_from) + (log.content || "");
+      delete log.content_from;
+    }
+    logContents.set(log.no, log.content || "");
+  }
+  return true;
+}
 
 export function buildStateRequestPayload(options = {}) {
   const { forceFull = false } = options || {};
@@ -320,6 +338,7 @@ export async function applySnapshot(snapshot, options = {}) {
       if (chatHistoryEl) chatHistoryEl.innerHTML = "";
       lastLogVersion = 0;
       lastLogGuid = snapshot.log_guid;
+      logContents = new Map();
       if (typeof onLogGuidReset === "function") {
         await onLogGuidReset();
       }
@@ -328,9 +347,21 @@ export async function applySnapshot(snapshot, options = {}) {
     // First guid observed for this context: accept it and continue applying snapshot.
     lastLogVersion = 0;
     lastLogGuid = snapshot.log_guid;
+    logContents = new Map();
   }
 
   if (lastLogVersion != snapshot.log_version) {
+    if (!expandLogContents(snapshot.logs)) {
+      // Content delta does not match the rendered log, reload it from the start.
+      const chatHistoryEl = document.getElementById("chat-history");
+      if (chatHistoryEl) chatHistoryEl.innerHTML = "";
+      lastLogVersion = 0;
+      logContents = new Map();
+      if (typeof onLogGuidReset === "function") {
+        await onLogGuidReset();
+      }
+      return { updated: false, resynced: true };
+    }
     updated = true;
     setMessages(snapshot.logs);
     afterMessagesUpdate(snapshot.logs);
@@ -512,6 +543,7 @@ export const setContext = function (id) {
   // This ensures we get fresh data from the backend
   lastLogGuid = "";
   lastLogVersion = 0;
+  logContents = new Map();
   lastSpokenNo = 0;
 
   // Stop speech when switching chats